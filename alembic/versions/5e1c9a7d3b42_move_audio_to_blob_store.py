@@ -0,0 +1,83 @@
+"""move audio data from base64 columns to blob store
+
+Revision ID: 5e1c9a7d3b42
+Revises: db60ed29efff
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1c9a7d3b42'
+down_revision: Union[str, None] = 'db60ed29efff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, primary key, old base64 column, new column prefix)
+AUDIO_COLUMNS = [
+    ('text_segments', 'id', 'audio_data_b64', 'audio'),
+    ('sound_effects', 'effect_id', 'audio_data_b64', 'audio'),
+    ('texts', 'id', 'background_music_audio_b64', 'background_music_audio'),
+]
+
+
+def upgrade() -> None:
+    from services.blob_store import get_blob_store
+    blob_store = get_blob_store()
+    conn = op.get_bind()
+
+    for table, pk, old_column, prefix in AUDIO_COLUMNS:
+        op.add_column(table, sa.Column(f'{prefix}_hash', sa.String(64), nullable=True))
+        op.add_column(table, sa.Column(f'{prefix}_size', sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column(f'{prefix}_duration', sa.Float(), nullable=True))
+
+        # Move existing base64 audio into the blob store, one row at a time to bound memory
+        ids = [row[0] for row in conn.execute(sa.text(
+            f"SELECT {pk} FROM {table} WHERE {old_column} IS NOT NULL AND {old_column} != ''"
+        ))]
+        for row_id in ids:
+            audio_b64 = conn.execute(
+                sa.text(f"SELECT {old_column} FROM {table} WHERE {pk} = :id"), {'id': row_id}
+            ).scalar()
+            blob = blob_store.put_audio(audio_b64)
+            conn.execute(
+                sa.text(
+                    f"UPDATE {table} SET {prefix}_hash = :hash, {prefix}_size = :size, "
+                    f"{prefix}_duration = :duration WHERE {pk} = :id"
+                ),
+                {'hash': blob.hash, 'size': blob.size, 'duration': blob.duration, 'id': row_id}
+            )
+
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(old_column)
+
+
+def downgrade() -> None:
+    from services.blob_store import get_blob_store
+    blob_store = get_blob_store()
+    conn = op.get_bind()
+
+    for table, pk, old_column, prefix in AUDIO_COLUMNS:
+        op.add_column(table, sa.Column(old_column, sa.Text(), nullable=True))
+
+        # Inline the stored audio back into the row as base64
+        rows = conn.execute(sa.text(
+            f"SELECT {pk}, {prefix}_hash FROM {table} WHERE {prefix}_hash IS NOT NULL"
+        )).fetchall()
+        for row_id, audio_hash in rows:
+            audio_b64 = blob_store.get_audio_b64(audio_hash)
+            if audio_b64 is None:
+                continue
+            conn.execute(
+                sa.text(f"UPDATE {table} SET {old_column} = :data WHERE {pk} = :id"),
+                {'data': audio_b64, 'id': row_id}
+            )
+
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(f'{prefix}_duration')
+            batch_op.drop_column(f'{prefix}_size')
+            batch_op.drop_column(f'{prefix}_hash')
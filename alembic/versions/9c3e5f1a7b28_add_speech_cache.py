@@ -0,0 +1,38 @@
+"""add speech cache table
+
+Revision ID: 9c3e5f1a7b28
+Revises: f27b8d0c6a51
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5f1a7b28'
+down_revision: Union[str, None] = 'f27b8d0c6a51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('speech_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('voice_id', sa.String(), nullable=False),
+    sa.Column('audio_hash', sa.String(length=64), nullable=False),
+    sa.Column('audio_size', sa.Integer(), nullable=True),
+    sa.Column('audio_duration', sa.Float(), nullable=True),
+    sa.Column('hit_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index('ix_speech_cache_voice_id', 'speech_cache', ['voice_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_speech_cache_voice_id', table_name='speech_cache')
+    op.drop_table('speech_cache')
@@ -0,0 +1,39 @@
+"""add composite indexes for hot lookup paths
+
+Revision ID: a3f7c2e9d104
+Revises: 5e1c9a7d3b42
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f7c2e9d104'
+down_revision: Union[str, None] = '5e1c9a7d3b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_text_segments_text_id_sequence', 'text_segments', ['text_id', 'sequence']),
+    ('ix_text_segments_character_id', 'text_segments', ['character_id']),
+    ('ix_characters_text_id', 'characters', ['text_id']),
+    ('ix_sound_effects_text_id', 'sound_effects', ['text_id']),
+    ('ix_sound_effects_segment_id', 'sound_effects', ['segment_id']),
+    ('ix_process_logs_text_id_timestamp', 'process_logs', ['text_id', 'timestamp']),
+]
+
+
+def upgrade() -> None:
+    # if_not_exists: databases created by Base.metadata.create_all already have them
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,34 @@
+"""add paragraph hashes to texts and paragraph spans to segments
+
+Revision ID: b5d2e8f4a630
+Revises: 9c3e5f1a7b28
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f4a630'
+down_revision: Union[str, None] = '9c3e5f1a7b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Left NULL for texts analyzed before this revision: their first incremental
+    # re-analysis falls back to a full one, which fills them in
+    op.add_column('texts', sa.Column('paragraph_hashes', sa.JSON(), nullable=True))
+    op.add_column('text_segments', sa.Column('paragraph_start', sa.Integer(), nullable=True))
+    op.add_column('text_segments', sa.Column('paragraph_end', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('text_segments') as batch_op:
+        batch_op.drop_column('paragraph_end')
+        batch_op.drop_column('paragraph_start')
+    with op.batch_alter_table('texts') as batch_op:
+        batch_op.drop_column('paragraph_hashes')
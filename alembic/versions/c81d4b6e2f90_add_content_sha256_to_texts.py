@@ -0,0 +1,49 @@
+"""add content_sha256 to texts
+
+Revision ID: c81d4b6e2f90
+Revises: a3f7c2e9d104
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d4b6e2f90'
+down_revision: Union[str, None] = 'a3f7c2e9d104'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('texts', sa.Column('content_sha256', sa.String(64), nullable=True))
+
+    # Backfill hashes; when older rows duplicate each other only the oldest keeps
+    # its hash so the unique index can be created (lookups resolve to that row)
+    conn = op.get_bind()
+    seen = set()
+    ids = [row[0] for row in conn.execute(sa.text("SELECT id FROM texts ORDER BY id"))]
+    for text_id in ids:
+        content = conn.execute(
+            sa.text("SELECT content FROM texts WHERE id = :id"), {'id': text_id}
+        ).scalar()
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if content_hash in seen:
+            continue
+        seen.add(content_hash)
+        conn.execute(
+            sa.text("UPDATE texts SET content_sha256 = :hash WHERE id = :id"),
+            {'hash': content_hash, 'id': text_id}
+        )
+
+    op.create_index('ix_texts_content_sha256', 'texts', ['content_sha256'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_texts_content_sha256', table_name='texts')
+    with op.batch_alter_table('texts') as batch_op:
+        batch_op.drop_column('content_sha256')
@@ -0,0 +1,31 @@
+"""add speech generation status to text segments
+
+Revision ID: d83f1c6b2e47
+Revises: b5d2e8f4a630
+Create Date: 2026-10-16 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83f1c6b2e47'
+down_revision: Union[str, None] = 'b5d2e8f4a630'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('text_segments', sa.Column('audio_status', sa.String(length=16), nullable=True))
+    op.add_column('text_segments', sa.Column('audio_error', sa.Text(), nullable=True))
+    # Segments that already have audio were generated successfully
+    op.execute("UPDATE text_segments SET audio_status = 'done' WHERE audio_hash IS NOT NULL")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('text_segments') as batch_op:
+        batch_op.drop_column('audio_error')
+        batch_op.drop_column('audio_status')
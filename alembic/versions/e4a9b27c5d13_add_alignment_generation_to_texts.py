@@ -0,0 +1,31 @@
+"""add alignment generation counters to texts
+
+Revision ID: e4a9b27c5d13
+Revises: c81d4b6e2f90
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9b27c5d13'
+down_revision: Union[str, None] = 'c81d4b6e2f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('texts', sa.Column('alignment_generation', sa.Integer(), server_default='0', nullable=False))
+    # Left NULL for existing rows: alignments made before the counter existed
+    # are treated as stale and recomputed on the next export
+    op.add_column('texts', sa.Column('force_alignment_generation', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('texts') as batch_op:
+        batch_op.drop_column('force_alignment_generation')
+        batch_op.drop_column('alignment_generation')
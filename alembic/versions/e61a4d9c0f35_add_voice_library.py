@@ -0,0 +1,36 @@
+"""add voice library table
+
+Revision ID: e61a4d9c0f35
+Revises: d83f1c6b2e47
+Create Date: 2026-10-17 00:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e61a4d9c0f35'
+down_revision: Union[str, None] = 'd83f1c6b2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('voice_library',
+    sa.Column('description_hash', sa.String(length=64), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('voice_id', sa.String(), nullable=False),
+    sa.Column('voice_name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('use_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('description_hash')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('voice_library')
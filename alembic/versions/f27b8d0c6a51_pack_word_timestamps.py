@@ -0,0 +1,62 @@
+"""store word timestamps in packed columnar form
+
+Revision ID: f27b8d0c6a51
+Revises: e4a9b27c5d13
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from db.word_timestamps import WordTimestamps, pack_word_timestamps
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f27b8d0c6a51'
+down_revision: Union[str, None] = 'e4a9b27c5d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _json_value(value):
+    # Drivers return JSON columns either decoded or as text
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def upgrade() -> None:
+    op.add_column('texts', sa.Column('word_timestamps_data', sa.LargeBinary(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id FROM texts WHERE word_timestamps IS NOT NULL")).fetchall()
+    for (text_id,) in rows:
+        word_timestamps = _json_value(conn.execute(
+            sa.text("SELECT word_timestamps FROM texts WHERE id = :id"), {'id': text_id}
+        ).scalar())
+        if not word_timestamps:
+            continue
+        conn.execute(
+            sa.text("UPDATE texts SET word_timestamps_data = :data WHERE id = :id"),
+            {'data': pack_word_timestamps(word_timestamps), 'id': text_id}
+        )
+
+    with op.batch_alter_table('texts') as batch_op:
+        batch_op.drop_column('word_timestamps')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('texts') as batch_op:
+        batch_op.add_column(sa.Column('word_timestamps', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    texts = sa.table('texts', sa.column('id', sa.Integer), sa.column('word_timestamps', sa.JSON))
+    rows = conn.execute(sa.text("SELECT id, word_timestamps_data FROM texts WHERE word_timestamps_data IS NOT NULL")).fetchall()
+    for text_id, data in rows:
+        conn.execute(
+            texts.update().where(texts.c.id == text_id).values(word_timestamps=WordTimestamps(data).to_list())
+        )
+
+    with op.batch_alter_table('texts') as batch_op:
+        batch_op.drop_column('word_timestamps_data')
@@ -0,0 +1,47 @@
+"""add provider voice index
+
+Revision ID: f4b7c2a9d816
+Revises: e61a4d9c0f35
+Create Date: 2026-10-17 01:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b7c2a9d816'
+down_revision: Union[str, None] = 'e61a4d9c0f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('provider_voices',
+    sa.Column('voice_id', sa.String(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('text_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('voice_id')
+    )
+    op.create_index('ix_provider_voices_text_id', 'provider_voices', ['text_id'], unique=False)
+
+    # Record existing voices: library voices, then per-text voices saved as [name]_[text_id]
+    op.execute(
+        "INSERT INTO provider_voices (voice_id, provider, name, text_id) "
+        "SELECT voice_id, provider, voice_name, NULL FROM voice_library"
+    )
+    op.execute(
+        "INSERT INTO provider_voices (voice_id, provider, name, text_id) "
+        "SELECT provider_id, 'HUME', MIN(name || '_' || CAST(text_id AS VARCHAR)), MIN(text_id) FROM characters "
+        "WHERE provider_id IS NOT NULL AND provider_id NOT IN (SELECT voice_id FROM voice_library) "
+        "GROUP BY provider_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_provider_voices_text_id', table_name='provider_voices')
+    op.drop_table('provider_voices')
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
+import asyncio
 import os
-import base64
 import warnings
 
 from db.database import get_db
 from db import crud, models
 from services import speech_generation, background_music, combine_export_audio
+from services.blob_store import get_blob_store
 from utils.config import settings
 
 router = APIRouter(
@@ -41,9 +42,10 @@ async def generate_audio_for_text(
 @router.post("/text/{text_id}/generate-segments", response_model=Dict[str, Any])
 async def generate_segments_audio(
     text_id: int,
+    resume: bool = Query(False, description="Only generate segments whose audio is not done yet"),
     db: Session = Depends(get_db)
 ):
-    """Generate audio for all segments of a text"""
+    """Generate audio for all segments of a text, or only the unfinished ones when resuming"""
     db_text = crud.get_text(db, text_id)
     if not db_text:
         raise HTTPException(status_code=404, detail="Text not found")
@@ -53,7 +55,7 @@ async def generate_segments_audio(
         raise HTTPException(status_code=400, detail="Text must be analyzed before generating audio")
     
     # Generate audio with parallel batch processing - now returns True/False instead of file paths
-    success = await speech_generation.generate_text_audio(db, text_id)
+    success = await speech_generation.generate_text_audio(text_id, resume=resume)
     
     # Return the generation status
     return {
@@ -84,8 +86,8 @@ async def generate_background_music(
     # Process background music (both prompt and music generation)
     try:
         # Step 1: Generate prompt using audio analysis
-        from services.audio_analysis import analyze_text_for_audio
-        soundscape, _ = analyze_text_for_audio(text_id)
+        from services.audio_analysis import analyze_text_for_audio_async
+        soundscape, _ = await analyze_text_for_audio_async(text_id)
         
         if not soundscape:
             raise HTTPException(status_code=500, detail="Failed to generate background music prompt")
@@ -125,7 +127,7 @@ async def get_background_music_status(
         stacklevel=2
     )
     
-    db_text = crud.get_text(db, text_id)
+    db_text = crud.get_text_summary(db, text_id)
     if not db_text:
         raise HTTPException(status_code=404, detail="Text not found")
     
@@ -182,7 +184,7 @@ async def export_final_audio(
     
     # Get segments to verify audio is generated
     segments = crud.get_segments_by_text(db, text_id)
-    segments_with_audio = [segment for segment in segments if segment.audio_data_b64]
+    segments_with_audio = [segment for segment in segments if segment.audio_hash]
     
     if not segments_with_audio:
         raise HTTPException(status_code=400, detail="No segments have audio generated. Generate audio first.")
@@ -205,22 +207,31 @@ async def get_audio_for_text(
     db: Session = Depends(get_db)
 ):
     """Get audio information for a text"""
-    db_text = crud.get_text(db, text_id)
+    db_text = crud.get_text_summary(db, text_id)
     if not db_text:
         raise HTTPException(status_code=404, detail="Text not found")
     
-    # Get segments with audio
-    segments = crud.get_segments_by_text(db, text_id)
+    # Get segments with audio (audio references only, no segment text)
+    segments = crud.get_segment_summaries_by_text(db, text_id)
     
     # Check for audio data in the segments
-    segments_with_audio = [segment for segment in segments if segment.audio_data_b64]
+    segments_with_audio = [segment for segment in segments if segment.has_audio]
+    
+    # Per-segment speech generation status, so partially generated texts can be resumed
+    segment_status = {"done": 0, "pending": 0, "failed": 0}
+    for segment in segments:
+        if segment.audio_status in segment_status:
+            segment_status[segment.audio_status] += 1
+    failed_segment_ids = [segment.id for segment in segments if segment.audio_status == "failed"]
     
     if not segments_with_audio:
         return {
             "text_id": text_id,
             "status": "not_generated",
             "segments_count": 0,
-            "segments_with_audio_count": 0
+            "segments_with_audio_count": 0,
+            "segment_status": segment_status,
+            "failed_segment_ids": failed_segment_ids
         }
     
     # Return audio info 
@@ -228,7 +239,9 @@ async def get_audio_for_text(
         "text_id": text_id,
         "status": "generated",
         "segments_count": len(segments),
-        "segments_with_audio_count": len(segments_with_audio)
+        "segments_with_audio_count": len(segments_with_audio),
+        "segment_status": segment_status,
+        "failed_segment_ids": failed_segment_ids
     }
 
 @router.get("/text/{text_id}/segment/{segment_id}/audio")
@@ -247,11 +260,13 @@ async def get_segment_audio(
     if not segment:
         raise HTTPException(status_code=404, detail="Segment not found")
     
-    if not segment.audio_data_b64:
+    if not segment.audio_hash:
         raise HTTPException(status_code=404, detail="Audio not generated for this segment")
     
-    # Decode base64 audio data
-    audio_bytes = base64.b64decode(segment.audio_data_b64)
+    # Load audio bytes from the blob store
+    audio_bytes = await asyncio.to_thread(get_blob_store().get, segment.audio_hash)
+    if audio_bytes is None:
+        raise HTTPException(status_code=404, detail="Audio data missing from storage for this segment")
     
     return Response(content=audio_bytes, media_type="audio/mpeg")
 
@@ -301,7 +316,7 @@ async def run_force_alignment_for_text(
 
     # Check if segments have audio data
     segments = crud.get_segments_by_text(db, text_id)
-    if not any(s.audio_data_b64 for s in segments):
+    if not any(s.audio_hash for s in segments):
          raise HTTPException(status_code=400, detail="Speech has not been generated for this text's segments. Please generate audio first.")
 
     # Force alignment is now handled automatically in combine_speech_segments
@@ -314,10 +329,11 @@ async def run_force_alignment_for_text(
 
     # Fetch the updated timestamps to return them
     updated_text = crud.get_text(db, text_id)
+    word_timestamps = updated_text.word_timestamps
     
     return {
         "text_id": text_id,
         "success": True,
-        "word_timestamps": updated_text.word_timestamps,
+        "word_timestamps": word_timestamps.to_list() if word_timestamps else None,
         "warning": "⚠️ This endpoint is deprecated. Use /api/export/{text_id}/force-align instead."
     }
\ No newline at end of file
@@ -78,7 +78,7 @@ async def get_audio_analysis(
         404: Text not found or no analysis available
     """
     # Validate text exists
-    db_text = crud.get_text(db, text_id)
+    db_text = crud.get_text_summary(db, text_id)
     if not db_text:
         raise HTTPException(
             status_code=404, 
@@ -116,7 +116,8 @@ async def get_audio_analysis(
                     "prompt": effect.prompt,
                     "rank": effect.rank,
                     "total_time": effect.total_time,
-                    "has_audio": bool(effect.audio_data_b64)
+                    "has_audio": effect.has_audio,
+                    "audio_size": effect.audio_size
                 }
                 for effect in sound_effects
             ]
@@ -141,7 +142,7 @@ async def get_soundscape(
         404: Text not found or no soundscape available
     """
     # Validate text exists
-    db_text = crud.get_text(db, text_id)
+    db_text = crud.get_text_summary(db, text_id)
     if not db_text:
         raise HTTPException(
             status_code=404, 
@@ -184,7 +185,7 @@ async def get_sound_effects_from_analysis(
         404: Text not found or no sound effects available
     """
     # Validate text exists
-    db_text = crud.get_text(db, text_id)
+    db_text = crud.get_text_summary(db, text_id)
     if not db_text:
         raise HTTPException(
             status_code=404, 
@@ -216,7 +217,8 @@ async def get_sound_effects_from_analysis(
                     "prompt": effect.prompt,
                     "rank": effect.rank,
                     "total_time": effect.total_time,
-                    "has_audio": bool(effect.audio_data_b64)
+                    "has_audio": effect.has_audio,
+                    "audio_size": effect.audio_size
                 }
                 for effect in sound_effects
             ]
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Path, Query, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
-import base64
+import asyncio
 import os
 
+from db.async_database import get_async_db
 from db.database import get_db
-from db import crud
+from db import async_crud, crud
 from services import background_music
+from services.blob_store import get_blob_store
 from utils.config import settings
 from utils.logging import get_logger
 from db.session_manager import managed_db_session
@@ -28,8 +31,8 @@ async def complete_background_music_processing(text_id: int):
     with managed_db_session() as db:
         try:
             # Step 1: Generate prompt using audio analysis
-            from services.audio_analysis import analyze_text_for_audio
-            soundscape, _ = analyze_text_for_audio(text_id)
+            from services.audio_analysis import analyze_text_for_audio_async
+            soundscape, _ = await analyze_text_for_audio_async(text_id)
             
             if soundscape:
                 # Store the prompt
@@ -75,8 +78,8 @@ async def generate_music_prompt(
     
     try:
         # Generate music prompt using audio analysis
-        from services.audio_analysis import analyze_text_for_audio
-        soundscape, _ = analyze_text_for_audio(text_id)
+        from services.audio_analysis import analyze_text_for_audio_async
+        soundscape, _ = await analyze_text_for_audio_async(text_id)
         
         if not soundscape:
             raise HTTPException(
@@ -203,7 +206,7 @@ async def process_background_music(
         )
     
     # Check if music already exists and force flag
-    if not force and db_text.background_music_audio_b64:
+    if not force and db_text.background_music_audio_hash:
         return {
             "text_id": text_id,
             "status": "completed",
@@ -232,7 +235,7 @@ async def process_background_music(
 @router.get("/{text_id}")
 async def get_background_music_status(
     text_id: int = Path(..., description="ID of the text to get music status for"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get background music status for a given text.
@@ -247,7 +250,7 @@ async def get_background_music_status(
         404: Text not found
     """
     # Check if text exists
-    db_text = crud.get_text(db, text_id)
+    db_text = await async_crud.get_text_summary(db, text_id)
     if not db_text:
         raise HTTPException(
             status_code=404,
@@ -256,7 +259,7 @@ async def get_background_music_status(
     
     # Check music status
     has_prompt = bool(db_text.background_music_prompt)
-    has_audio = bool(db_text.background_music_audio_b64)
+    has_audio = db_text.has_background_music
     
     # Determine status
     if has_audio:
@@ -317,16 +320,21 @@ async def download_background_music(
         )
     
     # Check if background music exists
-    if not db_text.background_music_audio_b64:
+    if not db_text.background_music_audio_hash:
         raise HTTPException(
             status_code=404,
             detail="Background music not generated for this text"
         )
     
+    # Load audio bytes from the blob store
+    audio_bytes = await asyncio.to_thread(get_blob_store().get, db_text.background_music_audio_hash)
+    if audio_bytes is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Background music data missing from storage"
+        )
+    
     try:
-        # Decode base64 audio
-        audio_bytes = base64.b64decode(db_text.background_music_audio_b64)
-        
         # Return as file download
         filename = f"background_music_text_{text_id}.{format}"
         
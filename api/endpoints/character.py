@@ -93,6 +93,8 @@ async def create_character_voice(
     
     # Check for force regenerate flag
     force_regenerate = data.get("force_regenerate", False)
+    # Reuse a voice from the cross-text voice library when the description matches
+    use_library = data.get("use_library", True)
     
     # Generate voice
     try:
@@ -102,7 +104,8 @@ async def create_character_voice(
             character_description=character.description or "",
             character_intro_text=character.intro_text or "",
             text_id=text_id,
-            force_regenerate=force_regenerate
+            force_regenerate=force_regenerate,
+            use_library=use_library
         )
         
         if voice_id is None:
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, BackgroundTasks, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 import os
 import tempfile
 
+from db.async_database import get_async_db
 from db.database import get_db
-from db import crud
+from db import async_crud, crud
 from services import combine_export_audio
 from utils.config import settings
 from utils.logging import get_logger
@@ -49,7 +51,7 @@ async def combine_speech_segments_endpoint(
     
     # Check if segments have audio data
     segments = crud.get_segments_by_text(db, text_id)
-    segments_with_audio = [segment for segment in segments if segment.audio_data_b64]
+    segments_with_audio = [segment for segment in segments if segment.audio_hash]
     
     if not segments_with_audio:
         raise HTTPException(
@@ -118,7 +120,7 @@ async def run_force_alignment(
 
     # Check if segments have audio data
     segments = crud.get_segments_by_text(db, text_id)
-    if not any(s.audio_data_b64 for s in segments):
+    if not any(s.audio_hash for s in segments):
         raise HTTPException(
             status_code=400,
             detail="Speech has not been generated for this text's segments. Please generate audio first."
@@ -137,6 +139,7 @@ async def run_force_alignment(
 
         # Fetch the updated timestamps to return them
         updated_text = crud.get_text(db, text_id)
+        word_timestamps = updated_text.word_timestamps
         
         logger.info(f"Successfully completed force alignment for text ID {text_id}")
         
@@ -145,7 +148,7 @@ async def run_force_alignment(
             "status": "success", 
             "message": "Force alignment completed successfully",
             "data": {
-                "word_timestamps": updated_text.word_timestamps,
+                "word_timestamps": word_timestamps.to_list() if word_timestamps else None,
                 "combined_audio_path": combined_audio_path
             }
         }
@@ -196,7 +199,7 @@ async def export_final_audio_endpoint(
     
     # Get segments to verify audio is generated
     segments = crud.get_segments_by_text(db, text_id)
-    segments_with_audio = [segment for segment in segments if segment.audio_data_b64]
+    segments_with_audio = [segment for segment in segments if segment.audio_hash]
     
     if not segments_with_audio:
         raise HTTPException(
@@ -247,7 +250,7 @@ async def export_final_audio_endpoint(
 @router.get("/{text_id}/status", response_model=Dict[str, Any])
 async def get_export_status(
     text_id: int = Path(..., description="ID of the text to check status for"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get export status for a text including available files and processing state.
@@ -264,26 +267,28 @@ async def get_export_status(
     logger.info(f"Getting export status for text ID {text_id}")
     
     # Validate text exists
-    db_text = crud.get_text(db, text_id)
+    db_text = await async_crud.get_text_summary(db, text_id)
     if not db_text:
         raise HTTPException(
             status_code=404,
             detail=f"Text with ID {text_id} not found"
         )
     
-    # Get segments with audio
-    segments = crud.get_segments_by_text(db, text_id)
-    segments_with_audio = [segment for segment in segments if segment.audio_data_b64]
+    # Get segments with audio (audio references only, no segment text)
+    segments = await async_crud.get_segment_summaries_by_text(db, text_id)
+    segments_with_audio = [segment for segment in segments if segment.has_audio]
     
     # Check for word timestamps (indicates force alignment completed)
-    has_word_timestamps = bool(db_text.word_timestamps)
+    has_word_timestamps = await async_crud.has_word_timestamps(db, text_id)
+    # Timestamps are stale if segment audio changed after the last alignment
+    force_alignment_current = has_word_timestamps and await async_crud.is_force_alignment_current(db, text_id)
     
     # Check for background music
-    has_background_music = bool(db_text.background_music_audio_b64)
+    has_background_music = db_text.has_background_music
     
     # Check for sound effects with audio
-    sound_effects = crud.get_sound_effects_by_text(db, text_id)
-    sound_effects_with_audio = [fx for fx in sound_effects if fx.audio_data_b64]
+    sound_effects = await async_crud.get_sound_effect_summaries_by_text(db, text_id)
+    sound_effects_with_audio = [fx for fx in sound_effects if fx.has_audio]
     
     # Check for exported files in output directory
     output_dir = os.path.join(os.getcwd(), "output")
@@ -304,7 +309,7 @@ async def get_export_status(
     # Determine overall status
     if not segments_with_audio:
         status = "no_audio"
-    elif not has_word_timestamps:
+    elif not force_alignment_current:
         status = "speech_ready"
     elif available_files:
         status = "exported"
@@ -319,6 +324,7 @@ async def get_export_status(
             "segments_count": len(segments),
             "segments_with_audio": len(segments_with_audio),
             "has_word_timestamps": has_word_timestamps,
+            "force_alignment_current": force_alignment_current,
             "has_background_music": has_background_music,
             "sound_effects_count": len(sound_effects),
             "sound_effects_with_audio": len(sound_effects_with_audio),
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Literal, Optional
 from pydantic import BaseModel
 
+from db.async_database import get_async_db
 from db.database import get_db
-from db import crud
+from db import async_crud
 from utils.logging import get_logger
 
 router = APIRouter(
@@ -36,7 +38,7 @@ async def handle_replicate_webhook(
     payload: WebhookPayload,
     background_tasks: BackgroundTasks, 
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Unified webhook handler for Replicate predictions.
@@ -48,7 +50,7 @@ async def handle_replicate_webhook(
         payload: Replicate webhook payload
         background_tasks: FastAPI background tasks
         request: HTTP request for logging
-        db: Database session
+        db: Async database session (lookups do not block the event loop during webhook bursts)
     """
     
     # Log webhook receipt
@@ -67,11 +69,11 @@ async def handle_replicate_webhook(
     try:
         # Validate content exists
         if content_type == "sound_effect":
-            content = crud.get_sound_effect(db, content_id)
+            content = await async_crud.get_sound_effect(db, content_id)
             if not content:
                 raise HTTPException(status_code=404, detail=f"Sound effect {content_id} not found")
         elif content_type == "background_music":
-            content = crud.get_text(db, content_id)
+            content = await async_crud.get_text(db, content_id)
             if not content:
                 raise HTTPException(status_code=404, detail=f"Text {content_id} not found")
         
@@ -45,14 +45,14 @@ async def generate_sound_effects_for_text(text_id: int, background_tasks: Backgr
     if force:
         # Clear existing audio data if force=true using proper CRUD function
         for effect in sound_effects:
-            if effect.audio_data_b64:
+            if effect.audio_hash:
                 # Use the proper CRUD function that handles timestamps
-                crud.update_sound_effect_audio(db, effect.effect_id, "")
+                crud.update_sound_effect_audio(db, effect.effect_id, None)
         # No need for db.commit() as the CRUD function handles it
         effects_needing_generation = sound_effects
         message_suffix = " (forced regeneration)"
     else:
-        effects_needing_generation = [effect for effect in sound_effects if not effect.audio_data_b64 or effect.audio_data_b64.strip() == ""]
+        effects_needing_generation = [effect for effect in sound_effects if not effect.audio_hash]
         message_suffix = ""
     
     if effects_needing_generation:
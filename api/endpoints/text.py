@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 import warnings
 
+from db.async_database import get_async_db
 from db.database import get_db
-from db import crud, models
+from db import async_crud, crud
 from services import text_analysis
 
 router = APIRouter(
@@ -27,7 +30,7 @@ class TextResponse(BaseModel):
 @router.post("/", response_model=TextResponse)
 async def create_text(
     text_data: Dict[str, Any] = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new text entry"""
     content = text_data.get("content")
@@ -37,34 +40,36 @@ async def create_text(
         raise HTTPException(status_code=400, detail="Content is required")
     
     # Check if text already exists
-    existing_text = crud.get_text_by_content(db, content)
-    if existing_text:
-        return {
-            "id": existing_text.id,
-            "content": existing_text.content,
-            "title": existing_text.title,
-            "analyzed": existing_text.analyzed,
-            "created": False
-        }
+    db_text = await async_crud.get_text_by_content(db, content)
+    created = False
     
-    # Create new text
-    db_text = crud.create_text(db, content, title)
+    if not db_text:
+        # Create new text; a concurrent request may have created the same content since
+        # the check, in which case the unique content hash rejects this insert
+        try:
+            db_text = await async_crud.create_text(db, content, title)
+            created = True
+        except IntegrityError:
+            await db.rollback()
+            db_text = await async_crud.get_text_by_content(db, content)
+            if not db_text:
+                raise
     
     return {
         "id": db_text.id,
         "content": db_text.content,
         "title": db_text.title,
         "analyzed": db_text.analyzed,
-        "created": True
+        "created": created
     }
 
 @router.get("/{text_id}", response_model=TextResponse)
 async def get_text(
     text_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a text by ID"""
-    db_text = crud.get_text(db, text_id)
+    db_text = await async_crud.get_text(db, text_id)
     if not db_text:
         raise HTTPException(status_code=404, detail="Text not found")
     
@@ -77,10 +82,10 @@ async def get_text(
 
 @router.get("/", response_model=List[TextResponse])
 async def list_texts(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all texts"""
-    texts = db.query(models.Text).all()
+    texts = await async_crud.get_texts(db)
     
     return [{
         "id": text.id,
@@ -120,7 +125,7 @@ async def analyze_text_endpoint(
         }
     
     # Analyze text
-    await text_analysis.process_text_analysis(db, text_id, db_text.content)
+    await text_analysis.process_text_analysis(text_id, db_text.content, use_cache=not force)
     
     # Return updated text
     db_text = crud.get_text(db, text_id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Path, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, BackgroundTasks, Path, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
@@ -43,18 +43,27 @@ class SegmentResponse(BaseModel):
 async def analyze_text_full(
     text_id: int = Path(..., description="ID of the text to analyze"),
     skip_if_analyzed: bool = Query(False, description="Skip analysis if already analyzed"),
+    incremental: bool = Query(False, description="Re-segment only the paragraphs that changed since the last analysis"),
+    content: Optional[str] = Body(None, embed=True, description="Edited content to analyze and store in place of the current content"),
+    no_cache: bool = Query(False, description="Call Anthropic even if identical requests have cached responses"),
     background_tasks: BackgroundTasks = None,
     db: Session = Depends(get_db)
 ):
     """
     Run full text analysis to extract characters and segments.
     
-    By default, this will always reprocess the text, deleting existing characters/segments
-    and making fresh calls to Anthropic API.
+    By default, this will always reprocess the text, deleting existing characters/segments.
+    Anthropic responses to identical earlier requests are replayed from the LLM response
+    cache (for LLM_CACHE_TTL_HOURS); set no_cache to make fresh calls instead, e.g. to
+    re-roll the analysis of an unchanged text.
     
     Args:
         text_id: ID of the text to analyze
-        skip_if_analyzed: Skip analysis if text is already marked as analyzed
+        skip_if_analyzed: Skip analysis if text is already marked as analyzed (and content is unchanged)
+        incremental: Keep the segments (and their audio) of unchanged paragraphs and
+            re-segment only the changed ones; falls back to a full analysis when not possible
+        content: Edited text content; saved as the text's content by the analysis
+        no_cache: Skip the LLM response cache and call Anthropic again
         
     Returns:
         Processing status and details
@@ -62,6 +71,7 @@ async def analyze_text_full(
     Raises:
         404: Text not found
         400: Text content is empty
+        409: Another text already has the edited content
         500: Analysis error
     """
     logger.info(f"Starting full text analysis for text ID {text_id}")
@@ -74,15 +84,27 @@ async def analyze_text_full(
             detail=f"Text with ID {text_id} not found"
         )
     
+    if content is None:
+        content = db_text.content
+    
     # Check if content exists
-    if not db_text.content or not db_text.content.strip():
+    if not content or not content.strip():
         raise HTTPException(
             status_code=400,
             detail="Text content is empty"
         )
     
+    # Texts are unique by content, so an edit may not duplicate another text
+    if content != db_text.content:
+        duplicate = crud.get_text_by_content(db, content)
+        if duplicate and duplicate.id != text_id:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Text with ID {duplicate.id} already has this content"
+            )
+    
     # Check if should skip if already analyzed
-    if db_text.analyzed and skip_if_analyzed:
+    if db_text.analyzed and skip_if_analyzed and content == db_text.content:
         logger.info(f"Text {text_id} already analyzed, skipping reanalysis")
         return TextAnalysisResponse(
             text_id=text_id,
@@ -95,8 +117,8 @@ async def analyze_text_full(
         # Run analysis in background if BackgroundTasks is available
         if background_tasks:
             background_tasks.add_task(
-                text_analysis.process_text_analysis, 
-                db, text_id, db_text.content
+                text_analysis.process_text_analysis,
+                text_id, content, incremental=incremental, use_cache=not no_cache
             )
             return TextAnalysisResponse(
                 text_id=text_id,
@@ -105,7 +127,7 @@ async def analyze_text_full(
             )
         else:
             # Run synchronously
-            await text_analysis.process_text_analysis(db, text_id, db_text.content)
+            await text_analysis.process_text_analysis(text_id, content, incremental=incremental, use_cache=not no_cache)
             logger.info(f"Successfully completed text analysis for text ID {text_id}")
             return TextAnalysisResponse(
                 text_id=text_id,
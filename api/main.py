@@ -1,13 +1,18 @@
 from fastapi import FastAPI, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
+import asyncio
 import os
 import time
+from contextlib import asynccontextmanager
 from typing import Dict, List
 from datetime import datetime, timedelta
 
 from .endpoints import text, character, audio, sound_effects, audio_analysis, background_music, export_audio, text_analysis, replicate_webhook
 from db.database import engine, Base
+from db.async_database import dispose_async_engine
+from db.log_writer import shutdown_log_writer
+from services.voice_index import run_voice_reconciliation
 from utils.config import settings
 from utils.logging import SessionLogger, get_logger
 import utils.http_client
@@ -25,10 +30,24 @@ else:
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Periodically reconcile the local index of Hume voices with the account
+    reconciliation = None
+    if settings.VOICE_RECONCILE_INTERVAL_MINUTES > 0 and settings.HUME_API_KEY:
+        reconciliation = asyncio.create_task(run_voice_reconciliation(settings.VOICE_RECONCILE_INTERVAL_MINUTES))
+    yield
+    if reconciliation:
+        reconciliation.cancel()
+    # Write buffered process logs and close pooled async database connections on shutdown
+    shutdown_log_writer()
+    await dispose_async_engine()
+
 app = FastAPI(
     title="Narratix API",
     description="API for Narratix text-to-audio conversion",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Webhook monitoring state
@@ -0,0 +1,88 @@
+"""
+Async counterparts of db/crud.py for endpoints using db.async_database.get_async_db.
+
+Each function issues the same query as its sync namesake in db/crud.py. Only the
+functions needed by the endpoints migrated to AsyncSession are provided so far.
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only
+
+from . import models
+from .crud import (
+    _SEGMENT_SUMMARY_COLUMNS,
+    _SOUND_EFFECT_SUMMARY_COLUMNS,
+    _word_timestamps_present,
+    compute_content_hash
+)
+
+# Text CRUD
+async def create_text(db: AsyncSession, content: str, title: Optional[str] = None) -> models.Text:
+    db_text = models.Text(content=content, content_sha256=compute_content_hash(content), title=title)
+    db.add(db_text)
+    await db.commit()
+    await db.refresh(db_text)
+    return db_text
+
+async def get_text(db: AsyncSession, text_id: int) -> Optional[models.Text]:
+    return await db.scalar(select(models.Text).where(models.Text.id == text_id))
+
+async def get_texts(db: AsyncSession) -> List[models.Text]:
+    return list(await db.scalars(select(models.Text)))
+
+async def get_text_by_content(db: AsyncSession, content: str) -> Optional[models.Text]:
+    """Look up a text by the SHA-256 of its content (indexed)"""
+    return await db.scalar(
+        select(models.Text).where(models.Text.content_sha256 == compute_content_hash(content))
+    )
+
+async def get_text_summary(db: AsyncSession, text_id: int) -> Optional[models.Text]:
+    """Get a text without loading its content or word timestamps (see crud.get_text_summary)"""
+    return await db.scalar(
+        select(models.Text)
+        .options(defer(models.Text.content), defer(models.Text.word_timestamps_data))
+        .where(models.Text.id == text_id)
+    )
+
+async def has_word_timestamps(db: AsyncSession, text_id: int) -> bool:
+    """Check whether a text has non-empty word timestamps without loading them"""
+    found = await db.scalar(
+        select(models.Text.id).where(models.Text.id == text_id, _word_timestamps_present())
+    )
+    return found is not None
+
+async def is_force_alignment_current(db: AsyncSession, text_id: int) -> bool:
+    """Check that word timestamps were computed from the current segment audio (see crud.is_force_alignment_current)"""
+    found = await db.scalar(
+        select(models.Text.id).where(
+            models.Text.id == text_id,
+            models.Text.force_alignment_timestamp.isnot(None),
+            models.Text.force_alignment_generation == models.Text.alignment_generation
+        )
+    )
+    return found is not None
+
+# TextSegment CRUD
+async def get_segment_summaries_by_text(db: AsyncSession, text_id: int) -> List[models.TextSegment]:
+    """Get segments for a text with only id, ordering and audio reference columns loaded"""
+    return list(await db.scalars(
+        select(models.TextSegment)
+        .options(load_only(*_SEGMENT_SUMMARY_COLUMNS))
+        .where(models.TextSegment.text_id == text_id)
+        .order_by(models.TextSegment.sequence)
+    ))
+
+# SoundEffect CRUD
+async def get_sound_effect(db: AsyncSession, effect_id: int) -> Optional[models.SoundEffect]:
+    return await db.scalar(select(models.SoundEffect).where(models.SoundEffect.effect_id == effect_id))
+
+async def get_sound_effect_summaries_by_text(db: AsyncSession, text_id: int) -> List[models.SoundEffect]:
+    """Get sound effects for a text with only id and audio reference columns loaded"""
+    return list(await db.scalars(
+        select(models.SoundEffect)
+        .options(load_only(*_SOUND_EFFECT_SUMMARY_COLUMNS))
+        .where(models.SoundEffect.text_id == text_id)
+    ))
@@ -0,0 +1,122 @@
+"""
+Async database engine and session factory for FastAPI endpoints.
+
+Mirrors db/database.py for use with `async def` endpoints so database calls do not
+block the event loop: asyncpg is used for PostgreSQL and aiosqlite for SQLite. Both
+engines point at the same DATABASE_URL and share the models in db/models.py.
+"""
+
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from utils.config import settings
+
+# Async drivers for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def to_async_url(database_url: str) -> str:
+    """
+    Convert a sync database URL to its async driver equivalent.
+
+    libpq-only query parameters (sslmode, channel_binding) are dropped, since asyncpg
+    does not accept them; SSL is configured in connect args instead.
+
+    Args:
+        database_url: URL as used by the sync engine
+
+    Returns:
+        URL string for create_async_engine
+    """
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    query = {key: value for key, value in url.query.items() if key not in ("sslmode", "channel_binding")}
+    return url.set(drivername=drivername, query=query).render_as_string(hide_password=False)
+
+def create_async_engine_for_url(database_url: str) -> AsyncEngine:
+    """
+    Create an async engine configured like the sync engine in db/database.py.
+
+    Args:
+        database_url: Sync database URL (converted with to_async_url)
+
+    Returns:
+        Configured AsyncEngine
+    """
+    async_url = to_async_url(database_url)
+
+    if async_url.startswith("sqlite"):
+        # aiosqlite runs each connection on its own thread; NullPool keeps connections
+        # from being shared across event loops (e.g. TestClient starts one per request)
+        async_engine = create_async_engine(
+            async_url,
+            connect_args={"timeout": 20},
+            poolclass=NullPool,
+            echo=settings.DB_ECHO
+        )
+
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def set_sqlite_pragma(dbapi_connection, connection_record):
+            """Configure SQLite the same way as the sync engine."""
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA busy_timeout=30000")  # 30 seconds
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("PRAGMA cache_size=10000")  # 10MB cache
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        return async_engine
+
+    connect_args = {}
+    if make_url(database_url).query.get("sslmode") in ("require", "verify-ca", "verify-full"):
+        connect_args["ssl"] = "require"
+    if "neon.tech" in database_url:
+        # Neon's connection pooler runs in transaction mode, which does not support
+        # asyncpg's prepared statement cache
+        connect_args["statement_cache_size"] = 0
+    else:
+        connect_args["server_settings"] = {"statement_timeout": "300000"}  # 5 minute statement timeout
+
+    return create_async_engine(
+        async_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        echo=settings.DB_ECHO,
+        connect_args=connect_args
+    )
+
+async_engine = create_async_engine_for_url(settings.DATABASE_URL)
+
+# expire_on_commit=False: attribute access after commit would otherwise trigger
+# implicit (sync) loads, which AsyncSession does not allow
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    Used by FastAPI Depends() in endpoints that have been moved to async CRUD.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    """Close pooled async connections (call on application shutdown)."""
+    await async_engine.dispose()
+    logging.info("Async database engine disposed")
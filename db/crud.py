@@ -1,61 +1,120 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, insert, update
+from sqlalchemy.orm import Session, defer, load_only
 from . import models
+from .session_manager import in_unit_of_work
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _commit(db: Session, *instances) -> None:
+    """
+    Persist pending changes made by a CRUD function.
+    
+    Outside a unit of work this commits and refreshes the given instances, as CRUD
+    functions always have. Inside db.session_manager.unit_of_work it only flushes
+    (so generated ids and defaults are available) and the caller commits once.
+    """
+    if in_unit_of_work(db):
+        db.flush()
+        return
+    db.commit()
+    for instance in instances:
+        db.refresh(instance)
+
 # Text CRUD
+def compute_content_hash(content: str) -> str:
+    """Hex SHA-256 of text content, stored in Text.content_sha256"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
 def create_text(db: Session, content: str, title: Optional[str] = None) -> models.Text:
-    db_text = models.Text(content=content, title=title)
+    db_text = models.Text(content=content, content_sha256=compute_content_hash(content), title=title)
     db.add(db_text)
-    db.commit()
-    db.refresh(db_text)
+    _commit(db, db_text)
     return db_text
 
 def get_text(db: Session, text_id: int) -> Optional[models.Text]:
     return db.query(models.Text).filter(models.Text.id == text_id).first()
 
 def get_text_by_content(db: Session, content: str) -> Optional[models.Text]:
-    return db.query(models.Text).filter(models.Text.content == content).first()
+    """Find a text with identical content using the indexed content hash"""
+    return db.query(models.Text).filter(
+        models.Text.content_sha256 == compute_content_hash(content)
+    ).first()
+
+def get_text_summary(db: Session, text_id: int) -> Optional[models.Text]:
+    """
+    Get a text without loading its content or word timestamps.
+    For status endpoints that only need metadata and audio flags.
+    Deferred columns are loaded on first access.
+    """
+    return db.query(models.Text).options(
+        defer(models.Text.content),
+        defer(models.Text.word_timestamps_data)
+    ).filter(models.Text.id == text_id).first()
+
+def update_text_content(db: Session, text_id: int, content: str) -> Optional[models.Text]:
+    """
+    Replace a text's content (and its content hash).
+    Raises ValueError if another text already has this content (texts are unique by content).
+    """
+    db_text = get_text(db, text_id)
+    if db_text:
+        duplicate = get_text_by_content(db, content)
+        if duplicate is not None and duplicate.id != text_id:
+            raise ValueError(f"Text {duplicate.id} already has this content")
+        db_text.content = content
+        db_text.content_sha256 = compute_content_hash(content)
+        _commit(db, db_text)
+    return db_text
 
 def update_text_analyzed(db: Session, text_id: int, analyzed: bool) -> Optional[models.Text]:
     db_text = get_text(db, text_id)
     if db_text:
         db_text.analyzed = analyzed
-        db.commit()
-        db.refresh(db_text)
+        _commit(db, db_text)
     return db_text
 
-def update_text_background_music_audio(db: Session, text_id: int, audio_data_b64: str) -> Optional[models.Text]:
+def update_text_background_music_audio(
+    db: Session,
+    text_id: int,
+    audio_hash: Optional[str],
+    audio_size: Optional[int] = None,
+    audio_duration: Optional[float] = None
+) -> Optional[models.Text]:
     """
-    Update the background_music_audio_b64 field for a text and set bg_audio_timestamp.
+    Update the background music audio reference for a text and set bg_audio_timestamp.
     
     Args:
         db: Database session
         text_id: ID of the text to update
-        audio_data_b64: Base64 encoded audio data
+        audio_hash: Content hash of the audio in the blob store (None clears the audio)
+        audio_size: Size of the audio in bytes
+        audio_duration: Duration of the audio in seconds
         
     Returns:
         Updated Text object or None if text not found
     """
     db_text = get_text(db, text_id)
     if db_text:
-        db_text.background_music_audio_b64 = audio_data_b64
+        db_text.background_music_audio_hash = audio_hash
+        db_text.background_music_audio_size = audio_size
+        db_text.background_music_audio_duration = audio_duration
         db_text.bg_audio_timestamp = datetime.utcnow()
-        db.commit()
-        db.refresh(db_text)
+        _commit(db, db_text)
     return db_text
 
 def update_text_word_timestamps(db: Session, text_id: int, word_timestamps: List[Dict]) -> Optional[models.Text]:
     """
     Update the word_timestamps field for a text and set force_alignment_timestamp.
+    Records the text's current alignment generation (see is_force_alignment_current).
     
     Args:
         db: Database session
         text_id: ID of the text to update
-        word_timestamps: List of word timestamp dictionaries
+        word_timestamps: List of word timestamp dictionaries (stored packed, see db/word_timestamps.py)
         
     Returns:
         Updated Text object or None if text not found
@@ -64,8 +123,9 @@ def update_text_word_timestamps(db: Session, text_id: int, word_timestamps: List
     if db_text:
         db_text.word_timestamps = word_timestamps
         db_text.force_alignment_timestamp = datetime.utcnow()
-        db.commit()
-        db.refresh(db_text)
+        # Copied in SQL so a concurrent segment audio update is never missed
+        db_text.force_alignment_generation = models.Text.alignment_generation
+        _commit(db, db_text)
     return db_text
 
 def clear_text_word_timestamps(db: Session, text_id: int) -> Optional[models.Text]:
@@ -83,14 +143,38 @@ def clear_text_word_timestamps(db: Session, text_id: int) -> Optional[models.Tex
     if db_text:
         db_text.word_timestamps = None
         db_text.force_alignment_timestamp = None
-        db.commit()
-        db.refresh(db_text)
+        db_text.force_alignment_generation = None
+        _commit(db, db_text)
     return db_text
 
+def _word_timestamps_present():
+    """SQL condition: the text has non-empty word timestamps"""
+    # Empty timestamps are stored as NULL (see db.word_timestamps.encode_word_timestamps)
+    return models.Text.word_timestamps_data.isnot(None)
+
+def has_word_timestamps(db: Session, text_id: int) -> bool:
+    """
+    Check whether a text has non-empty word timestamps without loading them.
+    
+    Args:
+        db: Database session
+        text_id: ID of the text to check
+        
+    Returns:
+        True if word timestamps are stored for the text
+    """
+    return db.query(models.Text.id).filter(
+        models.Text.id == text_id,
+        _word_timestamps_present()
+    ).first() is not None
+
 def is_force_alignment_valid(db: Session, text_id: int) -> bool:
     """
     Check if force alignment is valid (alignment timestamp is newer than all segment timestamps).
     
+    Runs a single query: the text's alignment timestamp alongside MAX(last_updated)
+    over its segments, without loading any segment rows.
+    
     Args:
         db: Database session
         text_id: ID of the text to check alignment validity for
@@ -98,21 +182,42 @@ def is_force_alignment_valid(db: Session, text_id: int) -> bool:
     Returns:
         True if alignment is valid and current, False otherwise
     """
-    db_text = get_text(db, text_id)
-    if not db_text or not db_text.force_alignment_timestamp or not db_text.word_timestamps:
+    latest_segment_update = db.query(func.max(models.TextSegment.last_updated)).filter(
+        models.TextSegment.text_id == text_id
+    ).scalar_subquery()
+    row = db.query(models.Text.force_alignment_timestamp, latest_segment_update).filter(
+        models.Text.id == text_id,
+        models.Text.force_alignment_timestamp.isnot(None),
+        _word_timestamps_present()
+    ).first()
+    if row is None:
         return False
     
-    # Get all segments for this text
-    segments = get_segments_by_text(db, text_id)
-    if not segments:
+    aligned_at, latest_update = row
+    if latest_update is None:
         return True  # No segments to compare against
+    return latest_update <= aligned_at
+
+def is_force_alignment_current(db: Session, text_id: int) -> bool:
+    """
+    Check that stored word timestamps were computed from the current segment audio.
     
-    # Check if any segment was updated after the alignment
-    for segment in segments:
-        if segment.last_updated > db_text.force_alignment_timestamp:
-            return False
+    Compares the text's alignment generation (bumped by every segment audio update)
+    with the generation recorded when force alignment last ran, so the check is a
+    single primary-key lookup. Used by the export path.
     
-    return True
+    Args:
+        db: Database session
+        text_id: ID of the text to check
+        
+    Returns:
+        True if force alignment ran after the latest segment audio update
+    """
+    return db.query(models.Text.id).filter(
+        models.Text.id == text_id,
+        models.Text.force_alignment_timestamp.isnot(None),
+        models.Text.force_alignment_generation == models.Text.alignment_generation
+    ).first() is not None
 
 # Character CRUD
 def create_character(
@@ -135,10 +240,32 @@ def create_character(
         intro_text=intro_text
     )
     db.add(db_character)
-    db.commit()
-    db.refresh(db_character)
+    _commit(db, db_character)
     return db_character
 
+def create_characters_bulk(db: Session, text_id: int, characters: List[Dict[str, Any]]) -> List[models.Character]:
+    """
+    Insert many characters for a text in a single INSERT ... RETURNING statement.
+    
+    Never commits, even outside a unit of work, so characters and their
+    segments can be written in one transaction; the caller commits.
+    
+    Args:
+        db: Database session
+        text_id: ID of the text the characters belong to
+        characters: Dicts of Character column values (name, description, is_narrator, ...)
+        
+    Returns:
+        Created Character objects with ids, in the same order as the input
+    """
+    if not characters:
+        return []
+    rows = [{**character, "text_id": text_id} for character in characters]
+    return list(db.scalars(
+        insert(models.Character).returning(models.Character, sort_by_parameter_order=True),
+        rows
+    ).all())
+
 def get_characters_by_text(db: Session, text_id: int) -> List[models.Character]:
     return db.query(models.Character).filter(models.Character.text_id == text_id).all()
 
@@ -147,10 +274,36 @@ def update_character_voice(db: Session, character_id: int, provider_id: str, pro
     if db_character:
         db_character.provider_id = provider_id
         db_character.provider = provider
-        db.commit()
-        db.refresh(db_character)
+        _commit(db, db_character)
     return db_character
 
+def get_voiced_characters_without_segments(db: Session, text_id: int) -> List[models.Character]:
+    """Characters of a text that have a voice but no segments (voiced before segmentation finished)"""
+    has_segments = exists().where(models.TextSegment.character_id == models.Character.id)
+    return db.query(models.Character).filter(
+        models.Character.text_id == text_id,
+        models.Character.provider_id.isnot(None),
+        ~has_segments
+    ).all()
+
+def clear_character_voices(db: Session, character_ids: List[int]) -> int:
+    """
+    Clear the voice of specific characters.
+    
+    Returns:
+        int: Number of characters updated
+    """
+    if not character_ids:
+        return 0
+    result = db.query(models.Character).filter(
+        models.Character.id.in_(character_ids)
+    ).update(
+        {models.Character.provider_id: None, models.Character.provider: None},
+        synchronize_session=False
+    )
+    _commit(db)
+    return result
+
 def get_character(db: Session, character_id: int) -> Optional[models.Character]:
     """Get a character by ID"""
     return db.query(models.Character).filter(models.Character.id == character_id).first()
@@ -164,7 +317,7 @@ def delete_characters_by_text(db: Session, text_id: int) -> int:
     result = db.query(models.Character).filter(
         models.Character.text_id == text_id
     ).delete(synchronize_session=False)
-    db.commit()
+    _commit(db)
     return result
 
 # TextSegment CRUD
@@ -193,15 +346,60 @@ def create_text_segment(
         trailing_silence=trailing_silence
     )
     db.add(db_segment)
-    db.commit()
-    db.refresh(db_segment)
+    _commit(db, db_segment)
     return db_segment
 
+def create_text_segments_bulk(db: Session, text_id: int, segments: List[Dict[str, Any]]) -> List[models.TextSegment]:
+    """
+    Insert many segments for a text in a single INSERT ... RETURNING statement.
+    
+    Never commits; the caller commits (see create_characters_bulk).
+    
+    Args:
+        db: Database session
+        text_id: ID of the text the segments belong to
+        segments: Dicts of TextSegment column values (character_id, text, sequence, ...)
+        
+    Returns:
+        Created TextSegment objects with ids, in the same order as the input
+    """
+    if not segments:
+        return []
+    rows = [{**segment, "text_id": text_id} for segment in segments]
+    return list(db.scalars(
+        insert(models.TextSegment).returning(models.TextSegment, sort_by_parameter_order=True),
+        rows
+    ).all())
+
 def get_segments_by_text(db: Session, text_id: int) -> List[models.TextSegment]:
     return db.query(models.TextSegment).filter(
         models.TextSegment.text_id == text_id
     ).order_by(models.TextSegment.sequence).all()
 
+# Columns loaded by segment summary queries (shared with db/async_crud.py)
+_SEGMENT_SUMMARY_COLUMNS = (
+    models.TextSegment.id,
+    models.TextSegment.text_id,
+    models.TextSegment.character_id,
+    models.TextSegment.sequence,
+    models.TextSegment.audio_hash,
+    models.TextSegment.audio_size,
+    models.TextSegment.audio_duration,
+    models.TextSegment.audio_status,
+    models.TextSegment.last_updated
+)
+
+def get_segment_summaries_by_text(db: Session, text_id: int) -> List[models.TextSegment]:
+    """
+    Get segments for a text with only id, ordering and audio reference columns loaded.
+    Use segment.has_audio / segment.audio_size for status checks.
+    """
+    return db.query(models.TextSegment).options(
+        load_only(*_SEGMENT_SUMMARY_COLUMNS)
+    ).filter(
+        models.TextSegment.text_id == text_id
+    ).order_by(models.TextSegment.sequence).all()
+
 def delete_segments_by_text(db: Session, text_id: int) -> int:
     """Delete all text segments associated with a text_id
     
@@ -211,25 +409,233 @@ def delete_segments_by_text(db: Session, text_id: int) -> int:
     result = db.query(models.TextSegment).filter(
         models.TextSegment.text_id == text_id
     ).delete(synchronize_session=False)
-    db.commit()
+    _commit(db)
     return result
 
+def delete_segments(db: Session, text_id: int, segment_ids: List[int]) -> int:
+    """
+    Delete specific segments of a text. Sound effects placed on them are kept
+    (their word positions are text-level) but detached from the segment.
+    
+    Returns:
+        int: Number of deleted segments
+    """
+    if not segment_ids:
+        return 0
+    db.query(models.SoundEffect).filter(
+        models.SoundEffect.segment_id.in_(segment_ids)
+    ).update({models.SoundEffect.segment_id: None}, synchronize_session=False)
+    result = db.query(models.TextSegment).filter(
+        models.TextSegment.text_id == text_id,
+        models.TextSegment.id.in_(segment_ids)
+    ).delete(synchronize_session=False)
+    _bump_alignment_generation(db, text_id)
+    _commit(db)
+    return result
+
+def update_segment_positions(db: Session, text_id: int, positions: Dict[int, Dict[str, int]]) -> int:
+    """
+    Re-sequence segments in place with one executemany UPDATE.
+    
+    Args:
+        db: Database session
+        text_id: ID of the text the segments belong to
+        positions: Segment id -> {"sequence", "paragraph_start", "paragraph_end"}
+        
+    Returns:
+        int: Number of segments updated
+    """
+    if not positions:
+        return 0
+    db.execute(
+        update(models.TextSegment),
+        [{"id": segment_id, **values} for segment_id, values in positions.items()]
+    )
+    _bump_alignment_generation(db, text_id)
+    _commit(db)
+    return len(positions)
+
+def _bump_alignment_generation(db: Session, text_id: int) -> None:
+    """Mark the text's force alignment as stale after its segment audio changed"""
+    db.query(models.Text).filter(models.Text.id == text_id).update(
+        {models.Text.alignment_generation: models.Text.alignment_generation + 1},
+        synchronize_session=False
+    )
+
 def update_segment_audio(db: Session, segment_id: int, audio_file: str) -> Optional[models.TextSegment]:
     db_segment = db.query(models.TextSegment).filter(models.TextSegment.id == segment_id).first()
     if db_segment:
         db_segment.audio_file = audio_file
-        db.commit()
-        db.refresh(db_segment)
+        _bump_alignment_generation(db, db_segment.text_id)
+        _commit(db, db_segment)
     return db_segment
 
-def update_segment_audio_data(db: Session, segment_id: int, audio_data_b64: str) -> Optional[models.TextSegment]:
+def update_segment_audio_data(
+    db: Session,
+    segment_id: int,
+    audio_hash: Optional[str],
+    audio_size: Optional[int] = None,
+    audio_duration: Optional[float] = None
+) -> Optional[models.TextSegment]:
+    """Update the audio reference (blob store hash, size, duration) for a segment"""
     db_segment = db.query(models.TextSegment).filter(models.TextSegment.id == segment_id).first()
     if db_segment:
-        db_segment.audio_data_b64 = audio_data_b64
-        db.commit()
-        db.refresh(db_segment)
+        db_segment.audio_hash = audio_hash
+        db_segment.audio_size = audio_size
+        db_segment.audio_duration = audio_duration
+        db_segment.audio_status = "done" if audio_hash else None
+        db_segment.audio_error = None
+        _bump_alignment_generation(db, db_segment.text_id)
+        _commit(db, db_segment)
     return db_segment
 
+def set_segment_audio_status(db: Session, segment_ids: List[int], status: Optional[str], error: Optional[str] = None) -> int:
+    """
+    Set the speech generation status ("pending", "done" or "failed") of segments.
+    
+    Returns:
+        int: Number of updated segments
+    """
+    if not segment_ids:
+        return 0
+    result = db.query(models.TextSegment).filter(
+        models.TextSegment.id.in_(segment_ids)
+    ).update(
+        {models.TextSegment.audio_status: status, models.TextSegment.audio_error: error},
+        synchronize_session=False
+    )
+    _commit(db)
+    return result
+
+# SpeechCacheEntry CRUD
+def get_speech_cache_entries(db: Session, cache_keys: List[str]) -> Dict[str, models.SpeechCacheEntry]:
+    """Look up cached segment audio by cache key; returns the entries found, keyed by cache key"""
+    if not cache_keys:
+        return {}
+    entries = db.query(models.SpeechCacheEntry).filter(
+        models.SpeechCacheEntry.cache_key.in_(set(cache_keys))
+    ).all()
+    return {entry.cache_key: entry for entry in entries}
+
+def save_speech_cache_entries(db: Session, entries: List[Dict[str, Any]]) -> int:
+    """
+    Insert or replace cache entries (dicts of cache_key, voice_id, audio_hash,
+    audio_size, audio_duration).
+    """
+    for entry in entries:
+        db.merge(models.SpeechCacheEntry(**entry))
+    _commit(db)
+    return len(entries)
+
+def touch_speech_cache_entries(db: Session, cache_keys: List[str]) -> int:
+    """Count a cache hit for each key and record when it was last used"""
+    if not cache_keys:
+        return 0
+    updated = db.query(models.SpeechCacheEntry).filter(
+        models.SpeechCacheEntry.cache_key.in_(set(cache_keys))
+    ).update(
+        {
+            models.SpeechCacheEntry.hit_count: models.SpeechCacheEntry.hit_count + 1,
+            models.SpeechCacheEntry.last_used_at: func.now()
+        },
+        synchronize_session=False
+    )
+    _commit(db)
+    return updated
+
+# VoiceLibraryEntry CRUD
+def get_library_voice(db: Session, description_hash: str) -> Optional[models.VoiceLibraryEntry]:
+    """Get the shared voice generated from a description, if any"""
+    return db.query(models.VoiceLibraryEntry).filter(
+        models.VoiceLibraryEntry.description_hash == description_hash
+    ).first()
+
+def save_library_voice(
+    db: Session,
+    description_hash: str,
+    voice_id: str,
+    voice_name: str,
+    description: Optional[str] = None,
+    provider: str = "HUME"
+) -> models.VoiceLibraryEntry:
+    """Insert or replace the shared voice for a description"""
+    entry = db.merge(models.VoiceLibraryEntry(
+        description_hash=description_hash,
+        provider=provider,
+        voice_id=voice_id,
+        voice_name=voice_name,
+        description=description
+    ))
+    _commit(db, entry)
+    return entry
+
+def touch_library_voice(db: Session, description_hash: str) -> int:
+    """Count a reuse of a shared voice and record when it was last used"""
+    updated = db.query(models.VoiceLibraryEntry).filter(
+        models.VoiceLibraryEntry.description_hash == description_hash
+    ).update(
+        {
+            models.VoiceLibraryEntry.use_count: models.VoiceLibraryEntry.use_count + 1,
+            models.VoiceLibraryEntry.last_used_at: func.now()
+        },
+        synchronize_session=False
+    )
+    _commit(db)
+    return updated
+
+# ProviderVoice CRUD
+def record_provider_voice(
+    db: Session,
+    voice_id: str,
+    name: str,
+    text_id: Optional[int] = None,
+    provider: str = "HUME"
+) -> models.ProviderVoice:
+    """Record a voice saved at the provider (text_id None for voices shared across texts)"""
+    voice = db.merge(models.ProviderVoice(voice_id=voice_id, provider=provider, name=name, text_id=text_id))
+    _commit(db, voice)
+    return voice
+
+def get_provider_voices_by_text(db: Session, text_id: int) -> List[models.ProviderVoice]:
+    """Get the provider voices created for a text"""
+    return db.query(models.ProviderVoice).filter(models.ProviderVoice.text_id == text_id).all()
+
+def get_all_provider_voices(db: Session, provider: str = "HUME") -> List[models.ProviderVoice]:
+    """Get every recorded voice of a provider (for reconciliation with the provider account)"""
+    return db.query(models.ProviderVoice).filter(models.ProviderVoice.provider == provider).all()
+
+def delete_provider_voices(db: Session, voice_ids: List[str]) -> int:
+    """Forget provider voices that were deleted at the provider"""
+    if not voice_ids:
+        return 0
+    result = db.query(models.ProviderVoice).filter(
+        models.ProviderVoice.voice_id.in_(voice_ids)
+    ).delete(synchronize_session=False)
+    _commit(db)
+    return result
+
+def forget_voice_references(db: Session, voice_ids: List[str]) -> int:
+    """
+    Clear character voices and library entries that point at voices which no longer
+    exist at the provider, so they are generated again.
+    
+    Returns:
+        int: Number of characters whose voice was cleared
+    """
+    if not voice_ids:
+        return 0
+    result = db.query(models.Character).filter(
+        models.Character.provider_id.in_(voice_ids)
+    ).update(
+        {models.Character.provider_id: None, models.Character.provider: None},
+        synchronize_session=False
+    )
+    db.query(models.VoiceLibraryEntry).filter(
+        models.VoiceLibraryEntry.voice_id.in_(voice_ids)
+    ).delete(synchronize_session=False)
+    _commit(db)
+    return result
+
 # ProcessLog CRUD
 def create_log(
     db: Session,
@@ -247,10 +653,27 @@ def create_log(
         response=response
     )
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    _commit(db, db_log)
     return db_log
 
+def create_logs_bulk(db: Session, logs: List[Dict[str, Any]]) -> int:
+    """
+    Insert many process logs in a single executemany INSERT.
+    
+    Never commits; the caller commits. Used by db/log_writer.py to flush buffered logs.
+    
+    Args:
+        db: Database session
+        logs: Dicts of ProcessLog column values (operation, status, text_id, request, response, timestamp)
+        
+    Returns:
+        Number of logs inserted
+    """
+    if not logs:
+        return 0
+    db.execute(insert(models.ProcessLog), logs)
+    return len(logs)
+
 # SoundEffect CRUD
 def create_sound_effect(
     db: Session,
@@ -259,14 +682,16 @@ def create_sound_effect(
     start_word: str,
     end_word: str,
     prompt: str,
-    audio_data_b64: str,
+    audio_hash: Optional[str] = None,  # Content hash in the audio blob store
     segment_id: Optional[int] = None,  # Now optional
     start_word_position: Optional[int] = None,  # Position of start word in text
     end_word_position: Optional[int] = None,    # Position of end word in text
     start_time: Optional[float] = None,
     end_time: Optional[float] = None,
     total_time: Optional[int] = None,
-    rank: Optional[int] = None  # Importance ranking from Claude analysis (1 = most important)
+    rank: Optional[int] = None,  # Importance ranking from Claude analysis (1 = most important)
+    audio_size: Optional[int] = None,
+    audio_duration: Optional[float] = None
 ) -> models.SoundEffect:
     """Create a new sound effect"""
     # Calculate total_time if start_time and end_time are provided but total_time is not
@@ -283,15 +708,16 @@ def create_sound_effect(
         start_word_position=start_word_position,
         end_word_position=end_word_position,
         prompt=prompt,
-        audio_data_b64=audio_data_b64,
+        audio_hash=audio_hash,
+        audio_size=audio_size,
+        audio_duration=audio_duration,
         start_time=start_time,
         end_time=end_time,
         total_time=total_time,
         rank=rank
     )
     db.add(db_sound_effect)
-    db.commit()
-    db.refresh(db_sound_effect)
+    _commit(db, db_sound_effect)
     return db_sound_effect
 
 def get_sound_effect(db: Session, effect_id: int) -> Optional[models.SoundEffect]:
@@ -302,6 +728,22 @@ def get_sound_effects_by_text(db: Session, text_id: int) -> List[models.SoundEff
     """Get all sound effects for a text"""
     return db.query(models.SoundEffect).filter(models.SoundEffect.text_id == text_id).all()
 
+# Columns loaded by sound effect summary queries (shared with db/async_crud.py)
+_SOUND_EFFECT_SUMMARY_COLUMNS = (
+    models.SoundEffect.effect_id,
+    models.SoundEffect.text_id,
+    models.SoundEffect.segment_id,
+    models.SoundEffect.audio_hash,
+    models.SoundEffect.audio_size,
+    models.SoundEffect.audio_duration
+)
+
+def get_sound_effect_summaries_by_text(db: Session, text_id: int) -> List[models.SoundEffect]:
+    """Get sound effects for a text with only id and audio reference columns loaded"""
+    return db.query(models.SoundEffect).options(
+        load_only(*_SOUND_EFFECT_SUMMARY_COLUMNS)
+    ).filter(models.SoundEffect.text_id == text_id).all()
+
 def get_sound_effects_by_segment(db: Session, segment_id: int) -> List[models.SoundEffect]:
     """Get all sound effects for a text segment"""
     return db.query(models.SoundEffect).filter(models.SoundEffect.segment_id == segment_id).all()
@@ -325,21 +767,24 @@ def update_sound_effect_timing(
             duration = db_sound_effect.end_time - db_sound_effect.start_time
             db_sound_effect.total_time = max(1, round(duration))  # Round to seconds, minimum 1 second
         
-        db.commit()
-        db.refresh(db_sound_effect)
+        _commit(db, db_sound_effect)
     return db_sound_effect
 
 def update_sound_effect_audio(
     db: Session,
     effect_id: int,
-    audio_data_b64: str,
+    audio_hash: Optional[str],
+    audio_size: Optional[int] = None,
+    audio_duration: Optional[float] = None,
     start_time: Optional[float] = None,
     end_time: Optional[float] = None
 ) -> Optional[models.SoundEffect]:
-    """Update the audio data and timing for a sound effect"""
+    """Update the audio reference (blob store hash, size, duration) and timing for a sound effect"""
     db_sound_effect = get_sound_effect(db, effect_id)
     if db_sound_effect:
-        db_sound_effect.audio_data_b64 = audio_data_b64
+        db_sound_effect.audio_hash = audio_hash
+        db_sound_effect.audio_size = audio_size
+        db_sound_effect.audio_duration = audio_duration
         db_sound_effect.audio_timestamp = datetime.utcnow()  # Set timestamp when audio is updated
         if start_time is not None:
             db_sound_effect.start_time = start_time
@@ -351,8 +796,7 @@ def update_sound_effect_audio(
             duration = db_sound_effect.end_time - db_sound_effect.start_time
             db_sound_effect.total_time = max(1, round(duration))  # Round to seconds, minimum 1 second
         
-        db.commit()
-        db.refresh(db_sound_effect)
+        _commit(db, db_sound_effect)
     return db_sound_effect
 
 def delete_sound_effect(db: Session, effect_id: int) -> bool:
@@ -360,7 +804,7 @@ def delete_sound_effect(db: Session, effect_id: int) -> bool:
     db_sound_effect = get_sound_effect(db, effect_id)
     if db_sound_effect:
         db.delete(db_sound_effect)
-        db.commit()
+        _commit(db)
         return True
     return False
 
@@ -373,7 +817,7 @@ def delete_sound_effects_by_text(db: Session, text_id: int) -> int:
     result = db.query(models.SoundEffect).filter(
         models.SoundEffect.text_id == text_id
     ).delete(synchronize_session=False)
-    db.commit()
+    _commit(db)
     return result
 
 def delete_sound_effects_by_segment(db: Session, segment_id: int) -> int:
@@ -385,7 +829,7 @@ def delete_sound_effects_by_segment(db: Session, segment_id: int) -> int:
     result = db.query(models.SoundEffect).filter(
         models.SoundEffect.segment_id == segment_id
     ).delete(synchronize_session=False)
-    db.commit()
+    _commit(db)
     return result
 
 def delete_all_sound_effects(db: Session) -> int:
@@ -395,5 +839,5 @@ def delete_all_sound_effects(db: Session) -> int:
         int: Number of deleted sound effects
     """
     result = db.query(models.SoundEffect).delete(synchronize_session=False)
-    db.commit()
+    _commit(db)
     return result
\ No newline at end of file
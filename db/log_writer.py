@@ -0,0 +1,199 @@
+"""
+Write-behind buffer for ProcessLog rows.
+
+enqueue_log queues rows in a bounded in-memory queue that a background thread
+batch-inserts with crud.create_logs_bulk. A full queue falls back to a synchronous
+insert, and pending rows are flushed on shutdown.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from db import crud
+from db.database import SessionLocal
+from utils.config import settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+class ProcessLogWriter:
+    """Bounded in-memory queue of ProcessLog rows with a background batch flusher."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval_ms: int = 500
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def enqueue(
+        self,
+        operation: str,
+        status: str,
+        text_id: Optional[int] = None,
+        request: Optional[Dict[str, Any]] = None,
+        response: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Queue a log row for the background flusher.
+
+        Falls back to a synchronous insert when the queue is full or the writer has
+        been shut down, so logs are never silently dropped.
+
+        Raises:
+            ValueError: If operation or status is missing (checked here, since the
+                insert itself happens later on the flusher thread)
+        """
+        if not operation or not status:
+            raise ValueError("Process logs require an operation and a status")
+        row = {
+            "operation": operation,
+            "status": status,
+            "text_id": text_id,
+            "request": request,
+            "response": response,
+            "timestamp": datetime.utcnow()
+        }
+        if self._stopped.is_set():
+            self._write([row])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            logger.warning("Process log queue is full, writing log synchronously")
+            self._write([row])
+            return
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Write every queued row now.
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    return written
+                written += self._write(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the background flusher and write any rows still queued."""
+        self._stopped.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def pending(self) -> int:
+        """Number of rows waiting to be flushed."""
+        return self._queue.qsize()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="process-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Never let the flusher thread die; rows that failed are logged in _write
+                logger.error(f"Process log flusher error: {e}")
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows in one transaction; on failure retry them one by one so a bad row only loses itself."""
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            crud.create_logs_bulk(db, rows)
+            db.commit()
+            logger.debug(f"Flushed {len(rows)} process logs in {time.perf_counter() - start:.3f}s")
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            if len(rows) == 1:
+                logger.error(f"Dropping process log {rows[0]['operation']} ({rows[0]['status']}): {e}")
+                return 0
+            logger.warning(f"Batch insert of {len(rows)} process logs failed, retrying individually: {e}")
+        finally:
+            db.close()
+        return sum(self._write([row]) for row in rows)
+
+_log_writer: Optional[ProcessLogWriter] = None
+_log_writer_lock = threading.Lock()
+
+def get_log_writer() -> ProcessLogWriter:
+    """
+    Get the shared process log writer (cached).
+
+    Returns:
+        ProcessLogWriter configured from settings
+    """
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = ProcessLogWriter(
+                    max_queue_size=settings.PROCESS_LOG_QUEUE_SIZE,
+                    batch_size=settings.PROCESS_LOG_BATCH_SIZE,
+                    flush_interval_ms=settings.PROCESS_LOG_FLUSH_INTERVAL_MS
+                )
+                atexit.register(_log_writer.shutdown)
+    return _log_writer
+
+def enqueue_log(
+    operation: str,
+    status: str,
+    text_id: Optional[int] = None,
+    request: Optional[Dict[str, Any]] = None,
+    response: Optional[Dict[str, Any]] = None
+) -> None:
+    """Record a ProcessLog row through the shared write-behind writer (same fields as crud.create_log)."""
+    get_log_writer().enqueue(operation, status, text_id=text_id, request=request, response=response)
+
+def shutdown_log_writer() -> None:
+    """Flush and stop the shared writer, if it was started (call on application shutdown)."""
+    if _log_writer is not None:
+        _log_writer.shutdown()
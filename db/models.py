@@ -1,32 +1,66 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text as SQLAlchemyText, DateTime, JSON, Float
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, LargeBinary, String, Text as SQLAlchemyText, DateTime, JSON, Float
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 import math
 
 from .database import Base
+from .word_timestamps import WordTimestamps, encode_word_timestamps
 
 class Text(Base):
     __tablename__ = "texts"
+    __table_args__ = (
+        Index("ix_texts_content_sha256", "content_sha256", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     content = Column(SQLAlchemyText, nullable=False)
+    content_sha256 = Column(String(64), nullable=True)  # Hex SHA-256 of content, for duplicate lookups
     title = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     analyzed = Column(Boolean, default=False, nullable=False)
     background_music_prompt = Column(SQLAlchemyText, nullable=True)
-    background_music_audio_b64 = Column(SQLAlchemyText, nullable=True)
+    background_music_audio_hash = Column(String(64), nullable=True)  # Content hash in the audio blob store
+    background_music_audio_size = Column(Integer, nullable=True)  # Size in bytes
+    background_music_audio_duration = Column(Float, nullable=True)  # Duration in seconds
     bg_audio_timestamp = Column(DateTime(timezone=True), nullable=True)  # When background music audio was last created
-    word_timestamps = Column(JSON, nullable=True)  # Store complete word-level timing data
+    word_timestamps_data = Column(LargeBinary, nullable=True)  # Packed word-level timing data (see word_timestamps.py)
     force_alignment_timestamp = Column(DateTime(timezone=True), nullable=True)  # When force alignment was last performed
+    alignment_generation = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped on every segment audio update
+    force_alignment_generation = Column(Integer, nullable=True)  # alignment_generation the word timestamps were computed at
+    paragraph_hashes = Column(JSON, nullable=True)  # Paragraph hashes of the content last segmented (see services/text_diff.py)
     
     characters = relationship("Character", back_populates="text", cascade="all, delete-orphan")
     segments = relationship("TextSegment", back_populates="text_obj", cascade="all, delete-orphan")
     logs = relationship("ProcessLog", back_populates="text")
     sound_effects = relationship("SoundEffect", back_populates="text", cascade="all, delete-orphan")
 
+    @hybrid_property
+    def has_background_music(self):
+        return self.background_music_audio_hash is not None
+
+    @has_background_music.expression
+    def has_background_music(cls):
+        return cls.background_music_audio_hash.isnot(None)
+
+    @property
+    def word_timestamps(self):
+        """Force-alignment word timings as a lazy WordTimestamps sequence, or None"""
+        if self.word_timestamps_data is None:
+            return None
+        return WordTimestamps(self.word_timestamps_data)
+
+    @word_timestamps.setter
+    def word_timestamps(self, value):
+        # Accepts a list of {"word", "start", "end"} dicts, a WordTimestamps or None
+        self.word_timestamps_data = encode_word_timestamps(value)
+
 class Character(Base):
     __tablename__ = "characters"
+    __table_args__ = (
+        Index("ix_characters_text_id", "text_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     text_id = Column(Integer, ForeignKey("texts.id"))
@@ -48,6 +82,10 @@ class Character(Base):
 
 class TextSegment(Base):
     __tablename__ = "text_segments"
+    __table_args__ = (
+        Index("ix_text_segments_text_id_sequence", "text_id", "sequence"),
+        Index("ix_text_segments_character_id", "character_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     text_id = Column(Integer, ForeignKey("texts.id"))
@@ -55,7 +93,11 @@ class TextSegment(Base):
     text = Column(SQLAlchemyText, nullable=False)
     sequence = Column(Integer, nullable=False)
     audio_file = Column(String, nullable=True)
-    audio_data_b64 = Column(SQLAlchemyText, nullable=True)
+    audio_hash = Column(String(64), nullable=True)  # Content hash in the audio blob store
+    audio_size = Column(Integer, nullable=True)  # Size in bytes
+    audio_duration = Column(Float, nullable=True)  # Duration in seconds
+    audio_status = Column(String(16), nullable=True)  # Speech generation: "pending", "done" or "failed"
+    audio_error = Column(SQLAlchemyText, nullable=True)  # Last error when audio_status is "failed"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -63,13 +105,27 @@ class TextSegment(Base):
     description = Column(SQLAlchemyText, nullable=True)
     speed = Column(Float, nullable=True)
     trailing_silence = Column(Float, nullable=True)
+    paragraph_start = Column(Integer, nullable=True)  # First source paragraph index in the text
+    paragraph_end = Column(Integer, nullable=True)  # Source paragraph index after the last one (exclusive)
     
     text_obj = relationship("Text", back_populates="segments")
     character = relationship("Character", back_populates="segments")
     sound_effects = relationship("SoundEffect", back_populates="segment", cascade="all, delete-orphan")
 
+    @hybrid_property
+    def has_audio(self):
+        return self.audio_hash is not None
+
+    @has_audio.expression
+    def has_audio(cls):
+        return cls.audio_hash.isnot(None)
+
 class SoundEffect(Base):
     __tablename__ = "sound_effects"
+    __table_args__ = (
+        Index("ix_sound_effects_text_id", "text_id"),
+        Index("ix_sound_effects_segment_id", "segment_id"),
+    )
     
     effect_id = Column(Integer, primary_key=True, autoincrement=True)
     effect_name = Column(String, nullable=False)
@@ -80,7 +136,9 @@ class SoundEffect(Base):
     start_word_position = Column(Integer, nullable=True)  # Position of start word in text
     end_word_position = Column(Integer, nullable=True)    # Position of end word in text
     prompt = Column(SQLAlchemyText, nullable=False)
-    audio_data_b64 = Column(SQLAlchemyText, nullable=True)
+    audio_hash = Column(String(64), nullable=True)  # Content hash in the audio blob store
+    audio_size = Column(Integer, nullable=True)  # Size in bytes
+    audio_duration = Column(Float, nullable=True)  # Duration in seconds
     start_time = Column(Float, nullable=True)  # From force alignment
     end_time = Column(Float, nullable=True)    # From force alignment
     total_time = Column(Integer, nullable=True)  # Calculated total time in seconds (rounded, min 1)
@@ -92,8 +150,61 @@ class SoundEffect(Base):
     text = relationship("Text", back_populates="sound_effects")
     segment = relationship("TextSegment", back_populates="sound_effects")
 
+    @hybrid_property
+    def has_audio(self):
+        return self.audio_hash is not None
+
+    @has_audio.expression
+    def has_audio(cls):
+        return cls.audio_hash.isnot(None)
+
+class SpeechCacheEntry(Base):
+    """Synthesized segment audio, keyed by everything that determines it (see services/speech_cache.py)"""
+    __tablename__ = "speech_cache"
+    __table_args__ = (
+        Index("ix_speech_cache_voice_id", "voice_id"),
+    )
+
+    cache_key = Column(String(64), primary_key=True)  # Hex SHA-256 of the TTS inputs
+    voice_id = Column(String, nullable=False)  # Provider voice the audio was generated with
+    audio_hash = Column(String(64), nullable=False)  # Content hash in the audio blob store
+    audio_size = Column(Integer, nullable=True)  # Size in bytes
+    audio_duration = Column(Float, nullable=True)  # Duration in seconds
+    hit_count = Column(Integer, default=0, server_default="0", nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+
+class VoiceLibraryEntry(Base):
+    """Provider voice shared across texts, keyed by its normalized description (see services/voice_library.py)"""
+    __tablename__ = "voice_library"
+
+    description_hash = Column(String(64), primary_key=True)  # Hex SHA-256 of the normalized voice description
+    provider = Column(String, nullable=False)
+    voice_id = Column(String, nullable=False)  # Provider voice ID
+    voice_name = Column(String, nullable=False)  # Name the voice was saved under at the provider
+    description = Column(SQLAlchemyText, nullable=True)  # Description the voice was generated from
+    use_count = Column(Integer, default=0, server_default="0", nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+
+class ProviderVoice(Base):
+    """Voice saved at a TTS provider, recorded so it can be deleted without listing the account"""
+    __tablename__ = "provider_voices"
+    __table_args__ = (
+        Index("ix_provider_voices_text_id", "text_id"),
+    )
+
+    voice_id = Column(String, primary_key=True)  # Provider voice ID
+    provider = Column(String, nullable=False)
+    name = Column(String, nullable=False)  # Name the voice was saved under (providers delete by name)
+    text_id = Column(Integer, nullable=True)  # Text the voice was created for; NULL for library voices
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class ProcessLog(Base):
     __tablename__ = "process_logs"
+    __table_args__ = (
+        Index("ix_process_logs_text_id_timestamp", "text_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     text_id = Column(Integer, ForeignKey("texts.id"), nullable=True)
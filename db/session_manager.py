@@ -3,6 +3,7 @@ Database session management utilities for improved transaction handling and depe
 """
 
 import logging
+import weakref
 from contextlib import contextmanager
 from typing import Generator, Optional, Any, Dict
 from sqlalchemy.orm import Session
@@ -82,6 +83,52 @@ def managed_db_transaction(db: Session) -> Generator[Session, None, None]:
         logger.error(f"Unexpected error in explicit transaction, rolling back: {e}")
         raise
 
+# Nesting depth of unit_of_work blocks per session
+_unit_of_work_depth: "weakref.WeakKeyDictionary[Session, int]" = weakref.WeakKeyDictionary()
+
+def in_unit_of_work(db: Session) -> bool:
+    """Check whether the session is inside a unit_of_work block."""
+    return _unit_of_work_depth.get(db, 0) > 0
+
+@contextmanager
+def unit_of_work(db: Session) -> Generator[Session, None, None]:
+    """
+    Context manager that groups many CRUD calls into a single transaction.
+    
+    Inside the block CRUD functions only flush (ids and defaults are still populated)
+    instead of committing and refreshing on every call. The outermost block commits
+    once on success and rolls back on error; nested blocks join the outer one.
+    
+    Args:
+        db: Existing database session
+        
+    Yields:
+        The same database session in unit-of-work mode
+        
+    Example:
+        with unit_of_work(db) as uow_db:
+            for segment in segments:
+                crud.update_segment_audio_data(uow_db, segment.id, ...)
+        # One commit for all segments
+    """
+    depth = _unit_of_work_depth.get(db, 0)
+    _unit_of_work_depth[db] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            db.commit()
+            logger.debug("Unit of work committed successfully")
+    except Exception as e:
+        if depth == 0:
+            db.rollback()
+            logger.error(f"Error in unit of work, rolling back: {e}")
+        raise
+    finally:
+        if depth == 0:
+            _unit_of_work_depth.pop(db, None)
+        else:
+            _unit_of_work_depth[db] = depth
+
 class DatabaseSessionManager:
     """
     Utility class for managing database sessions across services.
@@ -187,6 +234,8 @@ class DatabaseConnectionMonitor:
 __all__ = [
     'managed_db_session',
     'managed_db_transaction', 
+    'unit_of_work',
+    'in_unit_of_work',
     'DatabaseSessionManager',
     'DatabaseConnectionMonitor'
 ] 
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Compact columnar encoding for force-alignment word timestamps (Text.word_timestamps_data).
+
+Word timings are packed into a single binary value:
+
+    magic     4 bytes   b"NWT1"
+    count     uint32    number of words (n)
+    starts    float32[n]
+    ends      float32[n]
+    offsets   uint32[n + 1]   byte offsets of each word in the words blob
+    words     UTF-8 bytes     all words concatenated
+
+All numbers are little-endian. float32 keeps timings to within a few milliseconds for
+audio up to several hours, finer than the aligner's own resolution.
+
+WordTimestamps decodes lazily: starts/ends are exposed as arrays without parsing the
+words, and indexing yields the familiar {"word", "start", "end"} dicts one at a time.
+"""
+
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# NumPy is optional; WordTimestamps.as_numpy() needs it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"NWT1"
+_HEADER = struct.Struct("<4sI")
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+class WordTimestamps(Sequence):
+    """Read-only view of packed word timestamps."""
+
+    def __init__(self, data: bytes):
+        magic, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a packed word timestamps value")
+        self._data = bytes(data)
+        self._count = count
+        self._starts_offset = _HEADER.size
+        self._ends_offset = self._starts_offset + 4 * count
+        self._offsets_offset = self._ends_offset + 4 * count
+        self._words_offset = self._offsets_offset + 4 * (count + 1)
+        self._starts: Optional[array] = None
+        self._ends: Optional[array] = None
+        self._word_offsets: Optional[array] = None
+
+    @classmethod
+    def from_list(cls, word_timestamps: Iterable[Dict]) -> "WordTimestamps":
+        """Pack a list of {"word", "start", "end"} dicts."""
+        return cls(pack_word_timestamps(word_timestamps))
+
+    def encode(self) -> bytes:
+        """Packed bytes, as stored in Text.word_timestamps_data."""
+        return self._data
+
+    def _array(self, typecode: str, offset: int, count: int) -> array:
+        values = array(typecode)
+        values.frombytes(self._data[offset:offset + 4 * count])
+        return _little_endian(values)
+
+    @property
+    def starts(self) -> array:
+        """Word start times in seconds (float32 array)."""
+        if self._starts is None:
+            self._starts = self._array("f", self._starts_offset, self._count)
+        return self._starts
+
+    @property
+    def ends(self) -> array:
+        """Word end times in seconds (float32 array)."""
+        if self._ends is None:
+            self._ends = self._array("f", self._ends_offset, self._count)
+        return self._ends
+
+    def as_numpy(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Start and end times as read-only NumPy float32 arrays (no copy).
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for WordTimestamps.as_numpy()")
+        dtype = np.dtype("<f4")
+        starts = np.frombuffer(self._data, dtype=dtype, count=self._count, offset=self._starts_offset)
+        ends = np.frombuffer(self._data, dtype=dtype, count=self._count, offset=self._ends_offset)
+        return starts, ends
+
+    def start(self, index: int) -> float:
+        return self.starts[index]
+
+    def end(self, index: int) -> float:
+        return self.ends[index]
+
+    def word(self, index: int) -> str:
+        if self._word_offsets is None:
+            self._word_offsets = self._array("I", self._offsets_offset, self._count + 1)
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("word index out of range")
+        begin = self._words_offset + self._word_offsets[index]
+        end = self._words_offset + self._word_offsets[index + 1]
+        return self._data[begin:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        # Rounded to 0.1 ms so float32 noise does not leak into JSON responses
+        return {"word": self.word(index), "start": round(self.start(index), 4), "end": round(self.end(index), 4)}
+
+    def to_list(self) -> List[Dict]:
+        """Decode every word into {"word", "start", "end"} dicts (for JSON responses)."""
+        return self[:]
+
+    def __repr__(self) -> str:
+        return f"WordTimestamps({self._count} words, {len(self._data)} bytes)"
+
+def pack_word_timestamps(word_timestamps: Iterable[Dict]) -> bytes:
+    """
+    Pack {"word", "start", "end"} dicts into the columnar binary layout.
+
+    Args:
+        word_timestamps: Word timings, in text order
+
+    Returns:
+        Packed bytes
+    """
+    starts = array("f")
+    ends = array("f")
+    offsets = array("I", [0])
+    words = bytearray()
+    for item in word_timestamps:
+        starts.append(item["start"])
+        ends.append(item["end"])
+        words += item["word"].encode("utf-8")
+        offsets.append(len(words))
+
+    return b"".join((
+        _HEADER.pack(MAGIC, len(starts)),
+        _little_endian(starts).tobytes(),
+        _little_endian(ends).tobytes(),
+        _little_endian(offsets).tobytes(),
+        bytes(words)
+    ))
+
+def encode_word_timestamps(value: Union[None, WordTimestamps, Iterable[Dict]]) -> Optional[bytes]:
+    """
+    Encode a value assigned to Text.word_timestamps for storage.
+
+    None and empty lists are stored as NULL, so "has timestamps" is a NULL check.
+    """
+    if value is None:
+        return None
+    if isinstance(value, WordTimestamps):
+        return value.encode() if len(value) else None
+    data = pack_word_timestamps(value)
+    return data if _HEADER.unpack_from(data, 0)[1] else None
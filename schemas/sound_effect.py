@@ -17,11 +17,14 @@ class SoundEffectBase(BaseModel):
     rank: Optional[int] = None  # Importance ranking from Claude analysis (1 = most important)
 
 class SoundEffectCreate(SoundEffectBase):
-    audio_data_b64: str
+    audio_hash: Optional[str] = None  # Content hash in the audio blob store
 
 class SoundEffect(SoundEffectBase):
     effect_id: int
-    audio_data_b64: str
+    audio_hash: Optional[str] = None
+    audio_size: Optional[int] = None
+    audio_duration: Optional[float] = None
+    has_audio: bool = False
     created_at: datetime
 
     class Config:
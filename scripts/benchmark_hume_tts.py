@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark: speech batch wall time vs batch count against a local fake Hume TTS server.
+
+Starts an HTTP server on localhost that answers POST /v0/tts like Hume's synthesize_json
+endpoint after --latency-ms, then times two ways of running N batches concurrently:
+
+- blocking: the previous process_batch behaviour, calling the sync HumeClient inside
+  async tasks. Every call stalls the event loop, so batches run back to back and wall
+  time grows linearly with the batch count.
+- async: services.speech_generation.process_batch with the AsyncHumeClient and the
+  per-API-key limiter (--max-concurrency). Wall time grows in steps of one request
+  latency per --max-concurrency batches.
+
+Segments, characters and audio go to a temporary SQLite database and audio directory.
+
+Usage:
+    python scripts/benchmark_hume_tts.py --latency-ms 200 --batches 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Use scratch storage before project settings are loaded
+_temp_dir = tempfile.TemporaryDirectory()
+os.environ["LOCAL_DATABASE_URL"] = f"sqlite:///{os.path.join(_temp_dir.name, 'benchmark.db')}"
+os.environ["ENVIRONMENT"] = "development"
+os.environ["AUDIO_STORAGE_PATH"] = os.path.join(_temp_dir.name, "audio")
+os.environ["AUDIO_BLOB_BACKEND"] = "local"
+os.environ.setdefault("HUME_API_KEY", "benchmark-key")
+
+# Add parent directory to Python path to import project modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hume import AsyncHumeClient, HumeClient
+from hume.tts import FormatMp3, PostedUtterance, PostedUtteranceVoiceWithId
+
+from db import crud
+from db.database import Base, SessionLocal, engine
+from services import speech_generation
+from services.clients import ClientFactory
+from utils.config import settings
+
+BATCH_SIZE = 5
+
+def make_fake_hume_handler(latency_ms: float):
+    """Request handler answering synthesize_json with one snippet per utterance"""
+
+    class FakeHumeHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency_ms / 1000.0)
+            generation_id = uuid.uuid4().hex
+            snippets = []
+            for index, utterance in enumerate(body.get("utterances", [])):
+                # Unique audio per utterance, so every segment stores its own blob
+                audio = base64.b64encode(f"{generation_id}:{index}".encode()).decode()
+                snippets.append([{
+                    "audio": audio,
+                    "generation_id": generation_id,
+                    "id": f"{generation_id}-{index}",
+                    "text": utterance["text"],
+                    "utterance_index": index
+                }])
+            payload = json.dumps({
+                "request_id": generation_id,
+                "generations": [{
+                    "audio": "",
+                    "duration": 1.0,
+                    "encoding": {"format": "mp3", "sample_rate": 48000},
+                    "file_size": 0,
+                    "generation_id": generation_id,
+                    "snippets": snippets
+                }]
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeHumeHandler
+
+def start_fake_hume_server(latency_ms: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_fake_hume_handler(latency_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def create_benchmark_text(segment_count: int) -> int:
+    """Store a text with one voiced character and segment_count segments; returns the text id"""
+    with SessionLocal() as db:
+        db_text = crud.create_text(db, content=f"Hume benchmark {uuid.uuid4().hex}", title="Hume benchmark")
+        character = crud.create_character(db, text_id=db_text.id, name="Narrator", provider_id="fake-voice")
+        for sequence in range(1, segment_count + 1):
+            crud.create_text_segment(
+                db, text_id=db_text.id, character_id=character.id,
+                text=f"Benchmark line {sequence}.", sequence=sequence
+            )
+        return db_text.id
+
+async def run_blocking(segments, voice_map, hume_client: HumeClient) -> bool:
+    """Previous behaviour: sync client called from inside concurrent async tasks"""
+
+    async def blocking_batch(batch_segments) -> bool:
+        utterances = [
+            PostedUtterance(
+                text=segment.text,
+                description=segment.description,
+                voice=PostedUtteranceVoiceWithId(id=voice_map[str(segment.character_id)], provider="CUSTOM_VOICE")
+            )
+            for segment in batch_segments
+        ]
+        response = hume_client.tts.synthesize_json(utterances=utterances, format=FormatMp3(), strip_headers=True)
+        return len(response.generations[0].snippets) == len(batch_segments)
+
+    results = await asyncio.gather(*(
+        blocking_batch(segments[start:start + BATCH_SIZE])
+        for start in range(0, len(segments), BATCH_SIZE)
+    ))
+    return all(results)
+
+async def run_async(segments, voice_map, hume_client: AsyncHumeClient) -> bool:
+    """Current behaviour: services.speech_generation.process_batch"""
+    logger = speech_generation.get_logger(__name__)
+    results = await asyncio.gather(*(
+        speech_generation.process_batch(
+            segments=segments,
+            batch_segments=segments[start:start + BATCH_SIZE],
+            batch_start=start,
+            batch_end=min(start + BATCH_SIZE, len(segments)),
+            voice_map=voice_map,
+            hume_client=hume_client,
+            logger_contextual=logger
+        )
+        for start in range(0, len(segments), BATCH_SIZE)
+    ))
+    return all(results)
+
+async def time_batches(batch_count: int, base_url: str) -> dict:
+    text_id = create_benchmark_text(batch_count * BATCH_SIZE)
+    with SessionLocal() as db:
+        segments = crud.get_segments_by_text(db, text_id)
+        voice_map = {str(char.id): char.provider_id for char in crud.get_characters_by_text(db, text_id)}
+
+    timings = {}
+    sync_client = HumeClient(api_key=settings.HUME_API_KEY, base_url=base_url)
+    start = time.perf_counter()
+    if not await run_blocking(segments, voice_map, sync_client):
+        raise RuntimeError("Blocking run returned incomplete batches")
+    timings["blocking"] = time.perf_counter() - start
+
+    async_client = AsyncHumeClient(api_key=settings.HUME_API_KEY, base_url=base_url)
+    start = time.perf_counter()
+    if not await run_async(segments, voice_map, async_client):
+        raise RuntimeError("Async run returned failed batches")
+    timings["async"] = time.perf_counter() - start
+
+    with SessionLocal() as db:
+        stored = sum(1 for segment in crud.get_segment_summaries_by_text(db, text_id) if segment.has_audio)
+    if stored != len(segments):
+        raise RuntimeError(f"Only {stored} of {len(segments)} segments got audio")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speech batches against a local fake Hume server")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake Hume response time per request")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Batch counts to time")
+    parser.add_argument("--max-concurrency", type=int, default=settings.HUME_TTS_MAX_CONCURRENCY,
+                        help="Concurrent Hume TTS requests per API key")
+    args = parser.parse_args()
+
+    settings.HUME_TTS_MAX_CONCURRENCY = args.max_concurrency
+    ClientFactory.reset_clients()
+    Base.metadata.create_all(bind=engine)
+    server = start_fake_hume_server(args.latency_ms)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{args.latency_ms} ms per request, {BATCH_SIZE} segments per batch, "
+          f"{args.max_concurrency} concurrent requests per key")
+    print(f"{'batches':>8} {'blocking':>10} {'async':>10} {'speedup':>8}")
+    try:
+        for batch_count in args.batches:
+            timings = asyncio.run(time_batches(batch_count, base_url))
+            print(f"{batch_count:>8} {timings['blocking']:>9.2f}s {timings['async']:>9.2f}s "
+                  f"{timings['blocking'] / timings['async']:>7.1f}x")
+    finally:
+        server.shutdown()
+        engine.dispose()
+        _temp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark the dialogue/narrative structure pass run before phase 2 segmentation.
+
+Compares the previous implementation (regex split, buffers grown with +=, narrative
+elements merged with repeated +=) with services.text_structure.analyze_text_structure
+on a generated novel of --chars characters (500k by default), in three variants:
+
+- novel: narration with dialogue in straight quotes in most paragraphs;
+- merges: narration only, with empty quotes ("") in every paragraph, so the whole
+  text is one narrative element merged from thousands of pieces, which made the
+  previous implementation quadratic;
+- typographic: the novel with “curly” quotes, which the previous implementation did
+  not recognize (only the new one is timed).
+
+Both implementations must produce the same elements on straight quotes; the script
+checks this before timing them.
+
+Usage:
+    python scripts/benchmark_text_structure.py
+    python scripts/benchmark_text_structure.py --chars 2000000 --repeat 3
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Add parent directory to Python path to import project modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.text_structure import analyze_text_structure
+
+def _legacy_analyze_text_structure(text):
+    """The implementation replaced by services/text_structure.py, for comparison"""
+    parts = re.split(r'(["])', text)
+
+    elements = []
+    in_dialogue = False
+    buffer = ""
+
+    for part in parts:
+        if part == '"':
+            if buffer.strip():
+                kind = "dialogue" if in_dialogue else "narrative"
+                elements.append({"type": kind, "content": buffer.strip().replace('\n', '  ')})
+            buffer = ""
+            in_dialogue = not in_dialogue
+        else:
+            buffer += part
+
+    if buffer.strip():
+        elements.append({"type": "narrative", "content": buffer.strip().replace('\n', '  ')})
+
+    merged_elements = []
+    if elements:
+        merged_elements.append(elements[0])
+        for i in range(1, len(elements)):
+            if elements[i]['type'] == 'narrative' and merged_elements[-1]['type'] == 'narrative':
+                merged_elements[-1]['content'] += ' ' + elements[i]['content']
+            else:
+                merged_elements.append(elements[i])
+
+    return {"elements": merged_elements}
+
+def _novel(num_chars: int, merges: bool = False, opening: str = '"', closing: str = '"') -> str:
+    rng = random.Random(42)
+    sentences = [
+        "The rain had not stopped since morning.",
+        "Mara watched the street from the window of the shop.",
+        "Somewhere below, a cart rattled over the stones.",
+        "The lamps came on one by one along the canal."
+    ]
+    paragraphs = []
+    size = 0
+    number = 0
+    while size < num_chars:
+        paragraph = " ".join(rng.choice(sentences) for _ in range(rng.randint(1, 4)))
+        if merges:
+            paragraph += ' He wrote "" on the board and left.'
+        elif rng.random() < 0.6:
+            paragraph += f" {opening}Line {number}, and then some,{closing} she said. {opening}Will you wait?{closing}"
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+        number += 1
+    return "\n\n".join(paragraphs)[:num_chars]
+
+def _best_time(function, text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the text structure pass before segmentation")
+    parser.add_argument("--chars", type=int, default=500_000, help="Length of the generated novel in characters")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation (best time is reported)")
+    args = parser.parse_args()
+
+    print(f"Structure of a {args.chars:,}-character novel (best of {args.repeat})")
+    variants = (
+        ("novel", _novel(args.chars), True),
+        ("merges", _novel(args.chars, merges=True), True),
+        ("typographic", _novel(args.chars, opening="“", closing="”"), False)
+    )
+    for name, text, comparable in variants:
+        current = [
+            {"type": element["type"], "content": element["content"]}
+            for element in analyze_text_structure(text)["elements"]
+        ]
+        linear = _best_time(analyze_text_structure, text, args.repeat)
+        if not comparable:
+            print(f"{name:<12} {len(current):>7} elements   legacy:      n/a      linear: {linear * 1000:8.1f} ms")
+            continue
+        if current != _legacy_analyze_text_structure(text)["elements"]:
+            raise SystemExit(f"{name}: implementations disagree")
+
+        legacy = _best_time(_legacy_analyze_text_structure, text, args.repeat)
+        speedup = legacy / linear if linear else float("inf")
+        print(f"{name:<12} {len(current):>7} elements   legacy: {legacy * 1000:8.1f} ms   "
+              f"linear: {linear * 1000:8.1f} ms   speedup: {speedup:.1f}x")
+
+if __name__ == "__main__":
+    main()
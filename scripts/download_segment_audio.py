@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import os
-import base64
 import sys
 from sqlalchemy.orm import Session
 
@@ -11,10 +10,11 @@ if PROJECT_ROOT not in sys.path:
 
 from db.database import SessionLocal, engine # Assuming your SessionLocal is here
 from db import models # Assuming your TextSegment model is here
+from services.blob_store import get_blob_store
 
 def download_audio(segment_id: int, output_dir: str = "downloaded_audio"):
     """
-    Downloads audio_data_b64 for a given segment ID and saves it as an MP3 file.
+    Downloads the stored audio for a given segment ID and saves it as an MP3 file.
     """
     db: Session = SessionLocal()
     output_filename = f"segment_{segment_id}_audio.mp3"
@@ -28,16 +28,15 @@ def download_audio(segment_id: int, output_dir: str = "downloaded_audio"):
             print(f"Segment with ID {segment_id} not found.")
             return
 
-        if not segment.audio_data_b64:
-            print(f"Segment {segment_id} found, but audio_data_b64 is NULL or empty.")
+        if not segment.audio_hash:
+            print(f"Segment {segment_id} found, but audio_hash is NULL or empty.")
             return
 
-        print(f"Segment {segment_id} found with audio_data_b64. Decoding...")
+        print(f"Segment {segment_id} found with audio {segment.audio_hash}. Loading from blob store...")
         
-        try:
-            audio_bytes = base64.b64decode(segment.audio_data_b64)
-        except Exception as e:
-            print(f"Error decoding base64 data for segment {segment_id}: {e}")
+        audio_bytes = get_blob_store().get(segment.audio_hash)
+        if audio_bytes is None:
+            print(f"Audio blob {segment.audio_hash} for segment {segment_id} is missing from storage.")
             return
 
         # Ensure output directory exists
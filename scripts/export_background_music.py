@@ -2,7 +2,6 @@
 import argparse
 import os
 import sys
-import base64
 from datetime import datetime
 from sqlalchemy.orm import Session
 
@@ -11,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.database import SessionLocal
 from db import crud
+from services.blob_store import get_blob_store
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -29,7 +29,7 @@ def export_background_music(db: Session, text_id: int, output_dir: str = "audio_
     """
     # Get text from database
     db_text = crud.get_text(db, text_id)
-    if not db_text or not db_text.background_music_audio_b64:
+    if not db_text or not db_text.background_music_audio_hash:
         logger.error(f"No background music found for text ID {text_id}")
         return None
         
@@ -42,8 +42,11 @@ def export_background_music(db: Session, text_id: int, output_dir: str = "audio_
     output_path = os.path.join(text_dir, f"background_music_{timestamp}.mp3")
     
     try:
-        # Decode base64 and write to file
-        audio_bytes = base64.b64decode(db_text.background_music_audio_b64)
+        # Load from the blob store and write to file
+        audio_bytes = get_blob_store().get(db_text.background_music_audio_hash)
+        if audio_bytes is None:
+            logger.error(f"Background music blob missing from storage for text ID {text_id}")
+            return None
         with open(output_path, 'wb') as f:
             f.write(audio_bytes)
             
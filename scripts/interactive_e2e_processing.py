@@ -95,18 +95,18 @@ async def get_pipeline_status(text_id: int) -> PipelineStatus:
         text_obj = crud.get_text(db, text_id)
         if text_obj:
             status.has_bg_music_prompt = bool(text_obj.background_music_prompt)
-            status.has_bg_music_audio = bool(text_obj.background_music_audio_b64)
+            status.has_bg_music_audio = bool(text_obj.background_music_audio_hash)
             if not status.word_timestamps_available:  
                 status.word_timestamps_available = bool(text_obj.word_timestamps)
         
         segments = crud.get_segments_by_text(db, text_id)
         status.segments_count = len(segments)
-        status.segments_with_audio = len([s for s in segments if s.audio_data_b64])
+        status.segments_with_audio = len([s for s in segments if s.audio_hash])
         
         # Check sound effects
         sound_effects = crud.get_sound_effects_by_text(db, text_id)
         status.sound_effects_count = len(sound_effects)
-        status.sound_effects_with_audio = len([sfx for sfx in sound_effects if sfx.audio_data_b64])
+        status.sound_effects_with_audio = len([sfx for sfx in sound_effects if sfx.audio_hash])
     finally:
         db.close()
     
@@ -527,7 +527,9 @@ async def reset_text_pipeline_data(text_id: int) -> bool:
             text_obj.analyzed = False
             text_obj.word_timestamps = None
             text_obj.background_music_prompt = None
-            text_obj.background_music_audio_b64 = None
+            text_obj.background_music_audio_hash = None
+            text_obj.background_music_audio_size = None
+            text_obj.background_music_audio_duration = None
             
             # Delete all characters for this text
             characters = crud.get_characters_by_text(db, text_id)
@@ -2,36 +2,35 @@
 Unified audio analysis service that combines sound effects and background music analysis.
 This service replaces separate calls to Claude for each audio type with a single unified analysis.
 """
+import asyncio
 import json
 from typing import Dict, List, Any, Optional, Tuple
 
 from utils.logging import get_logger
 from utils.config import settings
 from db import crud
-from db.session_manager import managed_db_session
+from db.session_manager import managed_db_session, unit_of_work
 # Removed force alignment dependency - using word placement instead
 from utils.timing import time_it
 from services.clients import ClientFactory
+from services.llm_cache import cached_completion, cached_completion_sync
+from services.retry import retry_with_backoff, retry_with_backoff_sync
 
 logger = get_logger(__name__)
 
-@time_it("unified_audio_analysis")
-def analyze_text_for_audio(text_id: int) -> Tuple[Optional[str], List[Dict]]:
-    """
-    Unified analysis that generates both soundscape and sound effects in a single Claude call.
-    
-    Args:
-        text_id: ID of the text to analyze
-        
-    Returns:
-        Tuple of (soundscape_prompt, sound_effects_list)
-    """
+# Retry configuration for API overload handling
+MAX_RETRIES = 3
+BASE_DELAY = 15  # Start with 15 seconds
+MAX_DELAY = 90   # Cap at 90 seconds
+
+def _build_analysis_request(text_id: int) -> Optional[Dict[str, Any]]:
+    """Anthropic request parameters for the unified analysis of a text, or None if it does not exist"""
     # Get text content from database
     with managed_db_session() as db:
         db_text = crud.get_text(db, text_id)
         if not db_text:
             logger.error(f"Text with ID {text_id} not found")
-            return None, []
+            return None
         
         full_text = db_text.content
     
@@ -54,110 +53,149 @@ def analyze_text_for_audio(text_id: int) -> Tuple[Optional[str], List[Dict]]:
         "word_placement": word_placement
     }, indent=2)
     
-    # Retry configuration for API overload handling
-    max_retries = 3
-    base_delay = 15  # Start with 15 seconds
-    max_delay = 90   # Cap at 90 seconds
-    
-    message = None
-    for attempt in range(max_retries + 1):
-        try:
-            # Log the Claude API request
-            if attempt > 0:
-                logger.info(f"Anthropic API Request for unified audio analysis (attempt {attempt + 1}/{max_retries + 1})")
-            else:
-                logger.info("Anthropic API Request for unified audio analysis")
-            
-            # Single call to Claude for both analyses
-            message = ClientFactory.get_anthropic_client().messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=3854,
-                temperature=0,
-                messages=[
+    # Single call to Claude for both analyses
+    return {
+        "model": "claude-3-5-haiku-20241022",
+        "max_tokens": 3854,
+        "temperature": 0,
+        "messages": [
+            {
+                "role": "user",
+                "content": [
                     {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"analyze according to the following:\n\nsoundscape: atmospheric sounds that will be played in the background of this entire text. Focus on concrete instructions like background noises (rain, wind, crowd cheering), tempo, instrumentation (if any), rhythm, and musical motifs. mention the genre of the book. 1-2 sentences.\n\nsound effects:\n- Name of sound (e.g., \"wooden-door-creak\", \"distant-thunder\")\n- The exact word where the effect should start\n- The exact word where the effect should end (can be same as start)\n- A detailed AudioX prompt for generating the sound\n- Rank the sound effects by their importance and contribution to the immersive audio experience (1 most important)\n- start_word_number and end_word_number (can be the same) - the numerical position of the word\n- Background music can NOT be sound effects\n\nOUTPUT FORMAT:\n{{\n  \"sound_effects\": [\n    {{\n      \"effect_name\": \"wooden-door-creak\",\n      \"description\": \"Old wooden door creaking open slowly\",\n      \"start_word\": \"door\",\n      \"end_word\": \"opened\",\n      \"prompt\": \"old wooden door creaking open slowly, horror movie style, high quality\",\n      \"rank\": \"2\",\n      \"start_word_number\": \"3\", \n      \"end_word_number\": \"4\"\n    }},\n    {{\n      \"effect_name\": \"thunder-distant\",\n      \"description\": \"Distant thunder rumbling\",\n      \"start_word\": \"thunder\",\n      \"end_word\": \"thunder\",\n      \"prompt\": \"distant thunder rumbling softly, cinematic, high quality\",\n      \"rank\": \"1\",\n      \"start_word_number\": \"23\", \n      \"end_word_number\": \"23\"\n    }}\n  ],\n  \"soundscape\": \"Slow, ominous percussion with deep tribal drums mimicking a primal heartbeat. Low, rumbling bass undertones create tension. Sparse, dissonant string elements suggest a dark fantasy or horror genre, with a rhythmic pattern that suggests impending danger and mysterious exploration.\"\n}}\n\n\nNEVER address a sound in both soundscape and sound effects, unless it's crucial for the storyline\n\nWord placement data (use this to find start_word_number and end_word_number):\n{word_placement_json}\n\nText:\n{full_text}"
-                            }
-                        ]
+                        "type": "text",
+                        "text": f"analyze according to the following:\n\nsoundscape: atmospheric sounds that will be played in the background of this entire text. Focus on concrete instructions like background noises (rain, wind, crowd cheering), tempo, instrumentation (if any), rhythm, and musical motifs. mention the genre of the book. 1-2 sentences.\n\nsound effects:\n- Name of sound (e.g., \"wooden-door-creak\", \"distant-thunder\")\n- The exact word where the effect should start\n- The exact word where the effect should end (can be same as start)\n- A detailed AudioX prompt for generating the sound\n- Rank the sound effects by their importance and contribution to the immersive audio experience (1 most important)\n- start_word_number and end_word_number (can be the same) - the numerical position of the word\n- Background music can NOT be sound effects\n\nOUTPUT FORMAT:\n{{\n  \"sound_effects\": [\n    {{\n      \"effect_name\": \"wooden-door-creak\",\n      \"description\": \"Old wooden door creaking open slowly\",\n      \"start_word\": \"door\",\n      \"end_word\": \"opened\",\n      \"prompt\": \"old wooden door creaking open slowly, horror movie style, high quality\",\n      \"rank\": \"2\",\n      \"start_word_number\": \"3\", \n      \"end_word_number\": \"4\"\n    }},\n    {{\n      \"effect_name\": \"thunder-distant\",\n      \"description\": \"Distant thunder rumbling\",\n      \"start_word\": \"thunder\",\n      \"end_word\": \"thunder\",\n      \"prompt\": \"distant thunder rumbling softly, cinematic, high quality\",\n      \"rank\": \"1\",\n      \"start_word_number\": \"23\", \n      \"end_word_number\": \"23\"\n    }}\n  ],\n  \"soundscape\": \"Slow, ominous percussion with deep tribal drums mimicking a primal heartbeat. Low, rumbling bass undertones create tension. Sparse, dissonant string elements suggest a dark fantasy or horror genre, with a rhythmic pattern that suggests impending danger and mysterious exploration.\"\n}}\n\n\nNEVER address a sound in both soundscape and sound effects, unless it's crucial for the storyline\n\nWord placement data (use this to find start_word_number and end_word_number):\n{word_placement_json}\n\nText:\n{full_text}"
                     }
                 ]
-            )
-            # If we get here, the request succeeded
-            break
-            
-        except Exception as e:
-            error_str = str(e)
-            # Check if this is an overload error and we have retries left
-            if ("overloaded" in error_str.lower() or "529" in error_str) and attempt < max_retries:
-                delay = min(base_delay * (2 ** attempt), max_delay)  # Exponential backoff with cap
-                logger.warning(f"API overloaded, retrying in {delay} seconds (attempt {attempt + 1}/{max_retries + 1})")
-                
-                import time
-                time.sleep(delay)
-                continue
-            else:
-                # Re-raise the exception if it's not overload or we're out of retries
-                logger.error(f"Error in unified audio analysis: {error_str}")
-                return None, []
+            }
+        ]
+    }
+
+def _is_overloaded(error: Exception) -> bool:
+    """Whether an Anthropic error is an overload that is worth retrying"""
+    error_str = str(error)
+    return "overloaded" in error_str.lower() or "529" in error_str
+
+def _retry_options() -> Dict[str, Any]:
+    """Retry settings shared by the blocking and the async analysis"""
+    return {
+        "attempts": MAX_RETRIES + 1,
+        "base_delay": BASE_DELAY,
+        "max_delay": MAX_DELAY,
+        "retry_if": _is_overloaded,
+        "log": logger,
+        "description": "Unified audio analysis request"
+    }
+
+def _parse_analysis_response(response_text: str) -> Tuple[Optional[str], List[Dict]]:
+    """Soundscape and sound effects from Claude's analysis response; raises ValueError if it has no valid JSON"""
+    # Parse the JSON response
+    response_text = response_text.strip()
+    
+    # Extract JSON from response
+    start_idx = response_text.find('{')
+    end_idx = response_text.rfind('}') + 1
+    if start_idx != -1 and end_idx != -1:
+        json_str = response_text[start_idx:end_idx]
+        analysis_result = json.loads(json_str)
+    else:
+        raise ValueError("No valid JSON found in Claude response")
     
-    if message is None:
-        logger.error("Failed to get response from Claude API after all retries")
+    # Extract soundscape and sound effects
+    soundscape = analysis_result.get("soundscape", "")
+    sound_effects = analysis_result.get("sound_effects", [])
+    
+    logger.info(f"Claude analysis completed - Soundscape: {bool(soundscape)}, Sound effects: {len(sound_effects)}")
+    
+    # Process sound effects with word number data
+    processed_effects = []
+    for effect in sound_effects:
+        # Extract word numbers from Claude's response
+        start_word_number = effect.get('start_word_number')
+        end_word_number = effect.get('end_word_number')
+        
+        # Convert to integers if they exist
+        if start_word_number:
+            try:
+                effect['start_word_number'] = int(start_word_number)
+            except (ValueError, TypeError):
+                effect['start_word_number'] = None
+        
+        if end_word_number:
+            try:
+                effect['end_word_number'] = int(end_word_number)
+            except (ValueError, TypeError):
+                effect['end_word_number'] = None
+        
+        processed_effects.append(effect)
+    
+    return soundscape, processed_effects
+
+@time_it("unified_audio_analysis")
+def analyze_text_for_audio(text_id: int) -> Tuple[Optional[str], List[Dict]]:
+    """
+    Unified analysis that generates both soundscape and sound effects in a single Claude call.
+    Responses are cached (services/llm_cache.py).
+    
+    Blocks the calling thread, including while waiting to retry an overloaded API; call
+    analyze_text_for_audio_async from coroutines.
+    
+    Args:
+        text_id: ID of the text to analyze
+        
+    Returns:
+        Tuple of (soundscape_prompt, sound_effects_list)
+    """
+    api_params = _build_analysis_request(text_id)
+    if api_params is None:
         return None, []
     
+    def request() -> str:
+        logger.info("Anthropic API Request for unified audio analysis")
+        client = ClientFactory.get_anthropic_client()
+        message = retry_with_backoff_sync(lambda: client.messages.create(**api_params), **_retry_options())
+        # Log the Claude API response
+        logger.info("Anthropic API Response for unified audio analysis", extra={
+            "anthropic_response": message.content[0].text
+        })
+        return message.content[0].text
+    
     try:
+        return cached_completion_sync(api_params, request, _parse_analysis_response, "Audio analysis")
+    except Exception as e:
+        logger.error(f"Error in unified audio analysis: {str(e)}")
+        return None, []
+
+@time_it("unified_audio_analysis")
+async def analyze_text_for_audio_async(text_id: int) -> Tuple[Optional[str], List[Dict]]:
+    """
+    Event-loop-safe analyze_text_for_audio: the request uses the async Anthropic client
+    and retries wait with asyncio.sleep.
+    
+    Args:
+        text_id: ID of the text to analyze
         
+    Returns:
+        Tuple of (soundscape_prompt, sound_effects_list)
+    """
+    api_params = await asyncio.to_thread(_build_analysis_request, text_id)
+    if api_params is None:
+        return None, []
+    
+    async def request() -> str:
+        logger.info("Anthropic API Request for unified audio analysis")
+        client = ClientFactory.get_anthropic_async_client()
+        message = await retry_with_backoff(lambda: client.messages.create(**api_params), **_retry_options())
         # Log the Claude API response
         logger.info("Anthropic API Response for unified audio analysis", extra={
             "anthropic_response": message.content[0].text
         })
-        
-        # Parse the JSON response
-        response_text = message.content[0].text.strip()
-        
-        # Extract JSON from response
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        if start_idx != -1 and end_idx != -1:
-            json_str = response_text[start_idx:end_idx]
-            analysis_result = json.loads(json_str)
-        else:
-            raise ValueError("No valid JSON found in Claude response")
-        
-        # Extract soundscape and sound effects
-        soundscape = analysis_result.get("soundscape", "")
-        sound_effects = analysis_result.get("sound_effects", [])
-        
-        logger.info(f"Claude analysis completed - Soundscape: {bool(soundscape)}, Sound effects: {len(sound_effects)}")
-        
-        # Process sound effects with word number data
-        processed_effects = []
-        for effect in sound_effects:
-            # Extract word numbers from Claude's response
-            start_word_number = effect.get('start_word_number')
-            end_word_number = effect.get('end_word_number')
-            
-            # Convert to integers if they exist
-            if start_word_number:
-                try:
-                    effect['start_word_number'] = int(start_word_number)
-                except (ValueError, TypeError):
-                    effect['start_word_number'] = None
-            
-            if end_word_number:
-                try:
-                    effect['end_word_number'] = int(end_word_number)
-                except (ValueError, TypeError):
-                    effect['end_word_number'] = None
-            
-            processed_effects.append(effect)
-        
-        return soundscape, processed_effects
-        
+        return message.content[0].text
+    
+    try:
+        return await cached_completion(api_params, request, _parse_analysis_response, "Audio analysis")
     except Exception as e:
-        logger.error(f"Error in unified audio analysis: {e}")
+        logger.error(f"Error in unified audio analysis: {str(e)}")
         return None, []
 
 # Removed find_word_timing function - no longer needed with word placement approach
@@ -177,15 +215,16 @@ def process_audio_analysis_for_text(text_id: int) -> Tuple[bool, Optional[str],
         Tuple of (success, soundscape_prompt, sound_effects_list)
     """
     # Delete existing sound effects and clear background music audio to avoid duplicates
-    with managed_db_session() as db:
+    with managed_db_session() as db, unit_of_work(db):
         deleted_count = crud.delete_sound_effects_by_text(db, text_id)
         logger.info(f"Deleted {deleted_count} existing sound effects for text {text_id}")
         
         # Clear any existing background music audio data
-        db_text = crud.get_text(db, text_id)
-        if db_text and db_text.background_music_audio_b64:
-            db_text.background_music_audio_b64 = None
-            db.commit()
+        db_text = crud.get_text_summary(db, text_id)
+        if db_text and db_text.background_music_audio_hash:
+            db_text.background_music_audio_hash = None
+            db_text.background_music_audio_size = None
+            db_text.background_music_audio_duration = None
             logger.info(f"Cleared existing background music audio for text {text_id}")
     
     # Run unified analysis
@@ -195,21 +234,20 @@ def process_audio_analysis_for_text(text_id: int) -> Tuple[bool, Optional[str],
         logger.error(f"Audio analysis failed for text {text_id}")
         return False, None, []
     
-    # Store soundscape as background music prompt
-    if soundscape:
-        try:
-            with managed_db_session() as db:
+    # Store soundscape and sound effects in a single transaction
+    with managed_db_session() as db, unit_of_work(db):
+        # Store soundscape as background music prompt
+        if soundscape:
+            try:
                 db_text = crud.get_text(db, text_id)
                 if db_text:
                     db_text.background_music_prompt = soundscape
-                    db.commit()
                     logger.info(f"Stored soundscape as background music prompt for text {text_id}")
-        except Exception as e:
-            logger.error(f"Error storing soundscape: {e}")
-    
-    # Apply text length filtering for sound effects
-    if sound_effects:
-        with managed_db_session() as db:
+            except Exception as e:
+                logger.error(f"Error storing soundscape: {e}")
+        
+        # Apply text length filtering for sound effects
+        if sound_effects:
             text_length = len(crud.get_text(db, text_id).content)
             max_effects = max(1, text_length // 700)
             
@@ -248,7 +286,6 @@ def process_audio_analysis_for_text(text_id: int) -> Tuple[bool, Optional[str],
                         start_word_position=start_word_number,
                         end_word_position=end_word_number,
                         prompt=effect['prompt'],
-                        audio_data_b64="",
                         start_time=None,  # No timing data with word placement approach
                         end_time=None,    # No timing data with word placement approach
                         total_time=total_time,
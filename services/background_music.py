@@ -2,12 +2,12 @@ import json
 import os
 import subprocess
 from typing import Dict, Any, Optional, Tuple
-import base64
 from sqlalchemy.orm import Session
 from utils.config import settings
 from utils.logging import get_logger
 from utils.http_client import get_sync_client
 from db import crud, models
+from db.log_writer import enqueue_log
 from db.session_manager import managed_db_session
 from utils.timing import time_it
 from services.clients import ClientFactory
@@ -38,8 +38,7 @@ def update_text_with_music_prompt(text_id: int, music_prompt: str) -> bool:
             db_text.background_music_prompt = music_prompt
             
             # Also log the operation
-            crud.create_log(
-                db=db,
+            enqueue_log(
                 text_id=text_id,
                 operation="background_music_prompt_generation",
                 status="success",
@@ -139,8 +138,10 @@ async def generate_background_music(text_id: int) -> bool:
                               "final_music_duration": music_duration})
             
             # Clear existing background music audio data to ensure we wait for new prediction
-            if db_text.background_music_audio_b64:
-                db_text.background_music_audio_b64 = None
+            if db_text.background_music_audio_hash:
+                db_text.background_music_audio_hash = None
+                db_text.background_music_audio_size = None
+                db_text.background_music_audio_duration = None
                 db.commit()
                 logger.info(f"Cleared existing background music audio for text {text_id} to wait for new prediction")
             
@@ -163,8 +164,7 @@ async def generate_background_music(text_id: int) -> bool:
             
             if not prediction_id:
                 logger.error(f"Failed to trigger background music generation webhook for text {text_id}")
-                crud.create_log(
-                    db=db,
+                enqueue_log(
                     text_id=text_id,
                     operation="background_music_generation_webhook_trigger",
                     status="error",
@@ -173,8 +173,7 @@ async def generate_background_music(text_id: int) -> bool:
                 return False
             
             logger.info(f"Background music generation webhook triggered for text {text_id}, prediction ID: {prediction_id}")
-            crud.create_log(
-                db=db,
+            enqueue_log(
                 text_id=text_id,
                 operation="background_music_generation_webhook_trigger",
                 status="success",
@@ -196,8 +195,7 @@ async def generate_background_music(text_id: int) -> bool:
 
     except Exception as e:
         logger.error(f"Error triggering background music generation webhook: {str(e)}")
-        with managed_db_session() as db:
-            crud.create_log(db=db, text_id=text_id, operation="background_music_generation_webhook_trigger", status="error", response={"error": str(e)})
+        enqueue_log(text_id=text_id, operation="background_music_generation_webhook_trigger", status="error", response={"error": str(e)})
         return False
 
  
\ No newline at end of file
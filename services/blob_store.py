@@ -0,0 +1,249 @@
+"""
+Content-addressed blob storage for generated audio.
+
+Audio assets (speech segments, sound effects, background music) are stored once,
+keyed by the SHA-256 of their bytes, instead of as base64 text inside database rows.
+Database models keep only the hash, size and duration of each asset.
+
+Two backends are provided:
+- LocalBlobStore: files on local disk under AUDIO_STORAGE_PATH (default for development)
+- R2BlobStore: objects in Cloudflare R2, built on R2StorageService
+"""
+
+import base64
+import hashlib
+import os
+import subprocess
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from utils.config import settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass(frozen=True)
+class AudioBlob:
+    """Reference to an audio asset stored in the blob store."""
+    hash: str
+    size: int
+    duration: Optional[float] = None
+
+def compute_blob_hash(data: bytes) -> str:
+    """Return the content hash (hex SHA-256) used as the blob key."""
+    return hashlib.sha256(data).hexdigest()
+
+def probe_audio_duration(data: bytes) -> Optional[float]:
+    """
+    Get the duration of in-memory audio data in seconds using ffprobe.
+
+    Args:
+        data: Raw audio bytes
+
+    Returns:
+        Duration in seconds, or None if it could not be determined
+    """
+    try:
+        result = subprocess.run(
+            [
+                'ffprobe',
+                '-v', 'error',
+                '-show_entries', 'format=duration',
+                '-of', 'default=noprint_wrappers=1:nokey=1',
+                '-i', 'pipe:0'
+            ],
+            input=data,
+            capture_output=True,
+            timeout=settings.replicate_audio.ffmpeg_timeout
+        )
+        if result.returncode != 0:
+            return None
+        return float(result.stdout.decode().strip())
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+class BlobStore(ABC):
+    """Abstract content-addressed blob store."""
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes, content_type: Optional[str] = None) -> bool:
+        """Write bytes under key. Returns True on success."""
+        pass
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[bytes]:
+        """Read bytes stored under key, or None if missing."""
+        pass
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Check whether a blob with this key is stored."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete the blob stored under key. Returns True on success."""
+        pass
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        """
+        Store bytes and return their content hash.
+        Identical content is only written once.
+
+        Args:
+            data: Bytes to store
+            content_type: Optional MIME type of the data
+
+        Returns:
+            Content hash of the stored data
+
+        Raises:
+            IOError: If the backend failed to store the data
+        """
+        key = compute_blob_hash(data)
+        if self.exists(key):
+            logger.debug(f"Blob {key} already stored, skipping write")
+            return key
+        if not self._write(key, data, content_type):
+            raise IOError(f"Failed to store blob {key} ({len(data)} bytes)")
+        return key
+
+    def get(self, key: Optional[str]) -> Optional[bytes]:
+        """
+        Get bytes for a content hash.
+
+        Args:
+            key: Content hash returned by put()
+
+        Returns:
+            Stored bytes, or None if key is empty or the blob is missing
+        """
+        if not key:
+            return None
+        data = self._read(key)
+        if data is None:
+            logger.warning(f"Blob {key} not found in {self.__class__.__name__}")
+        return data
+
+    def put_audio(self, audio: Union[bytes, str], content_type: str = "audio/mpeg") -> AudioBlob:
+        """
+        Store audio and return a reference with hash, size and duration.
+
+        Args:
+            audio: Raw audio bytes, or base64 encoded audio as returned by providers
+            content_type: MIME type of the audio
+
+        Returns:
+            AudioBlob describing the stored audio
+        """
+        data = base64.b64decode(audio) if isinstance(audio, str) else audio
+        key = self.put(data, content_type)
+        return AudioBlob(hash=key, size=len(data), duration=probe_audio_duration(data))
+
+    def get_audio_b64(self, key: Optional[str]) -> Optional[str]:
+        """Get stored audio as a base64 string, or None if missing."""
+        data = self.get(key)
+        return base64.b64encode(data).decode() if data is not None else None
+
+class LocalBlobStore(BlobStore):
+    """Blob store backed by the local filesystem."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        """Get the on-disk path for a key (fanned out by hash prefix)."""
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def _write(self, key: str, data: bytes, content_type: Optional[str] = None) -> bool:
+        path = self.path_for(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see partial blobs
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.error(f"Failed to write blob {key} to {path}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return False
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path_for(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self.path_for(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+class R2BlobStore(BlobStore):
+    """Blob store backed by Cloudflare R2."""
+
+    def __init__(self, storage=None, prefix: str = "audio/"):
+        if storage is None:
+            from services.r2_storage import r2_storage
+            storage = r2_storage
+        self.storage = storage
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _write(self, key: str, data: bytes, content_type: Optional[str] = None) -> bool:
+        return self.storage.upload_bytes(data, self._object_key(key), content_type)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        return self.storage.download_bytes(self._object_key(key))
+
+    def exists(self, key: str) -> bool:
+        return self.storage.object_exists(self._object_key(key))
+
+    def delete(self, key: str) -> bool:
+        return self.storage.delete_object(self._object_key(key))
+
+_blob_store: Optional[BlobStore] = None
+
+def get_blob_store() -> BlobStore:
+    """
+    Get the configured blob store (cached).
+
+    The backend is selected by AUDIO_BLOB_BACKEND ("local" or "r2").
+
+    Returns:
+        BlobStore instance
+    """
+    global _blob_store
+    if _blob_store is None:
+        backend = settings.AUDIO_BLOB_BACKEND
+        if backend == "r2":
+            _blob_store = R2BlobStore()
+        elif backend == "local":
+            _blob_store = LocalBlobStore(os.path.join(settings.AUDIO_STORAGE_PATH, "blobs"))
+        else:
+            raise ValueError(f"Unknown AUDIO_BLOB_BACKEND: {backend}")
+        logger.info(f"Using {_blob_store.__class__.__name__} for audio storage")
+    return _blob_store
+
+def reset_blob_store() -> None:
+    """Reset the cached blob store. Useful for testing or config changes."""
+    global _blob_store
+    _blob_store = None
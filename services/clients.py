@@ -2,13 +2,19 @@
 Shared client factory for external API services.
 
 This module provides a centralized factory for creating and managing
-external API clients (Anthropic, Hume AI) with caching and connection pooling.
+external API clients (Anthropic, Hume AI, Replicate) with caching and connection pooling.
+Every client sends its requests through the shared per-provider scheduler in
+services/rate_limit.py, so concurrent services stay within provider rate limits.
 """
 
-from typing import Optional
+import asyncio
+import weakref
+from typing import Dict, Optional
+import httpx
 from anthropic import Anthropic, AsyncAnthropic
 from hume import AsyncHumeClient, HumeClient
 import replicate
+from services.rate_limit import ScheduledTransport, get_scheduler
 from utils.config import settings
 import logging
 
@@ -22,7 +28,17 @@ class ClientFactory:
     _anthropic_async_client: Optional[AsyncAnthropic] = None
     _hume_async_client: Optional[AsyncHumeClient] = None
     _hume_sync_client: Optional[HumeClient] = None
-    _replicate_initialized: bool = False
+    _replicate_client: Optional[replicate.Client] = None
+    # Per event loop, per API key: asyncio primitives cannot be shared across loops
+    _hume_tts_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+    # Hume's SDK default, which it only applies when it builds its own httpx client
+    HUME_TIMEOUT = 60.0
+    
+    @staticmethod
+    def _scheduled_transport(provider: str) -> ScheduledTransport:
+        """Transport routing a client's requests through the provider's shared scheduler."""
+        return ScheduledTransport(get_scheduler(provider))
     
     @classmethod
     def get_anthropic_client(cls) -> Anthropic:
@@ -34,7 +50,10 @@ class ClientFactory:
         """
         if cls._anthropic_client is None:
             logger.debug("Creating new Anthropic client")
-            cls._anthropic_client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+            cls._anthropic_client = Anthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                http_client=httpx.Client(transport=cls._scheduled_transport("anthropic"))
+            )
         return cls._anthropic_client
     
     @classmethod
@@ -47,7 +66,10 @@ class ClientFactory:
         """
         if cls._anthropic_async_client is None:
             logger.debug("Creating new async Anthropic client")
-            cls._anthropic_async_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+            cls._anthropic_async_client = AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                http_client=httpx.AsyncClient(transport=cls._scheduled_transport("anthropic"))
+            )
         return cls._anthropic_async_client
     
     @classmethod
@@ -60,7 +82,15 @@ class ClientFactory:
         """
         if cls._hume_async_client is None:
             logger.debug("Creating new async Hume client")
-            cls._hume_async_client = AsyncHumeClient(api_key=settings.HUME_API_KEY)
+            cls._hume_async_client = AsyncHumeClient(
+                api_key=settings.HUME_API_KEY,
+                timeout=cls.HUME_TIMEOUT,
+                httpx_client=httpx.AsyncClient(
+                    transport=cls._scheduled_transport("hume"),
+                    timeout=cls.HUME_TIMEOUT,
+                    follow_redirects=True
+                )
+            )
         return cls._hume_async_client
     
     @classmethod
@@ -73,22 +103,53 @@ class ClientFactory:
         """
         if cls._hume_sync_client is None:
             logger.debug("Creating new sync Hume client")
-            cls._hume_sync_client = HumeClient(api_key=settings.HUME_API_KEY)
+            cls._hume_sync_client = HumeClient(
+                api_key=settings.HUME_API_KEY,
+                timeout=cls.HUME_TIMEOUT,
+                httpx_client=httpx.Client(
+                    transport=cls._scheduled_transport("hume"),
+                    timeout=cls.HUME_TIMEOUT,
+                    follow_redirects=True
+                )
+            )
         return cls._hume_sync_client
     
     @classmethod
-    def get_replicate_client(cls):
+    def get_hume_tts_limiter(cls) -> asyncio.Semaphore:
+        """
+        Get the semaphore bounding concurrent Hume TTS requests for the configured API key.
+        
+        Hume enforces concurrency limits per API key, so every caller using the same key
+        shares one semaphore of HUME_TTS_MAX_CONCURRENCY slots. Must be called from a
+        running event loop.
+        
+        Returns:
+            asyncio.Semaphore: Limiter to hold for the duration of each TTS request
+        """
+        loop = asyncio.get_running_loop()
+        limiters = cls._hume_tts_limiters.setdefault(loop, {})
+        limiter = limiters.get(settings.HUME_API_KEY)
+        if limiter is None:
+            logger.debug(f"Creating Hume TTS limiter with {settings.HUME_TTS_MAX_CONCURRENCY} slots")
+            limiter = asyncio.Semaphore(settings.HUME_TTS_MAX_CONCURRENCY)
+            limiters[settings.HUME_API_KEY] = limiter
+        return limiter
+    
+    @classmethod
+    def get_replicate_client(cls) -> replicate.Client:
         """
-        Initialize Replicate client (it's a module, not a class).
+        Get or create a cached Replicate client instance.
         
         Returns:
-            replicate module: Configured replicate module
+            replicate.Client: Configured Replicate client
         """
-        if not cls._replicate_initialized:
-            logger.debug("Initializing Replicate client")
-            replicate.api_token = settings.REPLICATE_API_TOKEN
-            cls._replicate_initialized = True
-        return replicate
+        if cls._replicate_client is None:
+            logger.debug("Creating new Replicate client")
+            cls._replicate_client = replicate.Client(
+                api_token=settings.REPLICATE_API_TOKEN,
+                transport=cls._scheduled_transport("replicate")
+            )
+        return cls._replicate_client
     
     @classmethod
     def reset_clients(cls) -> None:
@@ -100,4 +161,5 @@ class ClientFactory:
         cls._anthropic_async_client = None
         cls._hume_async_client = None
         cls._hume_sync_client = None
-        cls._replicate_initialized = False
\ No newline at end of file
+        cls._hume_tts_limiters = weakref.WeakKeyDictionary()
+        cls._replicate_client = None
\ No newline at end of file
@@ -1,6 +1,6 @@
 import os
+import shutil
 import subprocess
-import base64
 import tempfile
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -8,7 +8,10 @@ from datetime import datetime
 from utils.logging import get_logger
 from utils.timing import time_it
 from db import crud
+from db.word_timestamps import WordTimestamps
 from db.session_manager import managed_db_session
+from services.blob_store import get_blob_store
+from services.speech_combiner import find_combined_speech
 
 # Import force alignment dependencies
 try:
@@ -127,30 +130,30 @@ def _run_force_alignment_on_combined_audio(combined_audio_path: str, text_conten
         logger.error(f"Error running force alignment for text ID {text_id}: {str(e)}")
         return False
 
-def _match_word_position_to_timestamp(word_position: int, word_timestamps: List[Dict]) -> Optional[float]:
+def _match_word_position_to_timestamp(word_position: int, word_timestamps: WordTimestamps) -> Optional[float]:
     """
     Match a word position (index in text) to its timestamp from force alignment.
     
     Args:
         word_position: Word position in the text (0-based index)
-        word_timestamps: List of word timestamps from force alignment
+        word_timestamps: Packed word timestamps from force alignment (Text.word_timestamps)
         
     Returns:
         Start timestamp of the word, or None if not found
     """
     if not word_timestamps or word_position < 0:
         return None
+    
+    # Only the start-time array is read; words are never decoded
+    starts = word_timestamps.starts
         
     # Ensure word_position is within bounds
-    if word_position < len(word_timestamps):
-        return word_timestamps[word_position]["start"]
+    if word_position < len(starts):
+        return starts[word_position]
     
     # If word_position is beyond our timestamps, return the last word's timestamp
-    if word_timestamps:
-        logger.warning(f"Word position {word_position} beyond available timestamps ({len(word_timestamps)}), using last word timestamp")
-        return word_timestamps[-1]["start"]
-    
-    return None
+    logger.warning(f"Word position {word_position} beyond available timestamps ({len(starts)}), using last word timestamp")
+    return starts[-1]
 
 @time_it("combine_speech_segments")
 async def combine_speech_segments(text_id: int, output_dir: str = None, trailing_silence: float = 0.0) -> Optional[str]:
@@ -176,6 +179,8 @@ async def combine_speech_segments(text_id: int, output_dir: str = None, trailing
             
             # Get all segments for the text, ordered by sequence
             segments = crud.get_segments_by_text(db, text_id)
+            # Detach so the commit on leaving the session does not expire them
+            db.expunge_all()
         if not segments:
             logger.error(f"No segments found for text ID {text_id}")
             return None
@@ -189,21 +194,32 @@ async def combine_speech_segments(text_id: int, output_dir: str = None, trailing
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         combined_audio_path = os.path.join(output_dir, f"combined_speech_{text_id}_{timestamp}.mp3")
         
+        # Streaming speech generation may already have combined exactly this audio
+        prebuilt = None
+        if not trailing_silence:
+            prebuilt = find_combined_speech(text_id, [segment.audio_hash for segment in segments if segment.audio_hash])
+        if prebuilt:
+            shutil.copyfile(prebuilt, combined_audio_path)
+            logger.info(f"Using speech combined during generation for text ID {text_id}")
+            if not _run_force_alignment_on_combined_audio(combined_audio_path, db_text.content, text_id):
+                logger.warning(f"Force alignment failed for text ID {text_id}, but continuing with combined audio")
+            return combined_audio_path
+        
         # Create temporary files for each segment's audio
         temp_files = []
         segments_with_audio = []
         
+        blob_store = get_blob_store()
         for segment in segments:
             # Skip segments without audio data
-            if not segment.audio_data_b64:
+            if not segment.audio_hash:
                 logger.warning(f"Segment {segment.id} doesn't have audio data, skipping")
                 continue
                 
-            # Decode base64 to binary
-            try:
-                audio_bytes = base64.b64decode(segment.audio_data_b64)
-            except Exception as e:
-                logger.error(f"Error decoding base64 audio for segment {segment.id}: {str(e)}")
+            # Load audio bytes from the blob store
+            audio_bytes = blob_store.get(segment.audio_hash)
+            if audio_bytes is None:
+                logger.error(f"Audio blob {segment.audio_hash} missing for segment {segment.id}")
                 continue
                 
             # Save to temporary file
@@ -393,12 +409,17 @@ async def export_final_audio(text_id: int, output_dir: str = None, bg_volume: fl
             # Get word timestamps from force alignment for sound effect positioning
             db_text = crud.get_text(db, text_id)
             word_timestamps = db_text.word_timestamps if db_text else None
+            if word_timestamps and not crud.is_force_alignment_current(db, text_id):
+                # Alignment failed above and these timestamps predate the current segment audio
+                logger.warning(f"Word timestamps for text ID {text_id} are stale, ignoring them")
+                word_timestamps = None
         
         sound_effects_with_audio = []
         
+        blob_store = get_blob_store()
         for effect in sound_effects:
             # Skip effects without audio data
-            if not effect.audio_data_b64:
+            if not effect.audio_hash:
                 logger.warning(f"Sound effect {effect.effect_id} ({effect.effect_name}) missing audio data, skipping")
                 continue
             
@@ -421,8 +442,10 @@ async def export_final_audio(text_id: int, output_dir: str = None, bg_volume: fl
             logger.info(f"Matched sound effect '{effect.effect_name}' word position {effect.start_word_position} to timestamp {start_time}s")
                 
             try:
-                # Decode base64 to binary
-                audio_bytes = base64.b64decode(effect.audio_data_b64)
+                # Load audio bytes from the blob store
+                audio_bytes = blob_store.get(effect.audio_hash)
+                if audio_bytes is None:
+                    raise ValueError(f"audio blob {effect.audio_hash} missing")
                 
                 # Save to temporary file
                 temp_fx_fd, temp_fx_file = tempfile.mkstemp(suffix='.wav')
@@ -446,7 +469,7 @@ async def export_final_audio(text_id: int, output_dir: str = None, bg_volume: fl
         # Step 4: Get background music from database
         with managed_db_session() as db:
             db_text = crud.get_text(db, text_id)
-            if not db_text or not db_text.background_music_audio_b64:
+            if not db_text or not db_text.background_music_audio_hash:
                 logger.warning(f"No background music found for text {text_id}")
                 # Mix speech with sound effects only
                 if sound_effects_with_audio:
@@ -455,8 +478,8 @@ async def export_final_audio(text_id: int, output_dir: str = None, bg_volume: fl
                     # Return normalized speech only
                     return temp_norm_speech
             
-            # Extract background music data for processing
-            bg_music_data = db_text.background_music_audio_b64
+            # Extract background music reference for processing
+            bg_music_hash = db_text.background_music_audio_hash
         
         # Step 5: Process background music
         temp_bg_fd, temp_bg_file = tempfile.mkstemp(suffix='.mp3')
@@ -464,7 +487,9 @@ async def export_final_audio(text_id: int, output_dir: str = None, bg_volume: fl
         temp_files.append(temp_bg_file)
         
         try:
-            audio_bytes = base64.b64decode(bg_music_data)
+            audio_bytes = blob_store.get(bg_music_hash)
+            if audio_bytes is None:
+                raise ValueError(f"background music blob {bg_music_hash} missing")
             with open(temp_bg_file, 'wb') as f:
                 f.write(audio_bytes)
             
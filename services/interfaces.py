@@ -9,6 +9,8 @@ from typing import Protocol, List, Dict, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 from sqlalchemy.orm import Session
 
+from services.retry import retry_with_backoff
+
 
 # Text Analysis Service Interface
 class TextAnalysisService(Protocol):
@@ -159,22 +161,17 @@ class BaseService(ABC):
         *args,
         **kwargs
     ):
-        """Execute operation with exponential backoff retry."""
-        import asyncio
-        
-        last_exception = None
-        for attempt in range(max_retries + 1):
-            try:
-                return await operation(*args, **kwargs)
-            except Exception as e:
-                last_exception = e
-                if attempt < max_retries:
-                    delay = backoff_factor ** attempt
-                    self.logger.warning(f"Attempt {attempt + 1} failed, retrying in {delay}s: {str(e)}")
-                    await asyncio.sleep(delay)
-                else:
-                    self.logger.error(f"All {max_retries + 1} attempts failed: {str(e)}")
-                    raise last_exception
+        """Execute operation with exponential, jittered backoff (see services/retry.py)."""
+        try:
+            return await retry_with_backoff(
+                lambda: operation(*args, **kwargs),
+                attempts=max_retries + 1,
+                factor=backoff_factor,
+                log=self.logger
+            )
+        except Exception as e:
+            self.logger.error(f"All {max_retries + 1} attempts failed: {str(e)}")
+            raise
 
 
 # Client Factory Interface
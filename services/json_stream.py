@@ -0,0 +1,117 @@
+"""
+Incremental parsing of a JSON array from text that arrives in pieces (a streamed LLM response).
+
+Streamed segmentation (text_analysis.stream_text_phase2_segmentation) receives a response
+of the form {"narrative_elements": [{...}, {...}, ...]} a few tokens at a time. Instead of
+waiting for the whole document, JSONArrayStream tracks string and nesting state as text
+arrives and returns each element of the array as soon as its closing brace is seen.
+
+Text before the array (including markdown fences or a preamble) and after it is ignored.
+Each character is scanned once, so parsing a response costs time linear in its length.
+
+Example:
+    parser = JSONArrayStream("narrative_elements")
+    for piece in pieces:
+        for element in parser.feed(piece):
+            ...
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+class JSONArrayStream:
+    """Yields the object elements of one JSON array as their text completes."""
+
+    def __init__(self, key: Optional[str] = None):
+        """
+        Args:
+            key: Name of the property holding the array; None takes the first array
+        """
+        self._marker = json.dumps(key) if key is not None else None
+        self._parts: List[str] = []
+        self._buffer = ""
+        self._position = 0
+        self._in_array = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._element_start: Optional[int] = None
+        self.complete = False
+        self.count = 0
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return "".join(self._parts)
+
+    def feed(self, piece: str) -> List[Dict[str, Any]]:
+        """
+        Add text and return the array elements it completed, in order.
+
+        Raises:
+            ValueError: If a completed element is not valid JSON
+        """
+        self._parts.append(piece)
+        if self.complete:
+            return []
+        self._buffer += piece
+        if not self._in_array and not self._find_array():
+            return []
+
+        elements = []
+        buffer = self._buffer
+        position = self._position
+        while position < len(buffer) and not self.complete:
+            char = buffer[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0 and char == "{":
+                    self._element_start = position
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    self.complete = char == "]"
+                else:
+                    self._depth -= 1
+                    if self._depth == 0 and self._element_start is not None:
+                        elements.append(self._parse(buffer[self._element_start:position + 1]))
+                        self.count += 1
+                        self._element_start = None
+            position += 1
+
+        # Keep only the text of an element still being received
+        keep_from = self._element_start if self._element_start is not None else position
+        self._buffer = buffer[keep_from:]
+        self._position = position - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        return elements
+
+    def _find_array(self) -> bool:
+        """Skip to the opening bracket of the array, once it has arrived"""
+        start = 0
+        if self._marker is not None:
+            start = self._buffer.find(self._marker)
+            if start == -1:
+                return False
+        bracket = self._buffer.find("[", start)
+        if bracket == -1:
+            return False
+        self._in_array = True
+        self._buffer = self._buffer[bracket + 1:]
+        self._position = 0
+        return True
+
+    def _parse(self, element: str) -> Dict[str, Any]:
+        try:
+            return json.loads(element)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in array element {self.count + 1}: {e}") from e
@@ -0,0 +1,223 @@
+"""
+Disk-backed cache of Anthropic responses for the analysis prompts.
+
+Responses are stored in a SQLite file (LLM_CACHE_PATH), keyed by a hash of the request
+parameters, with a TTL and least-recently-used eviction by size. Only responses the
+caller could parse are cached. bypass_llm_cache() skips the cache inside a block, as
+process_text_analysis(use_cache=False) does.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from utils.config import settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Bump when cached responses must no longer be used (e.g. a change in how they are parsed)
+CACHE_VERSION = 1
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+def llm_cache_key(api_params: Dict[str, Any]) -> str:
+    """Hex SHA-256 of the request parameters (model, messages, temperature, max_tokens, ...)"""
+    payload = {"v": CACHE_VERSION, "request": api_params}
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """
+    SQLite-backed response store with a TTL and least-recently-used eviction by size.
+
+    Safe to share between threads; every operation runs under one lock.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_responses_last_used_at ON responses (last_used_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None if missing or expired; marks the entry as used"""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response, then drop expired entries and evict down to max_bytes"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now)
+            )
+            self._connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._connection.execute("SELECT key, size FROM responses ORDER BY last_used_at ASC"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} LLM cache entries to stay under {self.max_bytes} bytes")
+
+    def stats(self) -> Dict[str, int]:
+        """Number of entries and their total size in bytes"""
+        with self._lock:
+            entries, size = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """The process-wide response cache, or None when LLM_CACHE_ENABLED is off"""
+    global _cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(
+                Path(settings.LLM_CACHE_PATH),
+                ttl_seconds=settings.LLM_CACHE_TTL_HOURS * 3600,
+                max_bytes=int(settings.LLM_CACHE_MAX_MB * 1024 * 1024)
+            )
+        return _cache
+
+def reset_llm_cache() -> None:
+    """Close the cache so the next use reopens it from the current settings (tests, config changes)"""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+
+@contextmanager
+def bypass_llm_cache() -> Iterator[None]:
+    """Neither read nor write the cache for calls made inside the block (including spawned tasks)"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+def _active_cache() -> Optional[LLMResponseCache]:
+    return None if _bypass.get() else get_llm_cache()
+
+def _cached(cache: Optional[LLMResponseCache], key: str, parse: Callable[[str], T], description: str) -> Optional[T]:
+    response = cache.get(key) if cache else None
+    if response is None:
+        return None
+    try:
+        result = parse(response)
+    except Exception as e:
+        logger.warning(f"Ignoring unparseable cached {description} response: {str(e)}")
+        return None
+    logger.info(f"{description} response served from cache ({key[:12]})")
+    return result
+
+def lookup_response(api_params: Dict[str, Any]) -> Optional[str]:
+    """Cached response text for api_params, or None (also when the cache is off or bypassed)"""
+    cache = _active_cache()
+    return cache.get(llm_cache_key(api_params)) if cache else None
+
+def store_response(api_params: Dict[str, Any], response: str) -> None:
+    """Cache a response the caller has parsed successfully"""
+    cache = _active_cache()
+    if cache:
+        cache.put(llm_cache_key(api_params), response)
+
+async def cached_completion(
+    api_params: Dict[str, Any],
+    request: Callable[[], Awaitable[str]],
+    parse: Callable[[str], T],
+    description: str = "Anthropic"
+) -> T:
+    """
+    Parsed response for api_params, from the cache or from request().
+
+    Args:
+        api_params: Request parameters; the cache key
+        request: Makes the API call and returns the response text
+        parse: Parses the response text; a response is only cached if this succeeds
+        description: What is requested, for log messages
+
+    Returns:
+        parse(response text)
+    """
+    cache = _active_cache()
+    key = llm_cache_key(api_params)
+    if cache:
+        result = await asyncio.to_thread(_cached, cache, key, parse, description)
+        if result is not None:
+            return result
+    response = await request()
+    result = parse(response)
+    if cache:
+        await asyncio.to_thread(cache.put, key, response)
+    return result
+
+def cached_completion_sync(
+    api_params: Dict[str, Any],
+    request: Callable[[], str],
+    parse: Callable[[str], T],
+    description: str = "Anthropic"
+) -> T:
+    """Blocking counterpart of cached_completion, for code outside the event loop"""
+    cache = _active_cache()
+    key = llm_cache_key(api_params)
+    if cache:
+        result = _cached(cache, key, parse, description)
+        if result is not None:
+            return result
+    response = request()
+    result = parse(response)
+    if cache:
+        cache.put(key, response)
+    return result
@@ -183,7 +183,11 @@ class TextManager:
                 
             text_data = response.json()
             text_id = text_data["id"]
-            print(f"✅ Created text with ID: {text_id}")
+            if text_data.get("created") is False:
+                # The API de-duplicates by content hash and returns the existing text
+                print(f"✅ Using existing text with identical content, ID: {text_id}")
+            else:
+                print(f"✅ Created text with ID: {text_id}")
             return text_id
             
         except FileNotFoundError:
@@ -244,7 +248,9 @@ class PipelineDataManager:
                 text_obj.analyzed = False
                 text_obj.word_timestamps = None
                 text_obj.background_music_prompt = None
-                text_obj.background_music_audio_b64 = None
+                text_obj.background_music_audio_hash = None
+                text_obj.background_music_audio_size = None
+                text_obj.background_music_audio_duration = None
                 
                 # Delete all related data (in dependency order)
                 deleted_sound_effects = crud.delete_sound_effects_by_text(db, text_id)
@@ -182,6 +182,30 @@ class R2StorageService:
             logger.error(f"Failed to download {object_key} from R2: {e}")
             return None
     
+    def object_exists(self, object_key: str) -> bool:
+        """
+        Check whether an object exists in R2 storage.
+        
+        Args:
+            object_key: Key of the object in R2
+            
+        Returns:
+            True if the object exists, False otherwise
+        """
+        if not self.client:
+            logger.error("R2 client not initialized - check credentials")
+            return False
+            
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=object_key)
+            return True
+            
+        except NoCredentialsError:
+            logger.error("R2 credentials not configured")
+            return False
+        except ClientError:
+            return False
+    
     def delete_object(self, object_key: str) -> bool:
         """
         Delete an object from R2 storage.
@@ -0,0 +1,436 @@
+"""
+Rate-limit-aware scheduling of outbound provider requests (Hume, Anthropic, Replicate).
+
+Each provider has one shared ProviderScheduler: a token bucket, a concurrency cap with a
+FIFO queue, and pauses on 429/529/503 responses or exhausted rate-limit headers.
+ClientFactory builds SDK clients on a ScheduledTransport, so every request to a
+provider (SDK retries included) goes through its scheduler.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+import httpx
+
+from utils.config import settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Status codes treated as "slow down": rate limited, Anthropic overloaded, unavailable
+THROTTLE_STATUS_CODES = {429, 503, 529}
+
+# How often queued requests re-check whether they can be admitted
+POLL_INTERVAL = 0.02
+
+# Rate-limit headers, checked in order (Anthropic first, then common x-ratelimit forms)
+REMAINING_HEADERS = (
+    "anthropic-ratelimit-requests-remaining",
+    "anthropic-ratelimit-tokens-remaining",
+    "x-ratelimit-remaining-requests",
+    "x-ratelimit-remaining",
+)
+RESET_HEADERS = (
+    "anthropic-ratelimit-requests-reset",
+    "anthropic-ratelimit-tokens-reset",
+    "x-ratelimit-reset-requests",
+    "x-ratelimit-reset",
+)
+
+def parse_reset_delay(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Convert a Retry-After or rate-limit reset header value to seconds from now.
+
+    Accepts delta seconds ("12", "0.5"), epoch seconds, HTTP dates and RFC 3339
+    timestamps. Returns None if the value cannot be parsed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    wall_now = time.time() if now is None else now
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is not None:
+        # Large values are absolute epoch timestamps, small ones are deltas
+        return max(0.0, number - wall_now) if number > 1e9 else max(0.0, number)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            reset_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, reset_at.timestamp() - wall_now)
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second up to `capacity`. Not thread-safe on its own."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, now: float) -> float:
+        """Take one token if available. Returns 0 on success, else seconds until one is."""
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def set_rate(self, rate: float, now: float) -> None:
+        self._refill(now)
+        self.rate = rate
+
+class ProviderScheduler:
+    """
+    Admission control for one provider: token bucket, concurrency cap, FIFO queue
+    and adaptive backoff driven by response status codes and rate-limit headers.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: float,
+        max_concurrency: int,
+        burst: Optional[int] = None,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0
+    ):
+        self.provider = provider
+        self.max_rate = requests_per_minute / 60.0
+        self.min_rate = self.max_rate / 16
+        self.max_concurrency = max_concurrency
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._bucket = TokenBucket(self.max_rate, burst or max_concurrency)
+        self._queue: deque = deque()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._lock = threading.Lock()
+
+    # Admission
+    def _try_admit(self, ticket: Optional[object]) -> float:
+        """
+        Admit ticket if it may start now (returns 0), else return how long to wait.
+
+        A None ticket skips the queue and the concurrency cap but still respects
+        pauses and the token bucket.
+        """
+        with self._lock:
+            if ticket is not None and self._queue[0] is not ticket:
+                return POLL_INTERVAL
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if ticket is not None and self._in_flight >= self.max_concurrency:
+                return POLL_INTERVAL
+            wait = self._bucket.try_take(now)
+            if wait:
+                return wait
+            if ticket is not None:
+                self._queue.popleft()
+            self._in_flight += 1
+            return 0.0
+
+    def _enqueue(self) -> object:
+        ticket = object()
+        with self._lock:
+            self._queue.append(ticket)
+        return ticket
+
+    def _abandon(self, ticket: object) -> None:
+        with self._lock:
+            try:
+                self._queue.remove(ticket)
+            except ValueError:
+                pass
+
+    def acquire(self) -> None:
+        """
+        Block the calling thread until a request may be sent.
+
+        A sync client called on an event loop thread bypasses the queue and the
+        concurrency cap: the requests ahead of it may be coroutines on that same,
+        now blocked, loop. It still waits for pauses and the rate limit.
+        """
+        try:
+            asyncio.get_running_loop()
+            ticket = None
+        except RuntimeError:
+            ticket = self._enqueue()
+        try:
+            while True:
+                wait = self._try_admit(ticket)
+                if not wait:
+                    return
+                time.sleep(min(wait, 1.0))
+        except BaseException:
+            if ticket is not None:
+                self._abandon(ticket)
+            raise
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be sent."""
+        ticket = self._enqueue()
+        try:
+            while True:
+                wait = self._try_admit(ticket)
+                if not wait:
+                    return
+                await asyncio.sleep(min(wait, 1.0))
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def release(self) -> None:
+        """Free the concurrency slot taken by acquire()."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+    # Feedback
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Adapt to a provider response: back off on throttling, honour rate-limit headers."""
+        now = time.monotonic()
+        with self._lock:
+            if status_code in THROTTLE_STATUS_CODES:
+                self._consecutive_throttles += 1
+                delay = parse_reset_delay(headers.get("retry-after"))
+                if delay is None:
+                    backoff = min(self.max_backoff, self.min_backoff * 2 ** (self._consecutive_throttles - 1))
+                    delay = backoff * random.uniform(0.5, 1.0)
+                self._pause(now, delay)
+                self._bucket.set_rate(max(self.min_rate, self._bucket.rate / 2), now)
+                logger.warning(
+                    f"{self.provider} returned {status_code}, pausing requests for {delay:.1f}s "
+                    f"(rate now {self._bucket.rate * 60:.0f}/min)"
+                )
+                return
+
+            if status_code < 400:
+                self._consecutive_throttles = 0
+                if self._bucket.rate < self.max_rate:
+                    self._bucket.set_rate(min(self.max_rate, self._bucket.rate + self.max_rate / 10), now)
+
+            remaining = self._first_header(headers, REMAINING_HEADERS)
+            if remaining is not None and remaining.strip() in ("0", "0.0"):
+                delay = parse_reset_delay(self._first_header(headers, RESET_HEADERS))
+                if delay:
+                    self._pause(now, min(delay, self.max_backoff))
+                    logger.info(f"{self.provider} rate limit exhausted, pausing requests for {delay:.1f}s")
+
+    def _pause(self, now: float, delay: float) -> None:
+        self._paused_until = max(self._paused_until, now + delay)
+
+    @staticmethod
+    def _first_header(headers: Mapping[str, str], names) -> Optional[str]:
+        for name in names:
+            value = headers.get(name)
+            if value is not None:
+                return value
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the scheduler state (for logging and tests)."""
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "requests_per_minute": round(self._bucket.rate * 60, 2),
+                "paused_for": max(0.0, self._paused_until - time.monotonic())
+            }
+
+@dataclass
+class AdmissionStats:
+    """Scheduling overhead of the requests sent inside a track_admission() block"""
+    waited: float = 0.0  # Seconds spent waiting for admission (queue, rate limit, pauses)
+    throttled: int = 0  # Responses with a throttle status code
+
+_admission: ContextVar[Optional[AdmissionStats]] = ContextVar("scheduler_admission", default=None)
+
+@contextmanager
+def track_admission() -> Iterator[AdmissionStats]:
+    """
+    Collect AdmissionStats for the scheduled requests made inside the block (including
+    SDK retries), so callers timing a call can tell time on the wire from time queued.
+    """
+    stats = AdmissionStats()
+    token = _admission.set(stats)
+    try:
+        yield stats
+    finally:
+        _admission.reset(token)
+
+class _ReleasingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body wrapper that frees the scheduler slot once the body is closed."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    def _release_once(self) -> None:
+        if not self._released:
+            self._released = True
+            self._release()
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release_once()
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release_once()
+
+class ScheduledTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    httpx transport sending every request through a ProviderScheduler.
+
+    Usable by both httpx.Client and httpx.AsyncClient. The concurrency slot is held
+    until the response body is closed, so streaming responses count as in flight.
+    """
+
+    def __init__(self, scheduler: ProviderScheduler, transport=None):
+        """
+        Args:
+            scheduler: Provider scheduler to admit requests through
+            transport: Transport to send admitted requests with (used for both sync
+                and async requests); defaults to httpx's HTTP transports
+        """
+        self.scheduler = scheduler
+        self._sync_transport = transport
+        self._async_transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self._sync_transport is None:
+            self._sync_transport = httpx.HTTPTransport()
+        started = time.monotonic()
+        self.scheduler.acquire()
+        self._record_wait(started)
+        try:
+            response = self._sync_transport.handle_request(request)
+        except BaseException:
+            self.scheduler.release()
+            raise
+        return self._scheduled_response(response)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._async_transport is None:
+            self._async_transport = httpx.AsyncHTTPTransport()
+        started = time.monotonic()
+        await self.scheduler.acquire_async()
+        self._record_wait(started)
+        try:
+            response = await self._async_transport.handle_async_request(request)
+        except BaseException:
+            self.scheduler.release()
+            raise
+        return self._scheduled_response(response)
+
+    @staticmethod
+    def _record_wait(started: float) -> None:
+        stats = _admission.get()
+        if stats is not None:
+            stats.waited += time.monotonic() - started
+
+    def _scheduled_response(self, response: httpx.Response) -> httpx.Response:
+        self.scheduler.observe(response.status_code, response.headers)
+        stats = _admission.get()
+        if stats is not None and response.status_code in THROTTLE_STATUS_CODES:
+            stats.throttled += 1
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, self.scheduler.release),
+            extensions=response.extensions
+        )
+
+    def close(self) -> None:
+        if self._sync_transport is not None:
+            self._sync_transport.close()
+
+    async def aclose(self) -> None:
+        if self._async_transport is not None:
+            await self._async_transport.aclose()
+
+_schedulers: Dict[str, ProviderScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(provider: str) -> ProviderScheduler:
+    """
+    Get the shared scheduler for a provider ("hume", "anthropic" or "replicate").
+
+    Returns:
+        ProviderScheduler configured from settings.rate_limits
+
+    Raises:
+        KeyError: If the provider has no rate limit settings
+    """
+    scheduler = _schedulers.get(provider)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(provider)
+            if scheduler is None:
+                limits = settings.rate_limits[provider]
+                scheduler = ProviderScheduler(
+                    provider,
+                    requests_per_minute=limits.requests_per_minute,
+                    max_concurrency=limits.max_concurrency,
+                    burst=limits.burst,
+                    max_backoff=limits.max_backoff
+                )
+                _schedulers[provider] = scheduler
+    return scheduler
+
+def reset_schedulers() -> None:
+    """Drop all schedulers so the next get_scheduler() re-reads settings (for tests)."""
+    with _schedulers_lock:
+        _schedulers.clear()
@@ -6,7 +6,6 @@ and background music generation using Replicate webhooks instead of polling.
 """
 
 import asyncio
-import base64
 import os
 import tempfile
 import subprocess
@@ -21,8 +20,10 @@ from utils.logging import get_logger
 from utils.http_client import get_sync_client, get_async_client
 from utils.ngrok_sync import smart_server_health_check, sync_ngrok_url
 from db import crud
-from db.session_manager import managed_db_session, managed_db_transaction, DatabaseSessionManager
+from db.log_writer import enqueue_log
+from db.session_manager import managed_db_session, unit_of_work, DatabaseSessionManager
 from services.clients import ClientFactory
+from services.blob_store import AudioBlob, get_blob_store
 
 logger = get_logger(__name__)
 
@@ -265,6 +266,9 @@ def get_processor(content_type: str) -> 'AudioPostProcessor':
 class AudioPostProcessor(ABC):
     """Abstract base class for audio post-processing with dependency injection support."""
     
+    # MIME type used when storing the processed audio
+    content_type: str = "audio/mpeg"
+    
     async def process_and_store(self, db: Session, content_id: int, prediction_data: Dict[str, Any]) -> bool:
         """
         Main processing pipeline for audio webhook results with injected database session.
@@ -293,25 +297,24 @@ class AudioPostProcessor(ABC):
             # Trim audio if needed (sound effects only)
             processed_audio = self.trim_audio(audio_data)
             
-            # Convert to base64
-            audio_b64 = base64.b64encode(processed_audio).decode()
+            # Store audio bytes in the blob store (off the event loop); the database keeps only the reference
+            blob = await asyncio.to_thread(get_blob_store().put_audio, processed_audio, self.content_type)
             
-            # Store in database using injected session and transaction management
-            with managed_db_transaction(db) as tx_db:
-                success = await self.store_audio(tx_db, content_id, audio_b64)
-                
-                # Log result in the same transaction
-                await self.log_result(tx_db, content_id, success, prediction_data)
+            # Store in database using injected session
+            with unit_of_work(db) as tx_db:
+                success = await self.store_audio(tx_db, content_id, blob)
+            
+            # The log writer persists the row on its own, so queue it only once the audio is committed
+            await self.log_result(db, content_id, success, prediction_data)
             
             logger.info(f"Successfully processed audio for {self.__class__.__name__} ID {content_id}")
             return success
             
         except Exception as e:
             logger.error(f"Error in {self.__class__.__name__} processing for ID {content_id}: {e}")
-            # Log error in separate transaction to ensure it's recorded
+            # Log error through the log writer, independent of the rolled back transaction
             try:
-                with managed_db_transaction(db) as tx_db:
-                    await self.log_result(tx_db, content_id, False, prediction_data, error=str(e))
+                await self.log_result(db, content_id, False, prediction_data, error=str(e))
             except Exception as log_error:
                 logger.error(f"Failed to log error result: {log_error}")
             return False
@@ -341,14 +344,14 @@ class AudioPostProcessor(ABC):
         pass
     
     @abstractmethod
-    async def store_audio(self, db: Session, content_id: int, audio_b64: str) -> bool:
+    async def store_audio(self, db: Session, content_id: int, blob: AudioBlob) -> bool:
         """
-        Store audio in database. Override in subclasses.
+        Store audio reference in database. Override in subclasses.
         
         Args:
             db: Database session (injected dependency)
             content_id: ID of the content
-            audio_b64: Base64 encoded audio
+            blob: Reference to the audio in the blob store
             
         Returns:
             True if storage succeeded, False otherwise
@@ -404,8 +407,8 @@ class SoundEffectProcessor(AudioPostProcessor):
             logger.error(f"Error trimming sound effect audio: {e}")
             return audio_data
     
-    async def store_audio(self, db: Session, content_id: int, audio_b64: str) -> bool:
-        """Store sound effect audio in database using injected session."""
+    async def store_audio(self, db: Session, content_id: int, blob: AudioBlob) -> bool:
+        """Store sound effect audio reference in database using injected session."""
         try:
             # First attempt with the existing safe_execute method
             result = DatabaseSessionManager.safe_execute(
@@ -413,7 +416,9 @@ class SoundEffectProcessor(AudioPostProcessor):
                 f"update_sound_effect_audio_{content_id}",
                 crud.update_sound_effect_audio,
                 effect_id=content_id,
-                audio_data_b64=audio_b64
+                audio_hash=blob.hash,
+                audio_size=blob.size,
+                audio_duration=blob.duration
             )
             
             if result:
@@ -428,10 +433,11 @@ class SoundEffectProcessor(AudioPostProcessor):
                 effect = crud.get_sound_effect(db, content_id)
                 if effect:
                     # Update fields directly
-                    effect.audio_data_b64 = audio_b64
+                    effect.audio_hash = blob.hash
+                    effect.audio_size = blob.size
+                    effect.audio_duration = blob.duration
                     effect.audio_timestamp = datetime.utcnow()
-                    db.commit()
-                    db.refresh(effect)
+                    db.flush()
                     logger.info(f"Successfully updated sound effect {content_id} with direct method and timestamp")
                     return True
                 else:
@@ -443,7 +449,7 @@ class SoundEffectProcessor(AudioPostProcessor):
             return False
     
     async def log_result(self, db: Session, content_id: int, success: bool, prediction_data: Dict[str, Any], error: Optional[str] = None):
-        """Log sound effect processing result using injected session."""
+        """Log sound effect processing result through the process log writer."""
         try:
             status = "success" if success else "error"
             response_data = {
@@ -455,10 +461,8 @@ class SoundEffectProcessor(AudioPostProcessor):
             if error:
                 response_data["error"] = error
             
-            DatabaseSessionManager.safe_execute(
-                db,
-                f"log_sound_effect_result_{content_id}",
-                crud.create_log,
+            # Written behind by the log writer, outside the webhook's transaction
+            enqueue_log(
                 text_id=None,  # Sound effects don't have direct text_id in logs
                 operation="sound_effect_generation_webhook",
                 status=status,
@@ -475,15 +479,17 @@ class BackgroundMusicProcessor(AudioPostProcessor):
         """Background music doesn't need trimming."""
         return audio_data
     
-    async def store_audio(self, db: Session, content_id: int, audio_b64: str) -> bool:
-        """Store background music audio in database using injected session."""
+    async def store_audio(self, db: Session, content_id: int, blob: AudioBlob) -> bool:
+        """Store background music audio reference in database using injected session."""
         try:
             result = DatabaseSessionManager.safe_execute(
                 db,
                 f"update_background_music_audio_{content_id}",
                 crud.update_text_background_music_audio,
                 text_id=content_id,
-                audio_data_b64=audio_b64
+                audio_hash=blob.hash,
+                audio_size=blob.size,
+                audio_duration=blob.duration
             )
             
             if result:
@@ -498,7 +504,7 @@ class BackgroundMusicProcessor(AudioPostProcessor):
             return False
     
     async def log_result(self, db: Session, content_id: int, success: bool, prediction_data: Dict[str, Any], error: Optional[str] = None):
-        """Log background music processing result using injected session."""
+        """Log background music processing result through the process log writer."""
         try:
             status = "success" if success else "error"
             response_data = {
@@ -510,10 +516,8 @@ class BackgroundMusicProcessor(AudioPostProcessor):
             if error:
                 response_data["error"] = error
             
-            DatabaseSessionManager.safe_execute(
-                db,
-                f"log_background_music_result_{content_id}",
-                crud.create_log,
+            # Written behind by the log writer, outside the webhook's transaction
+            enqueue_log(
                 text_id=content_id,
                 operation="background_music_generation_webhook",
                 status=status,
@@ -552,14 +556,14 @@ async def wait_for_webhook_completion_event(content_type: str, content_id: int,
                 if content_type == "sound_effect":
                     # Check if sound effect has audio data
                     effect = crud.get_sound_effect(db, content_id)
-                    if effect and effect.audio_data_b64:
+                    if effect and effect.audio_hash:
                         elapsed = time.time() - start_time
                         logger.info(f"Webhook completion for {content_type} {content_id}: success in {elapsed:.2f}s")
                         return True
                 elif content_type == "background_music":
                     # Check if text has background music audio
                     text = crud.get_text(db, content_id)
-                    if text and text.background_music_audio_b64:
+                    if text and text.background_music_audio_hash:
                         elapsed = time.time() - start_time
                         logger.info(f"Webhook completion for {content_type} {content_id}: success in {elapsed:.2f}s")
                         return True
@@ -0,0 +1,113 @@
+"""
+Retries with exponential backoff and jitter for provider calls.
+
+retry_with_backoff waits with asyncio.sleep, for coroutines; retry_with_backoff_sync is
+its blocking counterpart for worker threads and scripts.
+"""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: Optional[float] = None,
+    factor: float = 2.0,
+    jitter: float = 0.5
+) -> float:
+    """
+    Delay before retrying after failed attempt number `attempt` (1-based).
+
+    The delay grows as base_delay * factor ** (attempt - 1), is capped at max_delay,
+    and is then reduced by a random fraction of up to `jitter` of itself.
+    """
+    delay = base_delay * factor ** (attempt - 1)
+    if max_delay is not None:
+        delay = min(delay, max_delay)
+    return delay * (1 - jitter * random.random())
+
+def _should_retry(error: Exception, attempt: int, attempts: int, retry_if: Optional[Callable[[Exception], bool]]) -> bool:
+    return attempt < attempts and (retry_if is None or retry_if(error))
+
+async def retry_with_backoff(
+    operation: Callable[[], Awaitable[T]],
+    *,
+    attempts: int = 3,
+    base_delay: float = 1.0,
+    max_delay: Optional[float] = None,
+    factor: float = 2.0,
+    jitter: float = 0.5,
+    retry_if: Optional[Callable[[Exception], bool]] = None,
+    log=None,
+    description: str = "Operation"
+) -> T:
+    """
+    Await operation() until it succeeds, sleeping on the event loop between attempts.
+
+    Args:
+        operation: Zero-argument callable returning a fresh awaitable per attempt
+        attempts: Total number of attempts
+        base_delay: Delay after the first failure, in seconds
+        max_delay: Cap on the delay between attempts
+        factor: Growth of the delay per attempt
+        jitter: Largest fraction by which a delay is randomly shortened
+        retry_if: Predicate selecting retryable errors (default: all)
+        log: Logger for retry warnings (defaults to this module's logger)
+        description: What is being retried, for log messages
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        The last error, once attempts are exhausted or the error is not retryable
+    """
+    log = log or logger
+    attempt = 1
+    while True:
+        try:
+            return await operation()
+        except Exception as e:
+            if not _should_retry(e, attempt, attempts, retry_if):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay, factor, jitter)
+            log.warning(f"{description} attempt {attempt}/{attempts} failed, retrying in {delay:.1f}s: {str(e)}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+def retry_with_backoff_sync(
+    operation: Callable[[], T],
+    *,
+    attempts: int = 3,
+    base_delay: float = 1.0,
+    max_delay: Optional[float] = None,
+    factor: float = 2.0,
+    jitter: float = 0.5,
+    retry_if: Optional[Callable[[Exception], bool]] = None,
+    log=None,
+    description: str = "Operation"
+) -> T:
+    """
+    Blocking counterpart of retry_with_backoff, for code outside the event loop.
+
+    Never call this from a coroutine: it sleeps the calling thread between attempts.
+    """
+    log = log or logger
+    attempt = 1
+    while True:
+        try:
+            return operation()
+        except Exception as e:
+            if not _should_retry(e, attempt, attempts, retry_if):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay, factor, jitter)
+            log.warning(f"{description} attempt {attempt}/{attempts} failed, retrying in {delay:.1f}s: {str(e)}")
+            time.sleep(delay)
+            attempt += 1
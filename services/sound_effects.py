@@ -15,6 +15,7 @@ from utils.logging import get_logger
 from utils.config import settings
 from utils.http_client import get_sync_client
 from db import crud
+from db.log_writer import enqueue_log
 from db.session_manager import managed_db_session
 from utils.timing import time_it
 from services.clients import ClientFactory
@@ -90,7 +91,7 @@ def generate_and_store_effect(effect_id: int) -> bool:
         # Clear existing audio data to ensure we wait for new prediction
         with managed_db_session() as db:
             effect = crud.get_sound_effect(db, effect_id)
-            if effect and effect.audio_data_b64:
+            if effect and effect.audio_hash:
                 crud.update_sound_effect_audio(db, effect_id, None)
                 logger.info(f"Cleared existing audio data for sound effect {effect_id} to wait for new prediction")
         
@@ -98,25 +99,21 @@ def generate_and_store_effect(effect_id: int) -> bool:
         prediction_id = create_webhook_prediction("sound_effect", effect_id, config)
         if prediction_id:
             logger.info(f"Sound effect generation webhook triggered for effect {effect_id}, prediction ID: {prediction_id}")
-            with managed_db_session() as db:
-                crud.create_log(
-                    db=db,
-                    text_id=text_id,
-                    operation="sound_effect_generation_webhook_trigger",
-                    status="success",
-                    response={"effect_id": effect_id, "prediction_id": prediction_id, "message": "Webhook triggered successfully"}
-                )
+            enqueue_log(
+                text_id=text_id,
+                operation="sound_effect_generation_webhook_trigger",
+                status="success",
+                response={"effect_id": effect_id, "prediction_id": prediction_id, "message": "Webhook triggered successfully"}
+            )
             return True
         else:
             logger.error(f"Failed to trigger sound effect generation webhook for effect {effect_id}")
-            with managed_db_session() as db:
-                crud.create_log(
-                    db=db,
-                    text_id=text_id,
-                    operation="sound_effect_generation_webhook_trigger",
-                    status="error",
-                    response={"effect_id": effect_id, "error": "Failed to trigger webhook"}
-                )
+            enqueue_log(
+                text_id=text_id,
+                operation="sound_effect_generation_webhook_trigger",
+                status="error",
+                response={"effect_id": effect_id, "error": "Failed to trigger webhook"}
+            )
             return False
         
     except Exception as e:
@@ -126,8 +123,7 @@ def generate_and_store_effect(effect_id: int) -> bool:
             with managed_db_session() as db:
                 effect = crud.get_sound_effect(db, effect_id=effect_id)
                 if effect:
-                    crud.create_log(
-                        db=db,
+                    enqueue_log(
                         text_id=effect.text_id,
                         operation="sound_effect_generation_webhook_trigger",
                         status="error",
@@ -224,7 +220,8 @@ async def generate_sound_effects_for_text_parallel(text_id: int) -> bool:
             return generate_and_store_effect(effect_id)
         
         # Use ThreadPoolExecutor for parallel Replicate API calls
-        max_workers = min(len(effects), 3)  # Limit to 3 concurrent Replicate calls
+        # Replicate request rate and concurrency are enforced by the shared scheduler (services/rate_limit.py)
+        max_workers = min(len(effects), settings.rate_limits["replicate"].max_concurrency)
         logger.info(f"Using {max_workers} parallel workers for {len(effects)} sound effects")
         
         success_count = 0
@@ -0,0 +1,117 @@
+"""
+Packing of segments into Hume TTS requests by a character budget.
+
+BatchSizer packs consecutive segments into requests of at most char_budget characters
+and max_utterances utterances. The budget is tuned from observed seconds per character
+so a request takes about target_seconds; get_batch_sizer() shares one sizer per process.
+"""
+
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from utils.config import settings
+
+# Bounds for the tuned budget, so one unusually fast or slow request cannot
+# collapse batches to a single segment or grow them without limit
+MIN_BATCH_CHARS = 200
+MAX_BATCH_CHARS = 5000
+
+class BatchSizer:
+    """Character budget for TTS requests, tuned from observed request latency."""
+
+    def __init__(
+        self,
+        target_seconds: float,
+        initial_chars: int,
+        max_utterances: int,
+        min_chars: int = MIN_BATCH_CHARS,
+        max_chars: int = MAX_BATCH_CHARS,
+        smoothing: float = 0.2
+    ):
+        """
+        Args:
+            target_seconds: Latency a request should take
+            initial_chars: Budget used before any latency is observed
+            max_utterances: Most segments per request
+            min_chars: Lower bound of the tuned budget
+            max_chars: Upper bound of the tuned budget
+            smoothing: Weight of each new observation in the moving average
+        """
+        self.target_seconds = target_seconds
+        self.initial_chars = initial_chars
+        self.max_utterances = max_utterances
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.smoothing = smoothing
+        self._seconds_per_char: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def char_budget(self) -> int:
+        """Characters per request"""
+        with self._lock:
+            seconds_per_char = self._seconds_per_char
+        if not seconds_per_char:
+            return self.initial_chars
+        return max(self.min_chars, min(self.max_chars, int(self.target_seconds / seconds_per_char)))
+
+    def observe(self, chars: int, seconds: float) -> None:
+        """Record the latency of a request that synthesized chars characters"""
+        if chars <= 0 or seconds <= 0:
+            return
+        rate = seconds / chars
+        with self._lock:
+            if self._seconds_per_char is None:
+                self._seconds_per_char = rate
+            else:
+                self._seconds_per_char += self.smoothing * (rate - self._seconds_per_char)
+
+    def pack(self, indexes: Sequence[int], lengths: Sequence[int]) -> List[Tuple[int, int]]:
+        """
+        Group segment indexes into (start, end) ranges of consecutive segments, so each
+        request keeps its continuation context, within the character budget.
+
+        A segment longer than the budget gets a request of its own.
+
+        Args:
+            indexes: Sorted indexes of the segments to synthesize
+            lengths: Text length of every segment, by index
+
+        Returns:
+            List of (start, end) ranges, end exclusive
+        """
+        budget = self.char_budget
+        ranges = []
+        chars = 0
+        for index in indexes:
+            if ranges:
+                start, end = ranges[-1]
+                if end == index and index - start < self.max_utterances and chars + lengths[index] <= budget:
+                    ranges[-1] = (start, index + 1)
+                    chars += lengths[index]
+                    continue
+            ranges.append((index, index + 1))
+            chars = lengths[index]
+        return ranges
+
+_batch_sizer: Optional[BatchSizer] = None
+_batch_sizer_lock = threading.Lock()
+
+def get_batch_sizer() -> BatchSizer:
+    """Get the shared TTS batch sizer, configured from settings"""
+    global _batch_sizer
+    if _batch_sizer is None:
+        with _batch_sizer_lock:
+            if _batch_sizer is None:
+                _batch_sizer = BatchSizer(
+                    target_seconds=settings.HUME_TTS_BATCH_TARGET_SECONDS,
+                    initial_chars=settings.HUME_TTS_BATCH_CHARS,
+                    max_utterances=settings.HUME_TTS_BATCH_MAX_UTTERANCES
+                )
+    return _batch_sizer
+
+def reset_batch_sizer() -> None:
+    """Drop the shared sizer and its observations so the next get_batch_sizer() re-reads settings (for tests)."""
+    global _batch_sizer
+    with _batch_sizer_lock:
+        _batch_sizer = None
@@ -0,0 +1,95 @@
+"""
+Per-segment cache of synthesized speech (SpeechCacheEntry rows pointing at blob store audio).
+
+The cache key hashes every TTS input of a segment: voice, text, delivery description,
+trailing silence and continuation context. The context is the CONTEXT_SEGMENTS voiced
+segments before it in text order, independent of how segments are batched.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Optional, Sequence
+
+from services.blob_store import AudioBlob
+
+# Bump when the synthesis request changes in a way that alters the audio (format, provider options)
+CACHE_VERSION = 1
+
+# Preceding segments Hume receives as continuation context (matches process_batch)
+CONTEXT_SEGMENTS = 3
+
+def speech_cache_key(
+    voice_id: str,
+    text: str,
+    description: Optional[str],
+    trailing_silence: Optional[float],
+    context: Sequence[Dict[str, Optional[str]]] = ()
+) -> str:
+    """
+    Hash the inputs that determine a segment's synthesized audio.
+
+    Args:
+        voice_id: Provider voice ID
+        text: Segment text
+        description: Delivery description (acting instructions)
+        trailing_silence: Silence appended after the utterance, in seconds
+        context: Preceding utterances as {"voice_id", "text", "description"} dicts
+
+    Returns:
+        Hex SHA-256 cache key
+    """
+    payload = {
+        "v": CACHE_VERSION,
+        "format": "mp3",
+        "voice_id": voice_id,
+        "text": text,
+        "description": description,
+        "trailing_silence": trailing_silence,
+        "context": [
+            [utterance["voice_id"], utterance["text"], utterance["description"]] for utterance in context
+        ]
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def segment_cache_key(segments: List, index: int, voice_map: Dict[str, str]) -> Optional[str]:
+    """
+    Cache key for segments[index], or None if its character has no voice.
+
+    Args:
+        segments: All segments of the text, in order
+        index: Position of the segment in segments
+        voice_map: Mapping of character IDs (as strings) to voice IDs
+    """
+    segment = segments[index]
+    voice_id = voice_map.get(str(segment.character_id))
+    if not voice_id:
+        return None
+
+    context = []
+    for previous in segments[max(0, index - CONTEXT_SEGMENTS):index]:
+        previous_voice_id = voice_map.get(str(previous.character_id))
+        if previous_voice_id:
+            context.append({
+                "voice_id": previous_voice_id,
+                "text": previous.text,
+                "description": previous.description
+            })
+
+    return speech_cache_key(
+        voice_id,
+        segment.text,
+        segment.description,
+        getattr(segment, "trailing_silence", None),
+        context
+    )
+
+def cache_entry(cache_key: str, voice_id: str, blob: AudioBlob) -> Dict:
+    """Row for crud.save_speech_cache_entries"""
+    return {
+        "cache_key": cache_key,
+        "voice_id": voice_id,
+        "audio_hash": blob.hash,
+        "audio_size": blob.size,
+        "audio_duration": blob.duration
+    }
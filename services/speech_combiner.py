@@ -0,0 +1,155 @@
+"""
+Incremental assembly of a text's combined speech track.
+
+combine_speech_segments concatenates every segment's MP3 with ffmpeg after speech
+generation has finished. With streaming speech generation the track is instead built
+while batches are still in flight: IncrementalSpeechCombiner appends segments to a spool
+file in sequence order as their audio arrives, and holds back segments that arrive ahead
+of a gap until the gap is filled. Hume returns MP3 without headers (strip_headers), so
+appending the bytes gives the same stream as ffmpeg's concat demuxer with stream copy.
+
+A finished track is named after a key over the audio hashes it was built from.
+combine_speech_segments reuses it only while the segments' audio still matches that key,
+so segments regenerated or edited afterwards are never served from a stale track.
+"""
+
+import glob
+import hashlib
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+from utils.config import settings
+from utils.logging import get_logger
+from services.blob_store import get_blob_store
+
+logger = get_logger(__name__)
+
+def combined_speech_key(audio_hashes: Sequence[str]) -> str:
+    """Key of a combined track: hash over its segments' audio hashes, in order"""
+    return hashlib.sha256("\n".join(audio_hashes).encode("utf-8")).hexdigest()
+
+def _combined_dir() -> str:
+    return os.path.join(settings.AUDIO_STORAGE_PATH, "combined")
+
+def _track_path(text_id: int, key: str) -> str:
+    return os.path.join(_combined_dir(), f"speech_{text_id}_{key[:16]}.mp3")
+
+def find_combined_speech(text_id: int, audio_hashes: Sequence[str]) -> Optional[str]:
+    """
+    Path of a prebuilt combined track for exactly these segment audio hashes.
+
+    Args:
+        text_id: Text ID
+        audio_hashes: Audio hashes of the text's segments, in sequence order
+
+    Returns:
+        Path to the track, or None if none was built for this audio
+    """
+    if not audio_hashes:
+        return None
+    path = _track_path(text_id, combined_speech_key(audio_hashes))
+    return path if os.path.exists(path) else None
+
+class IncrementalSpeechCombiner:
+    """
+    Appends segment audio to a text's combined speech track in sequence order.
+
+    add() may be called from several threads and in any order. Audio of a segment that
+    cannot be appended yet is not kept in memory; it is read back from the blob store
+    once the segments before it have arrived.
+    """
+
+    def __init__(self, text_id: int, segment_ids: Sequence[int]):
+        """
+        Args:
+            text_id: Text ID
+            segment_ids: IDs of all the text's segments, in sequence order
+        """
+        self.text_id = text_id
+        self._order: List[int] = list(segment_ids)
+        self._pending: Dict[int, str] = {}
+        self._hashes: List[str] = []
+        self._failed = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+        os.makedirs(_combined_dir(), exist_ok=True)
+        self._spool_path = os.path.join(_combined_dir(), f"speech_{text_id}.{uuid.uuid4().hex}.partial")
+        open(self._spool_path, "wb").close()
+
+    @property
+    def appended(self) -> int:
+        """Number of segments written to the track so far"""
+        return len(self._hashes)
+
+    def add(self, segment_id: int, audio_hash: str, data: Optional[bytes] = None) -> None:
+        """
+        Record a segment's audio and append every segment that is now next in order.
+
+        Args:
+            segment_id: Segment ID
+            audio_hash: Blob store hash of the segment's audio
+            data: The audio bytes, if at hand (saves a blob store read when appended now)
+        """
+        with self._lock:
+            if self._closed or self._failed:
+                return
+            position = len(self._hashes)
+            if position < len(self._order) and self._order[position] == segment_id:
+                self._append(audio_hash, data)
+            else:
+                self._pending[segment_id] = audio_hash
+            self._drain()
+
+    def _append(self, audio_hash: str, data: Optional[bytes]) -> None:
+        if data is None:
+            data = get_blob_store().get(audio_hash)
+        if data is None:
+            logger.warning(f"Audio blob {audio_hash} missing, not combining speech for text {self.text_id}")
+            self._failed = True
+            return
+        with open(self._spool_path, "ab") as spool:
+            spool.write(data)
+        self._hashes.append(audio_hash)
+
+    def _drain(self) -> None:
+        while not self._failed and len(self._hashes) < len(self._order):
+            audio_hash = self._pending.pop(self._order[len(self._hashes)], None)
+            if audio_hash is None:
+                return
+            self._append(audio_hash, None)
+
+    def finish(self) -> Optional[str]:
+        """
+        Publish the track if every segment was appended; otherwise discard it.
+
+        Returns:
+            Path to the combined track, or None if it is incomplete
+        """
+        with self._lock:
+            self._closed = True
+            if self._failed or len(self._hashes) < len(self._order):
+                self._remove_spool()
+                logger.info(f"Combined speech for text {self.text_id} incomplete ({len(self._hashes)}/{len(self._order)} segments)")
+                return None
+
+            path = _track_path(self.text_id, combined_speech_key(self._hashes))
+            # Tracks built from earlier audio of this text can no longer match
+            for stale in glob.glob(os.path.join(_combined_dir(), f"speech_{self.text_id}_*.mp3")):
+                if stale != path:
+                    os.remove(stale)
+            os.replace(self._spool_path, path)
+            logger.info(f"Combined speech for text {self.text_id} built from {len(self._hashes)} segments")
+            return path
+
+    def discard(self) -> None:
+        """Drop the partial track"""
+        with self._lock:
+            self._closed = True
+            self._remove_spool()
+
+    def _remove_spool(self) -> None:
+        if os.path.exists(self._spool_path):
+            os.remove(self._spool_path)
@@ -1,18 +1,25 @@
 import asyncio
+import base64
 import time
-from typing import Dict, List, Any, Optional, TYPE_CHECKING
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from hume import HumeClient
+    from hume import AsyncHumeClient
 from sqlalchemy.orm import Session
 
 from utils.config import settings
 from utils.logging import get_logger
 from utils.http_client import get_async_client
 from db import crud
-from db.session_manager import managed_db_session
+from db.session_manager import managed_db_session, unit_of_work
 from utils.timing import time_it
 from services.clients import ClientFactory
+from services.blob_store import AudioBlob, get_blob_store
+from services.speech_cache import CONTEXT_SEGMENTS, cache_entry, segment_cache_key
+from services.speech_batching import get_batch_sizer
+from services.rate_limit import AdmissionStats, track_admission
+from services.speech_combiner import IncrementalSpeechCombiner
+from services.retry import retry_with_backoff
 
 # Import Hume SDK
 from hume.tts import FormatMp3, PostedUtterance, PostedUtteranceVoiceWithId, PostedContextWithUtterances
@@ -22,17 +29,37 @@ logger = get_logger(__name__)
 
 # Maximum number of retries for API calls
 MAX_RETRIES = 3
-# Delay between retries in seconds
+# Delay before the first retry in seconds (doubled per attempt, jittered)
 RETRY_DELAY = 5
 
 @time_it("speech_generation")
-async def generate_text_audio(text_id: int) -> bool:
+async def generate_text_audio(
+    text_id: int,
+    use_cache: bool = True,
+    streaming: Optional[bool] = None,
+    resume: bool = False
+) -> bool:
     """
     Generate audio for all segments of a text with parallel batch processing
     and store individual audio data in the DB.
     
+    Segments whose TTS inputs are unchanged since they were last synthesized reuse
+    the cached audio (services/speech_cache.py) without calling Hume.
+    
+    In streaming mode each segment is stored as soon as its audio has streamed in, and
+    the combined speech track is assembled as segments arrive (services/speech_combiner.py),
+    so combine_speech_segments finds it ready when generation finishes.
+    
+    Each segment's progress is recorded in TextSegment.audio_status ("pending", "done"
+    or "failed"; segments of characters without a voice are "failed"). A run with
+    resume=True only synthesizes segments that are not "done", so a partially
+    completed text can be finished without regenerating the rest.
+    
     Args:
         text_id: Text ID
+        use_cache: Look up cached segment audio before synthesizing (False regenerates everything)
+        streaming: Stream TTS responses (defaults to the HUME_TTS_STREAMING setting)
+        resume: Only generate segments whose audio_status is not "done"
         
     Returns:
         True if all segments were processed successfully, False otherwise.
@@ -40,13 +67,6 @@ async def generate_text_audio(text_id: int) -> bool:
     
     # Use managed database session for initial data access
     with managed_db_session() as db:
-        # Invalidate existing force alignment data before speech generation
-        db_text = crud.get_text(db, text_id)
-        if db_text and db_text.word_timestamps:
-            logger.info(f"Invalidating existing force alignment for text {text_id}")
-            crud.clear_text_word_timestamps(db, text_id)
-            logger.info(f"Cleared existing force alignment data for text {text_id}")
-        
         # Get voice map for all characters
         characters = crud.get_characters_by_text(db, text_id)
         voice_map = {str(char.id): char.provider_id for char in characters if char.provider_id}
@@ -56,6 +76,10 @@ async def generate_text_audio(text_id: int) -> bool:
         if not segments:
             logger.warning(f"No segments found for text {text_id}")
             return False
+        
+        # Detach the segments so the commit on leaving the session does not expire
+        # them; they are read after it closes
+        db.expunge_all()
     
     # Create logging entry
     log_operation = "parallel_batched_speech_generation"
@@ -63,23 +87,67 @@ async def generate_text_audio(text_id: int) -> bool:
     logger_contextual = get_logger(__name__, log_context)
     logger_contextual.info(f"Starting {log_operation} for text {text_id} with {len(segments)} segments")
     
+    # Only synthesize segments without cached audio
+    segment_indexes = list(range(len(segments)))
+    if resume:
+        segment_indexes = [index for index in segment_indexes if segments[index].audio_status != "done"]
+        logger_contextual.info(f"Resuming: {len(segments) - len(segment_indexes)} segments already generated")
+        if not segment_indexes:
+            return True
+    
+    # Segments of characters without a voice cannot be synthesized; record them as
+    # failed so they do not stay "pending" (a resumed run retries them)
+    unvoiced = [segments[index].id for index in segment_indexes if not voice_map.get(str(segments[index].character_id))]
+    if unvoiced:
+        logger_contextual.warning(f"No voice for the characters of segments {unvoiced}")
+        await asyncio.to_thread(_mark_segments_failed, unvoiced, "No voice for the segment's character")
+        segment_indexes = [index for index in segment_indexes if voice_map.get(str(segments[index].character_id))]
+        if not segment_indexes:
+            return False
+    
+    if use_cache:
+        misses = set(await asyncio.to_thread(_apply_cached_audio, segments, voice_map))
+        logger_contextual.info(f"Speech cache: {len(segments) - len(misses)} hits, {len(misses)} misses")
+        segment_indexes = [index for index in segment_indexes if index in misses]
+        if not segment_indexes:
+            logger_contextual.info(f"All voiced segments of text {text_id} served from the speech cache")
+            return not unvoiced
+    
     # Initialize Hume client once
     try:
         # Use factory to get cached client
-        hume_client = ClientFactory.get_hume_sync_client()
+        hume_client = ClientFactory.get_hume_async_client()
         http_client = None  # Not using custom client
     except Exception as e:
         logger_contextual.error(f"Failed to initialize Hume client: {str(e)}", exc_info=True)
         return False
     
-    batch_size = 5  # Maximum generations per request
-    all_segments_processed_successfully = True
+    # Invalidate existing force alignment now that segment audio is regenerated (a run
+    # served entirely from the speech cache returns before this and keeps it)
+    with managed_db_session() as db:
+        if crud.has_word_timestamps(db, text_id):
+            logger.info(f"Invalidating existing force alignment for text {text_id}")
+            crud.clear_text_word_timestamps(db, text_id)
+            logger.info(f"Cleared existing force alignment data for text {text_id}")
+    
+    await asyncio.to_thread(_mark_segments_pending, [segments[index].id for index in segment_indexes])
+    
+    if streaming is None:
+        streaming = settings.HUME_TTS_STREAMING
+    combiner = None
+    if streaming:
+        combiner = await asyncio.to_thread(_start_combiner, text_id, segments, segment_indexes, voice_map)
+    
+    # Pack segments into requests by character budget, tuned from observed latency
+    batch_sizer = get_batch_sizer()
+    batch_ranges = batch_sizer.pack(segment_indexes, [len(segment.text or "") for segment in segments])
+    logger_contextual.info(f"Packed {len(segment_indexes)} segments into {len(batch_ranges)} batches of up to {batch_sizer.char_budget} characters")
+    all_segments_processed_successfully = not unvoiced
     
     # Create batch tasks for parallel processing
     batch_tasks = []
     
-    for batch_start in range(0, len(segments), batch_size):
-        batch_end = min(batch_start + batch_size, len(segments))
+    for batch_start, batch_end in batch_ranges:
         batch_segments = segments[batch_start:batch_end]
         
         # Create task for this batch
@@ -90,7 +158,8 @@ async def generate_text_audio(text_id: int) -> bool:
             batch_end=batch_end,
             voice_map=voice_map,
             hume_client=hume_client,
-            logger_contextual=logger_contextual
+            logger_contextual=logger_contextual,
+            combiner=combiner
         )
         batch_tasks.append(task)
     
@@ -121,6 +190,9 @@ async def generate_text_audio(text_id: int) -> bool:
         logger_contextual.error(f"Error in parallel batch processing: {str(e)}", exc_info=True)
         all_segments_processed_successfully = False
     
+    if combiner is not None:
+        await asyncio.to_thread(combiner.finish)
+    
     # No custom httpx client to close since we're using Hume's default client
     logger_contextual.info(f"Speech generation completed for text_id {text_id}")
         
@@ -132,157 +204,370 @@ async def process_batch(
     batch_start: int,
     batch_end: int,
     voice_map: Dict[str, str],
-    hume_client: "HumeClient",
-    logger_contextual
+    hume_client: "AsyncHumeClient",
+    logger_contextual,
+    combiner: Optional[IncrementalSpeechCombiner] = None
 ) -> bool:
     """
     Process a single batch of segments with continuation context.
     
+    Success is tracked per segment: a segment is stored as soon as its audio arrives,
+    and only segments whose audio is missing, empty or lost to a failed request are
+    retried. Each retry request starts with the continuation context of its first
+    segment (the segments preceding it), the same context it had in the original
+    batch. Attempts are spaced by a jittered exponential backoff (services/retry.py),
+    and segments still failing after MAX_RETRIES attempts are marked "failed".
+    
+    The TTS request holds a slot of the per-API-key Hume limiter, and audio storage
+    and the DB write run in worker threads, so concurrent batches never block the
+    event loop.
+    
+    With a combiner the response is streamed (see _stream_batch) instead of awaited whole.
+    
     Args:
         segments: All segments (for context creation)
         batch_segments: Segments in this batch
         batch_start: Starting index of this batch
         batch_end: Ending index of this batch
         voice_map: Mapping of character IDs to voice IDs
-        hume_client: Hume client instance
+        hume_client: Async Hume client instance
         logger_contextual: Contextual logger
+        combiner: Combined speech track to feed, enables streaming
         
     Returns:
-        True if batch was processed successfully, False otherwise.
+        True if every voiced segment of the batch was stored, False otherwise.
     """
+    positions = []
+    for position, segment in enumerate(batch_segments, start=batch_start):
+        if not voice_map.get(str(segment.character_id)):
+            logger_contextual.warning(f"No voice ID found for character {segment.character_id} in segment {segment.id}")
+            continue
+        positions.append(position)
     
-    # Create context from previous batch segments for continuation
-    context = None
-    if batch_start > 0:
-        # Use last 2-3 segments from previous batches as context
-        context_start = max(0, batch_start - 3)
-        context_segments = segments[context_start:batch_start]
-        
-        context_utterances = []
-        for seg in context_segments:
-            voice_id = voice_map.get(str(seg.character_id))
-            if voice_id:
-                context_utterances.append(PostedUtterance(
-                    text=seg.text,
-                    description=seg.description,
-                    voice=PostedUtteranceVoiceWithId(id=voice_id, provider="CUSTOM_VOICE")
-                ))
+    if not positions:
+        logger_contextual.warning(f"No valid utterances in batch {batch_start}-{batch_end}")
+        return False
+    
+    remaining = positions
+    attempt = 0
+    
+    async def synthesize_remaining() -> None:
+        nonlocal remaining, attempt
+        attempt += 1
+        saved = set()
+        runs = _batch_ranges(remaining, len(remaining))
+        logger_contextual.info(
+            f"Generating audio for {len(remaining)} segments of batch {batch_start}-{batch_end} "
+            f"in {len(runs)} requests (attempt {attempt})"
+        )
+        results = await asyncio.gather(*(
+            _synthesize_range(hume_client, segments, list(range(start, end)), voice_map, combiner, saved, logger_contextual)
+            for start, end in runs
+        ), return_exceptions=True)
+        last_error = "No audio returned"
+        for (start, end), result in zip(runs, results):
+            if isinstance(result, Exception):
+                last_error = str(result)
+                logger_contextual.warning(f"Request for segments {start}-{end} failed: {last_error}")
         
-        if context_utterances:
-            context = PostedContextWithUtterances(utterances=context_utterances)
-            logger_contextual.info(f"Created continuation context with {len(context_utterances)} segments for batch {batch_start}-{batch_end}")
+        remaining = [position for position in remaining if position not in saved]
+        if remaining:
+            raise RuntimeError(last_error)
     
-    # Create utterances for the batch
-    utterances = []
-    batch_voice_ids = []
+    try:
+        await retry_with_backoff(
+            synthesize_remaining,
+            attempts=MAX_RETRIES,
+            base_delay=RETRY_DELAY,
+            log=logger_contextual,
+            description=f"Batch {batch_start}-{batch_end}"
+        )
+        return True
+    except Exception as e:
+        last_error = str(e)
     
-    for segment in batch_segments:
+    failed_ids = [segments[position].id for position in remaining]
+    logger_contextual.error(
+        f"Error generating audio for segments {failed_ids} after {MAX_RETRIES} attempts: {last_error}"
+    )
+    await asyncio.to_thread(_mark_segments_failed, failed_ids, last_error)
+    return False
+
+def _utterance(segment, voice_id: str, with_options: bool = True) -> PostedUtterance:
+    """Hume utterance for a segment (context utterances carry no delivery options)"""
+    utterance_params = {
+        "text": segment.text,
+        "description": segment.description,
+        "voice": PostedUtteranceVoiceWithId(id=voice_id, provider="CUSTOM_VOICE")
+    }
+    if with_options and getattr(segment, 'trailing_silence', None) is not None:
+        utterance_params["trailing_silence"] = segment.trailing_silence
+    return PostedUtterance(**utterance_params)
+
+def _continuation_context(segments: List, position: int, voice_map: Dict[str, str]) -> Optional[PostedContextWithUtterances]:
+    """Context for a request starting at segments[position]: the voiced segments just before it"""
+    context_utterances = []
+    for segment in segments[max(0, position - CONTEXT_SEGMENTS):position]:
         voice_id = voice_map.get(str(segment.character_id))
-        if not voice_id:
-            logger_contextual.warning(f"No voice ID found for character {segment.character_id} in segment {segment.id}")
-            continue
+        if voice_id:
+            context_utterances.append(_utterance(segment, voice_id, with_options=False))
+    return PostedContextWithUtterances(utterances=context_utterances) if context_utterances else None
+
+async def _synthesize_range(
+    hume_client: "AsyncHumeClient",
+    segments: List,
+    positions: List[int],
+    voice_map: Dict[str, str],
+    combiner: Optional[IncrementalSpeechCombiner],
+    saved: set,
+    logger_contextual
+) -> None:
+    """
+    Synthesize consecutive segments in one request and store those that got audio.
+    
+    Args:
+        hume_client: Async Hume client instance
+        segments: All segments, in order
+        positions: Consecutive positions in segments to synthesize
+        voice_map: Mapping of character IDs to voice IDs
+        combiner: Combined speech track to feed, enables streaming
+        saved: Positions stored so far; updated as segments are stored
+        logger_contextual: Contextual logger
         
-        batch_voice_ids.append(voice_id)
+    Raises:
+        Exception: If the request fails
+    """
+    # Generate with continuation context for narrative coherence
+    api_params = {
+        "utterances": [_utterance(segments[position], voice_map[str(segments[position].character_id)]) for position in positions],
+        "format": FormatMp3(),
+        "strip_headers": True
+    }
+    context = _continuation_context(segments, positions[0], voice_map)
+    if context:
+        api_params["context"] = context
+    
+    if combiner is not None:
+        await _stream_batch(hume_client, api_params, segments, positions, voice_map, combiner, saved, logger_contextual)
+        return
+    
+    async with ClientFactory.get_hume_tts_limiter():
+        with track_admission() as admission:
+            started = time.monotonic()
+            response = await hume_client.tts.synthesize_json(**api_params)
+        _observe_latency(api_params, time.monotonic() - started, admission)
+    
+    # Each utterance creates its own snippet group
+    snippet_groups = (response.generations[0].snippets or []) if response.generations else []
+    
+    # Audio references for the request, written to the DB in one transaction
+    segment_audio = []
+    cache_entries = []
+    stored = []
+    for index, position in enumerate(positions):
+        segment = segments[position]
+        snippet_group = snippet_groups[index] if index < len(snippet_groups) else []
+        audio_bytes_b64 = snippet_group[0].audio if snippet_group else None
+        if not audio_bytes_b64:
+            logger_contextual.error(f"No audio data returned for segment {segment.id}")
+            continue
         
-        # Prepare utterance for Hume API
-        utterance_params = {
-            "text": segment.text,
-            "description": segment.description,
-            "voice": PostedUtteranceVoiceWithId(id=voice_id, provider="CUSTOM_VOICE")
-        }
+        # Store audio in the blob store and keep only its reference in the DB
+        blob = await asyncio.to_thread(get_blob_store().put_audio, audio_bytes_b64)
+        segment_audio.append((segment.id, blob))
+        cache_key = segment_cache_key(segments, position, voice_map)
+        if cache_key:
+            cache_entries.append(cache_entry(cache_key, voice_map[str(segment.character_id)], blob))
+        stored.append(position)
+    
+    if segment_audio:
+        await asyncio.to_thread(_save_segment_audio, segment_audio, cache_entries)
+        saved.update(stored)
+        logger_contextual.info(f"Stored audio for {len(stored)} of {len(positions)} segments")
+
+async def _stream_batch(
+    hume_client: "AsyncHumeClient",
+    api_params: Dict[str, Any],
+    segments: List,
+    positions: List[int],
+    voice_map: Dict[str, str],
+    combiner: IncrementalSpeechCombiner,
+    saved: set,
+    logger_contextual
+) -> None:
+    """
+    Stream a request's audio and store each segment as soon as its audio is complete.
+    
+    An utterance's audio is complete once chunks of the next utterance arrive or the
+    stream ends. Stores run in worker threads while the stream keeps being read.
+    
+    Args:
+        hume_client: Async Hume client instance
+        api_params: synthesize_json parameters for the request
+        segments: All segments, in order
+        positions: Position in segments of each utterance in the request
+        voice_map: Mapping of character IDs to voice IDs
+        combiner: Combined speech track to append segments to
+        saved: Positions stored so far; updated as segments are stored
+        logger_contextual: Contextual logger
         
-        # Add optional parameters from segment if they exist
-        if hasattr(segment, 'trailing_silence') and segment.trailing_silence is not None:
-            utterance_params["trailing_silence"] = segment.trailing_silence
-            
-        # Create utterance with all parameters
-        utterances.append(PostedUtterance(**utterance_params))
-    
-    if not utterances:
-        logger_contextual.warning(f"No valid utterances in batch {batch_start}-{batch_end}")
-        return False
+    Raises:
+        Exception: If the request or stream fails (segments stored before that stay stored)
+    """
+    chunks: Dict[int, List[bytes]] = {}
+    snippet_ids: List[str] = []
+    saves = []
+    
+    async def save(position: int, audio: bytes) -> None:
+        segment = segments[position]
+        cache_key = segment_cache_key(segments, position, voice_map)
+        voice_id = voice_map[str(segment.character_id)]
+        await asyncio.to_thread(_save_streamed_segment, segment.id, audio, cache_key, voice_id, combiner)
+        saved.add(position)
+        logger_contextual.info(f"Streamed audio for segment {segment.id}")
     
-    # Generate audio for the batch with retry mechanism
-    retry_count = 0
-    last_exception = None
-    batch_generated_successfully = False
+    def store(index: int) -> None:
+        audio = b"".join(chunks.pop(index, []))
+        if index < len(positions) and audio:
+            saves.append(asyncio.create_task(save(positions[index], audio)))
+    
+    current = None
+    try:
+        async with ClientFactory.get_hume_tts_limiter():
+            with track_admission() as admission:
+                started = time.monotonic()
+                async for chunk in hume_client.tts.synthesize_json_streaming(**api_params):
+                    index = chunk.utterance_index
+                    if index is None:
+                        # Without an utterance index, each snippet is one utterance
+                        if chunk.snippet_id not in snippet_ids:
+                            snippet_ids.append(chunk.snippet_id)
+                        index = snippet_ids.index(chunk.snippet_id)
+                    if current is not None and index != current:
+                        store(current)
+                    current = index
+                    chunks.setdefault(index, []).append(base64.b64decode(chunk.audio))
+            _observe_latency(api_params, time.monotonic() - started, admission)
+        if current is not None:
+            store(current)
+    finally:
+        await asyncio.gather(*saves)
+    
+    missing = [position for position in positions if position not in saved]
+    if missing:
+        logger_contextual.error(f"No audio streamed for {len(missing)} of {len(positions)} segments")
 
-    while retry_count < MAX_RETRIES:
-        try:
-            logger_contextual.info(f"Generating audio for batch {batch_start}-{batch_end} (attempt {retry_count + 1})")
-            
-            # Generate with continuation context for narrative coherence
-            api_params = {
-                "utterances": utterances,
-                "format": FormatMp3(),
-                "strip_headers": True
-            }
-            
-            # Add context for batches after the first
-            if context:
-                api_params["context"] = context
-            
-            response = hume_client.tts.synthesize_json(**api_params)
-            
-            # Process each audio snippet from the batch response
-            if response.generations and len(response.generations) > 0:
-                generation = response.generations[0]
-                logger_contextual.info(f"Generation response has {len(response.generations)} generations")
-                
-                if hasattr(generation, 'snippets') and generation.snippets:
-                    logger_contextual.info(f"Generation has {len(generation.snippets)} snippet groups")
-                    
-                    # Each utterance creates its own snippet group
-                    for snippet_group_idx, snippet_group in enumerate(generation.snippets):
-                        if snippet_group_idx < len(batch_segments):
-                            segment = batch_segments[snippet_group_idx]
-                            
-                            # Each snippet group should have one snippet for that utterance
-                            if len(snippet_group) > 0:
-                                snippet = snippet_group[0]  # First snippet in this group
-                                audio_bytes_b64 = snippet.audio
-                                
-                                logger_contextual.info(f"Processing snippet group {snippet_group_idx} for segment {segment.id}")
-                                
-                                if audio_bytes_b64:
-                                    # Use managed database session for audio data update
-                                    with managed_db_session() as db:
-                                        crud.update_segment_audio_data(db, segment.id, audio_bytes_b64)
-                                    logger_contextual.info(f"Successfully generated audio for segment {segment.id}")
-                                else:
-                                    logger_contextual.error(f"No audio data returned for segment {segment.id}")
-                                    return False
-                            else:
-                                logger_contextual.error(f"Snippet group {snippet_group_idx} is empty for segment {segment.id}")
-                                return False
-                        else:
-                            logger_contextual.warning(f"More snippet groups ({len(generation.snippets)}) than batch segments ({len(batch_segments)})")
-                    
-                    # If we have fewer snippet groups than segments, that's an error
-                    if len(generation.snippets) < len(batch_segments):
-                        logger_contextual.error(f"Received {len(generation.snippets)} snippet groups but expected {len(batch_segments)} for batch segments")
-                        return False
-                    
-                    batch_generated_successfully = True
-                else:
-                    logger_contextual.error(f"No snippets found in response for batch {batch_start}-{batch_end}")
-                    return False
-            else:
-                logger_contextual.error(f"No generations found in response for batch {batch_start}-{batch_end}")
-                return False
-            break
-            
-        except Exception as e:
-            retry_count += 1
-            last_exception = e
-            logger_contextual.warning(f"Batch {batch_start}-{batch_end} generation attempt {retry_count} failed: {str(e)}")
-            
-            if retry_count >= MAX_RETRIES:
-                logger_contextual.error(f"Error generating audio for batch {batch_start}-{batch_end} after {MAX_RETRIES} attempts: {str(last_exception)}", exc_info=True)
-                return False
-                
-            await asyncio.sleep(RETRY_DELAY)
-    
-    return batch_generated_successfully
+def _observe_latency(api_params: Dict[str, Any], seconds: float, admission: AdmissionStats) -> None:
+    """
+    Feed a request's time on the wire to the batch sizer. Time queued by the Hume
+    scheduler is not counted, and throttled requests (paused, retried) are skipped:
+    otherwise throttling would shrink batches and so cause more requests.
+    """
+    if admission.throttled:
+        return
+    get_batch_sizer().observe(_request_chars(api_params), seconds - admission.waited)
 
-        
\ No newline at end of file
+def _save_streamed_segment(
+    segment_id: int,
+    audio: bytes,
+    cache_key: Optional[str],
+    voice_id: str,
+    combiner: IncrementalSpeechCombiner
+) -> None:
+    """Store one streamed segment's audio, cache it and append it to the combined track."""
+    blob = get_blob_store().put_audio(audio)
+    _save_segment_audio([(segment_id, blob)], [cache_entry(cache_key, voice_id, blob)] if cache_key else [])
+    combiner.add(segment_id, blob.hash, audio)
+
+def _start_combiner(
+    text_id: int,
+    segments: List,
+    pending_indexes: List[int],
+    voice_map: Dict[str, str]
+) -> IncrementalSpeechCombiner:
+    """
+    Create the combined speech track for a streaming run, seeded with the audio
+    of segments that are not being synthesized (cache hits).
+    """
+    voiced = [segment for segment in segments if voice_map.get(str(segment.character_id))]
+    combiner = IncrementalSpeechCombiner(text_id, [segment.id for segment in voiced])
+    pending = {segments[index].id for index in pending_indexes}
+    for segment in voiced:
+        if segment.id not in pending and segment.audio_hash:
+            combiner.add(segment.id, segment.audio_hash)
+    return combiner
+
+def _request_chars(api_params: Dict[str, Any]) -> int:
+    """Characters synthesized by a request (context utterances are not synthesized)"""
+    return sum(len(utterance.text or "") for utterance in api_params["utterances"])
+
+def _mark_segments_pending(segment_ids: List[int]) -> None:
+    with managed_db_session() as db:
+        crud.set_segment_audio_status(db, segment_ids, "pending")
+
+def _mark_segments_failed(segment_ids: List[int], error: str) -> None:
+    with managed_db_session() as db:
+        crud.set_segment_audio_status(db, segment_ids, "failed", error)
+
+def _batch_ranges(segment_indexes: List[int], batch_size: int) -> List[Tuple[int, int]]:
+    """
+    Group segment indexes into (start, end) ranges of consecutive segments,
+    at most batch_size long, so each batch keeps its continuation context.
+    """
+    ranges = []
+    for index in segment_indexes:
+        if ranges and ranges[-1][1] == index and index - ranges[-1][0] < batch_size:
+            ranges[-1][1] = index + 1
+        else:
+            ranges.append([index, index + 1])
+    return [(start, end) for start, end in ranges]
+
+def _apply_cached_audio(segments: List, voice_map: Dict[str, str]) -> List[int]:
+    """
+    Point segments at cached audio where their cache key is stored.
+    
+    Returns:
+        Indexes of the segments that still need to be synthesized
+    """
+    cache_keys = [segment_cache_key(segments, index, voice_map) for index in range(len(segments))]
+    with managed_db_session() as db:
+        cached = {
+            key: (entry.audio_hash, entry.audio_size, entry.audio_duration)
+            for key, entry in crud.get_speech_cache_entries(db, [key for key in cache_keys if key]).items()
+        }
+    
+    # Entries whose audio is gone from the blob store are regenerated (and overwritten)
+    blob_store = get_blob_store()
+    present = {key for key, (audio_hash, _, _) in cached.items() if blob_store.exists(audio_hash)}
+    hits = [index for index, key in enumerate(cache_keys) if key in present]
+    if hits:
+        with managed_db_session() as db, unit_of_work(db):
+            for index in hits:
+                segment = segments[index]
+                audio_hash, audio_size, audio_duration = cached[cache_keys[index]]
+                # Unchanged audio is not rewritten, so the text's alignment generation
+                # (and with it force alignment) stays current
+                if segment.audio_hash != audio_hash:
+                    crud.update_segment_audio_data(db, segment.id, audio_hash, audio_size, audio_duration)
+                    segment.audio_hash = audio_hash
+                segment.audio_status = "done"
+            crud.set_segment_audio_status(db, [segments[index].id for index in hits], "done")
+            crud.touch_speech_cache_entries(db, [cache_keys[index] for index in hits])
+    
+    hit_set = set(hits)
+    return [index for index in range(len(segments)) if index not in hit_set]
+
+def _save_segment_audio(segment_audio: List[Tuple[int, AudioBlob]], cache_entries: List[Dict[str, Any]] = ()) -> None:
+    """Write a batch's audio references to the DB in one transaction, then cache them."""
+    with managed_db_session() as db, unit_of_work(db):
+        for segment_id, blob in segment_audio:
+            crud.update_segment_audio_data(db, segment_id, blob.hash, blob.size, blob.duration)
+    
+    if not cache_entries:
+        return
+    try:
+        with managed_db_session() as db, unit_of_work(db):
+            crud.save_speech_cache_entries(db, cache_entries)
+    except Exception as e:
+        # A concurrent batch may have cached the same key first; the segment audio is saved either way
+        logger.warning(f"Could not cache audio for {len(cache_entries)} segments: {e}")
@@ -122,6 +122,12 @@ class SpeechPipelineSteps:
         
         try:
             response = await self.api_client.make_request("POST", f"/api/audio/text/{text_id}/generate-segments")
+            if response.status_code == 200 and not response.json().get("success", True):
+                # Only the segments that failed are generated again
+                print("⚠️  Some segments failed, resuming speech generation for them...")
+                response = await self.api_client.make_request(
+                    "POST", f"/api/audio/text/{text_id}/generate-segments", params={"resume": "true"}
+                )
             if response.status_code == 200:
                 elapsed = time.time() - step_start
                 print(f"✅ Speech generation completed in {elapsed:.2f}s")
@@ -1,16 +1,24 @@
+import asyncio
 import json
 import re
 import os
-from typing import Dict, List, Tuple, Any, TypedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any, TypedDict
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from utils.config import settings
 from utils.logging import get_logger
 from db import crud, models
-from db.session_manager import managed_db_session
+from db.session_manager import managed_db_session, unit_of_work
 from datetime import datetime
 from utils.timing import time_it
 from services.clients import ClientFactory
+from services.json_stream import JSONArrayStream
+from services.llm_cache import bypass_llm_cache, cached_completion, lookup_response, store_response
+from services.text_chunking import split_into_chunks
+from services.text_diff import locate_segments, paragraph_hashes, plan_incremental_segmentation, split_paragraphs
+from services.text_structure import analyze_text_structure
+from services.voice_generation import generate_all_character_voices_parallel
+from services.voice_index import delete_text_voices, drop_unused_character_voices
 
 # Initialize regular logger
 logger = get_logger(__name__)
@@ -18,37 +26,8 @@ logger = get_logger(__name__)
 async def _delete_existing_hume_voices(text_id: int):
     """Delete existing Hume voices for a text_id before reanalysis"""
     try:
-        # Initialize Hume client
-        hume_client = ClientFactory.get_hume_async_client()
-        
-        # List all custom voices
-        voices_response = await hume_client.tts.voices.list(provider="CUSTOM_VOICE")
-        # AsyncPager needs to be iterated through, not accessed via page_items
-        voices = []
-        async for voice in voices_response:
-            voices.append(voice)
-        
-        # Find and delete voices that end with "_[text_id]"
-        target_suffix = f"_{text_id}"
-        deleted_count = 0
-        
-        for voice in voices:
-            if hasattr(voice, "name") and (
-                voice.name.endswith(target_suffix) or 
-                voice.name.lower().endswith(target_suffix.lower())
-            ):
-                try:
-                    logger.info(f"Deleting existing voice '{voice.name}' for text reanalysis")
-                    await hume_client.tts.voices.delete(name=voice.name)
-                    deleted_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to delete voice '{voice.name}': {str(e)}")
-        
-        if deleted_count > 0:
-            logger.info(f"Successfully deleted {deleted_count} existing voice(s) for text_id {text_id}")
-        else:
-            logger.info(f"No existing voices found for text_id {text_id}")
-            
+        # Voices are looked up in the local voice index, not by listing the account
+        await delete_text_voices(text_id)
     except Exception as e:
         logger.error(f"Error deleting existing Hume voices for text_id {text_id}: {str(e)}")
         # Don't raise - voice deletion failure shouldn't stop text analysis
@@ -77,51 +56,6 @@ def _clear_character_voices_in_db(db: Session, text_id: int):
         logger.error(f"Error clearing character voices in database for text_id {text_id}: {str(e)}")
         # Don't raise - this shouldn't stop text analysis
 
-def _analyze_text_structure(text):
-    """
-    Analyzes a text and splits it into narrative and dialogue elements.
-    Incorporated from process_text.py for better encapsulation.
-    """
-    # Split the text by dialogue markers (" or " or ").
-    # The regex includes the markers in the split result.
-    parts = re.split(r'(["""])', text)
-
-    elements = []
-    in_dialogue = False
-    buffer = ""
-
-    for part in parts:
-        if part in ['"', '"', '"']:
-            if in_dialogue:
-                # End of dialogue
-                if buffer.strip():
-                    elements.append({"type": "dialogue", "content": buffer.strip().replace('\n', '  ')})
-                buffer = ""
-            else:
-                # Start of dialogue
-                if buffer.strip():
-                    elements.append({"type": "narrative", "content": buffer.strip().replace('\n', '  ')})
-                buffer = ""
-            in_dialogue = not in_dialogue
-        else:
-            buffer += part
-
-    if buffer.strip():
-        # Add any remaining text as narrative
-        elements.append({"type": "narrative", "content": buffer.strip().replace('\n', '  ')})
-        
-    # A simple approach to merge consecutive narrative parts
-    merged_elements = []
-    if elements:
-        merged_elements.append(elements[0])
-        for i in range(1, len(elements)):
-            if elements[i]['type'] == 'narrative' and merged_elements[-1]['type'] == 'narrative':
-                merged_elements[-1]['content'] += ' ' + elements[i]['content']
-            else:
-                merged_elements.append(elements[i])
-
-    return {"elements": merged_elements}
-
 # Define expected structures for clarity
 class CharacterDetail(TypedDict):
     name: str
@@ -173,7 +107,7 @@ def _extract_json_from_response(response_text: str) -> Dict[str, Any]:
 
 @time_it("analyze_text_phase1_characters")
 async def analyze_text_phase1_characters(text_content: str) -> List[CharacterDetail]:
-    """Phase 1: Identify characters using Claude Haiku."""
+    """Phase 1: Identify characters using Claude Haiku. Responses are cached (services/llm_cache.py)."""
     prompt = f"""your job is to put together a list of characters for voiceover, so only speaking characters and narrator (if exist).
 
 Output only json:
@@ -217,15 +151,18 @@ Now analyze this text:
         "messages": [{"role": "user", "content": prompt}]
     }
     
-    # Log full Anthropics API request
-    logger.info("Anthropic API Request", extra={"anthropic_request": api_params})
-    
-    response = await ClientFactory.get_anthropic_async_client().messages.create(**api_params)
+    async def request() -> str:
+        # Log full Anthropics API request
+        logger.info("Anthropic API Request", extra={"anthropic_request": api_params})
+        
+        response = await ClientFactory.get_anthropic_async_client().messages.create(**api_params)
+        
+        response_content = response.content[0].text
+        # Log full Anthropics API response
+        logger.info("Anthropic API Response", extra={"anthropic_response": response_content})
+        return response_content
     
-    response_content = response.content[0].text
-    # Log full Anthropics API response
-    logger.info("Anthropic API Response", extra={"anthropic_response": response_content})
-    analysis = _extract_json_from_response(response_content)
+    analysis = await cached_completion(api_params, request, _extract_json_from_response, "Character identification")
     
     # Map the API's 'text' field to our internal 'intro_text'
     characters_data = []
@@ -246,13 +183,13 @@ Now analyze this text:
 
     return characters_data
 
-@time_it("analyze_text_phase2_segmentation")
-async def analyze_text_phase2_segmentation(text_content: str, characters: List[CharacterDetail]) -> List[NarrativeElement]:
-    """Phase 2: Segment text and add voice instructions using improved approach with internal text structure analysis."""
+def _segmentation_request(text_content: str, characters: List[CharacterDetail]) -> Dict[str, Any]:
+    """Anthropic request parameters for phase 2 segmentation of text_content"""
     
     # Step 1: Use internal text structure analysis to get structured elements
-    structured_analysis = _analyze_text_structure(text_content)
-    elements = structured_analysis.get("elements", [])
+    # (offsets are left out of the prompt)
+    structured_analysis = analyze_text_structure(text_content)
+    elements = [{"type": element["type"], "content": element["content"]} for element in structured_analysis.get("elements", [])]
     
     # Prepare roles_names_json input for the second prompt
     roles_names = {"roles": [{"name": char["name"], "is_narrator": char["is_narrator"]} for char in characters]}
@@ -308,18 +245,143 @@ structured_elements:
         "temperature": 0.2,
         "messages": [{"role": "user", "content": prompt}]
     }
+    return api_params
+
+@time_it("analyze_text_phase2_segmentation")
+async def analyze_text_phase2_segmentation(text_content: str, characters: List[CharacterDetail]) -> List[NarrativeElement]:
+    """
+    Phase 2: Segment text and add voice instructions using improved approach with internal text structure analysis.
+    Responses are cached (services/llm_cache.py).
+    """
+    api_params = _segmentation_request(text_content, characters)
+    
+    async def request() -> str:
+        # Log full Anthropics API segmentation request
+        logger.info("Anthropic API Segmentation Request", extra={"anthropic_request": api_params})
+        
+        response = await ClientFactory.get_anthropic_async_client().messages.create(**api_params)
+        
+        response_content = response.content[0].text
+        # Log full Anthropics API segmentation response
+        logger.info("Anthropic API Segmentation Response", extra={"anthropic_response": response_content})
+        return response_content
+    
+    analysis = await cached_completion(api_params, request, _extract_json_from_response, "Segmentation")
+    
+    return analysis.get("narrative_elements", [])
+
+@time_it("analyze_text_phase2_chunked")
+async def analyze_text_phase2_chunked(
+    text_content: str,
+    characters: List[CharacterDetail],
+    chunk_chars: Optional[int] = None
+) -> List[NarrativeElement]:
+    """
+    Phase 2 for texts of any length: texts longer than chunk_chars are split at paragraph
+    or dialogue boundaries (see services/text_chunking.py) and the chunks are segmented
+    concurrently, each with the full phase 1 character list.
+    
+    The chunks' elements are merged in text order regardless of which request finishes
+    first, so sequence numbers assigned from the merged list are stable.
+    
+    Args:
+        text_content: Text to segment
+        characters: Characters from phase 1
+        chunk_chars: Largest chunk in characters (defaults to TEXT_ANALYSIS_CHUNK_CHARS)
+        
+    Returns:
+        Narrative elements of the whole text, in order
+    """
+    if chunk_chars is None:
+        chunk_chars = settings.TEXT_ANALYSIS_CHUNK_CHARS
+    chunks = split_into_chunks(text_content, chunk_chars)
+    if len(chunks) <= 1:
+        return await analyze_text_phase2_segmentation(text_content, characters)
+    
+    logger.info(f"Segmenting {len(text_content)} characters in {len(chunks)} chunks of up to {chunk_chars}")
+    chunk_elements = await asyncio.gather(*(
+        analyze_text_phase2_segmentation(chunk, characters) for chunk in chunks
+    ))
+    return [element for elements in chunk_elements for element in elements]
+
+async def stream_text_phase2_segmentation(text_content: str, characters: List[CharacterDetail]) -> AsyncIterator[NarrativeElement]:
+    """
+    Phase 2, streamed: yields narrative elements as they are parsed from the streamed
+    Anthropic response (services/json_stream.py) rather than after the whole response.
+    
+    Uses the same request, and so the same cache entries, as analyze_text_phase2_segmentation:
+    a cached response is replayed, and a streamed response is cached once complete.
+    
+    Raises:
+        ValueError: If the response ends before the narrative_elements array is closed
+    """
+    api_params = _segmentation_request(text_content, characters)
+    
+    cached = await asyncio.to_thread(lookup_response, api_params)
+    if cached is not None:
+        logger.info("Segmentation response served from cache")
+        for element in _extract_json_from_response(cached).get("narrative_elements", []):
+            yield element
+        return
     
     # Log full Anthropics API segmentation request
-    logger.info("Anthropic API Segmentation Request", extra={"anthropic_request": api_params})
+    logger.info("Anthropic API Segmentation Request (streaming)", extra={"anthropic_request": api_params})
     
-    response = await ClientFactory.get_anthropic_async_client().messages.create(**api_params)
+    parser = JSONArrayStream("narrative_elements")
+    async with ClientFactory.get_anthropic_async_client().messages.stream(**api_params) as stream:
+        async for text in stream.text_stream:
+            for element in parser.feed(text):
+                yield element
     
-    response_content = response.content[0].text
+    response_content = parser.text
     # Log full Anthropics API segmentation response
     logger.info("Anthropic API Segmentation Response", extra={"anthropic_response": response_content})
-    analysis = _extract_json_from_response(response_content)
+    if not parser.complete:
+        raise ValueError(f"API response appears to be truncated: segmentation stream ended after {parser.count} elements")
+    await asyncio.to_thread(store_response, api_params, response_content)
+
+async def stream_text_phase2_chunked(
+    text_content: str,
+    characters: List[CharacterDetail],
+    chunk_chars: Optional[int] = None
+) -> AsyncIterator[NarrativeElement]:
+    """
+    Streamed counterpart of analyze_text_phase2_chunked: all chunks are streamed
+    concurrently, and elements are yielded in text order. Elements of the first
+    unfinished chunk are yielded as they arrive; later chunks are buffered until the
+    chunks before them are done.
+    """
+    if chunk_chars is None:
+        chunk_chars = settings.TEXT_ANALYSIS_CHUNK_CHARS
+    chunks = split_into_chunks(text_content, chunk_chars)
+    if len(chunks) <= 1:
+        async for element in stream_text_phase2_segmentation(text_content, characters):
+            yield element
+        return
     
-    return analysis.get("narrative_elements", [])
+    logger.info(f"Streaming segmentation of {len(text_content)} characters in {len(chunks)} chunks of up to {chunk_chars}")
+    done = object()
+    queues = [asyncio.Queue() for _ in chunks]
+    
+    async def produce(chunk: str, queue: asyncio.Queue) -> None:
+        try:
+            async for element in stream_text_phase2_segmentation(chunk, characters):
+                queue.put_nowait(element)
+            queue.put_nowait(done)
+        except Exception as e:
+            queue.put_nowait(e)
+    
+    tasks = [asyncio.create_task(produce(chunk, queue)) for chunk, queue in zip(chunks, queues)]
+    try:
+        for queue in queues:
+            while (item := await queue.get()) is not done:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 @time_it("get_text_analysis_results")
 async def get_analysis_results(text_id: str, content: str) -> Tuple[List[CharacterDetail], List[NarrativeElement]]:
@@ -346,7 +408,7 @@ async def get_analysis_results(text_id: str, content: str) -> Tuple[List[Charact
     # Phase 2: Segmentation
     try:
         logger.info(f"Starting segmentation for text {text_id} with {len(characters)} characters")
-        narrative_elements = await analyze_text_phase2_segmentation(content, characters)
+        narrative_elements = await analyze_text_phase2_chunked(content, characters)
         logger.info(f"Created {len(narrative_elements)} narrative segments for text {text_id}")
         
     except Exception as e:
@@ -355,11 +417,90 @@ async def get_analysis_results(text_id: str, content: str) -> Tuple[List[Charact
         
     return characters, narrative_elements
 
+def _character_rows(characters_data: List[CharacterDetail]) -> List[Dict[str, Any]]:
+    """Character column values for phase 1 characters"""
+    return [
+        {
+            "name": char_detail["name"],
+            "is_narrator": char_detail.get("is_narrator"),
+            "speaking": char_detail.get("speaking"),
+            "description": char_detail.get("persona_description"),
+            "intro_text": char_detail.get("intro_text")
+        }
+        for char_detail in characters_data
+    ]
+
+def _segment_row(element: NarrativeElement, character_id: int, sequence: int) -> Dict[str, Any]:
+    """Segment column values for a phase 2 narrative element"""
+    return {
+        "character_id": character_id,
+        "text": element.get("text", ""),
+        "sequence": sequence,
+        "description": element.get("description"),
+        "speed": element.get("speed"),
+        "trailing_silence": element.get("trailing_silence")
+    }
+
 @time_it("process_text_analysis")
-async def process_text_analysis(text_id: int, content: str) -> models.Text:
+async def process_text_analysis(
+    text_id: int,
+    content: str,
+    incremental: bool = False,
+    streaming: Optional[bool] = None,
+    pipeline_voices: Optional[bool] = None,
+    use_cache: bool = True
+) -> models.Text:
     """
     Process text analysis using the two-phase approach and save results to database.
+    
+    With incremental=True an already analyzed text is diffed against content at the
+    paragraph level: only changed regions are re-segmented, and unchanged segments,
+    characters and voices are kept (see _process_text_analysis_incremental). Falls
+    back to a full analysis when that is not possible.
+    
+    With streaming (defaults to the TEXT_ANALYSIS_STREAMING setting) a full analysis
+    streams phase 2 and stores each segment as soon as it is parsed (see
+    _process_text_analysis_streaming).
+    
+    With pipeline_voices (defaults to the TEXT_ANALYSIS_PIPELINE_VOICES setting) a
+    full analysis also generates character voices while phase 2 runs, starting as
+    soon as the phase 1 characters are stored; characters left without segments
+    lose their voice afterwards. This builds on the streaming flow, so it implies
+    streaming. The text is marked analyzed once its voices are in place.
+    
+    With use_cache=False the Anthropic calls skip the LLM response cache (see
+    services.llm_cache), for a deliberate re-roll of an unchanged text's analysis.
+    
+    Raises ValueError before anything is deleted if content differs from the stored
+    content and another text already has it.
     """
+    if not use_cache:
+        with bypass_llm_cache():
+            return await _process_text_analysis(text_id, content, incremental, streaming, pipeline_voices)
+    return await _process_text_analysis(text_id, content, incremental, streaming, pipeline_voices)
+
+async def _process_text_analysis(
+    text_id: int,
+    content: str,
+    incremental: bool,
+    streaming: Optional[bool],
+    pipeline_voices: Optional[bool]
+) -> models.Text:
+    _check_content_available(text_id, content)
+    
+    if incremental:
+        db_text = await _process_text_analysis_incremental(text_id, content)
+        if db_text is not None:
+            return db_text
+        logger.info(f"Incremental analysis not possible for text {text_id}, running full analysis")
+    
+    if streaming is None:
+        streaming = settings.TEXT_ANALYSIS_STREAMING
+    if pipeline_voices is None:
+        pipeline_voices = settings.TEXT_ANALYSIS_PIPELINE_VOICES
+    if streaming or pipeline_voices:
+        return await _process_text_analysis_streaming(text_id, content, pipeline_voices=pipeline_voices)
+    
     try:
         characters_data, narrative_elements = await get_analysis_results(str(text_id), content)
     except Exception as e:
@@ -384,42 +525,31 @@ async def process_text_analysis(text_id: int, content: str) -> models.Text:
         print(f"Deleted {deleted_characters} existing characters and {deleted_segments} segments for text {text_id}")
         
         db_text.analyzed = True
+        if db_text.content != content:
+            crud.update_text_content(db, text_id, content)
+        
+        # Remember where each segment came from, for incremental re-analysis
+        paragraphs = split_paragraphs(content)
+        db_text.paragraph_hashes = paragraph_hashes(paragraphs)
+        spans = locate_segments(paragraphs, [element.get("text", "") for element in narrative_elements])
+        db.flush()
         db.refresh(db_text)
 
-        # Create characters in DB
-        character_map = {}  # Map character names to DB Character objects
-        db_characters = []
-        for char_detail in characters_data:
-            db_character = crud.create_character(
-                db=db,
-                text_id=db_text.id, 
-                name=char_detail["name"],
-                is_narrator=char_detail.get("is_narrator"),
-                speaking=char_detail.get("speaking"),
-                description=char_detail.get("persona_description"), 
-                intro_text=char_detail.get("intro_text")
-            )
-            character_map[char_detail["name"]] = db_character
-            db_characters.append(db_character)
+        # Create all characters and segments in one transaction (committed on session exit)
+        db_characters = crud.create_characters_bulk(db, db_text.id, _character_rows(characters_data))
+        character_map = {db_character.name: db_character for db_character in db_characters}
         
-        # Create segments in DB
-        db_segments = []
+        segment_rows = []
         for i, element in enumerate(narrative_elements):
             character_name = element.get("role")
             db_character = character_map.get(character_name)
             
             if db_character:
-                db_segment = crud.create_text_segment(
-                    db=db,
-                    text_id=db_text.id, 
-                    character_id=db_character.id, 
-                    text=element.get("text", ""), 
-                    sequence=i + 1, 
-                    description=element.get("description"),
-                    speed=element.get("speed"),
-                    trailing_silence=element.get("trailing_silence")
-                )
-                db_segments.append(db_segment)
+                segment_rows.append({
+                    **_segment_row(element, db_character.id, i + 1),
+                    "paragraph_start": spans[i][0],
+                    "paragraph_end": spans[i][1]
+                })
             else:
                 # Log or handle cases where a role in phase 2 doesn't match a character from phase 1
                 warning_message = f"Role '{character_name}' found in segmentation but not in character list for text {text_id}. Skipping segment."
@@ -431,8 +561,226 @@ async def process_text_analysis(text_id: int, content: str) -> models.Text:
                 })
                 segment_logger.warning(warning_message)
         
+        db_segments = crud.create_text_segments_bulk(db, db_text.id, segment_rows)
+        
         print(f"Processed text {text_id}: Created {len(db_characters)} characters and {len(db_segments)} segments.")
         
-        return db_text 
+        return db_text
 
- 
\ No newline at end of file
+def _check_content_available(text_id: int, content: str) -> None:
+    """Raise ValueError if content would collide with another text's (unique) content"""
+    with managed_db_session() as db:
+        duplicate = crud.get_text_by_content(db, content)
+        if duplicate is not None and duplicate.id != text_id:
+            raise ValueError(f"Cannot analyze text {text_id} with this content: text {duplicate.id} already has it")
+
+async def _process_text_analysis_streaming(text_id: int, content: str, pipeline_voices: bool = False) -> models.Text:
+    """
+    Full analysis with phase 2 streamed: characters are stored after phase 1, and each
+    segment is stored in its own transaction as soon as it is parsed, so early segments
+    can be read (and voiced) while segmentation is still running.
+    
+    Segments are numbered in text order as they arrive. Paragraph spans, paragraph hashes
+    and the analyzed flag are set once segmentation is complete; until then the text
+    reads as not analyzed, and a failed segmentation leaves it so.
+    
+    With pipeline_voices, voice generation for the stored characters runs alongside
+    phase 2 and is reconciled before the text is marked analyzed (see
+    _reconcile_pipelined_voices).
+    """
+    log = get_logger(__name__, {"text_id": str(text_id), "operation": "streaming_text_analysis"})
+    
+    try:
+        characters_data = await analyze_text_phase1_characters(content)
+    except Exception as e:
+        log.error(f"Error in text_analysis_phase1_characters: {e}", exc_info=True)
+        raise ValueError(f"Error in Phase 1 (Character Identification): {e}") from e
+    if not characters_data:
+        raise ValueError("Phase 1 did not return any characters.")
+    
+    with managed_db_session() as db:
+        db_text = crud.get_text(db, text_id)
+        if not db_text:
+            raise ValueError(f"Text with ID {text_id} not found in database")
+        
+        # Delete existing Hume voices, characters and segments before reanalysis
+        await _delete_existing_hume_voices(text_id)
+        _clear_character_voices_in_db(db, text_id)
+        crud.delete_segments_by_text(db, text_id)
+        crud.delete_characters_by_text(db, text_id)
+        
+        db_text.analyzed = False
+        if db_text.content != content:
+            crud.update_text_content(db, text_id, content)
+        db_characters = crud.create_characters_bulk(db, text_id, _character_rows(characters_data))
+        character_ids = {db_character.name: db_character.id for db_character in db_characters}
+    
+    # Characters are committed, so their voices can be generated while phase 2 runs
+    voices = asyncio.create_task(generate_all_character_voices_parallel(text_id, require_segments=False)) if pipeline_voices else None
+    
+    element_texts = []
+    segment_ids = {}
+    try:
+        async for element in stream_text_phase2_chunked(content, characters_data):
+            index = len(element_texts)
+            element_texts.append(element.get("text", ""))
+            character_id = character_ids.get(element.get("role"))
+            if character_id is None:
+                log.warning(f"Role '{element.get('role')}' found in segmentation but not in character list for text {text_id}. Skipping segment.")
+                continue
+            segment_ids[index] = await asyncio.to_thread(_store_streamed_segment, text_id, _segment_row(element, character_id, index + 1))
+    except Exception as e:
+        log.error(f"Error in streamed segmentation after {len(segment_ids)} segments: {e}", exc_info=True)
+        if voices:
+            # Let voices being saved reach the voice index, so reanalysis deletes them
+            await asyncio.gather(voices, return_exceptions=True)
+        raise ValueError(f"Error in Phase 2 (Segmentation): {e}") from e
+    
+    if voices:
+        await _reconcile_pipelined_voices(text_id, voices, log)
+    
+    # Remember where each segment came from, for incremental re-analysis
+    paragraphs = split_paragraphs(content)
+    spans = locate_segments(paragraphs, element_texts)
+    with managed_db_session() as db:
+        with unit_of_work(db):
+            crud.update_segment_positions(db, text_id, {
+                segment_id: {"sequence": index + 1, "paragraph_start": spans[index][0], "paragraph_end": spans[index][1]}
+                for index, segment_id in segment_ids.items()
+            })
+            db_text = crud.get_text(db, text_id)
+            db_text.paragraph_hashes = paragraph_hashes(paragraphs)
+            db_text.analyzed = True
+        db.refresh(db_text)
+        db.expunge(db_text)
+    
+    log.info(f"Processed text {text_id}: created {len(character_ids)} characters and streamed {len(segment_ids)} segments")
+    return db_text
+
+async def _reconcile_pipelined_voices(text_id: int, voices: asyncio.Task, log) -> None:
+    """
+    Settle the voices generated during segmentation against the segments that resulted:
+    characters without segments lose their voice, and characters with segments but no
+    voice (marked non-speaking by phase 1, or whose generation failed) are voiced now.
+    """
+    results = await voices
+    dropped = await drop_unused_character_voices(text_id)
+    generated = await generate_all_character_voices_parallel(text_id)
+    missing = [character_id for character_id, voice_id in generated if not voice_id]
+    log.info(
+        f"Pipelined voices for text {text_id}: {sum(1 for _, voice_id in results if voice_id)} generated during segmentation, "
+        f"{dropped} dropped as unused, {len(missing)} character(s) with segments still without a voice"
+    )
+
+def _store_streamed_segment(text_id: int, row: Dict[str, Any]) -> int:
+    """Insert and commit one segment; returns its ID"""
+    with managed_db_session() as db:
+        db_segment, = crud.create_text_segments_bulk(db, text_id, [row])
+        return db_segment.id
+
+async def _process_text_analysis_incremental(text_id: int, content: str) -> Optional[models.Text]:
+    """
+    Re-segment only the paragraphs of content that changed since the last analysis.
+    
+    Segments in unchanged paragraphs keep their rows and audio and are re-sequenced
+    in place; segments touching changed paragraphs are replaced by a phase 2
+    segmentation of just those regions, using the existing characters. The
+    content is saved as the text's new content.
+    
+    Returns:
+        The updated text, or None if a full analysis is needed instead (text not
+        analyzed before, no paragraph data, or a changed region introduced a role
+        that is not one of the text's characters)
+    """
+    log = get_logger(__name__, {"text_id": str(text_id), "operation": "incremental_text_analysis"})
+    
+    with managed_db_session() as db:
+        db_text = crud.get_text(db, text_id)
+        if not db_text:
+            raise ValueError(f"Text with ID {text_id} not found in database")
+        if not db_text.analyzed or db_text.paragraph_hashes is None:
+            return None
+        old_hashes = list(db_text.paragraph_hashes)
+        segments = crud.get_segments_by_text(db, text_id)
+        if any(segment.paragraph_start is None or segment.paragraph_end is None for segment in segments):
+            return None
+        segment_spans = [(segment.id, segment.paragraph_start, segment.paragraph_end) for segment in segments]
+        old_positions = {
+            segment.id: {"sequence": segment.sequence, "paragraph_start": segment.paragraph_start, "paragraph_end": segment.paragraph_end}
+            for segment in segments
+        }
+        characters = crud.get_characters_by_text(db, text_id)
+        character_ids = {character.name: character.id for character in characters}
+        character_details = [
+            {"name": character.name, "is_narrator": character.is_narrator} for character in characters
+        ]
+    
+    paragraphs = split_paragraphs(content)
+    new_hashes = paragraph_hashes(paragraphs)
+    plan = plan_incremental_segmentation(old_hashes, new_hashes, segment_spans)
+    log.info(
+        f"Incremental analysis of text {text_id}: keeping {len(plan.kept)} segments, "
+        f"dropping {len(plan.dropped)}, re-segmenting {len(plan.regions)} region(s)"
+    )
+    
+    # Phase 2 for each changed region, concurrently
+    region_elements = await asyncio.gather(*(
+        analyze_text_phase2_chunked("\n\n".join(paragraphs[start:end]), character_details)
+        for start, end in plan.regions
+    ))
+    
+    unknown_roles = {
+        element.get("role") for elements in region_elements for element in elements
+        if element.get("role") not in character_ids
+    }
+    if unknown_roles:
+        log.info(f"Changed regions introduce unknown roles {sorted(map(str, unknown_roles))}")
+        return None
+    
+    # Order kept and new segments by the paragraph they start in; kept and
+    # re-segmented paragraphs never overlap
+    ordered = [
+        (span[0], 0, old_positions[segment_id]["sequence"], ("kept", segment_id, span))
+        for segment_id, span in plan.kept.items()
+    ]
+    for (start, end), elements in zip(plan.regions, region_elements):
+        spans = locate_segments(paragraphs[start:end], [element.get("text", "") for element in elements], offset=start)
+        for index, (element, span) in enumerate(zip(elements, spans)):
+            ordered.append((start, 1, index, ("new", element, span)))
+    ordered.sort(key=lambda item: item[:3])
+    
+    positions = {}
+    new_rows = []
+    for sequence, (_, _, _, (kind, item, span)) in enumerate(ordered, start=1):
+        if kind == "kept":
+            position = {"sequence": sequence, "paragraph_start": span[0], "paragraph_end": span[1]}
+            # Only moved segments are written, so an unchanged text changes nothing
+            if position != old_positions[item]:
+                positions[item] = position
+        else:
+            new_rows.append({
+                "character_id": character_ids[item.get("role")],
+                "text": item.get("text", ""),
+                "sequence": sequence,
+                "description": item.get("description"),
+                "speed": item.get("speed"),
+                "trailing_silence": item.get("trailing_silence"),
+                "paragraph_start": span[0],
+                "paragraph_end": span[1]
+            })
+    
+    with managed_db_session() as db:
+        with unit_of_work(db):
+            crud.delete_segments(db, text_id, plan.dropped)
+            crud.update_segment_positions(db, text_id, positions)
+            crud.create_text_segments_bulk(db, text_id, new_rows)
+            db_text = crud.update_text_content(db, text_id, content)
+            db_text.paragraph_hashes = new_hashes
+        db.refresh(db_text)
+        db.expunge(db_text)
+    
+    log.info(
+        f"Incremental analysis of text {text_id}: {len(plan.kept)} segments kept "
+        f"({len(positions)} moved), {len(new_rows)} created"
+    )
+    return db_text
@@ -0,0 +1,84 @@
+"""
+Splitting of long texts into chunks for concurrent phase 2 segmentation (see
+text_analysis.analyze_text_phase2_chunked).
+
+Chunks of at most max_chars characters end at paragraph boundaries, or inside an
+oversized paragraph at a dialogue boundary, and never inside dialogue. A paragraph with
+no usable boundary, or dialogue running over several paragraphs, can exceed max_chars.
+"""
+
+from typing import List
+
+from services.text_diff import split_paragraphs
+from services.text_structure import ends_in_dialogue, quote_events
+
+def _dialogue_cuts(paragraph: str) -> List[int]:
+    """Offsets in a paragraph, starting outside of dialogue, where it can be cut outside of dialogue"""
+    cuts = []
+    for index, event in quote_events(paragraph):
+        if event == "open":
+            cuts.append(index)       # before an opening quote
+        elif event == "close":
+            cuts.append(index + 1)   # after a closing quote
+    return [cut for cut in cuts if 0 < cut < len(paragraph)]
+
+def _split_paragraph(paragraph: str, max_chars: int) -> List[str]:
+    """Cut an oversized paragraph at dialogue boundaries into pieces of about max_chars"""
+    pieces = []
+    start = 0
+    cuts = _dialogue_cuts(paragraph)
+    while len(paragraph) - start > max_chars:
+        fitting = [cut for cut in cuts if start < cut <= start + max_chars]
+        later = [cut for cut in cuts if cut > start + max_chars]
+        cut = fitting[-1] if fitting else (later[0] if later else None)
+        if cut is None:
+            break
+        piece = paragraph[start:cut].strip()
+        if piece:
+            pieces.append(piece)
+        start = cut
+    rest = paragraph[start:].strip()
+    if rest:
+        pieces.append(rest)
+    return pieces
+
+def split_into_chunks(content: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars characters for segmentation.
+
+    Args:
+        content: Text to split
+        max_chars: Largest chunk size in characters; 0 or less returns the text whole
+
+    Returns:
+        Chunks in text order (a single chunk for short texts)
+    """
+    if max_chars <= 0 or len(content) <= max_chars:
+        return [content] if content.strip() else []
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    in_dialogue = False
+
+    def flush():
+        nonlocal current, size
+        if current:
+            chunks.append("\n\n".join(current))
+        current, size = [], 0
+
+    for paragraph in split_paragraphs(content):
+        if in_dialogue:
+            # Dialogue continues from the previous paragraph: stay in the same chunk
+            units = [paragraph]
+        else:
+            units = _split_paragraph(paragraph, max_chars) if len(paragraph) > max_chars else [paragraph]
+        for unit in units:
+            # Pieces of a paragraph are cut outside of dialogue, like the paragraph start
+            if current and not in_dialogue and size + len(unit) + 2 > max_chars:
+                flush()
+            current.append(unit)
+            size += len(unit) + 2
+        in_dialogue = ends_in_dialogue(paragraph, in_dialogue)
+    flush()
+    return chunks
@@ -0,0 +1,163 @@
+"""
+Paragraph-level diffing for incremental re-segmentation (see text_analysis.process_text_analysis).
+
+A text is split into paragraphs. Each analyzed text stores the hashes of its paragraphs
+(Text.paragraph_hashes), and each segment stores the range of paragraphs it was taken
+from (TextSegment.paragraph_start / paragraph_end, end exclusive). After an edit, the
+new paragraph hashes are diffed against the stored ones:
+
+- segments lying entirely in unchanged paragraphs are kept, with their audio, and moved
+  to the paragraphs' new positions;
+- every other segment is dropped, and the paragraphs it covered are re-segmented
+  together with the inserted and changed paragraphs.
+"""
+
+import bisect
+import hashlib
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+_BLANK_LINE = re.compile(r"\n\s*\n")
+# Quote marks are stripped by text_structure.analyze_text_structure and usually by the model as well
+_IGNORED = re.compile(r"[\"“”„«»]")
+_WHITESPACE = re.compile(r"\s+")
+
+Span = Tuple[int, int]
+
+def split_paragraphs(content: str) -> List[str]:
+    """
+    Split text into paragraphs: blocks separated by blank lines, or single lines
+    if the text has no blank lines. Empty paragraphs are dropped.
+    """
+    parts = _BLANK_LINE.split(content) if _BLANK_LINE.search(content) else content.split("\n")
+    return [part.strip() for part in parts if part.strip()]
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", _IGNORED.sub("", text)).strip()
+
+def paragraph_hash(paragraph: str) -> str:
+    """Short hash of a paragraph, insensitive to whitespace and quote style"""
+    return hashlib.sha256(_normalize(paragraph).encode("utf-8")).hexdigest()[:16]
+
+def paragraph_hashes(paragraphs: Sequence[str]) -> List[str]:
+    return [paragraph_hash(paragraph) for paragraph in paragraphs]
+
+def locate_segments(paragraphs: Sequence[str], segment_texts: Sequence[str], offset: int = 0) -> List[Span]:
+    """
+    Map segments, in order, to the paragraphs they were taken from.
+
+    Each segment's text is searched for in the paragraphs after the previous match.
+    A segment that cannot be found (rewritten by the model) is attributed to the
+    paragraph where the previous one ended.
+
+    Args:
+        paragraphs: Paragraphs the segments were produced from
+        segment_texts: Segment texts, in order
+        offset: Index of paragraphs[0] in the whole text
+
+    Returns:
+        (start, end) paragraph range per segment, end exclusive, shifted by offset
+    """
+    if not paragraphs:
+        return [(offset, offset) for _ in segment_texts]
+
+    normalized = [_normalize(paragraph) for paragraph in paragraphs]
+    starts = []
+    position = 0
+    for paragraph in normalized:
+        starts.append(position)
+        position += len(paragraph) + 1
+    haystack = " ".join(normalized)
+
+    spans = []
+    cursor = 0
+    last = 0
+    for text in segment_texts:
+        needle = _normalize(text or "")
+        found = haystack.find(needle, cursor) if needle else -1
+        if found == -1 and len(needle) > 40:
+            found = haystack.find(needle[:40], cursor)
+            if found != -1:
+                needle = needle[:40]
+        if found == -1:
+            spans.append((offset + last, offset + last + 1))
+            continue
+        first = bisect.bisect_right(starts, found) - 1
+        final = bisect.bisect_right(starts, found + max(len(needle), 1) - 1) - 1
+        spans.append((offset + first, offset + final + 1))
+        cursor = found + len(needle)
+        last = final
+    return spans
+
+@dataclass
+class SegmentationPlan:
+    """What to keep and what to re-segment after an edit."""
+    kept: Dict[int, Span] = field(default_factory=dict)  # segment id -> paragraph range in the new text
+    dropped: List[int] = field(default_factory=list)     # segment ids to delete
+    regions: List[Span] = field(default_factory=list)    # new paragraph ranges to re-segment
+
+def plan_incremental_segmentation(
+    old_hashes: Sequence[str],
+    new_hashes: Sequence[str],
+    segment_spans: Sequence[Tuple[int, int, int]]
+) -> SegmentationPlan:
+    """
+    Diff paragraph hashes and decide which segments survive an edit.
+
+    Args:
+        old_hashes: Paragraph hashes the current segments were produced from
+        new_hashes: Paragraph hashes of the edited text
+        segment_spans: (segment id, paragraph_start, paragraph_end) for current segments
+
+    Returns:
+        SegmentationPlan
+    """
+    matcher = SequenceMatcher(None, list(old_hashes), list(new_hashes), autojunk=False)
+    old_to_new: Dict[int, int] = {}
+    dirty: Set[int] = set()
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            for index in range(old_end - old_start):
+                old_to_new[old_start + index] = new_start + index
+        else:
+            dirty.update(range(new_start, new_end))
+
+    def new_range(start: int, end: int) -> Optional[Span]:
+        mapped = [old_to_new.get(index) for index in range(start, end)]
+        if not mapped or None in mapped:
+            return None
+        return min(mapped), max(mapped) + 1
+
+    # Dropping a segment dirties its paragraphs, which can drop segments sharing them
+    plan = SegmentationPlan()
+    remaining = {segment_id: (start, end) for segment_id, start, end in segment_spans}
+    changed = True
+    while changed:
+        changed = False
+        for segment_id, (start, end) in list(remaining.items()):
+            span = new_range(start, end)
+            if span is not None and not dirty.intersection(range(*span)):
+                continue
+            del remaining[segment_id]
+            plan.dropped.append(segment_id)
+            surviving = [old_to_new[index] for index in range(start, end) if index in old_to_new]
+            if surviving:
+                dirty.update(range(min(surviving), max(surviving) + 1))
+            changed = True
+
+    plan.kept = {segment_id: new_range(start, end) for segment_id, (start, end) in remaining.items()}
+
+    # Paragraphs not covered by any kept segment need segments too (e.g. never segmented)
+    covered = set()
+    for start, end in plan.kept.values():
+        covered.update(range(start, end))
+    dirty.update(index for index in range(len(new_hashes)) if index not in covered)
+
+    for index in sorted(dirty):
+        if plan.regions and plan.regions[-1][1] == index:
+            plan.regions[-1] = (plan.regions[-1][0], index + 1)
+        else:
+            plan.regions.append((index, index + 1))
+    return plan
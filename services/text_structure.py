@@ -0,0 +1,113 @@
+"""
+Dialogue/narrative structure of a text: the elements phase 2 segmentation enriches
+(text_analysis._segmentation_request) and the dialogue boundaries text chunking cuts at.
+
+Quote marks are read as:
+- straight quotes (") toggle dialogue on and off;
+- typographic opening quotes (“ «) start dialogue; inside dialogue they start a new
+  quotation, as at the start of each paragraph of a speech running over several paragraphs;
+- typographic closing quotes (” ») end dialogue; outside of dialogue they are stray
+  marks and only dropped.
+
+The text is split once at its quote marks and merged narrative is joined once, so the
+cost is linear in the length of the text.
+
+Example:
+    for element in analyze_text_structure(text)["elements"]:
+        print(element["type"], element["start"], element["end"], element["content"])
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, Tuple
+
+TOGGLE_QUOTES = '"'
+OPENING_QUOTES = "“«"
+CLOSING_QUOTES = "”»"
+
+_QUOTE_MARK = re.compile(r'(["“”«»])')
+# Splitting on one ASCII mark is several times faster; used for texts without typographic quotes
+_STRAIGHT_QUOTE = re.compile(r'(")')
+
+def _quote_pattern(text: str) -> "re.Pattern[str]":
+    if any(mark in text for mark in OPENING_QUOTES + CLOSING_QUOTES):
+        return _QUOTE_MARK
+    return _STRAIGHT_QUOTE
+
+def quote_events(text: str, in_dialogue: bool = False) -> Iterator[Tuple[int, str]]:
+    """
+    Quote marks of text with what each does to dialogue.
+
+    Args:
+        text: Text to scan
+        in_dialogue: Whether text starts inside dialogue
+
+    Yields:
+        (offset, event): event is "open", "close", "reopen" (a new quotation while in
+        dialogue) or "stray" (a closing mark outside of dialogue)
+    """
+    for match in _quote_pattern(text).finditer(text):
+        mark = match.group()
+        if mark in TOGGLE_QUOTES:
+            event = "close" if in_dialogue else "open"
+        elif mark in OPENING_QUOTES:
+            event = "reopen" if in_dialogue else "open"
+        else:
+            event = "close" if in_dialogue else "stray"
+        in_dialogue = event in ("open", "reopen")
+        yield match.start(), event
+
+def ends_in_dialogue(text: str, in_dialogue: bool = False) -> bool:
+    """Whether dialogue is still open at the end of text"""
+    for _, event in quote_events(text, in_dialogue):
+        in_dialogue = event in ("open", "reopen")
+    return in_dialogue
+
+def analyze_text_structure(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split a text into narrative and dialogue elements.
+
+    Quote marks are dropped, element text is stripped and newlines are replaced by two
+    spaces. Consecutive narrative elements (around empty quotes or stray marks) are
+    merged with a space. Text after an unclosed quote reads as narrative.
+
+    Returns:
+        {"elements": [{"type", "content", "start", "end"}, ...]}, where start and end
+        are the character offsets in text of the element's first and last character + 1
+    """
+    # Text between quote marks alternates with the marks themselves; the last piece
+    # has no mark after it
+    parts = _quote_pattern(text).split(text)
+    marks = parts[1::2]
+    marks.append("")
+    elements: List[Dict[str, Any]] = []
+    narrative: List[str] = []
+    narrative_start = narrative_end = 0
+    in_dialogue = False
+    position = 0
+
+    for piece, mark in zip(parts[0::2], marks):
+        unindented = piece.lstrip()
+        content = unindented.rstrip()
+        if content:
+            start = position + len(piece) - len(unindented)
+            end = start + len(content)
+            # Text after an unclosed quote reads as narrative
+            if in_dialogue and mark:
+                if narrative:
+                    elements.append({"type": "narrative", "content": " ".join(narrative).replace("\n", "  "), "start": narrative_start, "end": narrative_end})
+                    narrative = []
+                elements.append({"type": "dialogue", "content": content.replace("\n", "  "), "start": start, "end": end})
+            else:
+                if not narrative:
+                    narrative_start = start
+                narrative.append(content)
+                narrative_end = end
+        position += len(piece) + 1
+        if mark == TOGGLE_QUOTES:
+            in_dialogue = not in_dialogue
+        elif mark:
+            in_dialogue = mark in OPENING_QUOTES
+
+    if narrative:
+        elements.append({"type": "narrative", "content": " ".join(narrative).replace("\n", "  "), "start": narrative_start, "end": narrative_end})
+    return {"elements": elements}
@@ -1,6 +1,6 @@
 import os
-import time
 import asyncio
+import weakref
 from typing import Dict, Any, Optional, List, Tuple
 from sqlalchemy.orm import Session
 
@@ -10,6 +10,8 @@ from db import crud, models
 from db.session_manager import managed_db_session
 from utils.timing import time_it
 from services.clients import ClientFactory
+from services.retry import retry_with_backoff
+from services.voice_library import DESCRIPTION_LIMIT, description_hash, library_voice_name, normalize_description
 
 # Import the Hume SDK client
 from hume.tts import PostedUtterance
@@ -19,139 +21,201 @@ logger = get_logger(__name__)
 
 # Maximum number of retries for API calls
 MAX_RETRIES = 3
-# Delay between retries in seconds
+# Delay before the first retry in seconds (doubled per attempt, jittered)
 RETRY_DELAY = 1
 
 @time_it("generate_character_voice")
 async def generate_character_voice(
     character_id: int, 
     character_name: str, 
-    character_description: str,
+    character_description: Optional[str],
     character_intro_text: str,
     text_id: int,
-    force_regenerate: bool = False
+    force_regenerate: bool = False,
+    use_library: bool = True,
+    require_segments: bool = True
 ) -> Optional[str]:
     """
     Generate and save a voice for a character using Hume AI.
-    Only generates voices for characters that have assigned segments.
-    If force_regenerate is True, deletes existing voice before creating new one.
+    Only generates voices for characters that have assigned segments, unless
+    require_segments is False (pipelined analysis voices characters before
+    segmentation has finished).
+    
+    Voices are shared across texts through the voice library (services/voice_library.py):
+    a character whose normalized description already has a library voice reuses it
+    without calling Hume; otherwise the new voice is added to the library.
+    
+    If force_regenerate is True, deletes the character's text-specific voice
+    ([name]_[text_id]) and creates a new one, bypassing the library. use_library=False
+    and characters without a description also get a text-specific voice.
     """
     with managed_db_session() as db:
         # Check if character has any segments
         segments = db.query(models.TextSegment).filter(models.TextSegment.character_id == character_id).all()
-        if not segments:
+        if not segments and require_segments:
             logger.info(f"Skipping voice generation for character {character_id} ({character_name}) - no assigned segments")
             return None
+        
+        # Get current character to check if voice already exists
+        character = crud.get_character(db, character_id)
+        existing_voice_id = character.provider_id if character else None
+    
+    if existing_voice_id and not force_regenerate:
+        logger.info(f"Character {character_name} already has voice {existing_voice_id}, skipping generation")
+        return existing_voice_id
     
     # Initialize the Hume SDK client
     hume_client = ClientFactory.get_hume_async_client()
     
-    # Step 2: Save the generated voice with naming format [name]_[text_id]
-    voice_name = f"{character_name}_{text_id}"
+    # Characters without a description have nothing to match in the library
+    if force_regenerate or not use_library or not normalize_description(character_description):
+        # Text-specific voice with naming format [name]_[text_id]
+        voice_name = f"{character_name}_{text_id}"
+        
+        # If force_regenerate is True, delete existing voice first
+        if force_regenerate:
+            try:
+                logger.info(f"Force regenerate enabled - deleting existing voice '{voice_name}' if it exists")
+                await hume_client.tts.voices.delete(name=voice_name)
+                logger.info(f"Successfully deleted existing voice '{voice_name}'")
+            except Exception as e:
+                # Voice might not exist or delete failed - continue with generation
+                logger.info(f"Could not delete voice '{voice_name}' (might not exist): {str(e)}")
+        
+        voice_id = await _create_voice(hume_client, voice_name, character_name, character_description, character_intro_text, character_id, text_id, owner_text_id=text_id)
+    else:
+        key = description_hash(character_description)
+        # Characters with the same description generated concurrently share one new voice
+        lock = _library_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            voice_id = await asyncio.to_thread(_reuse_library_voice, key)
+            if voice_id:
+                logger.info(f"Reusing library voice {voice_id} for character {character_name}")
+            else:
+                voice_name = library_voice_name(key)
+                voice_id = await _create_voice(hume_client, voice_name, character_name, character_description, character_intro_text, character_id, text_id, owner_text_id=None)
+                with managed_db_session() as db:
+                    crud.save_library_voice(db, key, voice_id, voice_name, description=character_description)
     
-    # If force_regenerate is True, delete existing voice first
-    if force_regenerate:
-        try:
-            logger.info(f"Force regenerate enabled - deleting existing voice '{voice_name}' if it exists")
-            await hume_client.tts.voices.delete(name=voice_name)
-            logger.info(f"Successfully deleted existing voice '{voice_name}'")
-        except Exception as e:
-            # Voice might not exist or delete failed - continue with generation
-            logger.info(f"Could not delete voice '{voice_name}' (might not exist): {str(e)}")
+    # Save provider_id and provider to the database
+    with managed_db_session() as db:
+        crud.update_character_voice(db, character_id, voice_id, provider="HUME")
+    return voice_id
+
+# Per-description locks, dropped once no generation holds them
+_library_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _reuse_library_voice(key: str) -> Optional[str]:
+    """Voice ID of the library voice for a description hash, counting the reuse"""
+    with managed_db_session() as db:
+        entry = crud.get_library_voice(db, key)
+        if not entry:
+            return None
+        crud.touch_library_voice(db, key)
+        return entry.voice_id
+
+async def _create_voice(
+    hume_client,
+    voice_name: str,
+    character_name: str,
+    character_description: Optional[str],
+    character_intro_text: str,
+    character_id: int,
+    text_id: int,
+    owner_text_id: Optional[int]
+) -> str:
+    """
+    Synthesize a sample for the description and save it as a Hume voice; returns the voice ID.
     
-        # Get current character to check if voice already exists
-        character = crud.get_character(db, character_id)
-        if character and character.provider_id and not force_regenerate:
-            logger.info(f"Character {character_name} already has voice {character.provider_id}, skipping generation")
-            return character.provider_id
+    The voice is recorded in the provider voice index (owned by owner_text_id, or by no
+    text for library voices) so it can be deleted without listing the account.
+    Characters without a description are described to the provider by their name.
+    """
+    character_description = character_description or f"Character named {character_name}"
     
-    retry_count = 0
-    while retry_count < MAX_RETRIES:
-        try:
-            # Step 1: Generate speech to obtain generation_id
-            tts_stream = hume_client.tts.synthesize_json_streaming(
-                utterances=[
-                    PostedUtterance(
-                        text=character_intro_text,
-                        description=character_description[:200]
-                    )
-                ]
-            )
-            
-            generation_id = None
-            chunk_count = 0
-            async for chunk in tts_stream:
-                chunk_count += 1
-                # Check if chunk has generation_id attribute and it's not empty
-                if hasattr(chunk, "generation_id") and chunk.generation_id:
-                    generation_id = chunk.generation_id
-                    logger.info(f"Found generation_id: {generation_id}")
-                    break
+    async def attempt() -> str:
+        # Step 1: Generate speech to obtain generation_id
+        tts_stream = hume_client.tts.synthesize_json_streaming(
+            utterances=[
+                PostedUtterance(
+                    text=character_intro_text,
+                    description=character_description[:DESCRIPTION_LIMIT]
+                )
+            ]
+        )
+        
+        generation_id = None
+        chunk_count = 0
+        async for chunk in tts_stream:
+            chunk_count += 1
+            # Check if chunk has generation_id attribute and it's not empty
+            if hasattr(chunk, "generation_id") and chunk.generation_id:
+                generation_id = chunk.generation_id
+                logger.info(f"Found generation_id: {generation_id}")
+                break
 
-            if not generation_id:
-                # If no chunks were received, the content might be filtered. Try with fallback text.
-                if chunk_count == 0:
-                    logger.warning(f"No chunks received for character {character_name}, trying fallback text")
-                    fallback_text = f"Hello, I am {character_name}."
-                    fallback_stream = hume_client.tts.synthesize_json_streaming(
-                        utterances=[
-                            PostedUtterance(
-                                text=fallback_text,
-                                description=f"Character named {character_name}"
-                            )
-                        ]
-                    )
-                    
-                    async for chunk in fallback_stream:
-                        if hasattr(chunk, "generation_id") and chunk.generation_id:
-                            generation_id = chunk.generation_id
-                            logger.info(f"Found generation_id with fallback text: {generation_id}")
-                            break
+        if not generation_id:
+            # If no chunks were received, the content might be filtered. Try with fallback text.
+            if chunk_count == 0:
+                logger.warning(f"No chunks received for character {character_name}, trying fallback text")
+                fallback_text = f"Hello, I am {character_name}."
+                fallback_stream = hume_client.tts.synthesize_json_streaming(
+                    utterances=[
+                        PostedUtterance(
+                            text=fallback_text,
+                            description=f"Character named {character_name}"
+                        )
+                    ]
+                )
                 
-                if not generation_id:
-                    raise ValueError("Missing 'generation_id' in API response stream")
-
-            # Step 2: Save the generated voice (voice_name already defined above)
-            save_response = await hume_client.tts.voices.create(
-                name=voice_name,
-                generation_id=generation_id
-            )
+                async for chunk in fallback_stream:
+                    if hasattr(chunk, "generation_id") and chunk.generation_id:
+                        generation_id = chunk.generation_id
+                        logger.info(f"Found generation_id with fallback text: {generation_id}")
+                        break
             
-            # Get the voice ID from the response
-            voice_id = save_response.id
+            if not generation_id:
+                raise ValueError("Missing 'generation_id' in API response stream")
 
-            # Save provider_id and provider to the database
-            with managed_db_session() as db:
-                crud.update_character_voice(db, character_id, voice_id, provider="HUME")
-            logger.info(f"Successfully created voice {voice_id} for character {character_name}")
-            return voice_id
-            
-        except Exception as e:
-            retry_count += 1
-            # Log the attempt
-            logger.warning(f"Voice generation attempt {retry_count} failed: {str(e)}")
-            
-            if retry_count >= MAX_RETRIES:
-                # Log error with context after all retries have failed
-                error_context = {
-                    "operation": "voice_generation", 
-                    "character_id": character_id, 
-                    "text_id": text_id,
-                    "attempts": retry_count
-                }
-                logger.error(f"Character voice generation failed after {retry_count} attempts: {str(e)}", exc_info=True)
-                raise
-                
-            # Wait before retrying
-            time.sleep(RETRY_DELAY)
+        # Step 2: Save the generated voice
+        save_response = await hume_client.tts.voices.create(
+            name=voice_name,
+            generation_id=generation_id
+        )
+        
+        # Get the voice ID from the response
+        voice_id = save_response.id
+        with managed_db_session() as db:
+            crud.record_provider_voice(db, voice_id, voice_name, text_id=owner_text_id)
+        logger.info(f"Successfully created voice {voice_id} ('{voice_name}') for character {character_name}")
+        return voice_id
+
+    try:
+        return await retry_with_backoff(
+            attempt,
+            attempts=MAX_RETRIES,
+            base_delay=RETRY_DELAY,
+            log=logger,
+            description=f"Voice generation for {character_name}"
+        )
+    except Exception as e:
+        logger.error(
+            f"Character voice generation failed after {MAX_RETRIES} attempts "
+            f"(character_id={character_id}, text_id={text_id}): {str(e)}",
+            exc_info=True
+        )
+        raise
 
 @time_it("parallel_voice_generation")
-async def generate_all_character_voices_parallel(text_id: int) -> List[Tuple[int, Optional[str]]]:
+async def generate_all_character_voices_parallel(text_id: int, require_segments: bool = True) -> List[Tuple[int, Optional[str]]]:
     """
     Generate voices for all characters of a text in parallel.
     
     Args:
         text_id: ID of the text to generate voices for
+        require_segments: Only voice characters with assigned segments; with False,
+            voices every character phase 1 did not mark as non-speaking (for
+            pipelined analysis, before segments exist)
         
     Returns:
         List of tuples (character_id, voice_id_or_none) for each character
@@ -173,23 +237,27 @@ async def generate_all_character_voices_parallel(text_id: int) -> List[Tuple[int
         
         for character in characters:
             # Only create tasks for speaking characters with segments
-            segments = db.query(models.TextSegment).filter(models.TextSegment.character_id == character.id).all()
-            if not segments:
+            if not require_segments:
+                if character.speaking is False:
+                    logger.info(f"Skipping character {character.id} ({character.name}) - not speaking")
+                    continue
+            elif not db.query(models.TextSegment).filter(models.TextSegment.character_id == character.id).first():
                 logger.info(f"Skipping character {character.id} ({character.name}) - no assigned segments")
                 continue
                 
-            character_info.append(character)
+            character_info.append((character.id, character.name))
             task = generate_character_voice(
                 character_id=character.id,
                 character_name=character.name,
-                character_description=character.description or f"Character named {character.name}",
+                character_description=character.description,
                 character_intro_text=character.intro_text or f"Hello, I am {character.name}.",
-                text_id=text_id
+                text_id=text_id,
+                require_segments=require_segments
             )
             voice_tasks.append(task)
     
     if not voice_tasks:
-        logger.warning(f"No characters with segments found for text {text_id}")
+        logger.warning(f"No characters to voice found for text {text_id}")
         return []
     
     logger.info(f"Starting parallel generation of {len(voice_tasks)} character voices")
@@ -203,18 +271,18 @@ async def generate_all_character_voices_parallel(text_id: int) -> List[Tuple[int
         successful_generations = 0
         failed_generations = 0
         
-        for i, (character, result) in enumerate(zip(character_info, voice_results)):
+        for i, ((character_id, character_name), result) in enumerate(zip(character_info, voice_results)):
             if isinstance(result, Exception):
-                logger.error(f"Voice generation failed for character {character.id} ({character.name}): {result}")
-                results.append((character.id, None))
+                logger.error(f"Voice generation failed for character {character_id} ({character_name}): {result}")
+                results.append((character_id, None))
                 failed_generations += 1
             else:
                 if result:
-                    logger.info(f"Successfully generated voice for character {character.id} ({character.name}): {result}")
+                    logger.info(f"Successfully generated voice for character {character_id} ({character_name}): {result}")
                     successful_generations += 1
                 else:
-                    logger.info(f"Voice generation skipped for character {character.id} ({character.name})")
-                results.append((character.id, result))
+                    logger.info(f"Voice generation skipped for character {character_id} ({character_name})")
+                results.append((character_id, result))
         
         logger.info(f"Parallel voice generation completed for text {text_id}: {successful_generations} successful, {failed_generations} failed")
         return results
@@ -0,0 +1,197 @@
+"""
+Local index of voices saved at Hume (ProviderVoice rows).
+
+Voice generation records every voice it saves, so a text's voices are deleted by name
+straight from the index. reconcile_provider_voices repairs drift between the index and
+the Hume account; the API process runs it periodically (run_voice_reconciliation).
+"""
+
+import asyncio
+import re
+from typing import Dict, List, Optional
+
+from utils.config import settings
+from utils.logging import get_logger
+from db import crud
+from db.session_manager import managed_db_session, unit_of_work
+from services.clients import ClientFactory
+
+logger = get_logger(__name__)
+
+# Names voice generation saves voices under: library voices and [name]_[text_id]
+_LIBRARY_NAME = re.compile(r"^library_[0-9a-f]{16}$")
+_TEXT_VOICE_NAME = re.compile(r"^.+_(\d+)$")
+
+def _is_not_found(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 404
+
+async def delete_text_voices(text_id: int) -> int:
+    """
+    Delete the Hume voices created for a text, as recorded in the index.
+
+    Voices already gone at Hume are dropped from the index as well. Voices shared
+    through the voice library are not owned by a text and are never deleted here.
+
+    Args:
+        text_id: Text ID
+
+    Returns:
+        Number of voices removed
+    """
+    with managed_db_session() as db:
+        voices = [(voice.voice_id, voice.name) for voice in crud.get_provider_voices_by_text(db, text_id)]
+    if not voices:
+        logger.info(f"No recorded voices for text_id {text_id}")
+        return 0
+
+    deleted = await _delete_voices(voices, "text reanalysis")
+    logger.info(f"Deleted {len(deleted)} of {len(voices)} voice(s) for text_id {text_id}")
+    return len(deleted)
+
+async def drop_unused_character_voices(text_id: int) -> int:
+    """
+    Clear the voices of a text's characters that ended up without segments.
+
+    Pipelined analysis voices characters before segmentation finishes, so some
+    voices may turn out to be unused. Voices created for the text are deleted at
+    Hume and from the index; library voices are shared and only unassigned.
+
+    Args:
+        text_id: Text ID
+
+    Returns:
+        Number of characters whose voice was cleared
+    """
+    with managed_db_session() as db:
+        unused = crud.get_voiced_characters_without_segments(db, text_id)
+        if not unused:
+            return 0
+        unused_ids = {character.id for character in unused}
+        still_used = {
+            character.provider_id for character in crud.get_characters_by_text(db, text_id)
+            if character.id not in unused_ids and character.provider_id
+        }
+        unused_voices = {character.provider_id for character in unused} - still_used
+        voices = [
+            (voice.voice_id, voice.name) for voice in crud.get_provider_voices_by_text(db, text_id)
+            if voice.voice_id in unused_voices
+        ]
+        crud.clear_character_voices(db, list(unused_ids))
+
+    deleted = await _delete_voices(voices, "character without segments") if voices else []
+    logger.info(f"Cleared {len(unused_ids)} unused character voice(s) for text_id {text_id}, deleted {len(deleted)}")
+    return len(unused_ids)
+
+async def _delete_voices(voices: List[tuple], reason: str) -> List[str]:
+    """
+    Delete (voice_id, name) voices at Hume, concurrently, and drop them from the index.
+
+    Voices already gone at Hume count as deleted.
+
+    Returns:
+        IDs of the deleted voices
+    """
+    hume_client = ClientFactory.get_hume_async_client()
+
+    async def delete(name: str) -> bool:
+        try:
+            logger.info(f"Deleting voice '{name}' ({reason})")
+            await hume_client.tts.voices.delete(name=name)
+            return True
+        except Exception as e:
+            if _is_not_found(e):
+                return True
+            logger.warning(f"Failed to delete voice '{name}': {str(e)}")
+            return False
+
+    results = await asyncio.gather(*(delete(name) for _, name in voices))
+    deleted = [voice_id for (voice_id, _), ok in zip(voices, results) if ok]
+    with managed_db_session() as db:
+        crud.delete_provider_voices(db, deleted)
+    return deleted
+
+async def reconcile_provider_voices(delete_orphans: Optional[bool] = None) -> Dict[str, int]:
+    """
+    Bring the voice index in line with the Hume account.
+
+    - Recorded voices missing at Hume are dropped from the index, and characters and
+      library entries using them are cleared so their voices are generated again.
+    - Voices at Hume that follow our naming but are not recorded are added to the index
+      (per-text voices under the text in their name, so reanalysis deletes them).
+    - With delete_orphans, such untracked voices of texts that no longer exist are
+      deleted instead.
+
+    Args:
+        delete_orphans: Delete untracked voices of deleted texts (defaults to the
+            VOICE_RECONCILE_DELETE_ORPHANS setting)
+
+    Returns:
+        Counts of "missing", "recorded" and "deleted" voices
+    """
+    if delete_orphans is None:
+        delete_orphans = settings.VOICE_RECONCILE_DELETE_ORPHANS
+
+    # Snapshot the index before listing the account: voices are recorded after they are
+    # saved at Hume, so every voice in the snapshot is in the listing unless it is gone.
+    # Voices recorded while the account is listed are left for the next run.
+    with managed_db_session() as db:
+        local = {voice.voice_id for voice in crud.get_all_provider_voices(db)}
+
+    hume_client = ClientFactory.get_hume_async_client()
+    remote: Dict[str, str] = {}
+    async for voice in await hume_client.tts.voices.list(provider="CUSTOM_VOICE"):
+        if getattr(voice, "id", None) and getattr(voice, "name", None):
+            remote[voice.id] = voice.name
+
+    missing = [voice_id for voice_id in local if voice_id not in remote]
+    untracked = {voice_id: name for voice_id, name in remote.items() if voice_id not in local}
+
+    to_record: List[tuple] = []
+    orphans: List[tuple] = []
+    with managed_db_session() as db:
+        for voice_id, name in untracked.items():
+            if _LIBRARY_NAME.match(name):
+                to_record.append((voice_id, name, None))
+                continue
+            match = _TEXT_VOICE_NAME.match(name)
+            if not match:
+                continue  # Not created by voice generation
+            text_id = int(match.group(1))
+            if delete_orphans and crud.get_text(db, text_id) is None:
+                orphans.append((voice_id, name))
+            else:
+                to_record.append((voice_id, name, text_id))
+
+    deleted = 0
+    if orphans:
+        async def delete(name: str) -> bool:
+            try:
+                await hume_client.tts.voices.delete(name=name)
+                return True
+            except Exception as e:
+                logger.warning(f"Failed to delete orphaned voice '{name}': {str(e)}")
+                return False
+        deleted = sum(await asyncio.gather(*(delete(name) for _, name in orphans)))
+
+    with managed_db_session() as db, unit_of_work(db):
+        if missing:
+            cleared = crud.forget_voice_references(db, missing)
+            crud.delete_provider_voices(db, missing)
+            logger.warning(f"{len(missing)} recorded voice(s) no longer exist at Hume; cleared {cleared} character voice(s)")
+        for voice_id, name, text_id in to_record:
+            crud.record_provider_voice(db, voice_id, name, text_id=text_id)
+
+    counts = {"missing": len(missing), "recorded": len(to_record), "deleted": deleted}
+    logger.info(f"Voice reconciliation: {counts} ({len(remote)} voices at Hume, {len(local)} recorded)")
+    return counts
+
+async def run_voice_reconciliation(interval_minutes: int) -> None:
+    """Reconcile the voice index every interval_minutes until cancelled"""
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            await reconcile_provider_voices()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Voice reconciliation failed: {str(e)}")
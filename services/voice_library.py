@@ -0,0 +1,33 @@
+"""
+Voice library shared across texts (VoiceLibraryEntry rows).
+
+Voices are keyed by a hash of the normalized character description, so characters with
+a matching description reuse one voice. Library voices are saved at the provider under a
+name derived from the hash, so reanalysis of a text leaves them in place.
+"""
+
+import hashlib
+import re
+from typing import Optional
+
+# Bump when voice generation changes in a way that makes existing voices unsuitable
+LIBRARY_VERSION = 1
+
+# Characters of the description sent to the provider (see voice_generation)
+DESCRIPTION_LIMIT = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_description(description: Optional[str]) -> str:
+    """The description as the provider receives it, ignoring case, spacing and trailing punctuation"""
+    text = (description or "")[:DESCRIPTION_LIMIT]
+    return _WHITESPACE.sub(" ", text).strip().rstrip(".!").strip().lower()
+
+def description_hash(description: Optional[str]) -> str:
+    """Library key for a voice description"""
+    payload = f"v{LIBRARY_VERSION}:{normalize_description(description)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def library_voice_name(key: str) -> str:
+    """Provider-side name of a library voice"""
+    return f"library_{key[:16]}"
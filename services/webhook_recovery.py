@@ -40,7 +40,7 @@ async def check_and_recover_missing_audio(text_id: int) -> Dict[str, Any]:
     try:
         # Check background music
         text = crud.get_text(db, text_id)
-        if text and text.background_music_prompt and not text.background_music_audio_b64:
+        if text and text.background_music_prompt and not text.background_music_audio_hash:
             logger.info(f"Background music missing for text {text_id}, attempting recovery...")
             bg_recovered = await recover_background_music(text_id)
             recovery_results["background_music_recovered"] = bg_recovered
@@ -54,7 +54,7 @@ async def check_and_recover_missing_audio(text_id: int) -> Dict[str, Any]:
         recovery_results["total_sound_effects"] = len(sound_effects)
         
         for effect in sound_effects:
-            if not effect.audio_data_b64:
+            if not effect.audio_hash:
                 logger.info(f"Sound effect '{effect.effect_name}' (ID: {effect.id}) missing audio, attempting recovery...")
                 sfx_recovered = await recover_sound_effect(effect.id)
                 if sfx_recovered:
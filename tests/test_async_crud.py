@@ -0,0 +1,88 @@
+"""
+Tests for the async engine and async CRUD used by the webhook, status and text endpoints.
+"""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from api.main import app
+from db import async_crud, crud, models
+from db.async_database import AsyncSessionLocal, to_async_url
+
+client = TestClient(app)
+
+@pytest.fixture
+def text_id(db_session):
+    db_text = crud.create_text(db_session, content=f"Async CRUD test text. {uuid.uuid4().hex}", title="Async Test")
+    character = crud.create_character(db_session, text_id=db_text.id, name="Narrator")
+    segment = crud.create_text_segment(db_session, text_id=db_text.id, character_id=character.id, text="One.", sequence=1)
+    crud.update_segment_audio_data(db_session, segment.id, "a" * 64, 2048, 1.25)
+    text_id = db_text.id
+    yield text_id
+
+    db_session.rollback()
+    crud.delete_segments_by_text(db_session, text_id)
+    crud.delete_characters_by_text(db_session, text_id)
+    db_session.query(models.Text).filter(models.Text.id == text_id).delete()
+    db_session.commit()
+
+def test_to_async_url():
+    assert to_async_url("sqlite:////tmp/narratix.db") == "sqlite+aiosqlite:////tmp/narratix.db"
+    assert to_async_url("postgresql://user:pw@host/db?sslmode=require&channel_binding=require") == \
+        "postgresql+asyncpg://user:pw@host/db"
+    assert to_async_url("postgresql+psycopg2://user:pw@host:5432/db") == "postgresql+asyncpg://user:pw@host:5432/db"
+
+@pytest.mark.asyncio
+async def test_async_reads_match_sync(db_session, text_id):
+    async with AsyncSessionLocal() as db:
+        summary = await async_crud.get_text_summary(db, text_id)
+        summary_unloaded = set(inspect(summary).unloaded)
+        db_text = await async_crud.get_text(db, text_id)
+        segments = await async_crud.get_segment_summaries_by_text(db, text_id)
+        has_timestamps = await async_crud.has_word_timestamps(db, text_id)
+        current = await async_crud.is_force_alignment_current(db, text_id)
+        missing = await async_crud.get_text(db, -1)
+
+    assert db_text.content == crud.get_text(db_session, text_id).content
+    assert "content" in summary_unloaded
+    assert [segment.has_audio for segment in segments] == [True]
+    assert has_timestamps is False
+    assert current is False
+    assert missing is None
+
+@pytest.mark.asyncio
+async def test_async_create_and_lookup_by_content(db_session):
+    content = f"Created through AsyncSession. {uuid.uuid4().hex}"
+    try:
+        async with AsyncSessionLocal() as db:
+            db_text = await async_crud.create_text(db, content, "Async Created")
+            found = await async_crud.get_text_by_content(db, content)
+
+        assert found.id == db_text.id
+        assert db_text.content_sha256 == crud.compute_content_hash(content)
+        assert crud.get_text(db_session, db_text.id).title == "Async Created"
+    finally:
+        db_session.query(models.Text).filter(
+            models.Text.content_sha256 == crud.compute_content_hash(content)
+        ).delete()
+        db_session.commit()
+
+def test_text_and_status_endpoints(text_id):
+    response = client.get(f"/api/text/{text_id}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Async Test"
+
+    response = client.get(f"/api/export/{text_id}/status")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "speech_ready"
+    assert data["data"]["segments_with_audio"] == 1
+
+    response = client.get(f"/api/background-music/{text_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "not_generated"
+
+    assert client.get("/api/text/-1").status_code == 404
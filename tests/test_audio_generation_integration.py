@@ -2,7 +2,6 @@ import pytest
 import os
 import uuid
 from datetime import datetime
-import base64
 
 from utils.logging import SessionLogger
 SessionLogger.start_session(f"test_speech_generation_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
@@ -11,6 +10,7 @@ from db import models, crud
 from utils.config import settings
 from services.speech_generation import generate_text_audio
 from services.combine_export_audio import combine_speech_segments
+from services.blob_store import get_blob_store
 
 # Skip the test if HUME_API_KEY is not available or invalid
 if not settings.HUME_API_KEY or len(settings.HUME_API_KEY) < 10:
@@ -25,7 +25,8 @@ WOMAN_VOICE_ID = "bd59eb6c-4d73-402c-8537-a69a8e147ab5"
 @pytest.fixture
 def test_text(db_session):
     """Create a test text entry in the database"""
-    text_content = "This is a test text for audio generation integration testing."
+    # Unique content: texts are de-duplicated by content hash and kept for inspection
+    text_content = f"This is a test text for audio generation integration testing ({uuid.uuid4().hex[:6]})."
     db_text = crud.create_text(db_session, content=text_content, title="Audio Test Text")
     yield db_text
     # No cleanup needed as we keep the data for inspection
@@ -114,7 +115,7 @@ async def test_generate_text_audio(db_session, test_text, test_male_character, t
     
     # Verify initial state
     for segment in segments:
-        assert segment.audio_data_b64 is None
+        assert segment.audio_hash is None
     
     # Generate audio using REAL API call
     success = await generate_text_audio(db=db_session, text_id=test_text.id)
@@ -133,18 +134,16 @@ async def test_generate_text_audio(db_session, test_text, test_male_character, t
     
     # Verify each segment has audio data
     for segment in refreshed_segments:
-        # Check if audio_data_b64 exists and is not None or empty
-        print(f"Segment {segment.id} retrieved audio_data_b64: '{segment.audio_data_b64}'")
-        assert segment.audio_data_b64 is not None, f"Segment {segment.id} has NULL audio_data_b64"
-        assert segment.audio_data_b64 != "", f"Segment {segment.id} has empty audio_data_b64"
+        # Check the segment references a stored audio blob
+        print(f"Segment {segment.id} retrieved audio_hash: '{segment.audio_hash}'")
+        assert segment.audio_hash, f"Segment {segment.id} has no audio_hash"
         
-        # Verify audio data is a valid base64 string with reasonable size
-        try:
-            audio_bytes = base64.b64decode(segment.audio_data_b64)
-            assert len(audio_bytes) > 1000, f"Audio data for segment {segment.id} is too small: {len(audio_bytes)} bytes"
-            print(f"Segment {segment.id} audio data size: {len(audio_bytes)} bytes")
-        except Exception as e:
-            assert False, f"Failed to decode base64 for segment {segment.id}: {str(e)}"
+        # Verify the blob exists in the store with reasonable size
+        audio_bytes = get_blob_store().get(segment.audio_hash)
+        assert audio_bytes is not None, f"Audio blob for segment {segment.id} is missing from storage"
+        assert len(audio_bytes) > 1000, f"Audio data for segment {segment.id} is too small: {len(audio_bytes)} bytes"
+        assert segment.audio_size == len(audio_bytes)
+        print(f"Segment {segment.id} audio data size: {len(audio_bytes)} bytes")
     
     print(f"Successfully generated audio data for {len(segments)} segments")
 
@@ -6,7 +6,7 @@ from datetime import datetime
 import tempfile
 import shutil
 import subprocess
-import base64
+from services.blob_store import get_blob_store
 
 # Add the project root to the Python path
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -148,19 +148,17 @@ async def test_generate_background_music(db_session, test_text, test_segment):
     # Verify music was generated and stored
     assert success is True, "Background music generation should succeed"
     
-    # Verify the base64 data was stored
+    # Verify the audio blob was stored
     db_session.refresh(test_text)
-    assert test_text.background_music_audio_b64 is not None, "Background music should be stored in DB"
-    assert len(test_text.background_music_audio_b64) > 1000, "Background music data should have reasonable size"
+    assert test_text.background_music_audio_hash is not None, "Background music should be stored"
+    assert test_text.background_music_audio_size > 1000, "Background music data should have reasonable size"
     
-    # Try to decode the base64 to ensure it's valid
-    try:
-        audio_bytes = base64.b64decode(test_text.background_music_audio_b64)
-        assert len(audio_bytes) > 1000, "Decoded audio data should have reasonable size"
-    except Exception as e:
-        pytest.fail(f"Failed to decode base64 audio data: {str(e)}")
+    # Load the blob to ensure it's retrievable
+    audio_bytes = get_blob_store().get(test_text.background_music_audio_hash)
+    assert audio_bytes is not None, "Background music blob should exist in storage"
+    assert len(audio_bytes) == test_text.background_music_audio_size
     
-    print(f"Generated background music: {len(test_text.background_music_audio_b64)} bytes of base64 data")
+    print(f"Generated background music: {test_text.background_music_audio_size} bytes")
 
 @pytest.mark.integration
 def test_end_to_end_process(db_session, test_text, test_segment):
@@ -175,12 +173,12 @@ def test_end_to_end_process(db_session, test_text, test_segment):
     
     # Verify data was stored in the database
     db_session.refresh(test_text)
-    assert test_text.background_music_audio_b64 is not None, "Background music should be stored in DB"
-    assert len(test_text.background_music_audio_b64) > 1000, "Background music data should have reasonable size"
+    assert test_text.background_music_audio_hash is not None, "Background music should be stored"
+    assert test_text.background_music_audio_size > 1000, "Background music data should have reasonable size"
     
     print(f"Successfully processed background music:")
     print(f"Prompt: {prompt}")
-    print(f"Music in DB: {len(test_text.background_music_audio_b64)} bytes of base64 data")
+    print(f"Music in storage: {test_text.background_music_audio_size} bytes")
 
 # Add this at the end of the file
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Unit tests for the content-addressed audio blob store.
+"""
+
+import base64
+import hashlib
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from services.blob_store import (
+    AudioBlob,
+    LocalBlobStore,
+    R2BlobStore,
+    compute_blob_hash,
+    get_blob_store,
+    reset_blob_store
+)
+
+class TestLocalBlobStore:
+    """Test the filesystem backend."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return LocalBlobStore(str(tmp_path / "blobs"))
+
+    def test_put_returns_content_hash(self, store):
+        key = store.put(b"audio bytes")
+
+        assert key == hashlib.sha256(b"audio bytes").hexdigest()
+        assert store.exists(key)
+        assert store.get(key) == b"audio bytes"
+
+    def test_put_fans_out_by_hash_prefix(self, store):
+        key = store.put(b"audio bytes")
+
+        assert os.path.isfile(os.path.join(store.root, key[:2], key[2:4], key))
+
+    def test_identical_content_is_written_once(self, store):
+        first = store.put(b"same")
+        with patch.object(store, '_write') as mock_write:
+            second = store.put(b"same")
+
+        assert first == second
+        mock_write.assert_not_called()
+
+    def test_get_missing_or_empty_key(self, store):
+        assert store.get(None) is None
+        assert store.get("") is None
+        assert store.get(compute_blob_hash(b"never stored")) is None
+
+    def test_delete(self, store):
+        key = store.put(b"temporary")
+
+        assert store.delete(key) is True
+        assert not store.exists(key)
+        assert store.delete(key) is False
+
+    def test_put_raises_when_write_fails(self, store):
+        with patch.object(store, '_write', return_value=False):
+            with pytest.raises(IOError):
+                store.put(b"data")
+
+    def test_failed_write_leaves_no_temp_file(self, store):
+        key = compute_blob_hash(b"data")
+        with patch('services.blob_store.os.replace', side_effect=OSError("disk full")):
+            with pytest.raises(IOError):
+                store.put(b"data")
+
+        assert os.listdir(os.path.dirname(store.path_for(key))) == []
+
+    @patch('services.blob_store.probe_audio_duration', return_value=1.5)
+    def test_put_audio_accepts_base64(self, mock_probe, store):
+        audio = b"fake_mp3_data"
+        blob = store.put_audio(base64.b64encode(audio).decode())
+
+        assert blob == AudioBlob(hash=compute_blob_hash(audio), size=len(audio), duration=1.5)
+        assert store.get(blob.hash) == audio
+        assert store.get_audio_b64(blob.hash) == base64.b64encode(audio).decode()
+
+class TestR2BlobStore:
+    """Test the R2 backend delegates to R2StorageService."""
+
+    def test_put_uploads_under_prefix(self):
+        storage = Mock()
+        storage.object_exists.return_value = False
+        storage.upload_bytes.return_value = True
+        store = R2BlobStore(storage=storage, prefix="audio/")
+
+        key = store.put(b"data", "audio/mpeg")
+
+        storage.upload_bytes.assert_called_once_with(b"data", f"audio/{key}", "audio/mpeg")
+
+    def test_put_skips_existing_object(self):
+        storage = Mock()
+        storage.object_exists.return_value = True
+        store = R2BlobStore(storage=storage)
+
+        store.put(b"data")
+
+        storage.upload_bytes.assert_not_called()
+
+    def test_get_downloads_object(self):
+        storage = Mock()
+        storage.download_bytes.return_value = b"data"
+        store = R2BlobStore(storage=storage, prefix="audio/")
+
+        assert store.get("abc") == b"data"
+        storage.download_bytes.assert_called_once_with("audio/abc")
+
+class TestGetBlobStore:
+    """Test backend selection from settings."""
+
+    def teardown_method(self):
+        reset_blob_store()
+
+    def test_local_backend(self, tmp_path):
+        reset_blob_store()
+        with patch('services.blob_store.settings') as mock_settings:
+            mock_settings.AUDIO_BLOB_BACKEND = "local"
+            mock_settings.AUDIO_STORAGE_PATH = str(tmp_path)
+            store = get_blob_store()
+
+        assert isinstance(store, LocalBlobStore)
+        assert store.root == os.path.join(str(tmp_path), "blobs")
+        assert get_blob_store() is store
+
+    def test_unknown_backend(self):
+        reset_blob_store()
+        with patch('services.blob_store.settings') as mock_settings:
+            mock_settings.AUDIO_BLOB_BACKEND = "s3"
+            with pytest.raises(ValueError):
+                get_blob_store()
@@ -0,0 +1,41 @@
+"""
+Tests for bulk character/segment inserts used when persisting text analysis.
+"""
+
+import pytest
+
+from db import models, crud
+
+@pytest.fixture
+def text_id(db_session):
+    db_text = crud.create_text(db_session, content="Bulk insert test text.", title="Bulk Test")
+    text_id = db_text.id
+    yield text_id
+
+    crud.delete_segments_by_text(db_session, text_id)
+    crud.delete_characters_by_text(db_session, text_id)
+    db_session.query(models.Text).filter(models.Text.id == text_id).delete()
+    db_session.commit()
+
+def test_bulk_insert_returns_ids_in_input_order(db_session, text_id):
+    characters = crud.create_characters_bulk(db_session, text_id, [
+        {"name": "Narrator", "is_narrator": True},
+        {"name": "Alice", "speaking": True, "description": "Curious"},
+    ])
+    segments = crud.create_text_segments_bulk(db_session, text_id, [
+        {"character_id": characters[i % 2].id, "text": f"Line {i}", "sequence": i + 1, "speed": 1.0}
+        for i in range(5)
+    ])
+    db_session.commit()
+
+    assert [c.name for c in characters] == ["Narrator", "Alice"]
+    assert all(c.id is not None for c in characters)
+    assert [s.sequence for s in segments] == [1, 2, 3, 4, 5]
+
+    stored = crud.get_segments_by_text(db_session, text_id)
+    assert [s.id for s in stored] == [s.id for s in segments]
+    assert [s.character_id for s in stored] == [characters[i % 2].id for i in range(5)]
+
+def test_bulk_insert_empty(db_session, text_id):
+    assert crud.create_characters_bulk(db_session, text_id, []) == []
+    assert crud.create_text_segments_bulk(db_session, text_id, []) == []
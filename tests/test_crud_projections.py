@@ -0,0 +1,75 @@
+"""
+Tests for projection-aware CRUD queries used by status endpoints.
+"""
+
+import pytest
+from sqlalchemy import inspect
+
+from db import models, crud
+
+@pytest.fixture
+def text_with_audio(db_session):
+    """Text with one voiced and one unvoiced segment, plus a sound effect."""
+    db_text = crud.create_text(db_session, content="A long chapter. " * 100, title="Projection Test")
+    character = crud.create_character(db_session, text_id=db_text.id, name="Narrator")
+    voiced = crud.create_text_segment(db_session, text_id=db_text.id, character_id=character.id, text="One.", sequence=1)
+    crud.create_text_segment(db_session, text_id=db_text.id, character_id=character.id, text="Two.", sequence=2)
+    crud.update_segment_audio_data(db_session, voiced.id, "a" * 64, 2048, 1.25)
+    crud.create_sound_effect(
+        db_session,
+        effect_name="door",
+        text_id=db_text.id,
+        start_word="A",
+        end_word="chapter",
+        prompt="door creak"
+    )
+    text_id = db_text.id
+    db_session.expunge_all()
+    yield text_id
+
+    crud.delete_sound_effects_by_text(db_session, text_id)
+    crud.delete_segments_by_text(db_session, text_id)
+    crud.delete_characters_by_text(db_session, text_id)
+    db_session.query(models.Text).filter(models.Text.id == text_id).delete()
+    db_session.commit()
+
+def test_get_text_summary_defers_heavy_columns(db_session, text_with_audio):
+    db_text = crud.get_text_summary(db_session, text_with_audio)
+
+    unloaded = inspect(db_text).unloaded
+    assert "content" in unloaded
+    assert "word_timestamps_data" in unloaded
+    assert db_text.title == "Projection Test"
+    assert db_text.has_background_music is False
+
+def test_get_segment_summaries_by_text(db_session, text_with_audio):
+    segments = crud.get_segment_summaries_by_text(db_session, text_with_audio)
+
+    assert [segment.sequence for segment in segments] == [1, 2]
+    assert "text" in inspect(segments[0]).unloaded
+    assert [segment.has_audio for segment in segments] == [True, False]
+    assert segments[0].audio_size == 2048
+
+def test_get_sound_effect_summaries_by_text(db_session, text_with_audio):
+    effects = crud.get_sound_effect_summaries_by_text(db_session, text_with_audio)
+
+    assert len(effects) == 1
+    assert "prompt" in inspect(effects[0]).unloaded
+    assert effects[0].has_audio is False
+
+def test_has_audio_expression(db_session, text_with_audio):
+    voiced = db_session.query(models.TextSegment).filter(
+        models.TextSegment.text_id == text_with_audio,
+        models.TextSegment.has_audio
+    ).count()
+
+    assert voiced == 1
+
+def test_has_word_timestamps(db_session, text_with_audio):
+    assert crud.has_word_timestamps(db_session, text_with_audio) is False
+
+    crud.update_text_word_timestamps(db_session, text_with_audio, [{"word": "A", "start": 0.0, "end": 0.1}])
+    assert crud.has_word_timestamps(db_session, text_with_audio) is True
+
+    crud.clear_text_word_timestamps(db_session, text_with_audio)
+    assert crud.has_word_timestamps(db_session, text_with_audio) is False
@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session
 from db.session_manager import (
     managed_db_session, 
     managed_db_transaction, 
+    unit_of_work,
+    in_unit_of_work,
     DatabaseSessionManager,
     DatabaseConnectionMonitor
 )
@@ -84,6 +86,58 @@ class TestManagedDbTransaction:
         mock_session.commit.assert_not_called()
 
 
+class TestUnitOfWork:
+    """Test the unit_of_work context manager."""
+    
+    def test_unit_of_work_commits_once(self):
+        """Test that CRUD calls only flush and the block commits once."""
+        mock_session = MagicMock()
+        
+        with unit_of_work(mock_session) as db:
+            assert in_unit_of_work(db)
+            crud.create_text(db, content="one")
+            crud.create_text(db, content="two")
+            mock_session.commit.assert_not_called()
+        
+        assert mock_session.flush.call_count == 2
+        mock_session.refresh.assert_not_called()
+        mock_session.commit.assert_called_once()
+        assert not in_unit_of_work(mock_session)
+    
+    def test_unit_of_work_rollback_on_exception(self):
+        """Test that unit_of_work rolls back on exception."""
+        mock_session = MagicMock()
+        
+        with pytest.raises(RuntimeError):
+            with unit_of_work(mock_session):
+                raise RuntimeError("Test exception")
+        
+        mock_session.rollback.assert_called_once()
+        mock_session.commit.assert_not_called()
+        assert not in_unit_of_work(mock_session)
+    
+    def test_nested_unit_of_work_joins_outer(self):
+        """Test that only the outermost block commits."""
+        mock_session = MagicMock()
+        
+        with unit_of_work(mock_session):
+            with unit_of_work(mock_session):
+                crud.create_text(mock_session, content="nested")
+            mock_session.commit.assert_not_called()
+            assert in_unit_of_work(mock_session)
+        
+        mock_session.commit.assert_called_once()
+    
+    def test_crud_commits_outside_unit_of_work(self):
+        """Test that CRUD functions keep committing when no unit of work is active."""
+        mock_session = MagicMock()
+        
+        crud.create_text(mock_session, content="standalone")
+        
+        mock_session.commit.assert_called_once()
+        mock_session.refresh.assert_called_once()
+
+
 class TestDatabaseSessionManager:
     """Test the DatabaseSessionManager utility class."""
     
@@ -121,7 +175,7 @@ class TestDatabaseSessionManager:
 class TestAudioProcessorDependencyInjection:
     """Test that audio processors correctly use dependency injection."""
     
-    @patch('services.replicate_audio.managed_db_transaction')
+    @patch('services.replicate_audio.unit_of_work')
     @patch('services.replicate_audio.crud.update_sound_effect_audio')
     @patch('services.replicate_audio.crud.create_log')
     def test_sound_effect_processor_uses_injected_session(self, mock_create_log, mock_update_audio, mock_transaction):
@@ -148,7 +202,7 @@ class TestAudioProcessorDependencyInjection:
                 # Verify transaction context manager was used
                 mock_transaction.assert_called_with(db_session)
     
-    @patch('services.replicate_audio.managed_db_transaction')
+    @patch('services.replicate_audio.unit_of_work')
     @patch('services.replicate_audio.crud.update_text_background_music_audio')
     @patch('services.replicate_audio.crud.create_log')
     def test_background_music_processor_uses_injected_session(self, mock_create_log, mock_update_audio, mock_transaction):
@@ -0,0 +1,176 @@
+"""
+Tests that provider retries wait without blocking the event loop (services/retry.py).
+"""
+
+import asyncio
+import base64
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from db import crud, models
+from services import audio_analysis, speech_generation, voice_generation
+from services.retry import backoff_delay, retry_with_backoff
+
+RETRY_DELAY = 0.2
+# Longest the loop may stall while retries wait; well under RETRY_DELAY * (1 - jitter)
+MAX_LOOP_LAG = 0.08
+
+@pytest.fixture
+def loop_watch(monkeypatch):
+    """
+    Detects blocking calls in coroutines: time.sleep fails when called on a thread
+    running an event loop, and a heartbeat task records the longest stall of the loop.
+    """
+    real_sleep = time.sleep
+    watch = SimpleNamespace(blocking_sleeps=[], max_lag=0.0)
+
+    def guarded_sleep(seconds):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return real_sleep(seconds)
+        watch.blocking_sleeps.append(seconds)
+        raise AssertionError(f"time.sleep({seconds}) called from a coroutine")
+
+    async def heartbeat():
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            watch.max_lag = max(watch.max_lag, time.monotonic() - started - 0.01)
+
+    async def run(coroutine):
+        ticker = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0)
+        try:
+            return await coroutine
+        finally:
+            ticker.cancel()
+
+    watch.run = run
+    monkeypatch.setattr(time, "sleep", guarded_sleep)
+    return watch
+
+def test_backoff_delay_grows_caps_and_jitters():
+    with patch("services.retry.random.random", return_value=0.0):
+        assert [backoff_delay(attempt, 1.0) for attempt in (1, 2, 3)] == [1.0, 2.0, 4.0]
+        assert backoff_delay(4, 15, max_delay=90) == 90
+    with patch("services.retry.random.random", return_value=1.0):
+        assert backoff_delay(2, 1.0, jitter=0.5) == 1.0
+    assert backoff_delay(3, 0) == 0
+
+@pytest.mark.asyncio
+async def test_retry_stops_on_errors_it_should_not_retry():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        raise ValueError("bad request" if len(calls) > 1 else "overloaded")
+
+    with pytest.raises(ValueError, match="bad request"):
+        await retry_with_backoff(operation, attempts=5, base_delay=0, retry_if=lambda e: "overloaded" in str(e))
+    assert len(calls) == 2
+
+class FlakyVoices:
+    def __init__(self, failures):
+        self.failures = failures
+
+    async def create(self, name, generation_id):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("Hume unavailable")
+        return SimpleNamespace(id=f"voice-{uuid.uuid4().hex}")
+
+class FlakyVoiceTts:
+    def __init__(self, failures):
+        self.voices = FlakyVoices(failures)
+
+    async def synthesize_json_streaming(self, utterances, **kwargs):
+        yield SimpleNamespace(generation_id=uuid.uuid4().hex)
+
+@pytest.mark.asyncio
+async def test_voice_generation_retries_without_blocking(db_session, loop_watch):
+    voice_name = f"retry_{uuid.uuid4().hex[:16]}"
+    tts = FlakyVoiceTts(failures=2)
+
+    try:
+        with patch.object(voice_generation, "RETRY_DELAY", RETRY_DELAY):
+            voice_id = await loop_watch.run(voice_generation._create_voice(
+                SimpleNamespace(tts=tts), voice_name, "Narrator", "A calm voice.", "Hello.",
+                character_id=0, text_id=0, owner_text_id=None
+            ))
+        assert voice_id.startswith("voice-")
+        assert tts.voices.failures == 0
+        assert loop_watch.blocking_sleeps == []
+        assert loop_watch.max_lag < MAX_LOOP_LAG
+    finally:
+        db_session.query(models.ProviderVoice).filter(models.ProviderVoice.name == voice_name).delete()
+        db_session.commit()
+
+class FlakySpeechTts:
+    """Fails the first request, then returns audio for every utterance."""
+
+    def __init__(self):
+        self.requests = 0
+
+    async def synthesize_json(self, utterances, **kwargs):
+        self.requests += 1
+        if self.requests == 1:
+            raise RuntimeError("Hume unavailable")
+        snippets = [[SimpleNamespace(audio=base64.b64encode(uuid.uuid4().bytes).decode())] for _ in utterances]
+        return SimpleNamespace(generations=[SimpleNamespace(snippets=snippets)])
+
+@pytest.mark.asyncio
+async def test_speech_batch_retries_without_blocking(db_session, loop_watch):
+    db_text = crud.create_text(db_session, content=f"Loop test. {uuid.uuid4().hex}", title="Loop")
+    narrator = crud.create_character(db_session, text_id=db_text.id, name="Narrator", provider_id=f"voice-{uuid.uuid4().hex}")
+    crud.create_text_segment(db_session, text_id=db_text.id, character_id=narrator.id, text="Only line.", sequence=1)
+    tts = FlakySpeechTts()
+
+    try:
+        with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)), \
+             patch.object(speech_generation, "RETRY_DELAY", RETRY_DELAY):
+            assert await loop_watch.run(speech_generation.generate_text_audio(db_text.id, use_cache=False, streaming=False)) is True
+        assert tts.requests == 2
+        assert loop_watch.blocking_sleeps == []
+        assert loop_watch.max_lag < MAX_LOOP_LAG
+    finally:
+        db_session.rollback()
+        crud.delete_segments_by_text(db_session, db_text.id)
+        crud.delete_characters_by_text(db_session, db_text.id)
+        db_session.query(models.Text).filter(models.Text.id == db_text.id).delete()
+        db_session.commit()
+
+class OverloadedMessages:
+    """Stands in for AsyncAnthropic.messages; overloaded on the first request."""
+
+    def __init__(self):
+        self.requests = 0
+
+    async def create(self, **kwargs):
+        self.requests += 1
+        if self.requests == 1:
+            raise RuntimeError("Error code: 529 - overloaded_error")
+        reply = '{"soundscape": "Soft rain on a tin roof.", "sound_effects": []}'
+        return SimpleNamespace(content=[SimpleNamespace(text=reply)])
+
+@pytest.mark.asyncio
+async def test_audio_analysis_retries_without_blocking(db_session, loop_watch):
+    db_text = crud.create_text(db_session, content=f"It rained all night. {uuid.uuid4().hex}", title="Loop")
+    messages = OverloadedMessages()
+
+    try:
+        with patch.object(audio_analysis.ClientFactory, "get_anthropic_async_client", return_value=SimpleNamespace(messages=messages)), \
+             patch.object(audio_analysis, "BASE_DELAY", RETRY_DELAY):
+            soundscape, effects = await loop_watch.run(audio_analysis.analyze_text_for_audio_async(db_text.id))
+        assert soundscape == "Soft rain on a tin roof."
+        assert effects == []
+        assert messages.requests == 2
+        assert loop_watch.blocking_sleeps == []
+        assert loop_watch.max_lag < MAX_LOOP_LAG
+    finally:
+        db_session.query(models.Text).filter(models.Text.id == db_text.id).delete()
+        db_session.commit()
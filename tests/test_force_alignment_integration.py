@@ -6,6 +6,7 @@ import sys
 import base64
 import json
 import tempfile
+import uuid
 import pytest
 from datetime import datetime
 from sqlalchemy.orm import Session
@@ -18,6 +19,7 @@ if PROJECT_ROOT not in sys.path:
 from db import models, crud
 from services.combine_export_audio import _run_force_alignment_on_combined_audio, force_alignment_service
 from services.combine_export_audio import combine_speech_segments
+from services.blob_store import get_blob_store
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -66,7 +68,8 @@ def test_text_with_segments(db_session, test_segments_data, shared_test_data):
         return shared_test_data['text_data']
     
     # Create test text
-    test_content = "This is a test story. It has multiple segments. Each segment has audio data."
+    # Unique content: texts are de-duplicated by content hash and kept for inspection
+    test_content = f"This is a test story. It has multiple segments. Each segment has audio data. ({uuid.uuid4().hex[:6]})"
     text = crud.create_text(db_session, content=test_content, title="Force Alignment Test")
     
     # Create test character
@@ -80,10 +83,10 @@ def test_text_with_segments(db_session, test_segments_data, shared_test_data):
     # Create segments with real audio data
     segments = []
     for i, audio_file in enumerate(test_segments_data):
-        # Read audio file and encode to base64
+        # Read audio file and store it in the blob store
         with open(audio_file, 'rb') as f:
             audio_bytes = f.read()
-            audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
+        blob = get_blob_store().put_audio(audio_bytes)
         
         # Create segment with corresponding text
         segment_texts = ["This is a test story.", "It has multiple segments.", "Each segment has audio data."]
@@ -96,7 +99,7 @@ def test_text_with_segments(db_session, test_segments_data, shared_test_data):
         )
         
         # Update with audio data
-        crud.update_segment_audio_data(db_session, segment.id, audio_b64)
+        crud.update_segment_audio_data(db_session, segment.id, blob.hash, blob.size, blob.duration)
         segments.append(segment)
     
     # Store in shared data
@@ -0,0 +1,72 @@
+"""
+Tests for force alignment validity checks (aggregate timestamp query and generation counter).
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import models, crud
+
+WORD_TIMESTAMPS = [{"word": "One", "start": 0.0, "end": 0.2}]
+
+@pytest.fixture
+def text_with_segments(db_session):
+    db_text = crud.create_text(db_session, content="One. Two.", title="Alignment Test")
+    character = crud.create_character(db_session, text_id=db_text.id, name="Narrator")
+    segments = [
+        crud.create_text_segment(db_session, text_id=db_text.id, character_id=character.id, text=text, sequence=i + 1)
+        for i, text in enumerate(["One.", "Two."])
+    ]
+    text_id = db_text.id
+    segment_ids = [segment.id for segment in segments]
+    yield text_id, segment_ids
+
+    crud.delete_segments_by_text(db_session, text_id)
+    crud.delete_characters_by_text(db_session, text_id)
+    db_session.query(models.Text).filter(models.Text.id == text_id).delete()
+    db_session.commit()
+
+def test_not_valid_without_alignment(db_session, text_with_segments):
+    text_id, _ = text_with_segments
+
+    assert crud.is_force_alignment_valid(db_session, text_id) is False
+    assert crud.is_force_alignment_current(db_session, text_id) is False
+
+def test_segment_audio_update_invalidates_alignment(db_session, text_with_segments):
+    text_id, segment_ids = text_with_segments
+    crud.update_segment_audio_data(db_session, segment_ids[0], "a" * 64, 10, 1.0)
+    crud.update_text_word_timestamps(db_session, text_id, WORD_TIMESTAMPS)
+
+    assert crud.is_force_alignment_current(db_session, text_id) is True
+
+    crud.update_segment_audio_data(db_session, segment_ids[1], "b" * 64, 10, 1.0)
+    assert crud.is_force_alignment_current(db_session, text_id) is False
+
+    crud.update_text_word_timestamps(db_session, text_id, WORD_TIMESTAMPS)
+    assert crud.is_force_alignment_current(db_session, text_id) is True
+
+def test_clear_word_timestamps(db_session, text_with_segments):
+    text_id, _ = text_with_segments
+    crud.update_text_word_timestamps(db_session, text_id, WORD_TIMESTAMPS)
+    crud.clear_text_word_timestamps(db_session, text_id)
+
+    assert crud.is_force_alignment_current(db_session, text_id) is False
+    assert crud.is_force_alignment_valid(db_session, text_id) is False
+
+def test_is_force_alignment_valid_compares_latest_segment_update(db_session, text_with_segments):
+    text_id, segment_ids = text_with_segments
+    crud.update_text_word_timestamps(db_session, text_id, WORD_TIMESTAMPS)
+    aligned_at = crud.get_text(db_session, text_id).force_alignment_timestamp
+
+    db_session.query(models.TextSegment).filter(models.TextSegment.text_id == text_id).update(
+        {models.TextSegment.last_updated: aligned_at - timedelta(minutes=1)}, synchronize_session=False
+    )
+    db_session.commit()
+    assert crud.is_force_alignment_valid(db_session, text_id) is True
+
+    db_session.query(models.TextSegment).filter(models.TextSegment.id == segment_ids[1]).update(
+        {models.TextSegment.last_updated: aligned_at + timedelta(minutes=1)}, synchronize_session=False
+    )
+    db_session.commit()
+    assert crud.is_force_alignment_valid(db_session, text_id) is False
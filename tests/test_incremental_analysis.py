@@ -0,0 +1,197 @@
+"""
+Tests for paragraph diffing (services/text_diff.py) and incremental re-segmentation in
+services/text_analysis.process_text_analysis.
+"""
+
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from db import crud, models
+from services import text_analysis
+from services.text_diff import (
+    locate_segments,
+    paragraph_hash,
+    plan_incremental_segmentation,
+    split_paragraphs
+)
+
+def test_split_paragraphs():
+    assert split_paragraphs("One.\n\n  Two,\nwrapped.\n\n\nThree.") == ["One.", "Two,\nwrapped.", "Three."]
+    assert split_paragraphs("Line one.\nLine two.\n") == ["Line one.", "Line two."]
+    assert paragraph_hash('He said "hi".') == paragraph_hash("He  said “hi”.")
+
+def test_locate_segments_spans_paragraphs():
+    paragraphs = ["The door opened.", '"Who is there?" she asked.', "Nobody answered. The wind", "kept howling."]
+    spans = locate_segments(
+        paragraphs,
+        ["The door opened.", "Who is there?", "she asked.", "Nobody answered. The wind kept howling.", "Rewritten by the model"],
+        offset=10
+    )
+    assert spans == [(10, 11), (11, 12), (11, 12), (12, 14), (13, 14)]
+
+def test_plan_keeps_segments_in_unchanged_paragraphs():
+    old = ["a", "b", "c", "d"]
+    new = ["a", "B", "c", "d", "e"]
+    # Segment 4 spans paragraphs c-d; segment 5 shares paragraph a with segment 1
+    spans = [(1, 0, 1), (2, 1, 2), (3, 2, 3), (4, 2, 4), (5, 0, 1)]
+    plan = plan_incremental_segmentation(old, new, spans)
+
+    assert sorted(plan.dropped) == [2]
+    assert plan.kept == {1: (0, 1), 3: (2, 3), 4: (2, 4), 5: (0, 1)}
+    assert plan.regions == [(1, 2), (4, 5)]
+
+def test_plan_drops_segments_sharing_a_changed_span():
+    old = ["a", "b", "c"]
+    new = ["a", "b", "C"]
+    # Segment 2 spans b-c (c changed), which drags in segment 1 sharing paragraph b
+    spans = [(1, 1, 2), (2, 1, 3), (3, 0, 1)]
+    plan = plan_incremental_segmentation(old, new, spans)
+
+    assert sorted(plan.dropped) == [1, 2]
+    assert plan.kept == {3: (0, 1)}
+    assert plan.regions == [(1, 3)]
+
+def test_plan_for_unchanged_text_keeps_everything():
+    plan = plan_incremental_segmentation(["a", "b"], ["a", "b"], [(1, 0, 1), (2, 1, 2)])
+    assert plan.dropped == [] and plan.regions == []
+    assert plan.kept == {1: (0, 1), 2: (1, 2)}
+
+PARAGRAPHS = [
+    "The rain had not stopped for three days.",
+    "Anna stood by the window, counting the drops.",
+    "Somewhere below, a door slammed.",
+    "She did not turn around."
+]
+
+async def fake_phase1(content):
+    return [{"name": "Narrator", "is_narrator": True, "speaking": True, "persona_description": "calm", "intro_text": "Hi."}]
+
+async def fake_phase2(content, characters):
+    """One narrator segment per paragraph"""
+    return [
+        {"role": "Narrator", "text": paragraph, "description": "calm", "speed": 1.0, "trailing_silence": 0.5}
+        for paragraph in split_paragraphs(content)
+    ]
+
+@pytest.fixture
+def analyzed_text(db_session):
+    content = "\n\n".join(PARAGRAPHS) + f"\n\n{uuid.uuid4().hex}"
+    db_text = crud.create_text(db_session, content=content, title="Incremental")
+    text_id = db_text.id
+    yield text_id, content
+
+    db_session.rollback()
+    crud.delete_segments_by_text(db_session, text_id)
+    crud.delete_characters_by_text(db_session, text_id)
+    db_session.query(models.Text).filter(models.Text.id == text_id).delete()
+    db_session.commit()
+
+def _segments(db_session, text_id):
+    db_session.expire_all()
+    return crud.get_segments_by_text(db_session, text_id)
+
+@pytest.mark.asyncio
+async def test_incremental_analysis_keeps_unchanged_segments(db_session, analyzed_text):
+    text_id, content = analyzed_text
+    phase2 = AsyncMock(side_effect=fake_phase2)
+    with patch.object(text_analysis, "analyze_text_phase1_characters", AsyncMock(side_effect=fake_phase1)), \
+         patch.object(text_analysis, "analyze_text_phase2_segmentation", phase2), \
+         patch.object(text_analysis, "_delete_existing_hume_voices", AsyncMock()):
+        await text_analysis.process_text_analysis(text_id, content)
+
+        original = _segments(db_session, text_id)
+        assert [segment.text for segment in original[:4]] == PARAGRAPHS
+        for segment in original:
+            crud.update_segment_audio_data(db_session, segment.id, uuid.uuid4().hex * 2, 100, 1.0)
+        audio = {segment.id: segment.audio_hash for segment in _segments(db_session, text_id)}
+
+        # Edit paragraph 2 and append a paragraph
+        edited = content.replace("counting the drops", "counting every drop") + "\n\nThen the lights went out."
+        phase2.reset_mock()
+        db_text = await text_analysis.process_text_analysis(text_id, edited, incremental=True)
+
+        assert db_text.content == edited
+        assert [call.args[0] for call in phase2.call_args_list] == [
+            "Anna stood by the window, counting every drop.", "Then the lights went out."
+        ]
+        segments = _segments(db_session, text_id)
+        assert [segment.sequence for segment in segments] == [1, 2, 3, 4, 5, 6]
+        assert [segment.text for segment in segments][:4] == [
+            PARAGRAPHS[0], "Anna stood by the window, counting every drop.", PARAGRAPHS[2], PARAGRAPHS[3]
+        ]
+        assert segments[-1].text == "Then the lights went out."
+
+        kept = [segments[0], segments[2], segments[3], segments[4]]
+        assert [segment.id for segment in kept] == [original[0].id, original[2].id, original[3].id, original[4].id]
+        assert all(segment.audio_hash == audio[segment.id] for segment in kept)
+        assert segments[1].audio_hash is None and segments[5].audio_hash is None
+
+        # Nothing changed: no segmentation calls, no writes
+        phase2.reset_mock()
+        before = [(segment.id, segment.sequence, segment.last_updated) for segment in segments]
+        await text_analysis.process_text_analysis(text_id, edited, incremental=True)
+        phase2.assert_not_called()
+        assert [(segment.id, segment.sequence, segment.last_updated) for segment in _segments(db_session, text_id)] == before
+
+@pytest.mark.asyncio
+async def test_incremental_analysis_falls_back_for_new_roles(db_session, analyzed_text):
+    text_id, content = analyzed_text
+    phase1 = AsyncMock(side_effect=fake_phase1)
+
+    async def phase2_with_new_role(region, characters):
+        elements = await fake_phase2(region, characters)
+        if "Stranger" in region:
+            elements[0]["role"] = "Stranger"
+        return elements
+
+    with patch.object(text_analysis, "analyze_text_phase1_characters", phase1), \
+         patch.object(text_analysis, "analyze_text_phase2_segmentation", AsyncMock(side_effect=phase2_with_new_role)), \
+         patch.object(text_analysis, "_delete_existing_hume_voices", AsyncMock()):
+        # Never analyzed: incremental mode runs a full analysis
+        await text_analysis.process_text_analysis(text_id, content, incremental=True)
+        assert phase1.await_count == 1
+
+        await text_analysis.process_text_analysis(text_id, content + "\n\nStranger: hello.", incremental=True)
+        assert phase1.await_count == 2
+
+def test_analyze_endpoint_runs_incremental_analysis(db_session, analyzed_text):
+    text_id, content = analyzed_text
+    client = TestClient(app)
+    phase1 = AsyncMock(side_effect=fake_phase1)
+    phase2 = AsyncMock(side_effect=fake_phase2)
+    with patch.object(text_analysis, "analyze_text_phase1_characters", phase1), \
+         patch.object(text_analysis, "analyze_text_phase2_segmentation", phase2), \
+         patch.object(text_analysis, "_delete_existing_hume_voices", AsyncMock()):
+        assert client.post(f"/api/text-analysis/{text_id}/analyze").status_code == 202
+        original_ids = [segment.id for segment in _segments(db_session, text_id)]
+
+        edited = content.replace("counting the drops", "counting every drop")
+        phase2.reset_mock()
+        response = client.post(f"/api/text-analysis/{text_id}/analyze", params={"incremental": True}, json={"content": edited})
+
+        assert response.status_code == 202
+        assert phase1.await_count == 1
+        assert [call.args[0] for call in phase2.call_args_list] == ["Anna stood by the window, counting every drop."]
+        segment_ids = [segment.id for segment in _segments(db_session, text_id)]
+        assert segment_ids[1] not in original_ids
+        assert segment_ids[:1] + segment_ids[2:] == original_ids[:1] + original_ids[2:]
+        assert crud.get_text(db_session, text_id).content == edited
+
+def test_edited_content_may_not_duplicate_another_text(db_session, analyzed_text):
+    text_id, content = analyzed_text
+    other = crud.create_text(db_session, content=f"Another text. {uuid.uuid4().hex}")
+    try:
+        response = TestClient(app).post(f"/api/text-analysis/{text_id}/analyze", json={"content": other.content})
+        assert response.status_code == 409
+
+        with pytest.raises(ValueError):
+            crud.update_text_content(db_session, text_id, other.content)
+        db_session.rollback()
+        assert crud.get_text(db_session, text_id).content == content
+    finally:
+        db_session.query(models.Text).filter(models.Text.id == other.id).delete()
+        db_session.commit()
@@ -0,0 +1,109 @@
+"""
+Tests for the disk cache of Anthropic analysis responses (services/llm_cache.py).
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from services import llm_cache, text_analysis
+from services.llm_cache import LLMResponseCache, bypass_llm_cache, llm_cache_key
+
+@pytest.fixture
+def cache_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_PATH", str(tmp_path / "llm_cache.sqlite3"))
+    llm_cache.reset_llm_cache()
+    yield
+    llm_cache.reset_llm_cache()
+
+def test_entries_expire_and_least_recently_used_are_evicted(tmp_path):
+    cache = LLMResponseCache(tmp_path / "cache.sqlite3", ttl_seconds=60, max_bytes=30)
+    with patch("services.llm_cache.time.time", return_value=1000.0):
+        cache.put("a", "x" * 10)
+    with patch("services.llm_cache.time.time", return_value=1001.0):
+        cache.put("b", "y" * 10)
+    with patch("services.llm_cache.time.time", return_value=1002.0):
+        assert cache.get("a") == "x" * 10  # "a" is now more recently used than "b"
+        cache.put("c", "z" * 15)
+
+    with patch("services.llm_cache.time.time", return_value=1003.0):
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 10
+        assert cache.stats() == {"entries": 2, "bytes": 25}
+    with patch("services.llm_cache.time.time", return_value=1061.0):
+        assert cache.get("a") is None
+        assert cache.get("c") == "z" * 15
+
+    # Reopening the file keeps the entries
+    cache.close()
+    with patch("services.llm_cache.time.time", return_value=1061.0):
+        assert LLMResponseCache(tmp_path / "cache.sqlite3", ttl_seconds=60, max_bytes=30).get("c") == "z" * 15
+
+def test_key_covers_every_request_parameter():
+    params = {"model": "m", "temperature": 0, "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+    assert llm_cache_key(params) == llm_cache_key(dict(reversed(list(params.items()))))
+    assert llm_cache_key(params) != llm_cache_key({**params, "temperature": 0.2})
+    assert llm_cache_key(params) != llm_cache_key({**params, "messages": [{"role": "user", "content": "hi!"}]})
+
+class FakeMessages:
+    """Stands in for AsyncAnthropic.messages, replying with the queued responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = 0
+
+    async def create(self, **kwargs):
+        self.requests += 1
+        return SimpleNamespace(content=[SimpleNamespace(text=self.responses.pop(0))])
+
+CHARACTERS = json.dumps({"characters": [
+    {"name": "Narrator", "is_narrator": True, "speaking": True, "persona_description": "Adult male", "text": "Welcome."}
+]})
+
+@pytest.mark.asyncio
+async def test_repeated_analysis_is_served_from_cache(cache_settings):
+    messages = FakeMessages(CHARACTERS, CHARACTERS, '{"characters": [')
+    with patch.object(text_analysis.ClientFactory, "get_anthropic_async_client", return_value=SimpleNamespace(messages=messages)):
+        first = await text_analysis.analyze_text_phase1_characters("Once upon a time.")
+        assert await text_analysis.analyze_text_phase1_characters("Once upon a time.") == first
+        assert messages.requests == 1
+
+        with bypass_llm_cache():
+            assert await text_analysis.analyze_text_phase1_characters("Once upon a time.") == first
+        assert messages.requests == 2
+
+        # A truncated response fails to parse and is not cached
+        with pytest.raises(ValueError):
+            await text_analysis.analyze_text_phase1_characters("Another text.")
+        messages.responses.append(CHARACTERS)
+        await text_analysis.analyze_text_phase1_characters("Another text.")
+        assert messages.requests == 4
+
+    assert llm_cache.get_llm_cache().stats()["entries"] == 2
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_calls_the_api(cache_settings, monkeypatch):
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_ENABLED", False)
+    messages = FakeMessages(CHARACTERS, CHARACTERS)
+    with patch.object(text_analysis.ClientFactory, "get_anthropic_async_client", return_value=SimpleNamespace(messages=messages)):
+        await text_analysis.analyze_text_phase1_characters("Once upon a time.")
+        await text_analysis.analyze_text_phase1_characters("Once upon a time.")
+    assert messages.requests == 2
+    assert llm_cache.get_llm_cache() is None
+
+@pytest.mark.asyncio
+async def test_reanalysis_without_cache_bypasses_it(cache_settings):
+    active = []
+
+    async def record_cache(*args):
+        active.append(llm_cache._active_cache())
+
+    with patch.object(text_analysis, "_process_text_analysis", side_effect=record_cache):
+        await text_analysis.process_text_analysis(1, "Once upon a time.")
+        await text_analysis.process_text_analysis(1, "Once upon a time.", use_cache=False)
+
+    assert active[0] is llm_cache.get_llm_cache()
+    assert active[1] is None
@@ -0,0 +1,99 @@
+"""
+Tests for the write-behind ProcessLog writer.
+"""
+
+import time
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from db import crud, models
+from db.log_writer import ProcessLogWriter
+
+@pytest.fixture
+def operation(db_session):
+    """Unique operation name so each test only sees its own log rows."""
+    operation = f"log_writer_test_{uuid.uuid4().hex}"
+    yield operation
+
+    db_session.query(models.ProcessLog).filter(models.ProcessLog.operation == operation).delete()
+    db_session.commit()
+
+def _count(db_session, operation):
+    db_session.expire_all()
+    return db_session.query(models.ProcessLog).filter(models.ProcessLog.operation == operation).count()
+
+def test_logs_are_buffered_until_flush(db_session, operation):
+    writer = ProcessLogWriter(batch_size=100, flush_interval_ms=60_000)
+    try:
+        for i in range(5):
+            writer.enqueue(operation, "success", response={"i": i})
+
+        assert writer.pending() == 5
+        assert _count(db_session, operation) == 0
+
+        assert writer.flush() == 5
+        assert _count(db_session, operation) == 5
+    finally:
+        writer.shutdown()
+
+def test_flusher_writes_when_batch_is_full(db_session, operation):
+    writer = ProcessLogWriter(batch_size=3, flush_interval_ms=60_000)
+    try:
+        for _ in range(3):
+            writer.enqueue(operation, "success")
+
+        deadline = time.monotonic() + 5
+        while _count(db_session, operation) < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _count(db_session, operation) == 3
+    finally:
+        writer.shutdown()
+
+def test_full_queue_falls_back_to_synchronous_write(db_session, operation):
+    writer = ProcessLogWriter(max_queue_size=2, batch_size=100, flush_interval_ms=60_000)
+    try:
+        for _ in range(3):
+            writer.enqueue(operation, "success")
+
+        assert writer.pending() == 2
+        assert _count(db_session, operation) == 1
+    finally:
+        writer.shutdown()
+    assert _count(db_session, operation) == 3
+
+def test_shutdown_flushes_and_later_logs_write_synchronously(db_session, operation):
+    writer = ProcessLogWriter(batch_size=100, flush_interval_ms=60_000)
+    writer.enqueue(operation, "success")
+    writer.shutdown()
+    assert _count(db_session, operation) == 1
+
+    writer.enqueue(operation, "error")
+    assert _count(db_session, operation) == 2
+
+def test_status_is_required(operation):
+    writer = ProcessLogWriter(batch_size=100, flush_interval_ms=60_000)
+    with pytest.raises(ValueError):
+        writer.enqueue(operation, None)
+    assert writer.pending() == 0
+
+def test_failed_batch_is_retried_row_by_row(db_session, operation, monkeypatch):
+    create_logs_bulk = crud.create_logs_bulk
+
+    def reject_batches_and_bad_rows(db, logs):
+        if len(logs) > 1 or logs[0]["response"] == {"bad": True}:
+            raise IntegrityError("INSERT", {}, Exception("rejected"))
+        return create_logs_bulk(db, logs)
+
+    monkeypatch.setattr(crud, "create_logs_bulk", reject_batches_and_bad_rows)
+    writer = ProcessLogWriter(batch_size=100, flush_interval_ms=60_000)
+    try:
+        writer.enqueue(operation, "success")
+        writer.enqueue(operation, "success", response={"bad": True})
+        writer.enqueue(operation, "success")
+
+        assert writer.flush() == 2
+        assert _count(db_session, operation) == 2
+    finally:
+        writer.shutdown()
@@ -0,0 +1,180 @@
+"""
+Query-plan regression test for db/crud.py.
+
+Seeds a scratch SQLite database with 100k text segments, runs every CRUD function
+and checks with EXPLAIN QUERY PLAN that none of the SELECT/UPDATE/DELETE statements
+they issue falls back to a full table scan.
+"""
+
+import inspect
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from db.database import Base
+from db import models, crud
+
+NUM_TEXTS = 100
+CHARACTERS_PER_TEXT = 10
+SEGMENTS_PER_TEXT = 1000  # 100k segments in total
+EFFECTS_PER_TEXT = 100
+
+# CRUD functions that are allowed to scan
+SCAN_EXEMPT = {
+    "compute_content_hash",      # no database access
+    "delete_all_sound_effects",  # deletes every row by design
+    "get_all_provider_voices",   # reads every recorded voice by design (reconciliation)
+    "forget_voice_references",   # only run by periodic voice reconciliation, on drift
+}
+
+# SQLite reports full scans as "SCAN <table>" (or "SCAN TABLE <table>" before 3.36)
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?(\w+)")
+
+@pytest.fixture(scope="module")
+def seeded_engine(tmp_path_factory):
+    path = tmp_path_factory.mktemp("query_plans") / "seeded.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Text), [
+            {"id": t, "content": f"Text {t}", "content_sha256": crud.compute_content_hash(f"Text {t}"), "analyzed": True}
+            for t in range(1, NUM_TEXTS + 1)
+        ])
+        conn.execute(insert(models.Character), [
+            {"id": (t - 1) * CHARACTERS_PER_TEXT + c + 1, "text_id": t, "name": f"Character {c}"}
+            for t in range(1, NUM_TEXTS + 1) for c in range(CHARACTERS_PER_TEXT)
+        ])
+        conn.execute(insert(models.TextSegment), [
+            {
+                "id": (t - 1) * SEGMENTS_PER_TEXT + s + 1,
+                "text_id": t,
+                "character_id": (t - 1) * CHARACTERS_PER_TEXT + s % CHARACTERS_PER_TEXT + 1,
+                "text": f"Segment {s}",
+                "sequence": s + 1,
+                "last_updated": now
+            }
+            for t in range(1, NUM_TEXTS + 1) for s in range(SEGMENTS_PER_TEXT)
+        ])
+        conn.execute(insert(models.SoundEffect), [
+            {
+                "effect_id": (t - 1) * EFFECTS_PER_TEXT + e + 1,
+                "text_id": t,
+                "segment_id": (t - 1) * SEGMENTS_PER_TEXT + e * 10 + 1,
+                "effect_name": f"effect {e}",
+                "start_word": "a",
+                "end_word": "b",
+                "prompt": "prompt"
+            }
+            for t in range(1, NUM_TEXTS + 1) for e in range(EFFECTS_PER_TEXT)
+        ])
+        conn.execute(insert(models.ProcessLog), [
+            {"text_id": t, "operation": "seed", "status": "success"}
+            for t in range(1, NUM_TEXTS + 1) for _ in range(100)
+        ])
+    yield engine
+    engine.dispose()
+
+def _crud_calls():
+    """One call per CRUD function, against text 1 of the seeded database."""
+    segment_id = 1
+    character_id = 1
+    effect_id = 1
+    return [
+        ("create_text", lambda db: crud.create_text(db, content="new text")),
+        ("get_text", lambda db: crud.get_text(db, 1)),
+        ("get_text_by_content", lambda db: crud.get_text_by_content(db, "Text 1")),
+        ("get_text_summary", lambda db: crud.get_text_summary(db, 1)),
+        ("update_text_content", lambda db: crud.update_text_content(db, 2, "Text 2, edited")),
+        ("update_text_analyzed", lambda db: crud.update_text_analyzed(db, 1, True)),
+        ("update_text_background_music_audio", lambda db: crud.update_text_background_music_audio(db, 1, "b" * 64, 10, 1.0)),
+        ("update_text_word_timestamps", lambda db: crud.update_text_word_timestamps(db, 1, [{"word": "a", "start": 0.0, "end": 0.1}])),
+        ("has_word_timestamps", lambda db: crud.has_word_timestamps(db, 1)),
+        ("is_force_alignment_valid", lambda db: crud.is_force_alignment_valid(db, 1)),
+        ("is_force_alignment_current", lambda db: crud.is_force_alignment_current(db, 1)),
+        ("clear_text_word_timestamps", lambda db: crud.clear_text_word_timestamps(db, 1)),
+        ("create_character", lambda db: crud.create_character(db, text_id=1, name="Extra")),
+        ("create_characters_bulk", lambda db: crud.create_characters_bulk(db, 1, [{"name": "Bulk"}])),
+        ("get_characters_by_text", lambda db: crud.get_characters_by_text(db, 1)),
+        ("update_character_voice", lambda db: crud.update_character_voice(db, character_id, "voice-id")),
+        ("get_character", lambda db: crud.get_character(db, character_id)),
+        ("get_voiced_characters_without_segments", lambda db: crud.get_voiced_characters_without_segments(db, 1)),
+        ("clear_character_voices", lambda db: crud.clear_character_voices(db, [character_id])),
+        ("create_text_segment", lambda db: crud.create_text_segment(db, text_id=1, character_id=character_id, text="new", sequence=SEGMENTS_PER_TEXT + 1)),
+        ("create_text_segments_bulk", lambda db: crud.create_text_segments_bulk(db, 1, [{"character_id": character_id, "text": "bulk", "sequence": SEGMENTS_PER_TEXT + 2}])),
+        ("get_segments_by_text", lambda db: crud.get_segments_by_text(db, 1)),
+        ("get_segment_summaries_by_text", lambda db: crud.get_segment_summaries_by_text(db, 1)),
+        ("update_segment_audio", lambda db: crud.update_segment_audio(db, segment_id, "file.mp3")),
+        ("update_segment_audio_data", lambda db: crud.update_segment_audio_data(db, segment_id, "a" * 64, 10, 1.0)),
+        ("set_segment_audio_status", lambda db: crud.set_segment_audio_status(db, [segment_id], "failed", "error")),
+        ("save_speech_cache_entries", lambda db: crud.save_speech_cache_entries(db, [{"cache_key": "d" * 64, "voice_id": "voice-id", "audio_hash": "a" * 64}])),
+        ("get_speech_cache_entries", lambda db: crud.get_speech_cache_entries(db, ["d" * 64, "e" * 64])),
+        ("touch_speech_cache_entries", lambda db: crud.touch_speech_cache_entries(db, ["d" * 64])),
+        ("save_library_voice", lambda db: crud.save_library_voice(db, "f" * 64, "voice-id", "library_voice")),
+        ("get_library_voice", lambda db: crud.get_library_voice(db, "f" * 64)),
+        ("touch_library_voice", lambda db: crud.touch_library_voice(db, "f" * 64)),
+        ("record_provider_voice", lambda db: crud.record_provider_voice(db, "voice-id", "Narrator_1", text_id=1)),
+        ("get_provider_voices_by_text", lambda db: crud.get_provider_voices_by_text(db, 1)),
+        ("delete_provider_voices", lambda db: crud.delete_provider_voices(db, ["voice-id"])),
+        ("create_log", lambda db: crud.create_log(db, text_id=1, operation="test", status="success")),
+        ("create_logs_bulk", lambda db: crud.create_logs_bulk(db, [{"text_id": 1, "operation": "test", "status": "success"}])),
+        ("create_sound_effect", lambda db: crud.create_sound_effect(db, effect_name="new", text_id=1, start_word="a", end_word="b", prompt="p")),
+        ("get_sound_effect", lambda db: crud.get_sound_effect(db, effect_id)),
+        ("get_sound_effects_by_text", lambda db: crud.get_sound_effects_by_text(db, 1)),
+        ("get_sound_effect_summaries_by_text", lambda db: crud.get_sound_effect_summaries_by_text(db, 1)),
+        ("get_sound_effects_by_segment", lambda db: crud.get_sound_effects_by_segment(db, segment_id)),
+        ("update_sound_effect_timing", lambda db: crud.update_sound_effect_timing(db, effect_id, 0.0, 1.0)),
+        ("update_sound_effect_audio", lambda db: crud.update_sound_effect_audio(db, effect_id, "c" * 64, 10, 1.0)),
+        ("delete_sound_effect", lambda db: crud.delete_sound_effect(db, effect_id)),
+        ("delete_sound_effects_by_segment", lambda db: crud.delete_sound_effects_by_segment(db, 11)),
+        ("delete_sound_effects_by_text", lambda db: crud.delete_sound_effects_by_text(db, 1)),
+        ("update_segment_positions", lambda db: crud.update_segment_positions(db, 1, {segment_id: {"sequence": 1, "paragraph_start": 0, "paragraph_end": 1}})),
+        ("delete_segments", lambda db: crud.delete_segments(db, 1, [2, 3])),
+        ("delete_segments_by_text", lambda db: crud.delete_segments_by_text(db, 1)),
+        ("delete_characters_by_text", lambda db: crud.delete_characters_by_text(db, 1)),
+    ]
+
+def _public_crud_functions():
+    return {
+        name for name, obj in inspect.getmembers(crud, inspect.isfunction)
+        if obj.__module__ == crud.__name__ and not name.startswith("_")
+    }
+
+def test_every_crud_function_is_checked():
+    """New CRUD functions must be added to _crud_calls or SCAN_EXEMPT."""
+    checked = {name for name, _ in _crud_calls()}
+    assert _public_crud_functions() - checked - SCAN_EXEMPT == set()
+
+def test_crud_queries_use_indexes(seeded_engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((current[0], statement, parameters))
+
+    current = [None]
+    event.listen(seeded_engine, "before_cursor_execute", capture)
+    Session = sessionmaker(bind=seeded_engine)
+    db = Session()
+    try:
+        for name, call in _crud_calls():
+            current[0] = name
+            call(db)
+    finally:
+        db.close()
+        event.remove(seeded_engine, "before_cursor_execute", capture)
+
+    full_scans = []
+    with seeded_engine.connect() as conn:
+        for name, statement, parameters in statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            for row in plan:
+                detail = row[-1]
+                if FULL_SCAN.match(detail):
+                    full_scans.append(f"{name}: {detail} <- {statement.strip()}")
+
+    assert full_scans == []
@@ -0,0 +1,167 @@
+"""
+Tests for the shared per-provider request scheduler (services/rate_limit.py).
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import replicate
+
+from services.clients import ClientFactory
+from services.rate_limit import ProviderScheduler, ScheduledTransport, parse_reset_delay, track_admission
+
+def test_parse_reset_delay_formats():
+    now = 1_700_000_000.0
+    assert parse_reset_delay("12", now=now) == 12
+    assert parse_reset_delay("0.5", now=now) == 0.5
+    assert parse_reset_delay(str(now + 30), now=now) == 30
+    rfc3339 = datetime.fromtimestamp(now + 20, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+    assert parse_reset_delay(rfc3339, now=now) == pytest.approx(20)
+    assert parse_reset_delay("Tue, 14 Nov 2023 22:13:40 GMT", now=now) == pytest.approx(20)
+    assert parse_reset_delay("soon", now=now) is None
+    assert parse_reset_delay(None) is None
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_requests():
+    scheduler = ProviderScheduler("test", requests_per_minute=1200, max_concurrency=10, burst=1)
+    start = time.perf_counter()
+    for _ in range(5):
+        async with scheduler.async_slot():
+            pass
+    # One request up front, then one every 50 ms
+    assert time.perf_counter() - start == pytest.approx(0.2, abs=0.08)
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_fifo_order():
+    scheduler = ProviderScheduler("test", requests_per_minute=60000, max_concurrency=2, burst=100)
+    started = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request(index):
+        nonlocal in_flight, max_in_flight
+        async with scheduler.async_slot():
+            started.append(index)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.03)
+            in_flight -= 1
+
+    tasks = []
+    for index in range(6):
+        tasks.append(asyncio.create_task(request(index)))
+        await asyncio.sleep(0)  # queue in a known order
+    await asyncio.gather(*tasks)
+
+    assert max_in_flight == 2
+    assert started == list(range(6))
+    assert scheduler.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    scheduler = ProviderScheduler("test", requests_per_minute=60000, max_concurrency=1, burst=100)
+    await scheduler.acquire_async()
+    waiter = asyncio.create_task(scheduler.acquire_async())
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.release()
+
+    assert scheduler.stats()["queued"] == 0
+    await asyncio.wait_for(scheduler.acquire_async(), timeout=1)
+
+def _transport(scheduler, responses):
+    """ScheduledTransport over a mock transport answering with the given (status, headers) in turn."""
+    responses = list(responses)
+
+    def handler(request):
+        status, headers = responses.pop(0) if responses else (200, {})
+        return httpx.Response(status, headers=headers, content=b"{}")
+
+    return ScheduledTransport(scheduler, transport=httpx.MockTransport(handler))
+
+def test_throttle_response_pauses_and_slows_down():
+    scheduler = ProviderScheduler("test", requests_per_minute=600, max_concurrency=5)
+    with httpx.Client(transport=_transport(scheduler, [(429, {"retry-after": "0.3"})])) as client:
+        assert client.get("https://provider.test/").status_code == 429
+        stats = scheduler.stats()
+        assert stats["paused_for"] == pytest.approx(0.3, abs=0.05)
+        assert stats["requests_per_minute"] == 300
+
+        start = time.perf_counter()
+        assert client.get("https://provider.test/").status_code == 200
+        assert time.perf_counter() - start >= 0.25
+
+    # Successful responses restore the rate gradually
+    assert scheduler.stats()["requests_per_minute"] == 360
+
+def test_throttle_without_retry_after_uses_exponential_backoff():
+    scheduler = ProviderScheduler("test", requests_per_minute=6000, max_concurrency=5, min_backoff=0.1)
+    scheduler.observe(529, {})
+    first = scheduler.stats()["paused_for"]
+    scheduler.observe(529, {})
+    second = scheduler.stats()["paused_for"]
+
+    assert 0.04 <= first <= 0.1
+    assert 0.09 <= second <= 0.2
+
+def test_exhausted_rate_limit_header_pauses_queue():
+    scheduler = ProviderScheduler("test", requests_per_minute=600, max_concurrency=5)
+    reset = (datetime.now(timezone.utc) + timedelta(seconds=2)).isoformat()
+    scheduler.observe(200, {"anthropic-ratelimit-requests-remaining": "0", "anthropic-ratelimit-requests-reset": reset})
+    assert scheduler.stats()["paused_for"] == pytest.approx(2, abs=0.2)
+
+    other = ProviderScheduler("test", requests_per_minute=600, max_concurrency=5)
+    other.observe(200, {"x-ratelimit-remaining": "7", "x-ratelimit-reset": "30"})
+    assert other.stats()["paused_for"] == 0
+
+@pytest.mark.asyncio
+async def test_streaming_response_holds_slot_until_closed():
+    scheduler = ProviderScheduler("test", requests_per_minute=60000, max_concurrency=1, burst=100)
+    async with httpx.AsyncClient(transport=_transport(scheduler, [])) as client:
+        async with client.stream("GET", "https://provider.test/stream") as response:
+            assert response.status_code == 200
+            assert scheduler.stats()["in_flight"] == 1
+        assert scheduler.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_track_admission_reports_queueing_and_throttling():
+    scheduler = ProviderScheduler("test", requests_per_minute=60000, max_concurrency=5, burst=100)
+    async with httpx.AsyncClient(transport=_transport(scheduler, [(429, {"retry-after": "0.2"})])) as client:
+        with track_admission() as admission:
+            assert (await client.get("https://provider.test/")).status_code == 429
+            assert (await client.get("https://provider.test/")).status_code == 200
+
+        assert admission.throttled == 1
+        assert admission.waited == pytest.approx(0.2, abs=0.1)
+
+        # Requests outside the block are not tracked
+        await client.get("https://provider.test/")
+        assert admission.throttled == 1
+
+def test_sync_client_on_event_loop_does_not_deadlock():
+    scheduler = ProviderScheduler("test", requests_per_minute=60000, max_concurrency=1, burst=100)
+
+    async def main():
+        await scheduler.acquire_async()  # a coroutine holds the only slot
+        with httpx.Client(transport=_transport(scheduler, [])) as client:
+            # A sync call on the loop thread must not wait for that slot
+            assert client.get("https://provider.test/").status_code == 200
+        scheduler.release()
+
+    asyncio.run(asyncio.wait_for(main(), timeout=2))
+
+def test_client_factory_builds_scheduled_clients():
+    ClientFactory.reset_clients()
+    try:
+        client = ClientFactory.get_replicate_client()
+        assert isinstance(client, replicate.Client)
+        assert ClientFactory.get_replicate_client() is client
+        assert isinstance(client._client_kwargs["transport"], ScheduledTransport)
+        assert client._client_kwargs["transport"].scheduler.provider == "replicate"
+    finally:
+        ClientFactory.reset_clients()
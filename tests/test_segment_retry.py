@@ -0,0 +1,131 @@
+"""
+Tests for segment-granular retries and per-segment speech generation status in
+services/speech_generation.py.
+"""
+
+import asyncio
+import base64
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from db import crud, models
+from services import speech_generation
+
+class FlakyTts:
+    """Stands in for AsyncHumeClient.tts; returns no audio for texts listed in `failing`."""
+
+    def __init__(self, failing=(), fail_times=1):
+        self.requests = []
+        self.failures = {text: fail_times for text in failing}
+
+    async def synthesize_json(self, utterances, context=None, **kwargs):
+        texts = [utterance.text for utterance in utterances]
+        context_texts = [utterance.text for utterance in context.utterances] if context else []
+        self.requests.append((texts, context_texts))
+        snippets = []
+        for text in texts:
+            if self.failures.get(text, 0) > 0:
+                self.failures[text] -= 1
+                snippets.append([])
+            else:
+                snippets.append([SimpleNamespace(audio=base64.b64encode(f"{uuid.uuid4()}:{text}".encode()).decode())])
+        await asyncio.sleep(0)
+        return SimpleNamespace(generations=[SimpleNamespace(snippets=snippets)])
+
+@pytest.fixture
+def text_with_segments(db_session):
+    db_text = crud.create_text(db_session, content=f"Retry test. {uuid.uuid4().hex}", title="Retry")
+    narrator = crud.create_character(db_session, text_id=db_text.id, name="Narrator", provider_id=f"voice-{uuid.uuid4().hex}")
+    for sequence in range(1, 8):
+        crud.create_text_segment(db_session, text_id=db_text.id, character_id=narrator.id, text=f"Sentence {sequence}.", sequence=sequence)
+    yield db_text.id
+
+    db_session.rollback()
+    db_session.query(models.SpeechCacheEntry).filter(models.SpeechCacheEntry.voice_id == narrator.provider_id).delete()
+    crud.delete_segments_by_text(db_session, db_text.id)
+    crud.delete_characters_by_text(db_session, db_text.id)
+    db_session.query(models.Text).filter(models.Text.id == db_text.id).delete()
+    db_session.commit()
+
+def _statuses(db_session, text_id):
+    db_session.expire_all()
+    return [segment.audio_status for segment in crud.get_segment_summaries_by_text(db_session, text_id)]
+
+@pytest.mark.asyncio
+async def test_only_failed_segments_are_retried_with_their_context(db_session, text_with_segments):
+    text_id = text_with_segments
+    tts = FlakyTts(failing=["Sentence 3.", "Sentence 4."])
+
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)), \
+         patch.object(speech_generation, "RETRY_DELAY", 0):
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False) is True
+
+    assert sorted(tts.requests) == sorted([
+        (["Sentence 1.", "Sentence 2.", "Sentence 3.", "Sentence 4.", "Sentence 5."], []),
+        (["Sentence 6.", "Sentence 7."], ["Sentence 3.", "Sentence 4.", "Sentence 5."]),
+        # The retry carries the context segments 3 and 4 had in the original batch
+        (["Sentence 3.", "Sentence 4."], ["Sentence 1.", "Sentence 2."])
+    ])
+    assert _statuses(db_session, text_id) == ["done"] * 7
+
+@pytest.mark.asyncio
+async def test_failed_segments_are_recorded_and_resumed(db_session, text_with_segments):
+    text_id = text_with_segments
+    tts = FlakyTts(failing=["Sentence 6."], fail_times=speech_generation.MAX_RETRIES)
+
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)), \
+         patch.object(speech_generation, "RETRY_DELAY", 0):
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False) is False
+        assert _statuses(db_session, text_id) == ["done"] * 5 + ["failed", "done"]
+        failed = [segment for segment in crud.get_segments_by_text(db_session, text_id) if segment.audio_status == "failed"]
+        assert failed[0].audio_error == "No audio returned"
+        assert [texts for texts, _ in tts.requests].count(["Sentence 6."]) == speech_generation.MAX_RETRIES - 1
+
+        # Resuming only synthesizes the failed segment
+        tts.requests.clear()
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False, resume=True) is True
+        assert tts.requests == [(["Sentence 6."], ["Sentence 3.", "Sentence 4.", "Sentence 5."])]
+        assert _statuses(db_session, text_id) == ["done"] * 7
+
+@pytest.mark.asyncio
+async def test_request_errors_retry_the_request(db_session, text_with_segments):
+    text_id = text_with_segments
+    tts = FlakyTts()
+    synthesize = tts.synthesize_json
+    calls = []
+
+    async def failing_once(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return await synthesize(**kwargs)
+
+    tts.synthesize_json = failing_once
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)), \
+         patch.object(speech_generation, "RETRY_DELAY", 0):
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False) is True
+    assert len(calls) == 3
+    assert _statuses(db_session, text_id) == ["done"] * 7
+
+@pytest.mark.asyncio
+async def test_unvoiced_segments_are_marked_failed(db_session, text_with_segments):
+    text_id = text_with_segments
+    stranger = crud.create_character(db_session, text_id=text_id, name="Stranger")
+    crud.create_text_segment(db_session, text_id=text_id, character_id=stranger.id, text="Who goes there?", sequence=8)
+    tts = FlakyTts()
+
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)), \
+         patch.object(speech_generation, "RETRY_DELAY", 0):
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False) is False
+        assert _statuses(db_session, text_id) == ["done"] * 7 + ["failed"]
+        assert all("Who goes there?" not in texts for texts, _ in tts.requests)
+
+        # Once the character has a voice, resuming synthesizes only that segment
+        crud.update_character_voice(db_session, stranger.id, f"voice-{uuid.uuid4().hex}")
+        tts.requests.clear()
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False, resume=True) is True
+        assert [texts for texts, _ in tts.requests] == [["Who goes there?"]]
+        assert _statuses(db_session, text_id) == ["done"] * 8
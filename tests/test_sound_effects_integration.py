@@ -4,7 +4,6 @@ Integration test for sound effects service using real APIs
 import pytest
 import os
 import json
-import base64
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -24,6 +23,7 @@ from services.sound_effects import (
     delete_existing_sound_effects
 )
 from services.audio_analysis import analyze_text_for_audio
+from services.blob_store import get_blob_store
 
 # Skip tests if required API keys are not available
 if not settings.ANTHROPIC_API_KEY or len(settings.ANTHROPIC_API_KEY) < 10:
@@ -90,7 +90,6 @@ class TestSoundEffectsIntegration:
                     start_word_position=start_word_number,
                     end_word_position=end_word_number,
                     prompt=effect['prompt'],
-                    audio_data_b64="",
                     start_time=None,
                     end_time=None,
                     total_time=total_time,
@@ -188,7 +187,7 @@ class TestSoundEffectsIntegration:
         print(f"Prompt: {rank_1_effect.prompt}")
         
         # Record initial state
-        initial_audio_length = len(rank_1_effect.audio_data_b64) if rank_1_effect.audio_data_b64 else 0
+        initial_audio_length = rank_1_effect.audio_size or 0
         
         try:
             # Generate audio
@@ -198,16 +197,16 @@ class TestSoundEffectsIntegration:
             db_session.refresh(rank_1_effect)
             
             # Verify audio was generated
-            final_audio_length = len(rank_1_effect.audio_data_b64) if rank_1_effect.audio_data_b64 else 0
+            final_audio_length = rank_1_effect.audio_size or 0
             audio_generated = final_audio_length > 0  # Real audio should be more than empty
             
             # Export audio to test_output_dir (only if real audio exists)
-            if rank_1_effect.audio_data_b64 and len(rank_1_effect.audio_data_b64) > 0:
+            if rank_1_effect.audio_hash:
                 audio_filename = f"sound_effect_{rank_1_effect.effect_id}_{rank_1_effect.effect_name}.wav"
                 audio_file_path = os.path.join(test_output_dir, audio_filename)
                 
                 try:
-                    audio_data = base64.b64decode(rank_1_effect.audio_data_b64)
+                    audio_data = get_blob_store().get(rank_1_effect.audio_hash)
                     with open(audio_file_path, 'wb') as f:
                         f.write(audio_data)
                     audio_exports.append(audio_file_path)
@@ -215,7 +214,7 @@ class TestSoundEffectsIntegration:
                     print(f"  Audio data size: {len(audio_data)} bytes")
                 except Exception as e:
                     print(f"✗ Failed to export audio: {e}")
-                    print(f"  Audio data length: {len(rank_1_effect.audio_data_b64)} chars")
+                    print(f"  Audio blob: {rank_1_effect.audio_hash}")
             else:
                 print(f"✗ No audio data generated for {rank_1_effect.effect_name}")
             
@@ -325,7 +324,7 @@ class TestSoundEffectsIntegration:
                 generate_and_store_effect(db_session, first_effect.effect_id)
                 db_session.refresh(first_effect)
                 
-                audio_generated = len(first_effect.audio_data_b64) > 0  # Changed to check for any audio content
+                audio_generated = bool(first_effect.audio_hash)  # Changed to check for any audio content
                 workflow_results["workflow_steps"].append({
                     "step": "audio_generation",
                     "status": "completed" if audio_generated else "failed",
@@ -382,7 +381,7 @@ class TestSoundEffectsIntegration:
         # Step 5: Final verification
         print("Step 5: Final verification...")
         final_effects = crud.get_sound_effects_by_text(db_session, TEST_TEXT_ID)
-        effects_with_audio = sum(1 for e in final_effects if e.audio_data_b64 and len(e.audio_data_b64) > 100)
+        effects_with_audio = sum(1 for e in final_effects if e.audio_hash and (e.audio_size or 0) > 100)
         
         workflow_results["final_state"] = {
             "total_effects": len(final_effects),
@@ -0,0 +1,111 @@
+"""
+Tests for non-blocking, concurrency-limited Hume TTS batches in services/speech_generation.py.
+"""
+
+import asyncio
+import base64
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from services import speech_generation
+from services.clients import ClientFactory
+from utils.config import settings
+
+AUDIO_B64 = base64.b64encode(b"fake mp3 bytes").decode()
+
+class FakeAsyncTts:
+    """Stands in for AsyncHumeClient.tts, tracking how many requests are in flight."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def synthesize_json(self, utterances, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        snippets = [[SimpleNamespace(audio=AUDIO_B64)] for _ in utterances]
+        return SimpleNamespace(generations=[SimpleNamespace(snippets=snippets)])
+
+def _segments(count: int):
+    return [
+        SimpleNamespace(id=i + 1, character_id=1, text=f"Line {i}.", description=None, trailing_silence=None)
+        for i in range(count)
+    ]
+
+async def _run_batches(tts: FakeAsyncTts, batch_count: int, saved: list):
+    segments = _segments(batch_count * 5)
+    hume_client = SimpleNamespace(tts=tts)
+    logger = speech_generation.get_logger(__name__)
+    with patch.object(speech_generation, "_save_segment_audio", side_effect=lambda segment_audio, cache_entries: saved.extend(segment_audio)):
+        return await asyncio.gather(*(
+            speech_generation.process_batch(
+                segments=segments,
+                batch_segments=segments[start:start + 5],
+                batch_start=start,
+                batch_end=start + 5,
+                voice_map={"1": "voice-1"},
+                hume_client=hume_client,
+                logger_contextual=logger
+            )
+            for start in range(0, len(segments), 5)
+        ))
+
+@pytest.fixture
+def tts_limit(monkeypatch):
+    monkeypatch.setattr(settings, "HUME_TTS_MAX_CONCURRENCY", 3)
+    ClientFactory.reset_clients()
+    yield 3
+    ClientFactory.reset_clients()
+
+@pytest.mark.asyncio
+async def test_batches_respect_per_key_concurrency_limit(tts_limit):
+    tts = FakeAsyncTts(latency=0.05)
+    saved = []
+    results = await _run_batches(tts, batch_count=10, saved=saved)
+
+    assert results == [True] * 10
+    assert tts.calls == 10
+    assert tts.max_in_flight == tts_limit
+    assert sorted(segment_id for segment_id, _ in saved) == list(range(1, 51))
+
+@pytest.mark.asyncio
+async def test_batches_do_not_block_event_loop(tts_limit):
+    tts = FakeAsyncTts(latency=0.1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    try:
+        await _run_batches(tts, batch_count=3, saved=[])
+    finally:
+        ticker_task.cancel()
+    elapsed = time.perf_counter() - start
+
+    # Three batches within the limit run concurrently, not back to back
+    assert elapsed < 0.25
+    # The loop kept scheduling other work while requests were in flight
+    assert ticks >= 5
+
+@pytest.mark.asyncio
+async def test_limiter_is_shared_per_api_key(tts_limit, monkeypatch):
+    first = ClientFactory.get_hume_tts_limiter()
+    assert ClientFactory.get_hume_tts_limiter() is first
+
+    monkeypatch.setattr(settings, "HUME_API_KEY", "another-key")
+    assert ClientFactory.get_hume_tts_limiter() is not first
@@ -0,0 +1,106 @@
+"""
+Tests for character-budget packing of TTS requests (services/speech_batching.py).
+"""
+
+import asyncio
+import base64
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from db import crud, models
+from services import speech_generation
+from services.rate_limit import AdmissionStats
+from services.speech_batching import BatchSizer, get_batch_sizer, reset_batch_sizer
+
+def test_pack_respects_budget_utterance_limit_and_gaps():
+    sizer = BatchSizer(target_seconds=10, initial_chars=100, max_utterances=3)
+    lengths = [30, 30, 30, 30, 90, 150, 10, 10, 10, 10, 10]
+
+    assert sizer.pack(range(len(lengths)), lengths) == [(0, 3), (3, 4), (4, 5), (5, 6), (6, 9), (9, 11)]
+    # Segments are only packed with their direct neighbours
+    assert sizer.pack([0, 1, 3, 6, 7], lengths) == [(0, 2), (3, 4), (6, 8)]
+    assert sizer.pack([], lengths) == []
+
+def test_budget_tracks_observed_latency():
+    sizer = BatchSizer(target_seconds=10, initial_chars=1000, max_utterances=5, min_chars=200, max_chars=5000, smoothing=0.5)
+    assert sizer.char_budget == 1000
+
+    sizer.observe(500, 10.0)  # 0.02 s/char
+    assert sizer.char_budget == 500
+    sizer.observe(500, 5.0)   # 0.01 s/char, averaged to 0.015
+    assert sizer.char_budget == 666
+
+    sizer.observe(10, 100.0)
+    assert sizer.char_budget == 200
+    sizer.observe(0, 1.0)
+    assert sizer.char_budget == 200
+
+def test_latency_excludes_scheduling_delays():
+    sizer = BatchSizer(target_seconds=10, initial_chars=1000, max_utterances=5, min_chars=200, max_chars=5000, smoothing=1.0)
+    api_params = {"utterances": [SimpleNamespace(text="x" * 500)]}
+    with patch.object(speech_generation, "get_batch_sizer", return_value=sizer):
+        # 6 of the 10 seconds were spent queued by the scheduler
+        speech_generation._observe_latency(api_params, 10.0, AdmissionStats(waited=6.0))
+        assert sizer.char_budget == 1250
+
+        # A throttled request says nothing about the provider's speed
+        speech_generation._observe_latency(api_params, 60.0, AdmissionStats(throttled=1))
+        assert sizer.char_budget == 1250
+
+class LatencyTts:
+    """Stands in for AsyncHumeClient.tts with latency proportional to the characters requested."""
+
+    def __init__(self, seconds_per_char):
+        self.seconds_per_char = seconds_per_char
+        self.requests = []
+
+    async def synthesize_json(self, utterances, **kwargs):
+        self.requests.append([len(utterance.text) for utterance in utterances])
+        await asyncio.sleep(self.seconds_per_char * sum(len(utterance.text) for utterance in utterances))
+        snippets = [
+            [SimpleNamespace(audio=base64.b64encode(f"{uuid.uuid4()}".encode()).decode())]
+            for _ in utterances
+        ]
+        return SimpleNamespace(generations=[SimpleNamespace(snippets=snippets)])
+
+@pytest.fixture
+def batch_settings(monkeypatch):
+    monkeypatch.setattr(speech_generation.settings, "HUME_TTS_BATCH_CHARS", 1000)
+    monkeypatch.setattr(speech_generation.settings, "HUME_TTS_BATCH_TARGET_SECONDS", 0.05)
+    reset_batch_sizer()
+    yield
+    reset_batch_sizer()
+
+@pytest.fixture
+def text_with_long_segments(db_session):
+    db_text = crud.create_text(db_session, content=f"Batching test. {uuid.uuid4().hex}", title="Batching")
+    narrator = crud.create_character(db_session, text_id=db_text.id, name="Narrator", provider_id=f"voice-{uuid.uuid4().hex}")
+    lengths = [600, 600, 600, 40, 40, 40, 40, 40, 40]
+    for sequence, length in enumerate(lengths, start=1):
+        crud.create_text_segment(db_session, text_id=db_text.id, character_id=narrator.id, text=f"{sequence} " + "x" * (length - 2), sequence=sequence)
+    yield db_text.id
+
+    db_session.rollback()
+    db_session.query(models.SpeechCacheEntry).filter(models.SpeechCacheEntry.voice_id == narrator.provider_id).delete()
+    crud.delete_segments_by_text(db_session, db_text.id)
+    crud.delete_characters_by_text(db_session, db_text.id)
+    db_session.query(models.Text).filter(models.Text.id == db_text.id).delete()
+    db_session.commit()
+
+@pytest.mark.asyncio
+async def test_long_segments_get_smaller_batches(batch_settings, text_with_long_segments):
+    text_id = text_with_long_segments
+    tts = LatencyTts(seconds_per_char=0.0001)
+
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)):
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False) is True
+        assert sorted(tts.requests) == sorted([[600], [600], [600, 40, 40, 40, 40], [40, 40]])
+
+        # Observed ~0.1 ms/char with a 50 ms target: the budget drops to about 500 characters
+        assert 200 <= get_batch_sizer().char_budget < 640
+        tts.requests.clear()
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False) is True
+        assert sorted(tts.requests) == sorted([[600], [600], [600], [40, 40, 40, 40, 40], [40]])
@@ -0,0 +1,120 @@
+"""
+Tests for the per-segment speech cache (services/speech_cache.py) used by generate_text_audio.
+"""
+
+import asyncio
+import base64
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from db import crud, models
+from services import speech_generation
+from services.speech_cache import segment_cache_key, speech_cache_key
+
+class FakeAsyncTts:
+    """Stands in for AsyncHumeClient.tts; returns distinct audio per utterance and records requests."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def synthesize_json(self, utterances, **kwargs):
+        self.requests.append([utterance.text for utterance in utterances])
+        snippets = [
+            [SimpleNamespace(audio=base64.b64encode(f"{uuid.uuid4()}:{utterance.text}".encode()).decode())]
+            for utterance in utterances
+        ]
+        await asyncio.sleep(0)
+        return SimpleNamespace(generations=[SimpleNamespace(snippets=snippets)])
+
+def _segment(character_id, text, description=None, trailing_silence=None):
+    return SimpleNamespace(character_id=character_id, text=text, description=description, trailing_silence=trailing_silence)
+
+def test_cache_key_covers_every_tts_input():
+    base = speech_cache_key("voice-1", "Hello.", "warm", 0.5, [{"voice_id": "voice-2", "text": "Hi.", "description": None}])
+    assert base == speech_cache_key("voice-1", "Hello.", "warm", 0.5, [{"voice_id": "voice-2", "text": "Hi.", "description": None}])
+    assert base != speech_cache_key("voice-3", "Hello.", "warm", 0.5, [{"voice_id": "voice-2", "text": "Hi.", "description": None}])
+    assert base != speech_cache_key("voice-1", "Hello!", "warm", 0.5, [{"voice_id": "voice-2", "text": "Hi.", "description": None}])
+    assert base != speech_cache_key("voice-1", "Hello.", "cold", 0.5, [{"voice_id": "voice-2", "text": "Hi.", "description": None}])
+    assert base != speech_cache_key("voice-1", "Hello.", "warm", 1.0, [{"voice_id": "voice-2", "text": "Hi.", "description": None}])
+    assert base != speech_cache_key("voice-1", "Hello.", "warm", 0.5, [{"voice_id": "voice-2", "text": "Hey.", "description": None}])
+    assert base != speech_cache_key("voice-1", "Hello.", "warm", 0.5)
+
+def test_segment_key_uses_preceding_segments_as_context():
+    voice_map = {"1": "voice-1", "2": "voice-2"}
+    segments = [_segment(1, f"Line {i}.") for i in range(6)]
+    keys = [segment_cache_key(segments, i, voice_map) for i in range(6)]
+
+    segments[1] = _segment(1, "Edited line.")
+    edited = [segment_cache_key(segments, i, voice_map) for i in range(6)]
+
+    # The edited segment and the CONTEXT_SEGMENTS after it change; the rest do not
+    assert [a == b for a, b in zip(keys, edited)] == [True, False, False, False, False, True]
+    assert segment_cache_key([_segment(3, "No voice.")], 0, voice_map) is None
+
+def test_batch_ranges_group_consecutive_segments():
+    assert speech_generation._batch_ranges(list(range(12)), 5) == [(0, 5), (5, 10), (10, 12)]
+    assert speech_generation._batch_ranges([1, 2, 4, 5, 6, 9], 2) == [(1, 3), (4, 6), (6, 7), (9, 10)]
+    assert speech_generation._batch_ranges([], 5) == []
+
+@pytest.fixture
+def text_with_segments(db_session):
+    db_text = crud.create_text(db_session, content=f"Speech cache test. {uuid.uuid4().hex}", title="Speech Cache")
+    narrator = crud.create_character(db_session, text_id=db_text.id, name="Narrator", provider_id=f"voice-{uuid.uuid4().hex}")
+    for sequence in range(1, 8):
+        crud.create_text_segment(db_session, text_id=db_text.id, character_id=narrator.id, text=f"Sentence {sequence}.", sequence=sequence)
+    yield db_text.id, narrator.provider_id
+
+    db_session.rollback()
+    db_session.query(models.SpeechCacheEntry).filter(models.SpeechCacheEntry.voice_id == narrator.provider_id).delete()
+    crud.delete_segments_by_text(db_session, db_text.id)
+    crud.delete_characters_by_text(db_session, db_text.id)
+    db_session.query(models.Text).filter(models.Text.id == db_text.id).delete()
+    db_session.commit()
+
+def _audio_hashes(db_session, text_id):
+    db_session.expire_all()
+    return [segment.audio_hash for segment in crud.get_segments_by_text(db_session, text_id)]
+
+@pytest.mark.asyncio
+async def test_regeneration_only_synthesizes_changed_segments(db_session, text_with_segments):
+    text_id, voice_id = text_with_segments
+    tts = FakeAsyncTts()
+    hume_client = SimpleNamespace(tts=tts)
+
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=hume_client):
+        assert await speech_generation.generate_text_audio(text_id) is True
+        assert [len(request) for request in tts.requests] == [5, 2]
+        first = _audio_hashes(db_session, text_id)
+        assert all(first)
+
+        # Unchanged text: every segment is a cache hit, Hume is not called and
+        # force alignment of the unchanged audio is kept
+        crud.update_text_word_timestamps(db_session, text_id, [{"word": "Sentence", "start": 0.0, "end": 0.4}])
+        tts.requests.clear()
+        assert await speech_generation.generate_text_audio(text_id) is True
+        assert tts.requests == []
+        assert _audio_hashes(db_session, text_id) == first
+        assert crud.is_force_alignment_current(db_session, text_id)
+
+        # Editing segment 4 resynthesizes it and the segments using it as context
+        segment = crud.get_segments_by_text(db_session, text_id)[3]
+        segment.text = "Sentence four, revised."
+        db_session.commit()
+        assert await speech_generation.generate_text_audio(text_id) is True
+        assert tts.requests == [["Sentence four, revised.", "Sentence 5.", "Sentence 6.", "Sentence 7."]]
+        assert not crud.has_word_timestamps(db_session, text_id)
+        second = _audio_hashes(db_session, text_id)
+        assert second[:3] == first[:3]
+        assert all(a != b for a, b in zip(second[3:], first[3:]))
+
+        # Bypassing the cache resynthesizes everything
+        tts.requests.clear()
+        assert await speech_generation.generate_text_audio(text_id, use_cache=False) is True
+        assert [len(request) for request in tts.requests] == [5, 2]
+
+    entries = db_session.query(models.SpeechCacheEntry).filter(models.SpeechCacheEntry.voice_id == voice_id).all()
+    assert len(entries) == 7 + 4
+    assert sum(entry.hit_count for entry in entries) == 7 + 3
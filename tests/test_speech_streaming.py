@@ -0,0 +1,121 @@
+"""
+Tests for streaming speech generation and the incremental speech combiner
+(services/speech_combiner.py).
+"""
+
+import asyncio
+import base64
+import os
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from db import crud, models
+from services import combine_export_audio, speech_generation
+from services.blob_store import get_blob_store
+from services.speech_combiner import IncrementalSpeechCombiner, find_combined_speech
+
+class FakeStreamingTts:
+    """Stands in for AsyncHumeClient.tts; streams two chunks per utterance and logs events."""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def synthesize_json_streaming(self, utterances, **kwargs):
+        for index, utterance in enumerate(utterances):
+            snippet_id = uuid.uuid4().hex
+            for chunk_index in range(2):
+                await asyncio.sleep(0.01)
+                yield SimpleNamespace(
+                    audio=base64.b64encode(f"[{utterance.text}:{chunk_index}]".encode()).decode(),
+                    chunk_index=chunk_index,
+                    snippet_id=snippet_id,
+                    utterance_index=index,
+                    is_last_chunk=chunk_index == 1
+                )
+        await asyncio.sleep(0.05)
+        self.events.append(("stream_end", utterances[-1].text))
+
+def test_combiner_appends_in_sequence_order():
+    store = get_blob_store()
+    audio = {segment_id: f"<{segment_id}>".encode() for segment_id in (11, 12, 13)}
+    hashes = {segment_id: store.put(data) for segment_id, data in audio.items()}
+
+    combiner = IncrementalSpeechCombiner(9001, [11, 12, 13])
+    combiner.add(13, hashes[13], audio[13])
+    combiner.add(12, hashes[12], audio[12])
+    assert combiner.appended == 0
+    combiner.add(11, hashes[11], audio[11])
+    assert combiner.appended == 3
+
+    path = combiner.finish()
+    with open(path, "rb") as track:
+        assert track.read() == b"<11><12><13>"
+    assert find_combined_speech(9001, [hashes[11], hashes[12], hashes[13]]) == path
+    assert find_combined_speech(9001, [hashes[11], hashes[13]]) is None
+
+    incomplete = IncrementalSpeechCombiner(9001, [11, 12])
+    incomplete.add(12, hashes[12])
+    assert incomplete.finish() is None
+
+@pytest.fixture
+def text_with_segments(db_session):
+    db_text = crud.create_text(db_session, content=f"Streaming test. {uuid.uuid4().hex}", title="Streaming")
+    narrator = crud.create_character(db_session, text_id=db_text.id, name="Narrator", provider_id=f"voice-{uuid.uuid4().hex}")
+    for sequence in range(1, 8):
+        crud.create_text_segment(db_session, text_id=db_text.id, character_id=narrator.id, text=f"Sentence {sequence}.", sequence=sequence)
+    yield db_text.id, narrator.provider_id
+
+    db_session.rollback()
+    db_session.query(models.SpeechCacheEntry).filter(models.SpeechCacheEntry.voice_id == narrator.provider_id).delete()
+    crud.delete_segments_by_text(db_session, db_text.id)
+    crud.delete_characters_by_text(db_session, db_text.id)
+    db_session.query(models.Text).filter(models.Text.id == db_text.id).delete()
+    db_session.commit()
+
+@pytest.mark.asyncio
+async def test_streaming_stores_segments_and_combines_early(db_session, text_with_segments, tmp_path):
+    text_id, _ = text_with_segments
+    events = []
+    hume_client = SimpleNamespace(tts=FakeStreamingTts(events))
+    save = speech_generation._save_streamed_segment
+
+    def recording_save(segment_id, audio, *args):
+        save(segment_id, audio, *args)
+        events.append(("saved", audio.decode()))
+
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=hume_client), \
+         patch.object(speech_generation, "_save_streamed_segment", side_effect=recording_save):
+        assert await speech_generation.generate_text_audio(text_id, streaming=True) is True
+
+    # Each segment is stored before its batch's stream has ended
+    assert events.index(("saved", "[Sentence 1.:0][Sentence 1.:1]")) < events.index(("stream_end", "Sentence 5."))
+    assert events.index(("saved", "[Sentence 6.:0][Sentence 6.:1]")) < events.index(("stream_end", "Sentence 7."))
+
+    db_session.expire_all()
+    segments = crud.get_segments_by_text(db_session, text_id)
+    store = get_blob_store()
+    audio = [store.get(segment.audio_hash) for segment in segments]
+    assert audio == [f"[Sentence {n}.:0][Sentence {n}.:1]".encode() for n in range(1, 8)]
+
+    # The combined track is ready and reused by combine_speech_segments without ffmpeg
+    track = find_combined_speech(text_id, [segment.audio_hash for segment in segments])
+    assert track is not None
+    with patch.object(combine_export_audio.subprocess, "run") as run, \
+         patch.object(combine_export_audio, "_run_force_alignment_on_combined_audio", return_value=True):
+        combined = await combine_export_audio.combine_speech_segments(text_id, output_dir=str(tmp_path))
+    run.assert_not_called()
+    with open(combined, "rb") as combined_file:
+        assert combined_file.read() == b"".join(audio)
+
+    # A later streaming run served from the cache still publishes a track for the same audio
+    os.remove(track)
+    with patch.object(speech_generation.ClientFactory, "get_hume_async_client", return_value=hume_client):
+        segments[2].text = "Sentence three, revised."
+        db_session.commit()
+        assert await speech_generation.generate_text_audio(text_id, streaming=True) is True
+    db_session.expire_all()
+    segments = crud.get_segments_by_text(db_session, text_id)
+    assert find_combined_speech(text_id, [segment.audio_hash for segment in segments]) is not None
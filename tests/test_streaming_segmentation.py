@@ -0,0 +1,248 @@
+"""
+Tests for streamed phase 2 segmentation: incremental JSON array parsing
+(services/json_stream.py) and per-segment persistence in process_text_analysis.
+"""
+
+import asyncio
+import json
+import random
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from db import crud, models
+from db.session_manager import managed_db_session
+from services import llm_cache, text_analysis, voice_generation
+from services.json_stream import JSONArrayStream
+from services.voice_library import description_hash
+
+ELEMENTS = [
+    {"role": "Narrator", "text": 'The sign read "CLOSED {for now}".', "description": "dry", "speed": 1.0, "trailing_silence": 0.5},
+    {"role": "Anna", "text": "Back\\slash, [brackets] and ünïcode?", "description": "puzzled", "speed": 1.1, "trailing_silence": 0.8},
+    {"role": "Narrator", "text": "Nobody answered.", "description": "flat", "speed": 0.9, "trailing_silence": 1.0, "extra": {"tags": [1, {"a": "]"}]}}
+]
+
+def _response(elements):
+    return "Here you go:\n```json\n" + json.dumps({"narrative_elements": elements}, indent=2, ensure_ascii=False) + "\n```"
+
+def _pieces(text, seed=0):
+    rng = random.Random(seed)
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 9)
+        yield text[position:position + size]
+        position += size
+
+def test_elements_are_returned_as_soon_as_they_close():
+    response = _response(ELEMENTS)
+    for seed in range(20):
+        parser = JSONArrayStream("narrative_elements")
+        parsed = []
+        for piece in _pieces(response, seed):
+            parsed.extend(parser.feed(piece))
+        assert parsed == ELEMENTS
+        assert parser.complete and parser.count == 3
+        assert parser.text == response
+
+    # Each element is available before the next one starts arriving
+    parser = JSONArrayStream("narrative_elements")
+    first_end = response.index('"trailing_silence": 0.5') + len('"trailing_silence": 0.5\n    }')
+    assert parser.feed(response[:first_end]) == ELEMENTS[:1]
+    assert parser.feed(response[first_end:]) == ELEMENTS[1:]
+
+def test_truncated_response_is_incomplete():
+    response = _response(ELEMENTS)
+    parser = JSONArrayStream("narrative_elements")
+    assert parser.feed(response[:response.index('"Nobody')]) == ELEMENTS[:2]
+    assert not parser.complete
+
+    with pytest.raises(ValueError):
+        JSONArrayStream().feed('[{"role": "Narrator", "text": }]')
+
+class FakeStream:
+    """Stands in for AsyncMessageStream, delivering a response in small text deltas."""
+
+    def __init__(self, response, on_delta):
+        self.response = response
+        self.on_delta = on_delta
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        async def deltas():
+            for piece in _pieces(self.response):
+                self.on_delta()
+                yield piece
+        return deltas()
+
+async def fake_phase1(content):
+    return [
+        {"name": "Narrator", "is_narrator": True, "speaking": True, "persona_description": "calm", "intro_text": "Hi."},
+        {"name": "Anna", "is_narrator": False, "speaking": True, "persona_description": "bright", "intro_text": "I'm Anna."}
+    ]
+
+@pytest.fixture
+def text_to_analyze(db_session, monkeypatch):
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_ENABLED", False)
+    content = "\n\n".join(element["text"] for element in ELEMENTS) + f"\n\n{uuid.uuid4().hex}"
+    db_text = crud.create_text(db_session, content=content, title="Streaming")
+    yield db_text.id, content
+
+    db_session.rollback()
+    db_session.query(models.ProviderVoice).filter(models.ProviderVoice.text_id == db_text.id).delete()
+    crud.delete_segments_by_text(db_session, db_text.id)
+    crud.delete_characters_by_text(db_session, db_text.id)
+    db_session.query(models.Text).filter(models.Text.id == db_text.id).delete()
+    db_session.commit()
+
+@pytest.mark.asyncio
+async def test_segments_are_stored_while_the_response_streams(db_session, text_to_analyze):
+    text_id, content = text_to_analyze
+    stored_while_streaming = []
+
+    def count_stored():
+        with managed_db_session() as db:
+            stored_while_streaming.append(len(crud.get_segments_by_text(db, text_id)))
+
+    unknown_role = {"role": "Stranger", "text": "Who?", "description": "", "speed": 1.0, "trailing_silence": 0.5}
+    response = _response(ELEMENTS[:2] + [unknown_role] + ELEMENTS[2:])
+    messages = SimpleNamespace(stream=lambda **params: FakeStream(response, count_stored))
+
+    with patch.object(text_analysis, "analyze_text_phase1_characters", AsyncMock(side_effect=fake_phase1)), \
+         patch.object(text_analysis.ClientFactory, "get_anthropic_async_client", return_value=SimpleNamespace(messages=messages)):
+        db_text = await text_analysis.process_text_analysis(text_id, content, streaming=True)
+
+    assert db_text.analyzed is True
+    # Segments appeared one by one, before the response was complete
+    assert stored_while_streaming[0] == 0
+    assert sorted(set(stored_while_streaming)) == [0, 1, 2, 3]
+
+    db_session.expire_all()
+    segments = crud.get_segments_by_text(db_session, text_id)
+    assert [segment.text for segment in segments] == [element["text"] for element in ELEMENTS]
+    assert [segment.sequence for segment in segments] == [1, 2, 4]
+    assert [(segment.paragraph_start, segment.paragraph_end) for segment in segments] == [(0, 1), (1, 2), (2, 3)]
+    assert len(crud.get_text(db_session, text_id).paragraph_hashes) == 4
+
+@pytest.mark.asyncio
+async def test_truncated_stream_fails_and_leaves_text_unanalyzed(db_session, text_to_analyze):
+    text_id, content = text_to_analyze
+    response = _response(ELEMENTS)
+    truncated = response[:response.index('"Nobody')]
+    messages = SimpleNamespace(stream=lambda **params: FakeStream(truncated, lambda: None))
+
+    with patch.object(text_analysis, "analyze_text_phase1_characters", AsyncMock(side_effect=fake_phase1)), \
+         patch.object(text_analysis.ClientFactory, "get_anthropic_async_client", return_value=SimpleNamespace(messages=messages)):
+        with pytest.raises(ValueError, match="truncated"):
+            await text_analysis.process_text_analysis(text_id, content, streaming=True)
+
+    db_session.expire_all()
+    assert crud.get_text(db_session, text_id).analyzed is False
+    assert len(crud.get_segments_by_text(db_session, text_id)) == 2
+
+@pytest.mark.asyncio
+async def test_chunks_stream_concurrently_and_yield_in_text_order():
+    content = "\n\n".join(f'Paragraph {number}. "Line {number}," said Anna.' for number in range(12))
+    chunks = text_analysis.split_into_chunks(content, 120)
+    started = []
+
+    async def fake_stream(chunk, characters):
+        number = chunks.index(chunk)
+        started.append(number)
+        for paragraph in chunk.split("\n\n"):
+            # Later chunks produce their elements faster
+            await asyncio.sleep(0.002 * (len(chunks) - number))
+            yield {"role": "Narrator", "text": paragraph}
+
+    with patch.object(text_analysis, "stream_text_phase2_segmentation", fake_stream):
+        elements = [element async for element in text_analysis.stream_text_phase2_chunked(content, [], chunk_chars=120)]
+
+    assert len(chunks) > 2
+    assert sorted(started) == list(range(len(chunks)))
+    assert [element["text"] for element in elements] == content.split("\n\n")
+
+class FakeVoices:
+    """Stands in for AsyncHumeClient.tts.voices, with an in-memory account."""
+
+    def __init__(self):
+        self.account = {}
+
+    async def create(self, name, generation_id):
+        voice_id = f"voice-{uuid.uuid4().hex}"
+        self.account[voice_id] = name
+        return SimpleNamespace(id=voice_id)
+
+    async def delete(self, name):
+        self.account = {voice_id: voice_name for voice_id, voice_name in self.account.items() if voice_name != name}
+
+class FakeTts:
+    def __init__(self):
+        self.voices = FakeVoices()
+
+    async def synthesize_json_streaming(self, utterances, **kwargs):
+        yield SimpleNamespace(generation_id=uuid.uuid4().hex)
+
+class SlowStream(FakeStream):
+    @property
+    def text_stream(self):
+        async def deltas():
+            async for piece in FakeStream.text_stream.fget(self):
+                await asyncio.sleep(0.002)
+                yield piece
+        return deltas()
+
+@pytest.mark.asyncio
+async def test_voices_are_generated_during_segmentation(db_session, text_to_analyze):
+    text_id, content = text_to_analyze
+    run = uuid.uuid4().hex
+    characters = (await fake_phase1(content)) + [
+        {"name": "Ghost", "is_narrator": False, "speaking": True, "persona_description": "hollow", "intro_text": "Boo."},
+        {"name": "Crowd", "is_narrator": False, "speaking": False, "persona_description": "murmur", "intro_text": ""}
+    ]
+    for character in characters:
+        # Unique per test run so earlier runs' library entries do not match
+        character["persona_description"] += f" ({run})"
+    tts = FakeTts()
+    voices_while_streaming = []
+
+    def check_voices():
+        with managed_db_session() as db:
+            voiced = [character.name for character in crud.get_characters_by_text(db, text_id) if character.provider_id]
+            voices_while_streaming.append((len(voiced), crud.get_text(db, text_id).analyzed))
+
+    # Crowd has a line in the text although phase 1 marked it as non-speaking
+    crowd_line = {"role": "Crowd", "text": "Nobody answered.", "description": "", "speed": 1.0, "trailing_silence": 0.5}
+    messages = SimpleNamespace(stream=lambda **params: SlowStream(_response(ELEMENTS[:2] + [crowd_line]), check_voices))
+    descriptions = [character["persona_description"] for character in characters]
+
+    try:
+        with patch.object(text_analysis, "analyze_text_phase1_characters", AsyncMock(return_value=characters)), \
+             patch.object(text_analysis.ClientFactory, "get_anthropic_async_client", return_value=SimpleNamespace(messages=messages)), \
+             patch.object(voice_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)):
+            db_text = await text_analysis.process_text_analysis(text_id, content, streaming=False, pipeline_voices=True)
+
+        assert db_text.analyzed is True
+        # Narrator, Anna and Ghost were voiced while the response streamed, before the text was analyzed
+        assert max(voiced for voiced, _ in voices_while_streaming) == 3
+        assert not any(analyzed for _, analyzed in voices_while_streaming)
+
+        db_session.expire_all()
+        voiced = {character.name: character.provider_id for character in crud.get_characters_by_text(db_session, text_id)}
+        # Ghost got no segments and lost its voice (a shared library voice, so kept at Hume);
+        # Crowd got a line and was voiced afterwards
+        assert voiced["Ghost"] is None
+        assert all(voiced[name] for name in ("Narrator", "Anna", "Crowd"))
+        assert len(tts.voices.account) == 4
+    finally:
+        db_session.rollback()
+        hashes = [description_hash(description) for description in descriptions]
+        db_session.query(models.ProviderVoice).filter(models.ProviderVoice.voice_id.in_(list(tts.voices.account))).delete(synchronize_session=False)
+        db_session.query(models.VoiceLibraryEntry).filter(models.VoiceLibraryEntry.description_hash.in_(hashes)).delete(synchronize_session=False)
+        db_session.commit()
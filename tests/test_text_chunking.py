@@ -0,0 +1,82 @@
+"""
+Tests for chunked phase 2 segmentation of long texts (services/text_chunking.py).
+"""
+
+import asyncio
+import random
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from services import text_analysis
+from services.text_chunking import split_into_chunks
+from services.text_structure import analyze_text_structure
+
+def _chapter(paragraphs=40):
+    rng = random.Random(7)
+    lines = []
+    for number in range(paragraphs):
+        narration = " ".join(["The wind moved through the valley."] * rng.randint(1, 6))
+        if number % 3 == 0:
+            lines.append(f'{narration} "Line {number}, spoken aloud," said Mara. "And a second line {number}."')
+        elif number % 3 == 1:
+            # Dialogue running over two paragraphs
+            lines.append(f'"Long speech {number} begins here and goes on')
+            lines.append(f'and continues into another paragraph {number}," Tom finished.')
+        else:
+            lines.append(narration)
+    return "\n\n".join(lines)
+
+def _dialogues(text):
+    return [element["content"] for element in analyze_text_structure(text)["elements"] if element["type"] == "dialogue"]
+
+def test_chunks_respect_size_and_dialogue_boundaries():
+    text = _chapter()
+    chunks = split_into_chunks(text, 600)
+
+    assert len(chunks) > 5
+    assert all(len(chunk) <= 600 for chunk in chunks)
+    # Every chunk starts outside of dialogue, so its structure matches the whole text's
+    assert [line for chunk in chunks for line in _dialogues(chunk)] == _dialogues(text)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+    assert split_into_chunks(text, 0) == [text]
+    assert split_into_chunks("Short text.", 600) == ["Short text."]
+
+def test_oversized_paragraph_is_cut_between_dialogue_lines():
+    paragraph = " ".join(f'Narration {number}. "Spoken {number}."' for number in range(30))
+    chunks = split_into_chunks(paragraph, 150)
+
+    assert len(chunks) > 3
+    assert all(len(chunk) <= 150 for chunk in chunks)
+    assert all(chunk.count('"') % 2 == 0 for chunk in chunks)
+    # No boundary to cut at: kept whole
+    assert split_into_chunks("word " * 100, 150) == [("word " * 100).strip()]
+
+@pytest.mark.asyncio
+async def test_chunks_are_segmented_concurrently_and_merged_in_order():
+    text = _chapter()
+    characters = [{"name": "Narrator", "is_narrator": True}, {"name": "Mara", "is_narrator": False}]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_phase2(chunk, chunk_characters):
+        nonlocal in_flight, max_in_flight
+        assert chunk_characters is characters
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Later chunks finish first
+        await asyncio.sleep(0.05 / (1 + text.index(chunk[:40]) / 1000))
+        in_flight -= 1
+        return [{"role": "Narrator", "text": paragraph} for paragraph in chunk.split("\n\n")]
+
+    phase2 = AsyncMock(side_effect=fake_phase2)
+    with patch.object(text_analysis, "analyze_text_phase2_segmentation", phase2):
+        elements = await text_analysis.analyze_text_phase2_chunked(text, characters, chunk_chars=600)
+        assert phase2.await_count == len(split_into_chunks(text, 600))
+        assert max_in_flight == phase2.await_count
+        assert [element["text"] for element in elements] == text.split("\n\n")
+
+        phase2.reset_mock()
+        await text_analysis.analyze_text_phase2_chunked(text, characters, chunk_chars=0)
+        phase2.assert_awaited_once_with(text, characters)
@@ -0,0 +1,60 @@
+"""
+Tests for content-hash based text de-duplication.
+"""
+
+import hashlib
+import uuid
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from api.main import app
+from db import async_crud, models, crud
+
+@pytest.fixture
+def content(db_session):
+    content = f"Chapter one. It was a bright cold day in April. {uuid.uuid4().hex}"
+    yield content
+
+    db_session.rollback()
+    db_session.query(models.Text).filter(
+        models.Text.content_sha256 == crud.compute_content_hash(content)
+    ).delete()
+    db_session.commit()
+
+def test_create_text_stores_content_hash(db_session, content):
+    db_text = crud.create_text(db_session, content=content)
+
+    assert db_text.content_sha256 == hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def test_get_text_by_content_uses_hash(db_session, content):
+    db_text = crud.create_text(db_session, content=content)
+
+    assert crud.get_text_by_content(db_session, content).id == db_text.id
+    assert crud.get_text_by_content(db_session, content + " ") is None
+
+def test_duplicate_content_is_rejected(db_session, content):
+    crud.create_text(db_session, content=content)
+
+    with pytest.raises(IntegrityError):
+        crud.create_text(db_session, content=content)
+
+def test_create_endpoint_returns_text_created_concurrently(db_session, content):
+    db_text = crud.create_text(db_session, content=content)
+    lookup = async_crud.get_text_by_content
+    calls = []
+
+    async def created_after_check(db, text_content):
+        # The first lookup runs before a concurrent request inserts the same content
+        calls.append(text_content)
+        return None if len(calls) == 1 else await lookup(db, text_content)
+
+    with patch.object(async_crud, "get_text_by_content", side_effect=created_after_check):
+        response = TestClient(app).post("/api/text/", json={"content": content})
+
+    assert response.status_code == 200
+    assert response.json()["id"] == db_text.id
+    assert response.json()["created"] is False
@@ -0,0 +1,51 @@
+"""
+Tests for the dialogue/narrative structure pass before phase 2 segmentation (services/text_structure.py).
+"""
+
+from services.text_chunking import split_into_chunks
+from services.text_structure import analyze_text_structure, ends_in_dialogue
+
+def _elements(text):
+    return [(element["type"], element["content"]) for element in analyze_text_structure(text)["elements"]]
+
+def test_straight_quotes_toggle_dialogue():
+    # Narrative around empty quotes is merged; text after an unclosed quote reads as narrative
+    text = 'She paused.\n"Is anyone there?" she asked.  ""  Nobody answered.\n"Hello'
+    assert _elements(text) == [
+        ("narrative", "She paused."),
+        ("dialogue", "Is anyone there?"),
+        ("narrative", "she asked. Nobody answered. Hello")
+    ]
+
+def test_typographic_quotes():
+    text = (
+        "“It was late,” said Tom. «Too late.»\n\n"
+        "“The speech ran on\n\n"
+        "“and over a second paragraph.” He stopped. ” A stray mark."
+    )
+    assert _elements(text) == [
+        ("dialogue", "It was late,"),
+        ("narrative", "said Tom."),
+        ("dialogue", "Too late."),
+        ("dialogue", "The speech ran on"),
+        ("dialogue", "and over a second paragraph."),
+        ("narrative", "He stopped. A stray mark.")
+    ]
+    # Apostrophes are not quote marks
+    assert _elements("It’s Tom’s.") == [("narrative", "It’s Tom’s.")]
+    assert ends_in_dialogue("“The speech ran on") and not ends_in_dialogue("“and a second paragraph.”", True)
+
+def test_offsets_point_into_the_text():
+    text = "  Rain fell.\n“Come in,” she said, “quickly.”\n\n"
+    elements = analyze_text_structure(text)["elements"]
+    assert [(element["start"], element["end"]) for element in elements] == [(2, 12), (14, 22), (24, 33), (35, 43)]
+    assert [text[element["start"]:element["end"]] for element in elements] == ["Rain fell.", "Come in,", "she said,", "quickly."]
+
+def test_chunks_follow_typographic_dialogue():
+    paragraph = " ".join(f"Narration {number}. “Spoken {number}, and a little more.”" for number in range(20))
+    chunks = split_into_chunks(paragraph, 200)
+
+    assert len(chunks) > 3
+    # Every chunk starts and ends outside of dialogue
+    assert not any(ends_in_dialogue(chunk) for chunk in chunks)
+    assert [element for chunk in chunks for element in _elements(chunk)] == _elements(paragraph)
@@ -23,7 +23,8 @@ if not settings.HUME_API_KEY or len(settings.HUME_API_KEY) < 10:
 @pytest.fixture
 def test_text(db_session):
     """Create a test text entry in the database"""
-    text_content = "This is a test text for voice generation integration testing."
+    # Unique content: texts are de-duplicated by content hash and kept for inspection
+    text_content = f"This is a test text for voice generation integration testing ({uuid.uuid4().hex[:6]})."
     db_text = crud.create_text(db_session, content=text_content, title="Voice Test Text")
     yield db_text
     # No cleanup needed as we keep the data for inspection
@@ -0,0 +1,191 @@
+"""
+Tests for the local index of Hume voices (services/voice_index.py).
+"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from db import crud, models
+from services import text_analysis, voice_generation, voice_index
+
+class NotFound(Exception):
+    status_code = 404
+
+class FakeVoices:
+    """Stands in for AsyncHumeClient.tts.voices, with an in-memory account."""
+
+    def __init__(self):
+        self.account = {}
+        self.deleted = []
+        self.list_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, name, generation_id):
+        voice_id = f"voice-{uuid.uuid4().hex}"
+        self.account[voice_id] = name
+        return SimpleNamespace(id=voice_id)
+
+    async def delete(self, name):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        ids = [voice_id for voice_id, voice_name in self.account.items() if voice_name == name]
+        if not ids:
+            raise NotFound(f"Voice {name} not found")
+        for voice_id in ids:
+            del self.account[voice_id]
+        self.deleted.append(name)
+
+    async def list(self, provider):
+        self.list_calls += 1
+        voices = [SimpleNamespace(id=voice_id, name=name) for voice_id, name in self.account.items()]
+
+        async def pager():
+            for voice in voices:
+                yield voice
+        return pager()
+
+class FakeTts:
+    def __init__(self):
+        self.voices = FakeVoices()
+
+    async def synthesize_json_streaming(self, utterances, **kwargs):
+        yield SimpleNamespace(generation_id=uuid.uuid4().hex)
+
+@pytest.fixture
+def hume():
+    tts = FakeTts()
+    client = SimpleNamespace(tts=tts)
+    with patch.object(voice_generation.ClientFactory, "get_hume_async_client", return_value=client):
+        yield tts.voices
+
+@pytest.fixture
+def texts(db_session):
+    created = []
+
+    def make(character_count):
+        db_text = crud.create_text(db_session, content=f"Voice index test. {uuid.uuid4().hex}", title="Voice Index")
+        characters = []
+        for number in range(character_count):
+            character = crud.create_character(db_session, text_id=db_text.id, name=f"Character{number}", intro_text="Hi.")
+            crud.create_text_segment(db_session, text_id=db_text.id, character_id=character.id, text="Line.", sequence=number + 1)
+            characters.append(character.id)
+        created.append(db_text.id)
+        return db_text.id, characters
+
+    yield make
+
+    db_session.rollback()
+    for text_id in created:
+        db_session.query(models.ProviderVoice).filter(models.ProviderVoice.text_id == text_id).delete()
+        crud.delete_segments_by_text(db_session, text_id)
+        crud.delete_characters_by_text(db_session, text_id)
+        db_session.query(models.Text).filter(models.Text.id == text_id).delete()
+    db_session.commit()
+
+async def _generate_voices(text_id, character_ids):
+    return [
+        await voice_generation.generate_character_voice(
+            character_id=character_id,
+            character_name=f"Character{number}",
+            character_description="",
+            character_intro_text="Hi.",
+            text_id=text_id
+        )
+        for number, character_id in enumerate(character_ids)
+    ]
+
+@pytest.mark.asyncio
+async def test_reanalysis_deletes_recorded_voices_concurrently(db_session, hume, texts):
+    text_id, characters = texts(4)
+    other_text_id, other_characters = texts(1)
+    voice_ids = await _generate_voices(text_id, characters)
+    other_voice_ids = await _generate_voices(other_text_id, other_characters)
+
+    recorded = crud.get_provider_voices_by_text(db_session, text_id)
+    assert sorted(voice.voice_id for voice in recorded) == sorted(voice_ids)
+    assert {voice.name for voice in recorded} == {f"Character{n}_{text_id}" for n in range(4)}
+
+    # One voice was already deleted in the Hume dashboard
+    del hume.account[voice_ids[0]]
+    await text_analysis._delete_existing_hume_voices(text_id)
+
+    assert hume.list_calls == 0
+    assert hume.max_in_flight == 4
+    assert sorted(hume.deleted) == [f"Character{n}_{text_id}" for n in range(1, 4)]
+    assert list(hume.account) == other_voice_ids
+    db_session.expire_all()
+    assert crud.get_provider_voices_by_text(db_session, text_id) == []
+    assert len(crud.get_provider_voices_by_text(db_session, other_text_id)) == 1
+
+@pytest.mark.asyncio
+async def test_reconciliation_repairs_drift(db_session, hume, texts):
+    text_id, characters = texts(2)
+    voice_ids = await _generate_voices(text_id, characters)
+
+    # Drift: a recorded voice was deleted at Hume, and voices were saved without being recorded
+    del hume.account[voice_ids[0]]
+    hume.account["untracked-live"] = f"Narrator_{text_id}"
+    hume.account["untracked-orphan"] = "Narrator_999999999"
+    hume.account["someone-else"] = "Demo voice"
+
+    try:
+        counts = await voice_index.reconcile_provider_voices(delete_orphans=True)
+        assert counts["missing"] >= 1 and counts["recorded"] >= 1 and counts["deleted"] >= 1
+
+        db_session.expire_all()
+        recorded = {voice.voice_id for voice in crud.get_provider_voices_by_text(db_session, text_id)}
+        assert recorded == {voice_ids[1], "untracked-live"}
+        assert crud.get_character(db_session, characters[0]).provider_id is None
+        assert crud.get_character(db_session, characters[1]).provider_id == voice_ids[1]
+        assert "untracked-orphan" not in hume.account
+        assert "someone-else" in hume.account
+    finally:
+        db_session.query(models.ProviderVoice).filter(models.ProviderVoice.voice_id.in_(list(hume.account))).delete(synchronize_session=False)
+        db_session.commit()
+
+@pytest.mark.asyncio
+async def test_reconciliation_keeps_voices_created_while_listing(db_session, hume, texts):
+    text_id, characters = texts(1)
+    list_account = hume.list
+    created = []
+
+    async def list_then_generate(provider):
+        # The account listing misses a voice saved and recorded right after it
+        voices = await list_account(provider)
+        created.extend(await _generate_voices(text_id, characters))
+        return voices
+
+    hume.list = list_then_generate
+    await voice_index.reconcile_provider_voices(delete_orphans=False)
+
+    db_session.expire_all()
+    assert [voice.voice_id for voice in crud.get_provider_voices_by_text(db_session, text_id)] == created
+    assert crud.get_character(db_session, characters[0]).provider_id == created[0]
+    assert created[0] in hume.account
+
+@pytest.mark.asyncio
+async def test_unused_character_voices_are_dropped(db_session, hume, texts):
+    text_id, characters = texts(3)
+    voice_ids = await _generate_voices(text_id, characters)
+    # Segmentation gave Character1's lines to Character0; Character2 shares Character0's voice
+    segment = crud.get_segments_by_text(db_session, text_id)[1]
+    segment.character_id = characters[0]
+    crud.update_character_voice(db_session, characters[2], voice_ids[0])
+    crud.delete_segments(db_session, text_id, [crud.get_segments_by_text(db_session, text_id)[2].id])
+
+    assert await voice_index.drop_unused_character_voices(text_id) == 2
+    assert await voice_index.drop_unused_character_voices(text_id) == 0
+
+    db_session.expire_all()
+    assert [crud.get_character(db_session, character_id).provider_id for character_id in characters] == [voice_ids[0], None, None]
+    assert hume.deleted == [f"Character1_{text_id}"]
+    assert {voice.voice_id for voice in crud.get_provider_voices_by_text(db_session, text_id)} == {voice_ids[0], voice_ids[2]}
@@ -0,0 +1,139 @@
+"""
+Tests for voice reuse across texts through the voice library (services/voice_library.py).
+"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from db import crud, models
+from services import voice_generation
+from services.voice_library import description_hash, library_voice_name
+
+class FakeVoices:
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+
+    async def create(self, name, generation_id):
+        await asyncio.sleep(0.01)
+        self.created.append(name)
+        return SimpleNamespace(id=f"voice-{uuid.uuid4().hex}")
+
+    async def delete(self, name):
+        self.deleted.append(name)
+
+class FakeTts:
+    def __init__(self):
+        self.voices = FakeVoices()
+        self.samples = 0
+        self.descriptions = []
+
+    async def synthesize_json_streaming(self, utterances, **kwargs):
+        self.samples += 1
+        self.descriptions.extend(utterance.description for utterance in utterances)
+        yield SimpleNamespace(generation_id=uuid.uuid4().hex)
+
+@pytest.fixture
+def narrator_description():
+    # Unique per test run so earlier runs' library entries do not match
+    return f"A calm, low narrator voice with a slight rasp ({uuid.uuid4().hex})."
+
+@pytest.fixture
+def make_character(db_session):
+    created = []
+
+    def make(name, description):
+        db_text = crud.create_text(db_session, content=f"Voice library test. {uuid.uuid4().hex}", title="Voices")
+        character = crud.create_character(db_session, text_id=db_text.id, name=name, description=description, intro_text="Hello.")
+        crud.create_text_segment(db_session, text_id=db_text.id, character_id=character.id, text="Line.", sequence=1)
+        created.append((db_text.id, description))
+        return character.id, db_text.id
+
+    yield make
+
+    db_session.rollback()
+    for text_id, description in created:
+        db_session.query(models.VoiceLibraryEntry).filter(
+            models.VoiceLibraryEntry.description_hash == description_hash(description)
+        ).delete()
+        db_session.query(models.ProviderVoice).filter(
+            (models.ProviderVoice.text_id == text_id) |
+            (models.ProviderVoice.name == library_voice_name(description_hash(description)))
+        ).delete(synchronize_session=False)
+        crud.delete_segments_by_text(db_session, text_id)
+        crud.delete_characters_by_text(db_session, text_id)
+        db_session.query(models.Text).filter(models.Text.id == text_id).delete()
+    db_session.commit()
+
+async def _generate(character_id, text_id, description, **kwargs):
+    return await voice_generation.generate_character_voice(
+        character_id=character_id,
+        character_name="Narrator",
+        character_description=description,
+        character_intro_text="Hello.",
+        text_id=text_id,
+        **kwargs
+    )
+
+@pytest.mark.asyncio
+async def test_matching_descriptions_share_one_voice(db_session, make_character, narrator_description):
+    tts = FakeTts()
+    first = make_character("Narrator", narrator_description)
+    second = make_character("Narrator", narrator_description)
+    # Same description up to case, spacing and trailing punctuation
+    third = make_character("Narrator", "  " + narrator_description.upper().rstrip(".") + "  ")
+
+    with patch.object(voice_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)):
+        voice_ids = await asyncio.gather(
+            _generate(*first, narrator_description),
+            _generate(*second, narrator_description)
+        )
+        voice_ids.append(await _generate(*third, narrator_description.upper()))
+
+    key = description_hash(narrator_description)
+    assert tts.samples == 1
+    assert tts.voices.created == [library_voice_name(key)]
+    assert len(set(voice_ids)) == 1
+
+    entry = crud.get_library_voice(db_session, key)
+    assert entry.voice_id == voice_ids[0]
+    assert entry.use_count == 2
+    for character_id, _ in (first, second, third):
+        assert crud.get_character(db_session, character_id).provider_id == voice_ids[0]
+
+@pytest.mark.asyncio
+async def test_library_is_bypassed_when_requested(db_session, make_character, narrator_description):
+    tts = FakeTts()
+    shared = make_character("Narrator", narrator_description)
+    forced = make_character("Narrator", narrator_description)
+    undescribed = make_character("Narrator", "")
+
+    with patch.object(voice_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)):
+        library_voice = await _generate(*shared, narrator_description)
+        forced_voice = await _generate(*forced, narrator_description, force_regenerate=True)
+        await _generate(*undescribed, "")
+
+    assert forced_voice != library_voice
+    assert tts.voices.deleted == [f"Narrator_{forced[1]}"]
+    assert tts.voices.created == [
+        library_voice_name(description_hash(narrator_description)), f"Narrator_{forced[1]}", f"Narrator_{undescribed[1]}"
+    ]
+    assert crud.get_library_voice(db_session, description_hash(narrator_description)).voice_id == library_voice
+
+@pytest.mark.asyncio
+async def test_undescribed_characters_get_text_specific_voices(db_session, make_character):
+    tts = FakeTts()
+    first = make_character("Narrator", None)
+    second = make_character("Narrator", None)
+
+    with patch.object(voice_generation.ClientFactory, "get_hume_async_client", return_value=SimpleNamespace(tts=tts)):
+        for _, text_id in (first, second):
+            await voice_generation.generate_all_character_voices_parallel(text_id)
+
+    assert tts.voices.created == [f"Narrator_{first[1]}", f"Narrator_{second[1]}"]
+    assert tts.descriptions == ["Character named Narrator", "Character named Narrator"]
+    assert crud.get_library_voice(db_session, description_hash(None)) is None
@@ -129,7 +129,6 @@ def test_sound_effects(db_session, test_text):
                 start_word_position=start_word_number,
                 end_word_position=end_word_number,
                 prompt=effect['prompt'],
-                audio_data_b64="",
                 start_time=None,
                 end_time=None,
                 total_time=total_time,
@@ -237,7 +236,7 @@ class TestWebhookSoundEffectsWorkflow:
         
         while time.time() - wait_start < max_wait:
             db_session.refresh(effect)
-            if effect.audio_data_b64:
+            if effect.audio_hash:
                 break
             time.sleep(0.5)
         
@@ -245,8 +244,8 @@ class TestWebhookSoundEffectsWorkflow:
         total_duration = time.time() - start_time
         
         # Verify audio was stored
-        assert effect.audio_data_b64 is not None, "Audio should be stored in database"
-        assert len(effect.audio_data_b64) > 1000, "Audio data should have reasonable size"
+        assert effect.audio_hash is not None, "Audio should be stored"
+        assert effect.audio_size > 1000, "Audio data should have reasonable size"
         
         print(f"✓ Step 3: Audio stored in database after {storage_duration:.2f}s")
         print(f"✓ Total workflow time: {total_duration:.2f}s")
@@ -264,7 +263,7 @@ class TestWebhookSoundEffectsWorkflow:
                 "total_duration": total_duration
             },
             "success": True,
-            "audio_data_length": len(effect.audio_data_b64),
+            "audio_data_length": effect.audio_size,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -349,7 +348,7 @@ class TestWebhookBackgroundMusicWorkflow:
         
         while time.time() - wait_start < max_wait:
             db_session.refresh(test_text)
-            if test_text.background_music_audio_b64:
+            if test_text.background_music_audio_hash:
                 break
             time.sleep(0.5)
         
@@ -357,8 +356,8 @@ class TestWebhookBackgroundMusicWorkflow:
         total_duration = time.time() - start_time
         
         # Verify audio was stored
-        assert test_text.background_music_audio_b64 is not None, "Background music should be stored in database"
-        assert len(test_text.background_music_audio_b64) > 1000, "Audio data should have reasonable size"
+        assert test_text.background_music_audio_hash is not None, "Background music should be stored"
+        assert test_text.background_music_audio_size > 1000, "Audio data should have reasonable size"
         
         print(f"✓ Step 4: Audio stored in database after {storage_duration:.2f}s")
         print(f"✓ Total workflow time: {total_duration:.2f}s")
@@ -375,7 +374,7 @@ class TestWebhookBackgroundMusicWorkflow:
                 "total_duration": total_duration
             },
             "success": True,
-            "audio_data_length": len(test_text.background_music_audio_b64),
+            "audio_data_length": test_text.background_music_audio_size,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -511,13 +510,13 @@ class TestParallelProcessing:
             # Check sound effects
             for effect in test_effects:
                 db_session.refresh(effect)
-                if not effect.audio_data_b64:
+                if not effect.audio_hash:
                     all_stored = False
                     break
             
             # Check background music
             db_session.refresh(test_text)
-            if not test_text.background_music_audio_b64:
+            if not test_text.background_music_audio_hash:
                 all_stored = False
             
             return all_stored
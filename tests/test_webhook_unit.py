@@ -72,7 +72,7 @@ class TestWebhookEndpoint:
             "output": "https://replicate.com/test-music.mp3"
         }
     
-    @patch('api.endpoints.replicate_webhook.crud')
+    @patch('api.endpoints.replicate_webhook.async_crud', new_callable=AsyncMock)
     @patch('api.endpoints.replicate_webhook.process_webhook_success')
     def test_sound_effect_webhook_success(self, mock_process, mock_crud, sound_effect_payload):
         """Test successful sound effect webhook processing."""
@@ -89,7 +89,7 @@ class TestWebhookEndpoint:
         assert data["status"] == "succeeded"
         mock_crud.get_sound_effect.assert_called_once()
     
-    @patch('api.endpoints.replicate_webhook.crud')
+    @patch('api.endpoints.replicate_webhook.async_crud', new_callable=AsyncMock)
     @patch('api.endpoints.replicate_webhook.process_webhook_success')
     def test_background_music_webhook_success(self, mock_process, mock_crud, background_music_payload):
         """Test successful background music webhook processing."""
@@ -106,7 +106,7 @@ class TestWebhookEndpoint:
         assert data["status"] == "succeeded"
         mock_crud.get_text.assert_called_once()
     
-    @patch('api.endpoints.replicate_webhook.crud')
+    @patch('api.endpoints.replicate_webhook.async_crud', new_callable=AsyncMock)
     def test_content_type_routing(self, mock_crud, sound_effect_payload):
         """Test content_type routing to correct validation functions."""
         # Test sound_effect routing
@@ -130,7 +130,7 @@ class TestWebhookEndpoint:
         assert response.status_code == 200
         mock_crud.get_text.assert_called_once()
     
-    @patch('api.endpoints.replicate_webhook.crud')
+    @patch('api.endpoints.replicate_webhook.async_crud', new_callable=AsyncMock)
     def test_webhook_content_not_found(self, mock_crud, sound_effect_payload):
         """Test webhook when content doesn't exist."""
         mock_crud.get_sound_effect.return_value = None
@@ -143,7 +143,7 @@ class TestWebhookEndpoint:
         assert response.status_code == 404
         assert "Sound effect 999 not found" in response.json()["detail"]
     
-    @patch('api.endpoints.replicate_webhook.crud')
+    @patch('api.endpoints.replicate_webhook.async_crud', new_callable=AsyncMock)
     @patch('api.endpoints.replicate_webhook.mark_generation_failed')
     def test_webhook_failed_status(self, mock_mark_failed, mock_crud):
         """Test webhook handling for failed predictions."""
@@ -166,7 +166,7 @@ class TestWebhookEndpoint:
         assert response.status_code == 200
         assert response.json()["status"] == "failed"
     
-    @patch('api.endpoints.replicate_webhook.crud')
+    @patch('api.endpoints.replicate_webhook.async_crud', new_callable=AsyncMock)
     def test_webhook_succeeded_no_output(self, mock_crud, sound_effect_payload):
         """Test webhook when succeeded but no output provided."""
         mock_crud.get_sound_effect.return_value = Mock(id=1)
@@ -376,10 +376,33 @@ class TestErrorScenarios:
         
         assert result is False
 
+    @patch('services.replicate_audio.enqueue_log')
+    @patch('services.replicate_audio.get_blob_store')
+    @patch('services.replicate_audio.get_async_client')
+    @patch('services.replicate_audio.DatabaseSessionManager')
+    @pytest.mark.asyncio
+    async def test_failed_commit_logs_only_the_error(self, mock_db_manager, mock_get_client, mock_blob_store, mock_enqueue_log):
+        """Test that no success log is queued when the audio update fails to commit."""
+        mock_response = Mock()
+        mock_response.content = b"audio_data"
+        mock_client = Mock()
+        mock_client.get = AsyncMock(return_value=mock_response)
+        mock_get_client.return_value = mock_client
+        mock_db_manager.safe_execute.return_value = True
+        
+        processor = BackgroundMusicProcessor()
+        mock_db = Mock()
+        mock_db.commit.side_effect = Exception("commit failed")
+        result = await processor.process_and_store(mock_db, 1, {"output": "https://test.com/music.mp3"})
+        
+        assert result is False
+        mock_db.rollback.assert_called_once()
+        assert [call.kwargs["status"] for call in mock_enqueue_log.call_args_list] == ["error"]
+
 class TestIdempotency:
     """Test idempotent webhook handling."""
     
-    @patch('api.endpoints.replicate_webhook.crud')
+    @patch('api.endpoints.replicate_webhook.async_crud', new_callable=AsyncMock)
     @patch('api.endpoints.replicate_webhook.process_webhook_success')
     def test_duplicate_webhook_handling(self, mock_process, mock_crud):
         """Test that duplicate webhooks are handled gracefully."""
@@ -0,0 +1,62 @@
+"""
+Tests for the packed word timestamp encoding and its use in the export path.
+"""
+
+import pytest
+
+from db import models
+from db.word_timestamps import WordTimestamps, encode_word_timestamps, pack_word_timestamps
+from services.combine_export_audio import _match_word_position_to_timestamp
+
+WORDS = [
+    {"word": "It", "start": 0.0, "end": 0.12},
+    {"word": "was", "start": 0.12, "end": 0.3},
+    {"word": "naïve", "start": 0.31, "end": 0.8},
+    {"word": "“quoted”", "start": 3601.25, "end": 3601.5},
+]
+
+def test_round_trip():
+    timestamps = WordTimestamps.from_list(WORDS)
+
+    assert len(timestamps) == 4
+    assert timestamps.to_list() == WORDS
+    assert timestamps[2] == {"word": "naïve", "start": 0.31, "end": 0.8}
+    assert timestamps[-1]["word"] == "“quoted”"
+    assert timestamps.word(1) == "was"
+    assert timestamps.start(3) == pytest.approx(3601.25, abs=1e-3)
+
+def test_columnar_layout_is_compact():
+    data = pack_word_timestamps(WORDS)
+    words_bytes = sum(len(w["word"].encode("utf-8")) for w in WORDS)
+
+    # header + two float32 arrays + offset table + words
+    assert len(data) == 8 + 4 * 4 * 2 + 4 * 5 + words_bytes
+    assert WordTimestamps(data).encode() == data
+
+def test_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        WordTimestamps(b"[{\"word\": \"x\"}]")
+
+def test_empty_values_are_stored_as_null():
+    assert encode_word_timestamps(None) is None
+    assert encode_word_timestamps([]) is None
+    assert encode_word_timestamps(WordTimestamps.from_list([])) is None
+
+def test_text_property_packs_and_unpacks():
+    text = models.Text(content="It was naïve.")
+    text.word_timestamps = WORDS
+
+    assert isinstance(text.word_timestamps_data, bytes)
+    assert text.word_timestamps.to_list() == WORDS
+
+    text.word_timestamps = None
+    assert text.word_timestamps_data is None
+    assert text.word_timestamps is None
+
+def test_match_word_position_uses_start_array():
+    timestamps = WordTimestamps.from_list(WORDS)
+
+    assert _match_word_position_to_timestamp(1, timestamps) == pytest.approx(0.12)
+    assert _match_word_position_to_timestamp(10, timestamps) == pytest.approx(3601.25, abs=1e-3)
+    assert _match_word_position_to_timestamp(-1, timestamps) is None
+    assert _match_word_position_to_timestamp(0, None) is None
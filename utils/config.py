@@ -58,6 +58,27 @@ class ReplicateAudioSettings:
             silence_threshold=os.getenv("REPLICATE_SILENCE_THRESHOLD", "-60dB")
         )
 
+@dataclass
+class ProviderRateLimitSettings:
+    """Shared request scheduling limits for one external provider (services/rate_limit.py)."""
+    
+    requests_per_minute: float = 60.0
+    max_concurrency: int = 5
+    burst: Optional[int] = None  # Requests allowed back to back; defaults to max_concurrency
+    max_backoff: float = 60.0  # Longest pause after throttling or an exhausted rate limit
+    
+    @classmethod
+    def from_environment(cls, provider: str, requests_per_minute: float, max_concurrency: int) -> 'ProviderRateLimitSettings':
+        """Read <PROVIDER>_REQUESTS_PER_MINUTE, _MAX_CONCURRENCY, _BURST and _MAX_BACKOFF."""
+        prefix = provider.upper()
+        burst = os.getenv(f"{prefix}_BURST")
+        return cls(
+            requests_per_minute=float(os.getenv(f"{prefix}_REQUESTS_PER_MINUTE", str(requests_per_minute))),
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(max_concurrency))),
+            burst=int(burst) if burst else None,
+            max_backoff=float(os.getenv(f"{prefix}_MAX_BACKOFF", "60"))
+        )
+
 # Settings class for compatibility
 class Settings:
     """Settings container class for application configuration"""
@@ -67,6 +88,32 @@ class Settings:
         self.HUME_API_KEY = os.getenv("HUME_API_KEY", "")
         self.REPLICATE_API_TOKEN = os.getenv("REPLICATE_API_TOKEN", "")
         
+        # Concurrent Hume TTS requests allowed per API key (services/speech_generation.py)
+        self.HUME_TTS_MAX_CONCURRENCY = int(os.getenv("HUME_TTS_MAX_CONCURRENCY", "5"))
+        # Stream TTS responses and build the combined speech track while batches are in flight
+        self.HUME_TTS_STREAMING = os.getenv("HUME_TTS_STREAMING", "false").lower() == "true"
+        # TTS request packing (services/speech_batching.py): initial character budget per
+        # request, the latency the tuned budget aims for, and the most segments per request
+        self.HUME_TTS_BATCH_CHARS = int(os.getenv("HUME_TTS_BATCH_CHARS", "1200"))
+        self.HUME_TTS_BATCH_TARGET_SECONDS = float(os.getenv("HUME_TTS_BATCH_TARGET_SECONDS", "10"))
+        self.HUME_TTS_BATCH_MAX_UTTERANCES = int(os.getenv("HUME_TTS_BATCH_MAX_UTTERANCES", "5"))
+        # Texts longer than this many characters are segmented in concurrent chunks
+        # (services/text_chunking.py); 0 segments every text in a single request
+        self.TEXT_ANALYSIS_CHUNK_CHARS = int(os.getenv("TEXT_ANALYSIS_CHUNK_CHARS", "8000"))
+        # Stream phase 2 segmentation and store segments as they are parsed (services/text_analysis.py)
+        self.TEXT_ANALYSIS_STREAMING = os.getenv("TEXT_ANALYSIS_STREAMING", "false").lower() == "true"
+        # Generate character voices while phase 2 segmentation runs (implies streaming)
+        self.TEXT_ANALYSIS_PIPELINE_VOICES = os.getenv("TEXT_ANALYSIS_PIPELINE_VOICES", "false").lower() == "true"
+        # Disk cache of Anthropic analysis responses (services/llm_cache.py)
+        self.LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(OUTPUT_DIR / "llm_cache.sqlite3"))
+        self.LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+        self.LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+        # Reconciliation of the local voice index with the Hume account (services/voice_index.py);
+        # 0 disables the periodic job
+        self.VOICE_RECONCILE_INTERVAL_MINUTES = int(os.getenv("VOICE_RECONCILE_INTERVAL_MINUTES", "360"))
+        self.VOICE_RECONCILE_DELETE_ORPHANS = os.getenv("VOICE_RECONCILE_DELETE_ORPHANS", "false").lower() == "true"
+        
         # Production Environment Configuration
         self.ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
         self.BASE_URL = self._get_base_url()
@@ -83,6 +130,8 @@ class Settings:
         self.OUTPUT_DIR = OUTPUT_DIR
         self.LOGS_DIR = LOGS_DIR
         self.AUDIO_STORAGE_PATH = os.getenv("AUDIO_STORAGE_PATH", str(AUDIO_DIR))
+        # Audio blob storage backend: "local" (files under AUDIO_STORAGE_PATH) or "r2"
+        self.AUDIO_BLOB_BACKEND = os.getenv("AUDIO_BLOB_BACKEND", "local").lower()
         
         # WhisperX/Force Alignment Configuration
         self.WHISPERX_MODEL_SIZE = os.getenv("WHISPERX_MODEL_SIZE", "base")
@@ -92,6 +141,13 @@ class Settings:
         # Replicate Audio Configuration
         self.replicate_audio = ReplicateAudioSettings.from_environment()
         
+        # Provider request scheduling (token bucket rate, in-flight cap per provider)
+        self.rate_limits = {
+            "hume": ProviderRateLimitSettings.from_environment("hume", requests_per_minute=100, max_concurrency=10),
+            "anthropic": ProviderRateLimitSettings.from_environment("anthropic", requests_per_minute=50, max_concurrency=5),
+            "replicate": ProviderRateLimitSettings.from_environment("replicate", requests_per_minute=600, max_concurrency=10)
+        }
+        
         # Database Configuration Management
         self.DATABASE_URL = self._get_database_url()
         
@@ -102,6 +158,11 @@ class Settings:
         self.DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
         self.DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
         self.DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+        
+        # Write-behind ProcessLog writer (db/log_writer.py)
+        self.PROCESS_LOG_QUEUE_SIZE = int(os.getenv("PROCESS_LOG_QUEUE_SIZE", "10000"))
+        self.PROCESS_LOG_BATCH_SIZE = int(os.getenv("PROCESS_LOG_BATCH_SIZE", "100"))
+        self.PROCESS_LOG_FLUSH_INTERVAL_MS = int(os.getenv("PROCESS_LOG_FLUSH_INTERVAL_MS", "500"))
     
     def _get_base_url(self) -> str:
         """Get BASE_URL with proper HTTPS validation for production."""